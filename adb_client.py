@@ -0,0 +1,301 @@
+"""
+ADB 服务端协议客户端
+
+``adb devices`` / ``adb connect`` / ``adb -s X shell echo`` 每次都要启动一个 adb 进程
+（50~100ms），``ensure_connected`` 一次就要跑好几次。ADB 客户端本身只是把请求通过
+TCP 发给 5037 端口上的 adb server，``AdbClient`` 直接说这个协议：
+
+- 请求格式：4 位十六进制长度 + 请求字符串；响应 ``OKAY`` / ``FAIL`` + 长度前缀的消息
+- ``host:track-devices`` 是一条长连接，设备列表变化时 adb server 主动推送；后台线程
+  持有这条连接维护设备表，``devices()`` 直接读内存（亚毫秒）
+- 没有跟踪连接时（或刚执行过 connect/disconnect），用一次 ``host:devices`` 查询并按
+  TTL 缓存
+
+adb server 未启动时抛出 ``AdbServerUnavailable``，调用方回退到 adb 命令（命令行会
+自动拉起 adb server）。
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import socket
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+ADB_HOST = "127.0.0.1"
+ADB_PORT = int(os.getenv("ADB_SERVER_PORT", "5037"))
+
+DEVICE_CACHE_TTL = 2.0
+"""没有跟踪连接时，设备表缓存的有效期（秒）"""
+
+TRACK_RETRY_INTERVAL = 2.0
+"""跟踪连接断开后重连的间隔（秒）"""
+
+logger = logging.getLogger(__name__)
+
+
+class AdbError(Exception):
+    """adb server 返回 FAIL 或协议错误"""
+
+
+class AdbServerUnavailable(AdbError):
+    """连不上 adb server（未启动）"""
+
+
+def parse_devices(payload: str) -> Dict[str, str]:
+    """``serial\\tstate`` 行 -> {serial: state}"""
+    devices = {}
+    for line in payload.splitlines():
+        parts = line.split()
+        if len(parts) >= 2:
+            devices[parts[0]] = parts[1]
+    return devices
+
+
+def _recv_exact(sock: socket.socket, size: int) -> bytes:
+    data = b""
+    while len(data) < size:
+        chunk = sock.recv(size - len(data))
+        if not chunk:
+            raise AdbError("adb server 关闭了连接")
+        data += chunk
+    return data
+
+
+def _read_message(sock: socket.socket) -> str:
+    length = int(_recv_exact(sock, 4), 16)
+    return _recv_exact(sock, length).decode("utf-8", errors="replace")
+
+
+def _send_request(sock: socket.socket, request: str) -> None:
+    data = request.encode("utf-8")
+    sock.sendall(b"%04x" % len(data) + data)
+    status = _recv_exact(sock, 4)
+    if status == b"OKAY":
+        return
+    if status == b"FAIL":
+        raise AdbError(_read_message(sock))
+    raise AdbError(f"未知响应: {status!r}")
+
+
+class AdbClient:
+    """adb server 客户端（线程安全）"""
+
+    def __init__(
+        self,
+        host: str = ADB_HOST,
+        port: int = ADB_PORT,
+        timeout: float = 5.0,
+        cache_ttl: float = DEVICE_CACHE_TTL,
+    ):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.cache_ttl = cache_ttl
+        self._devices: Dict[str, str] = {}
+        self._devices_at = 0.0
+        self._stale = True
+        self._tracking = False
+        self._track_thread: Optional[threading.Thread] = None
+        self._track_sock: Optional[socket.socket] = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    # 协议
+    # ------------------------------------------------------------------
+
+    def _open(self, timeout: Optional[float] = None) -> socket.socket:
+        try:
+            return socket.create_connection(
+                (self.host, self.port), timeout=self.timeout if timeout is None else timeout
+            )
+        except OSError as exc:
+            raise AdbServerUnavailable(f"无法连接 adb server {self.host}:{self.port}: {exc}")
+
+    def host_request(self, request: str) -> str:
+        """一次性 host 服务请求（如 ``host:devices``），返回长度前缀的响应消息"""
+        with self._open() as sock:
+            _send_request(sock, request)
+            return _read_message(sock)
+
+    def is_available(self) -> bool:
+        """adb server 是否在监听"""
+        try:
+            self.host_request("host:version")
+            return True
+        except AdbError:
+            return False
+
+    # ------------------------------------------------------------------
+    # 设备表
+    # ------------------------------------------------------------------
+
+    def devices(self) -> Dict[str, str]:
+        """当前设备表 {serial: state}
+
+        跟踪连接在线时直接返回推送来的设备表；否则 TTL 内返回缓存，过期重新查询。
+
+        Raises:
+            AdbServerUnavailable: adb server 未启动
+        """
+        with self._lock:
+            fresh = time.monotonic() - self._devices_at < self.cache_ttl
+            if not self._stale and (self._tracking or fresh):
+                return dict(self._devices)
+        devices = parse_devices(self.host_request("host:devices"))
+        with self._lock:
+            self._devices = devices
+            self._devices_at = time.monotonic()
+            self._stale = False
+        return dict(devices)
+
+    def invalidate(self) -> None:
+        """设备表可能已变化（connect/disconnect 之后），下次 ``devices()`` 重新查询"""
+        with self._lock:
+            self._stale = True
+
+    def start_tracking(self) -> None:
+        """启动后台 ``host:track-devices`` 跟踪线程（已启动时无操作）"""
+        with self._lock:
+            if self._track_thread is not None and self._track_thread.is_alive():
+                return
+            self._stop.clear()
+            self._track_thread = threading.Thread(
+                target=self._track_loop, name="adb-track-devices", daemon=True
+            )
+            self._track_thread.start()
+
+    def stop_tracking(self) -> None:
+        self._stop.set()
+        sock = self._track_sock
+        if sock is not None:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+        if self._track_thread is not None:
+            self._track_thread.join(timeout=2)
+
+    @property
+    def tracking(self) -> bool:
+        with self._lock:
+            return self._tracking
+
+    def _track_loop(self) -> None:
+        while not self._stop.is_set():
+            try:
+                with self._open(timeout=None) as sock:
+                    sock.settimeout(None)
+                    self._track_sock = sock
+                    _send_request(sock, "host:track-devices")
+                    while not self._stop.is_set():
+                        devices = parse_devices(_read_message(sock))
+                        with self._lock:
+                            self._devices = devices
+                            self._devices_at = time.monotonic()
+                            self._stale = False
+                            self._tracking = True
+            except (AdbError, OSError, ValueError) as exc:
+                if not self._stop.is_set():
+                    logger.debug(f"[ADB] 设备跟踪连接断开: {exc}")
+            finally:
+                self._track_sock = None
+                with self._lock:
+                    self._tracking = False
+            self._stop.wait(TRACK_RETRY_INTERVAL)
+
+    # ------------------------------------------------------------------
+    # 命令
+    # ------------------------------------------------------------------
+
+    def connect(self, address: str) -> Tuple[bool, str]:
+        """``adb connect``，返回 (是否已连接, adb server 的消息)"""
+        message = self.host_request(f"host:connect:{address}")
+        self.invalidate()
+        lowered = message.lower()
+        ok = "connected to" in lowered and "cannot" not in lowered and "failed" not in lowered
+        return ok, message
+
+    def disconnect(self, address: str) -> Tuple[bool, str]:
+        """``adb disconnect``，返回 (是否成功, adb server 的消息)"""
+        try:
+            message = self.host_request(f"host:disconnect:{address}")
+        except AdbServerUnavailable:
+            raise
+        except AdbError as exc:
+            self.invalidate()
+            return False, str(exc)
+        self.invalidate()
+        return True, message
+
+    def open_service(
+        self, serial: str, service: str, timeout: Optional[float] = None
+    ) -> socket.socket:
+        """切换到设备并打开 ``service``（如 ``exec:sh``），返回已就绪的连接，由调用方关闭
+
+        Raises:
+            AdbError: 设备不存在、离线或服务打开失败
+        """
+        sock = self._open()
+        try:
+            sock.settimeout(self.timeout if timeout is None else timeout)
+            _send_request(sock, f"host:transport:{serial}")
+            _send_request(sock, service)
+        except BaseException:
+            sock.close()
+            raise
+        return sock
+
+    def _transport(self, serial: str, service: str, timeout: float) -> bytes:
+        """切换到设备后执行 ``service``，读取输出直到设备端关闭连接"""
+        with self.open_service(serial, service, timeout) as sock:
+            chunks = []
+            while True:
+                chunk = sock.recv(1 << 20)
+                if not chunk:
+                    break
+                chunks.append(chunk)
+        return b"".join(chunks)
+
+    def shell(self, serial: str, command: str, timeout: float = 10.0) -> str:
+        """``adb -s <serial> shell <command>``，返回输出
+
+        Raises:
+            AdbError: 设备不存在或离线
+        """
+        return self._transport(serial, f"shell:{command}", timeout).decode(
+            "utf-8", errors="replace"
+        )
+
+    def exec_out(self, serial: str, command: str, timeout: float = 10.0) -> bytes:
+        """``adb -s <serial> exec-out <command>``，返回原始字节（不经过 pty，不转换换行）
+
+        Raises:
+            AdbError: 设备不存在或离线
+        """
+        return self._transport(serial, f"exec:{command}", timeout)
+
+_clients: Dict[Tuple[str, int], AdbClient] = {}
+_clients_lock = threading.Lock()
+
+
+def get_adb_client(host: str = ADB_HOST, port: int = ADB_PORT) -> AdbClient:
+    """进程内共享的 adb server 客户端（首次使用时启动设备跟踪线程）"""
+    with _clients_lock:
+        client = _clients.get((host, port))
+        if client is None:
+            client = _clients[(host, port)] = AdbClient(host, port)
+            client.start_tracking()
+        return client
+
+
+__all__ = [
+    "AdbClient",
+    "AdbError",
+    "AdbServerUnavailable",
+    "get_adb_client",
+    "parse_devices",
+]
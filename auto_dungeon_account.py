@@ -8,22 +8,28 @@ import time
 from airtest.core.api import (
     start_app,
     stop_app,
-    touch,
-    swipe,
     wait,
 )
 from auto_dungeon_container import get_container
 from auto_dungeon_ui import find_text, find_text_and_click_safe, find_text_and_click
 from auto_dungeon_navigation import is_on_character_selection, save_error_screenshot
-from auto_dungeon_utils import sleep
+from auto_dungeon_utils import (
+    current_frame,
+    sleep,
+    swipe,
+    touch,
+    wait_for_change,
+    wait_for_stable_frame,
+)
 from coordinates import (
     ACCOUNT_AVATAR,
     ACCOUNT_DROPDOWN_ARROW,
     ACCOUNT_LIST_SWIPE_START,
     ACCOUNT_LIST_SWIPE_END,
     LOGIN_BUTTON,
+    SETTINGS_BUTTON,
 )
-from auto_dungeon_config import GIFTS_TEMPLATE
+from auto_dungeon_config import CHAR_SELECTION_WAIT, CLICK_INTERVAL, GIFTS_TEMPLATE
 
 logger = logging.getLogger(__name__)
 
@@ -58,6 +64,28 @@ def switch_account(account_name: str) -> None:
     touch(LOGIN_BUTTON)
 
 
+def switch_character(timeout: int = 30) -> bool:
+    """游戏内切换角色：主界面 → 设置 → 切换角色 → 角色选择界面
+
+    不重启游戏；任一步失败返回 False（不抛异常），由调用方决定是否重启游戏。
+    """
+    logger.info("🔄 游戏内切换角色")
+    before = current_frame()
+    touch(SETTINGS_BUTTON)
+    wait_for_change(before, max_wait=CLICK_INTERVAL, reason="等待设置界面打开")
+
+    if not find_text_and_click_safe("切换角色", timeout=5, use_cache=False):
+        logger.warning("⚠️ 设置界面未找到「切换角色」按钮")
+        return False
+    # 部分版本会弹出确认框
+    find_text_and_click_safe("确定", timeout=2, use_cache=False, regions=[4, 5, 6, 7, 8, 9])
+
+    if not is_on_character_selection(timeout=timeout):
+        logger.warning("⚠️ 切换角色后未进入角色选择界面")
+        return False
+    return True
+
+
 def select_character(char_class: str) -> None:
     """选择角色"""
     logger.info(f"⚔️ 选择角色: {char_class}")
@@ -72,7 +100,12 @@ def select_character(char_class: str) -> None:
         save_error_screenshot("select_character")
         raise RuntimeError("未在角色选择界面，无法选择角色")
 
-    sleep(3, "等待角色选择界面加载完毕")
+    wait_for_stable_frame(
+        max_wait=CHAR_SELECTION_WAIT,
+        min_wait=0.3,
+        stable_frames=3,
+        reason="等待角色选择界面加载完毕",
+    )
     logger.info(f"🔍 查找职业: {char_class}")
     result = find_text(char_class, similarity_threshold=0.8, use_cache=False)
 
@@ -81,8 +114,9 @@ def select_character(char_class: str) -> None:
         click_x = pos[0]
         click_y = pos[1] - 60
         logger.info(f"👆 点击角色位置: ({click_x}, {click_y})")
+        before = current_frame()
         touch((click_x, click_y))
-        sleep(1)
+        wait_for_change(before, max_wait=1, reason="等待角色选中")
         logger.info(f"✅ 成功选择角色: {char_class}")
     else:
         logger.error(f"❌ 未找到职业: {char_class}")
@@ -5,14 +5,23 @@ auto_dungeon 战斗模块
 import logging
 import time
 
-from airtest.core.api import touch, wait
+from airtest.core.api import wait
 from tqdm import tqdm
 
-from auto_dungeon_config import AUTOCOMBAT_TEMPLATE
-from auto_dungeon_navigation import is_main_world
+from auto_dungeon_config import (
+    AUTOCOMBAT_TEMPLATE,
+    COMBAT_FAST_POLL_INTERVAL,
+    COMBAT_SLOW_POLL_INTERVAL,
+    COMBAT_TIMEOUT_SECONDS,
+    TEMPLATE_ROI_MARGIN,
+)
+from auto_dungeon_container import get_container
+from auto_dungeon_navigation import MAIN_WORLD_DETECTOR, is_main_world
 from auto_dungeon_ui import find_text_and_click_safe
-from auto_dungeon_utils import check_stop_signal, sleep
+from auto_dungeon_utils import check_stop_signal, sleep, touch
 from coordinates import SKILL_POSITIONS
+from combat_watcher import STATUS_STOPPED, STATUS_TIMEOUT, CombatWatcher
+from frame_bus import wait_template
 
 logger = logging.getLogger(__name__)
 
@@ -22,8 +31,22 @@ def auto_combat(completed_dungeons: int = 0, total_dungeons: int = 0) -> None:
     logger.info("⚔️ 开始自动战斗")
     find_text_and_click_safe("战斗", regions=[8])
 
+    bus = get_container().frame_bus
     try:
-        builtin_auto_combat_activated = bool(wait(AUTOCOMBAT_TEMPLATE, timeout=2, interval=0.1))
+        if bus is not None:
+            builtin_auto_combat_activated = bool(
+                wait_template(
+                    AUTOCOMBAT_TEMPLATE,
+                    bus,
+                    timeout=2,
+                    interval=0.1,
+                    roi_margin=TEMPLATE_ROI_MARGIN,
+                )
+            )
+        else:
+            builtin_auto_combat_activated = bool(
+                wait(AUTOCOMBAT_TEMPLATE, timeout=2, interval=0.1)
+            )
     except Exception:
         builtin_auto_combat_activated = False
 
@@ -47,37 +70,11 @@ def auto_combat(completed_dungeons: int = 0, total_dungeons: int = 0) -> None:
         initial=completed_dungeons if total_dungeons > 0 else 0,
     ) as pbar:
         start_time = time.time()
-        last_update = start_time
-        combat_start = time.monotonic()
-        combat_timeout_seconds = 180
-
-        while not is_main_world():
-            if check_stop_signal():
-                pbar.close()
-                raise KeyboardInterrupt("检测到停止信号，退出自动战斗")
-
-            if time.monotonic() - combat_start >= combat_timeout_seconds:
-                pbar.close()
-                logger.error("⏱️ 自动战斗超时（180秒），抛出异常")
-                raise TimeoutError("自动战斗超时（180秒）")
-
-            current_time = time.time()
-
-            if current_time - last_update >= 0.5:
-                if total_dungeons > 0:
-                    pass
-                else:
-                    update_amount = current_time - last_update
-                    pbar.update(update_amount)
-                last_update = current_time
-
-            if builtin_auto_combat_activated:
-                sleep(1, "等待内置自动战斗")
-                continue
-
-            positions = SKILL_POSITIONS.copy()
-            touch(positions[4])
-            sleep(1, "等待下一次攻击")
+
+        if bus is not None:
+            _watch_combat(bus, builtin_auto_combat_activated, pbar, total_dungeons)
+        else:
+            _poll_combat(builtin_auto_combat_activated, pbar, total_dungeons)
 
         if total_dungeons > 0:
             pbar.update(1)
@@ -88,3 +85,67 @@ def auto_combat(completed_dungeons: int = 0, total_dungeons: int = 0) -> None:
         pbar.close()
 
     logger.info("✅ 战斗完成")
+
+
+def _watch_combat(bus, builtin_auto_combat: bool, pbar, total_dungeons: int) -> None:
+    """在帧总线上等待战斗结束（自适应检测频率，结束后立即返回）"""
+    # 结束判定只看主界面模板/像素签名：界面识别器的缩略图相似度不足以区分战斗和主界面
+    watcher = CombatWatcher(
+        bus,
+        is_finished=MAIN_WORLD_DETECTOR.detect,
+        slow_interval=COMBAT_SLOW_POLL_INTERVAL,
+        fast_interval=COMBAT_FAST_POLL_INTERVAL,
+    )
+    last_update = time.time()
+
+    def on_tick() -> None:
+        nonlocal last_update
+        current_time = time.time()
+        if total_dungeons <= 0:
+            pbar.update(current_time - last_update)
+        last_update = current_time
+        if not builtin_auto_combat:
+            touch(SKILL_POSITIONS[4])
+
+    result = watcher.run(
+        timeout=COMBAT_TIMEOUT_SECONDS,
+        should_stop=check_stop_signal,
+        on_tick=on_tick,
+        tick_interval=1.0,
+    )
+    if result.status == STATUS_STOPPED:
+        pbar.close()
+        raise KeyboardInterrupt("检测到停止信号，退出自动战斗")
+    if result.status == STATUS_TIMEOUT:
+        pbar.close()
+        logger.error(f"⏱️ 自动战斗超时（{COMBAT_TIMEOUT_SECONDS}秒），抛出异常")
+        raise TimeoutError(f"自动战斗超时（{COMBAT_TIMEOUT_SECONDS}秒）")
+
+
+def _poll_combat(builtin_auto_combat: bool, pbar, total_dungeons: int) -> None:
+    """没有帧总线时按固定间隔检测主界面"""
+    last_update = time.time()
+    combat_start = time.monotonic()
+
+    while not is_main_world():
+        if check_stop_signal():
+            pbar.close()
+            raise KeyboardInterrupt("检测到停止信号，退出自动战斗")
+
+        if time.monotonic() - combat_start >= COMBAT_TIMEOUT_SECONDS:
+            pbar.close()
+            logger.error(f"⏱️ 自动战斗超时（{COMBAT_TIMEOUT_SECONDS}秒），抛出异常")
+            raise TimeoutError(f"自动战斗超时（{COMBAT_TIMEOUT_SECONDS}秒）")
+
+        current_time = time.time()
+        if current_time - last_update >= 0.5:
+            if total_dungeons <= 0:
+                pbar.update(current_time - last_update)
+            last_update = current_time
+
+        if builtin_auto_combat:
+            sleep(1, "等待内置自动战斗")
+            continue
+
+        touch(SKILL_POSITIONS[4])
+        sleep(1, "等待下一次攻击")
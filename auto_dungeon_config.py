@@ -55,6 +55,35 @@ LAST_OCCURRENCE = 9999
 # "mstpl": 多尺度模板匹配 (Multi-Scale Template Matching)
 OCR_STRATEGY = ["mstpl", "tpl", "sift", "brisk"]
 
+OCR_CACHE_MAX_SIZE = 5000
+"""OCR 结果缓存的最大条目数（所有角色共用；相似查找走内存哈希索引，不受条目数影响）"""
+
+OCR_TEXT_FILTER = False
+"""送 OCR 前先判断区域有没有文字，纯色/黑屏等无字区域直接跳过
+
+边缘判断尚未在真实游戏画面上验证，默认关闭；查找时可用 text_filter 单独开启或关闭
+"""
+
+OCR_IMAGE_FORMAT = "png"
+"""上传给 OCR 服务的图像格式："png"（无损）、"jpg" 或 "webp"
+
+默认无损；"jpg"/"webp" 体积约为 PNG 的 1/5~1/2，但压缩噪点可能影响小号中文字的识别，
+需先在真实截图上与 PNG 对比识别结果，确认无损失后再显式开启
+"""
+
+OCR_IMAGE_QUALITY = 90
+"""JPEG / WebP 编码质量（1-100），过低会影响小字识别"""
+
+OCR_BINARY_UPLOAD = False
+"""是否以原始字节上传图像（省掉 base64），需 OCR 服务支持；PaddleX 官方服务只接受 JSON"""
+
+TEMPLATE_ROI_MARGIN = 60
+"""带 record_pos 的模板只在预测位置周围多少像素内匹配，未命中再回退整帧；None 表示始终整帧匹配"""
+
+PIXEL_SIGNATURES_FILE = str(resolve_project_path("pixel_signatures.json"))
+"""像素签名文件（每台部署用 ``python pixel_signature.py learn`` 生成，不纳入版本库）；
+文件不存在时检测器只用模板匹配，设为 None 则不加载"""
+
 # ====== 超时配置 ======
 
 FIND_TIMEOUT = 10
@@ -71,6 +100,15 @@ COMBAT_TIMEOUT = 60
 MAIN_WORLD_CHECK_TIMEOUT = 0.3
 """主界面检测超时时间（秒）"""
 
+COMBAT_TIMEOUT_SECONDS = 180
+"""单场战斗最长等待时间（秒）"""
+
+COMBAT_SLOW_POLL_INTERVAL = 1.0
+"""战斗平稳阶段检测战斗结束的间隔（秒）"""
+
+COMBAT_FAST_POLL_INTERVAL = 0.1
+"""出现结束迹象（画面剧变、界面不再是战斗）后的检测间隔（秒）"""
+
 # ====== 区域划分配置 ======
 
 # 屏幕区域划分（用于优化OCR搜索范围）
@@ -96,6 +134,11 @@ MAX_ACCOUNT_SWIPE = 10
 MAX_RETINUE_RECRUIT = 4
 """随从招募最大次数"""
 
+# ====== 副本规划配置 ======
+
+SELL_LOOT_EVERY = 3
+"""每打完多少个有掉落的副本卖一次垃圾（日常任务不计入）"""
+
 # ====== 等待时间配置 ======
 
 MAP_LOAD_WAIT = 2
@@ -104,8 +147,20 @@ MAP_LOAD_WAIT = 2
 CHAR_SELECTION_WAIT = 3
 """角色选择界面等待时间（秒）"""
 
+FAST_CHARACTER_SWITCH = True
+"""游戏已在主界面时，通过「设置 → 切换角色」换角色，失败才重启游戏"""
+
 AD_WATCH_WAIT = 40
 """广告观看等待时间（秒）"""
 
 SHOP_COOLDOWN = 150
 """商店购买冷却时间（秒）"""
+
+FRAME_STABLE_THRESHOLD = 3.0
+"""相邻帧缩略图平均差异不超过该值视为画面稳定（0-255）"""
+
+FRAME_CHANGE_THRESHOLD = 8.0
+"""与参考帧的缩略图平均差异超过该值视为画面已变化（0-255）"""
+
+FRAME_SETTLE_MIN_WAIT = 0.2
+"""画面开始变化后至少再等多久才接受“已稳定”（秒），避免在过渡动画的静止首帧上返回"""
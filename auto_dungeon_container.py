@@ -24,6 +24,9 @@ class DependencyContainer:
         self._target_emulator = None
         self._config_name = None
         self._error_dialog_monitor = None
+        self._frame_bus = None
+        self._screen_classifier = None
+        self._input_channel = None
         self._initialized = True
 
     @property
@@ -90,6 +93,30 @@ class DependencyContainer:
     def error_dialog_monitor(self, value):
         self._error_dialog_monitor = value
 
+    @property
+    def frame_bus(self):
+        return self._frame_bus
+
+    @frame_bus.setter
+    def frame_bus(self, value):
+        self._frame_bus = value
+
+    @property
+    def screen_classifier(self):
+        return self._screen_classifier
+
+    @screen_classifier.setter
+    def screen_classifier(self, value):
+        self._screen_classifier = value
+
+    @property
+    def input_channel(self):
+        return self._input_channel
+
+    @input_channel.setter
+    def input_channel(self, value):
+        self._input_channel = value
+
     def reset(self):
         """重置所有依赖"""
         self._config_loader = None
@@ -100,6 +127,9 @@ class DependencyContainer:
         self._target_emulator = None
         self._config_name = None
         self._error_dialog_monitor = None
+        self._frame_bus = None
+        self._screen_classifier = None
+        self._input_channel = None
         self._initialized = False
 
 
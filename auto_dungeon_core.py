@@ -27,6 +27,7 @@ import auto_dungeon_ui
 from auto_dungeon_account import switch_account
 from auto_dungeon_config import (
     CLICK_INTERVAL,
+    FAST_CHARACTER_SWITCH,
     FIND_TIMEOUT,
     FIND_TIMEOUT_TMP,
     OCR_STRATEGY,
@@ -36,6 +37,7 @@ from auto_dungeon_config import (
 from auto_dungeon_container import _container, get_container as container_getter
 from auto_dungeon_daily import DailyCollectManager
 from auto_dungeon_device import DeviceConnectionError, DeviceManager
+from device_session import get_active_session
 from auto_dungeon_navigation import (
     back_to_main,
     is_on_character_selection,
@@ -49,11 +51,22 @@ from auto_dungeon_ui import (
     find_text_and_click_safe,
     sell_trashes,
 )
-from auto_dungeon_utils import check_stop_signal, sleep
+from auto_dungeon_utils import check_stop_signal, sleep, wait_for_stable_frame
 from coordinates import SKILL_POSITIONS as DEFAULT_SKILL_POSITIONS
 from database import DungeonProgressDB
+from dungeon_planner import (
+    STEP_DAILY_TASK,
+    STEP_DUNGEON,
+    STEP_RESTART_GAME,
+    STEP_SELL,
+    STEP_SWITCH_CHARACTER,
+    load_step_timings,
+    plan_dungeons,
+    timed_step,
+)
 from error_dialog_monitor import ErrorDialogMonitor
 from logger_config import setup_logger_from_config
+from screen_classifier import get_screen_classifier
 from system_config_loader import load_system_config
 
 # 初始化模块级 logger
@@ -111,8 +124,13 @@ def process_dungeon(
     completed_dungeons: int = 0,
     remaining_dungeons: int = 0,
     state_machine: Optional[DungeonStateMachine] = None,
+    keep_map: bool = False,
 ) -> bool:
-    """处理单个副本"""
+    """处理单个副本
+
+    Args:
+        keep_map: 下一个副本在同一区域；无免费次数时关闭弹窗后留在地图上
+    """
     logger.info(f"\n🎯 [{index}/{total}] 处理副本: {dungeon_name}")
 
     if state_machine is None:
@@ -123,6 +141,8 @@ def process_dungeon(
     if zone_name == "日常任务":
         logger.info(f"📋 执行日常任务: {dungeon_name}")
         manager = DailyCollectManager(_container.config_loader, db)
+        # 日常任务可能在地图上切换过区域
+        state_machine.current_zone = None
         if manager.execute_task(dungeon_name):
             db.mark_dungeon_completed(zone_name, dungeon_name)
             return True
@@ -143,6 +163,8 @@ def process_dungeon(
     if not battle_started:
         logger.warning("⚠️ 无免费按钮，标记为已完成")
         db.mark_dungeon_completed(zone_name, dungeon_name)
+        if keep_map and state_machine.close_dungeon_state():
+            return True
         click_back()
         state_machine.return_to_main_state()
         return True
@@ -150,11 +172,69 @@ def process_dungeon(
     logger.info(f"✅ 完成: {dungeon_name}")
     state_machine.complete_battle_state()
     db.mark_dungeon_completed(zone_name, dungeon_name)
-    sleep(CLICK_INTERVAL)
+    wait_for_stable_frame(max_wait=CLICK_INTERVAL, reason="等待战斗结算界面")
     state_machine.return_to_main_state()
     return True
 
 
+def restart_game() -> bool:
+    """冷启动游戏并等待进入角色选择界面"""
+    logger.info("关闭游戏...")
+    stop_app("com.ms.ysjyzr")
+    sleep(2, "关闭游戏")
+
+    logger.info("启动游戏")
+    start_app("com.ms.ysjyzr")
+
+    # 等待进入角色选择界面
+    if is_on_character_selection(120):
+        logger.info("已在角色选择界面")
+        return True
+    return False
+
+
+def enter_character_selection(
+    state_machine: DungeonStateMachine, db: DungeonProgressDB, in_game: bool = True
+) -> str:
+    """进入角色选择界面，优先游戏内切换角色，失败时回退到重启游戏
+
+    两条路径的耗时分别记为 ``switch_character`` / ``restart_game`` 步骤，
+    日志中与另一条路径的历史平均耗时对比。
+
+    Args:
+        in_game: 是否尝试游戏内切换（游戏仍停留在上一个角色时才可能成功）
+
+    Returns:
+        实际使用的步骤名（STEP_SWITCH_CHARACTER 或 STEP_RESTART_GAME）
+    """
+    timings = load_step_timings(db)
+
+    def record(step: str, start: float) -> None:
+        elapsed = time.monotonic() - start
+        try:
+            db.record_step_timing(step, elapsed)
+        except Exception as e:
+            logger.debug(f"记录步骤耗时失败: {e}")
+        other = STEP_RESTART_GAME if step == STEP_SWITCH_CHARACTER else STEP_SWITCH_CHARACTER
+        message = f"⏱️ [{db.config_name}] {step} 耗时 {elapsed:.1f}s"
+        if other in timings:
+            message += f"（{other} 历史平均 {timings[other]:.1f}s）"
+        logger.info(message)
+
+    if in_game:
+        start = time.monotonic()
+        if state_machine.switch_character_in_game():
+            record(STEP_SWITCH_CHARACTER, start)
+            return STEP_SWITCH_CHARACTER
+        logger.warning("⚠️ 游戏内切换角色失败，改为重启游戏")
+
+    start = time.monotonic()
+    restart_game()
+    state_machine.restarted_game()
+    record(STEP_RESTART_GAME, start)
+    return STEP_RESTART_GAME
+
+
 def count_remaining_selected_dungeons(db: DungeonProgressDB) -> int:
     """统计未完成的选定副本数量"""
     zone_dungeons = (
@@ -237,53 +317,56 @@ def run_dungeon_traversal(
         logger.error("❌ 区域副本配置未初始化")
         return 0
 
-    dungeon_index = 0
     processed_dungeons = 0
-    remaining_dungeons = count_remaining_selected_dungeons(db)
-
-    logger.info(f"📊 需要完成的副本总数: {remaining_dungeons}")
     completed_today = db.get_today_completed_count()
     logger.info(f"📊 今天已完成的副本数: {completed_today}")
 
     state_machine.ensure_main()
+    state_machine.timing_recorder = db.record_step_timing
 
-    for zone_idx, (zone_name, dungeons) in enumerate(zone_dungeons.items(), 1):
-        logger.info(f"\n{'#' * 60}")
-        logger.info(f"# 🌍 [{zone_idx}/{len(zone_dungeons)}] 区域: {zone_name}")
-        logger.info(f"# 🎯 副本数: {len(dungeons)}")
-        logger.info(f"{'#' * 60}")
-
-        for dungeon_dict in dungeons:
-            if check_stop_signal():
-                logger.info(f"\n📊 统计: 本次运行完成 {processed_dungeons} 个副本")
-                logger.info("👋 已停止执行")
-                state_machine.ensure_main()
-                return processed_dungeons
-
-            dungeon_name = dungeon_dict["name"]
-            is_selected = dungeon_dict["selected"]
-            dungeon_index += 1
-
-            if not is_selected:
-                logger.info(f"⏭️ [{dungeon_index}/{total_dungeons}] 未选定，跳过: {dungeon_name}")
-                continue
-
-            if db.is_dungeon_completed(zone_name, dungeon_name):
-                logger.info(f"⏭️ [{dungeon_index}/{total_dungeons}] 已通关，跳过: {dungeon_name}")
-                continue
-
-            if process_dungeon(
-                dungeon_name,
-                zone_name,
-                dungeon_index,
+    plan = plan_dungeons(
+        zone_dungeons,
+        db.is_dungeon_completed,
+        current_zone=state_machine.current_zone,
+        timings=load_step_timings(db),
+    )
+    remaining_dungeons = len(plan)
+    logger.info(f"📊 需要完成的副本总数: {remaining_dungeons}")
+    plan.log()
+
+    zone_name = None
+    for entry in plan:
+        if check_stop_signal():
+            logger.info(f"\n📊 统计: 本次运行完成 {processed_dungeons} 个副本")
+            logger.info("👋 已停止执行")
+            state_machine.ensure_main()
+            return processed_dungeons
+
+        if entry.zone_name != zone_name:
+            if zone_name is not None:
+                logger.info(f"\n✅ 完成区域: {zone_name}")
+            zone_name = entry.zone_name
+            logger.info(f"\n{'#' * 60}")
+            logger.info(f"# 🌍 区域: {zone_name}")
+            logger.info(f"{'#' * 60}")
+
+        step = STEP_DAILY_TASK if entry.is_daily_task else STEP_DUNGEON
+        with timed_step(db.record_step_timing, step):
+            processed = process_dungeon(
+                entry.dungeon_name,
+                entry.zone_name,
+                entry.index,
                 total_dungeons,
                 db,
                 completed_today + processed_dungeons,
                 remaining_dungeons,
                 state_machine=state_machine,
-            ):
-                processed_dungeons += 1
-                if processed_dungeons % 3 == 0:
+                keep_map=entry.keep_map and not entry.sell_after,
+            )
+        if processed:
+            processed_dungeons += 1
+            if entry.sell_after:
+                with timed_step(db.record_step_timing, STEP_SELL):
                     if state_machine.sell_loot():
                         state_machine.finish_sell_loot()
                     else:
@@ -291,6 +374,7 @@ def run_dungeon_traversal(
                         back_to_main()
                         state_machine.ensure_main()
 
+    if zone_name is not None:
         logger.info(f"\n✅ 完成区域: {zone_name}")
 
     return processed_dungeons
@@ -361,6 +445,9 @@ def handle_load_account_mode(account_name: str, emulator_name: Optional[str] = N
         _container.ocr_helper = device_manager.get_ocr_helper()
         _container.game_actions = device_manager.get_game_actions()
         _container.target_emulator = device_manager.get_target_emulator()
+        _container.frame_bus = device_manager.get_frame_bus()
+        _container.input_channel = device_manager.get_input_channel()
+        _container.screen_classifier = get_screen_classifier()
 
     except Exception as e:
         logger.error(f"❌ {e}")
@@ -437,7 +524,9 @@ def attach_file_logger(emulator_name: str):
 
 def start_error_monitor():
     """启动错误对话框监控器"""
-    _container.error_dialog_monitor = ErrorDialogMonitor(logger)
+    _container.error_dialog_monitor = ErrorDialogMonitor(
+        logger, frame_bus_provider=lambda: _container.frame_bus
+    )
     _container.error_dialog_monitor.start()
 
 
@@ -492,22 +581,27 @@ def main():
 
     # 初始化设备
     try:
-        # 创建 DeviceManager 实例
-        device_manager = DeviceManager()
-
         # 获取 OCR 纠错映射
         correction_map = None
         if _container.config_loader:
             correction_map = _container.config_loader.get_ocr_correction_map()
 
-        # 初始化设备
-        device_manager.initialize(emulator_name=args.emulator, correction_map=correction_map)
+        # run_dungeons 的设备会话中复用已初始化的设备，否则新建
+        session = get_active_session(args.emulator)
+        if session is not None:
+            device_manager = session.ensure_ready(correction_map)
+        else:
+            device_manager = DeviceManager()
+            device_manager.initialize(emulator_name=args.emulator, correction_map=correction_map)
 
         # 将组件注入到依赖容器
         _container.emulator_manager = device_manager.emulator_manager
         _container.ocr_helper = device_manager.get_ocr_helper()
         _container.game_actions = device_manager.get_game_actions()
         _container.target_emulator = device_manager.get_target_emulator()
+        _container.frame_bus = device_manager.get_frame_bus()
+        _container.input_channel = device_manager.get_input_channel()
+        _container.screen_classifier = get_screen_classifier()
 
     except DeviceConnectionError as e:
         logger.error(f"❌ 设备连接错误: {e}")
@@ -523,20 +617,14 @@ def main():
 
     state_machine = DungeonStateMachine()
 
-    # 启动游戏
-    logger.info("关闭游戏...")
-    stop_app("com.ms.ysjyzr")
-    sleep(2, "关闭游戏")
-
-    logger.info("启动游戏")
-    start_app("com.ms.ysjyzr")
-
-    # 等待进入角色选择界面
-    if is_on_character_selection(120):
-        logger.info("已在角色选择界面")
+    # 进入角色选择界面：游戏仍在运行时游戏内切换角色，否则重启游戏
+    char_class = _container.config_loader.get_char_class()
+    with DungeonProgressDB(config_name=_container.config_loader.get_config_name()) as db:
+        enter_character_selection(
+            state_machine, db, in_game=bool(char_class) and FAST_CHARACTER_SWITCH
+        )
 
     # 选择角色
-    char_class = _container.config_loader.get_char_class()
     if char_class:
         logger.info(f"开始选择角色: {char_class}")
         state_machine.select_character_state(char_class=char_class)
@@ -570,6 +658,8 @@ def main():
         logger.info("\n" + "=" * 60)
         logger.info(f"🎉 全部完成！今天共通关 {db.get_today_completed_count()} 个副本")
         logger.info("=" * 60 + "\n")
+        if _container.ocr_helper is not None:
+            _container.ocr_helper.log_cache_stats()
         state_machine.ensure_main()
 
 
@@ -12,21 +12,33 @@ from typing import Any, Optional
 
 import cv2
 import numpy as np
-from airtest.core.api import snapshot, touch
+from airtest.core.api import snapshot
 
 from auto_dungeon_config import CLICK_INTERVAL
 from auto_dungeon_container import get_container
-from auto_dungeon_navigation import back_to_main, open_map, save_error_screenshot
+from auto_dungeon_navigation import back_to_main, save_error_screenshot
 from auto_dungeon_notification import send_notification
 from auto_dungeon_ui import (
     click_back,
     find_text,
     find_text_and_click,
     find_text_and_click_safe,
+    find_many,
     switch_to,
     text_exists,
 )
-from auto_dungeon_utils import sleep
+from auto_dungeon_utils import sleep, tap_burst, touch
+from navigation_graph import (
+    SCREEN_CITY,
+    SCREEN_GIFTS,
+    SCREEN_MAILBOX,
+    SCREEN_RETINUE,
+    SCREEN_SHOP,
+    SCREEN_TREASURY,
+    SCREEN_TRIAL_TOWER,
+    get_router,
+)
+from screen_classifier import SCREEN_MAIN_WORLD, SCREEN_MAP
 
 # 坐标常量
 from coordinates import (
@@ -75,15 +87,17 @@ class DailyCollectManager:
     - 每日免费地下城领取
     """
 
-    def __init__(self, config_loader=None, db=None):
+    def __init__(self, config_loader=None, db=None, router=None):
         """初始化每日收集管理器。
 
         Args:
             config_loader: 配置加载器实例。
             db: DungeonProgressDB 实例。
+            router: 界面导航器，默认使用全局导航器。
         """
         self.config_loader = config_loader
         self.db = db
+        self._router = router
         self.logger = logging.getLogger(__name__)
 
         # 任务映射：任务名称 -> (方法, 步骤key)
@@ -123,6 +137,18 @@ class DailyCollectManager:
             save_error_screenshot(f"daily_{task_name}")
             return False
 
+    @property
+    def router(self):
+        """界面导航器（按需创建）"""
+        if self._router is None:
+            self._router = get_router()
+        return self._router
+
+    def _navigate(self, screen: str) -> None:
+        """导航到指定界面，失败时抛出异常（与 find_text_and_click 行为一致）"""
+        if not self.router.go_to(screen):
+            raise RuntimeError(f"无法导航到界面: {screen}")
+
     def _open_chests_wrapper(self):
         """宝箱包装器"""
         if self.config_loader and self.config_loader.get_chest_name():
@@ -224,11 +250,15 @@ class DailyCollectManager:
             return None
         return [[int(point[0]), int(point[1])] for point in bbox]
 
-    def _capture_exchange_screen(self) -> tuple[list[dict[str, Any]], Optional[str]]:
+    def _capture_exchange_screen(self) -> tuple[list[dict[str, Any]], Any]:
         """截取当前兑换页并返回 OCR 结果。
 
+        OCRHelper 支持内存帧时，截图、OCR 与颜色分析共用同一个 numpy 数组，
+        不再落盘临时 PNG。
+
         Returns:
-            tuple[list[dict[str, Any]], Optional[str]]: OCR 结果及截图路径。
+            tuple[list[dict[str, Any]], Any]: OCR 结果及截图（numpy 数组，
+            或回退路径下的截图文件路径）。
         """
         container = get_container()
         ocr_helper = container.ocr_helper
@@ -236,6 +266,12 @@ class DailyCollectManager:
             self.logger.warning("⚠️ OCRHelper 未初始化，无法读取兑换页状态")
             return [], None
 
+        if getattr(ocr_helper, "frame_func", None) is not None:
+            screen = ocr_helper.capture_frame()
+            return ocr_helper.find_all_matching_texts_in_frame(
+                screen, "", confidence_threshold=0.0
+            ), screen
+
         screenshot_path = os.path.join(
             ocr_helper.temp_dir,
             f"exchange_{uuid.uuid4().hex[:8]}.png",
@@ -246,17 +282,17 @@ class DailyCollectManager:
             screenshot_path, "", confidence_threshold=0.0
         ), screenshot_path
 
-    def _cleanup_temp_screenshot(self, screenshot_path: Optional[str]) -> None:
-        """清理临时截图文件。
+    def _cleanup_temp_screenshot(self, screenshot: Any) -> None:
+        """清理临时截图文件（内存帧无需清理）。
 
         Args:
-            screenshot_path: 临时截图路径。
+            screenshot: 截图路径或内存帧。
 
         Returns:
             None.
         """
-        if screenshot_path and os.path.exists(screenshot_path):
-            os.remove(screenshot_path)
+        if isinstance(screenshot, str) and os.path.exists(screenshot):
+            os.remove(screenshot)
 
     def _match_exchange_button(
         self,
@@ -296,27 +332,27 @@ class DailyCollectManager:
 
     def _detect_exchange_affordable_by_color(
         self,
-        screenshot_path: Optional[str],
+        screenshot: Any,
         progress_item: dict[str, Any],
     ) -> Optional[bool]:
         """根据价格颜色辅助判断是否可兑换。
 
         Args:
-            screenshot_path: 当前截图路径。
+            screenshot: 当前截图（numpy 数组或截图路径）。
             progress_item: 奖券进度 OCR 项。
 
         Returns:
             Optional[bool]: `True` 表示更像白色可买态，`False` 表示更像红色不可买态，
             `None` 表示无法判断。
         """
-        if screenshot_path is None:
+        if screenshot is None:
             return None
 
         bbox = self._extract_bbox(progress_item)
         if bbox is None:
             return None
 
-        image = cv2.imread(screenshot_path)
+        image = cv2.imread(screenshot) if isinstance(screenshot, str) else screenshot
         if image is None:
             return None
 
@@ -368,7 +404,7 @@ class DailyCollectManager:
         Returns:
             list[EventExchangeItemState]: 目标物品状态列表。
         """
-        ocr_results, screenshot_path = self._capture_exchange_screen()
+        ocr_results, screenshot = self._capture_exchange_screen()
         try:
             button_items = [
                 item for item in ocr_results if item.get("text") == "兑换" and item.get("center")
@@ -429,7 +465,7 @@ class DailyCollectManager:
                             button_items,
                         ),
                         is_affordable_by_color=self._detect_exchange_affordable_by_color(
-                            screenshot_path,
+                            screenshot,
                             matched_item["ocr"],
                         ),
                     )
@@ -437,7 +473,7 @@ class DailyCollectManager:
 
             return states
         finally:
-            self._cleanup_temp_screenshot(screenshot_path)
+            self._cleanup_temp_screenshot(screenshot)
 
     def _can_redeem_fire_tower_item(self, item_state: EventExchangeItemState) -> bool:
         """判断目标物品当前是否可兑换。
@@ -638,15 +674,15 @@ class DailyCollectManager:
     def _collect_gifts(self):
         """领取礼包"""
         self.logger.info("领取礼包")
-        back_to_main()
-        find_text_and_click("礼包", regions=[3])
+        self._navigate(SCREEN_GIFTS)
         find_text_and_click("旅行日志", regions=[3])
         find_text_and_click("领取奖励", regions=[8])
-        back_to_main()
+        self.router.go_to(SCREEN_MAIN_WORLD)
 
     def _demonhunter_exam(self):
         """猎魔试炼"""
         self.logger.info("猎魔试炼")
+        self.router.invalidate()
         back_to_main()
 
         try:
@@ -672,6 +708,7 @@ class DailyCollectManager:
             "冰霜骑士团",
         ]
         self.logger.info("领取各种主题奖励[%s]", ",".join(event_names))
+        self.router.invalidate()
         back_to_main()
         activity_clicked = find_text_and_click_safe(
             "活动",
@@ -703,50 +740,46 @@ class DailyCollectManager:
         self.logger.info("👆 主题奖励: 已点击活动卡片 center=%s", res["center"])
         sleep(CLICK_INTERVAL)
 
-        top_claim_clicked = find_text_and_click_safe(
-            "领取",
-            regions=[6],
+        # 首个“领取”和“上缴”在同一界面上，一次 OCR 同时定位
+        top_claim, donate_button = find_many(
+            [("领取", [6]), ("上缴", [5])],
             timeout=3,
             use_cache=False,
         )
+        top_claim_clicked = bool(top_claim)
+        if top_claim_clicked:
+            touch(top_claim["center"])
+            sleep(CLICK_INTERVAL)
         self.logger.info("🔎 主题奖励: 首个领取按钮点击结果=%s", top_claim_clicked)
 
-        donate_button = find_text(
-            "上缴",
-            regions=[5],
-            raise_exception=False,
-            use_cache=False,
-            timeout=3,
-        )
         self.logger.info(
             "🔎 主题奖励: 上缴按钮搜索结果=%s",
             self._summarize_match_result(donate_button),
         )
         if donate_button:
             self.logger.info("👆 主题奖励: 准备连续点击上缴按钮 5 次")
-            for _ in range(5):
-                touch(donate_button["center"])
-                sleep(CLICK_INTERVAL)
+            tap_burst(donate_button["center"], times=5, interval=CLICK_INTERVAL)
         else:
             self.logger.warning("⚠️ 未找到上缴按钮, fallback to position click")
-            for _ in range(5):
-                touch((360, 640))
-                sleep(CLICK_INTERVAL)
+            tap_burst((360, 640), times=5, interval=CLICK_INTERVAL)
+        sleep(CLICK_INTERVAL)
 
-        bottom_claim_clicked = find_text_and_click_safe(
-            "领取",
-            regions=[9],
+        # 底部“领取”按钮和“兑换”标签同在底部栏，同样一次 OCR 定位
+        bottom_claim, exchange_tab = find_many(
+            [("领取", [9]), ("兑换", [9])],
             timeout=3,
             use_cache=False,
         )
+        bottom_claim_clicked = bool(bottom_claim)
+        if bottom_claim_clicked:
+            touch(bottom_claim["center"])
+            sleep(CLICK_INTERVAL)
         self.logger.info("🔎 主题奖励: 底部领取按钮点击结果=%s", bottom_claim_clicked)
 
-        exchange_tab_clicked = find_text_and_click_safe(
-            "兑换",
-            regions=[9],
-            timeout=3,
-            use_cache=False,
-        )
+        exchange_tab_clicked = bool(exchange_tab)
+        if exchange_tab_clicked:
+            touch(exchange_tab["center"])
+            sleep(CLICK_INTERVAL)
         self.logger.info("🔎 主题奖励: 兑换标签点击结果=%s", exchange_tab_clicked)
 
         exchange_success = False
@@ -780,6 +813,7 @@ class DailyCollectManager:
         领取每日挂机奖励
         """
         self.logger.info("📦 开始领取每日挂机奖励")
+        self.router.invalidate()
         back_to_main()
 
         try:
@@ -816,9 +850,8 @@ class DailyCollectManager:
         if find_text_and_click_safe("快速挂机", regions=[4, 5, 6, 7, 8, 9]):
             # 多次点击领取按钮，确保领取所有奖励
             if self.config_loader and self.config_loader.is_quick_afk_enabled():
-                for i in range(10):
-                    touch(QUICK_AFK_COLLECT_BUTTON)
-                    sleep(1)
+                tap_burst(QUICK_AFK_COLLECT_BUTTON, times=10, interval=1)
+                sleep(1)
             else:  # 点击广告
                 self.logger.info("广告无法点击跳过")
                 # for i in range(3):
@@ -835,9 +868,7 @@ class DailyCollectManager:
         购买广告物品
         """
         self.logger.info("🛒 购买广告物品")
-        back_to_main()
-        find_text_and_click("主城", regions=[9])
-        find_text_and_click("商店", regions=[4])
+        self._navigate(SCREEN_SHOP)
         first_item_pos = (111, 395)
 
         for i in range(3):
@@ -854,7 +885,7 @@ class DailyCollectManager:
                 click_back()
                 sleep(150)  # 2分半才能再点下一个
 
-        back_to_main()
+        self.router.go_to(SCREEN_CITY)
         self.logger.info("✅ 购买广告商品成功")
 
     def _handle_retinue_deployment(self):
@@ -862,9 +893,8 @@ class DailyCollectManager:
         处理随从派遣操作
         """
         self.logger.info("👥 开始处理随从派遣")
-        back_to_main()
 
-        if find_text_and_click_safe("随从", regions=[7]):
+        if self.router.go_to(SCREEN_RETINUE, max_replans=0):
             # 领取派遣奖励
             find_text_and_click("派遣", regions=[8])
             touch(ONE_KEY_REWARD)
@@ -882,6 +912,7 @@ class DailyCollectManager:
             back_to_main()
         else:
             self.logger.warning("⚠️ 未找到随从按钮，跳过派遣操作")
+            back_to_main()
 
         # 招募
         find_text_and_click("酒馆", regions=[7])
@@ -903,16 +934,15 @@ class DailyCollectManager:
         # 这里可能会没有这个按钮, 不应该抛出exception
         find_text_and_click_safe("抽取十次", regions=[8, 9], use_cache=False)
         back_to_main()
+        self.router.invalidate()
 
     def _collect_free_dungeons(self):
         """
         领取每日免费地下城（试炼塔）
         """
         self.logger.info("🏰 开始领取每日免费地下城")
-        back_to_main()
-        open_map()
 
-        if find_text_and_click_safe("试炼塔", regions=[9]):
+        if self.router.go_to(SCREEN_TRIAL_TOWER, max_replans=0):
             self.logger.info("✅ 进入试炼塔")
 
             # 领取消量奖励
@@ -924,7 +954,7 @@ class DailyCollectManager:
         else:
             self.logger.warning("⚠️ 未找到试炼塔，跳过免费地下城领取")
 
-        back_to_main()
+        self.router.go_to(SCREEN_MAIN_WORLD)
 
     def _sweep_tower_floor(self, floor_name: str, regions):
         """
@@ -949,8 +979,7 @@ class DailyCollectManager:
         杀死世界boss
         """
         self.logger.info("💀 开始杀死世界boss")
-        back_to_main()
-        open_map()
+        self._navigate(SCREEN_MAP)
         try:
             find_text_and_click("切换区域", regions=[8])
             find_text_and_click("东部大陆", regions=[5])
@@ -964,23 +993,24 @@ class DailyCollectManager:
         except Exception as e:
             self.logger.warning(f"⚠️ 未找到世界boss: {e}")
             back_to_main()
+        # 战斗结束后的界面不在导航图内，下次导航重新识别
+        self.router.invalidate()
 
     def _buy_market_items(self):
         """
         购买市场商品
         """
         self.logger.info("🛒 开始购买市场商品")
-        back_to_main()
         try:
-            find_text_and_click("主城", regions=[9])
-            find_text_and_click("商店", regions=[4])
+            self._navigate(SCREEN_SHOP)
             touch((570, 258))
             sleep(1)
             find_text_and_click("购买", regions=[8])
-            back_to_main()
+            self.router.go_to(SCREEN_CITY)
             self.logger.info("✅ 购买市场商品成功")
         except Exception as e:
             self.logger.warning(f"⚠️ 未找到商店: {e}")
+            self.router.invalidate()
             back_to_main()
 
     def _open_chests(self, chest_name: str):
@@ -988,10 +1018,8 @@ class DailyCollectManager:
         开启宝箱
         """
         self.logger.info(f"🎁 开始开启{chest_name}")
-        back_to_main()
         try:
-            find_text_and_click("主城", regions=[9])
-            find_text_and_click("宝库", regions=[9])
+            self._navigate(SCREEN_TREASURY)
             find_text_and_click(chest_name, regions=[4, 5, 6, 7, 8])
             res = find_text("开启10次", regions=[8, 9], use_cache=False, timeout=5)
             if res:
@@ -1001,16 +1029,17 @@ class DailyCollectManager:
                     click_back()
                 sleep(0.2)
                 touch((359, 879))  # 不满 10 个点击一次最后的打开
-            back_to_main()
+            self.router.go_to(SCREEN_CITY)
 
-            find_text_and_click("宝库", regions=[9])
+            self._navigate(SCREEN_TREASURY)
             find_text_and_click(chest_name, regions=[4, 5, 6, 7, 8])
             touch((359, 879))  # 不满 10 个点击一次最后的打开
-            back_to_main()
+            self.router.go_to(SCREEN_CITY)
 
             self.logger.info("✅ 打开宝箱成功")
         except Exception as e:
             self.logger.warning(f"⚠️ 未找到宝箱: {e}")
+            self.router.invalidate()
             back_to_main()
 
     def _receive_mails(self):
@@ -1018,19 +1047,18 @@ class DailyCollectManager:
         领取邮件
         """
         self.logger.info("✉️ 信件 开始领取邮件")
-        back_to_main()
         try:
-            find_text_and_click("主城", regions=[9])
-            find_text_and_click("邮箱", regions=[5])
+            self._navigate(SCREEN_MAILBOX)
             res = find_text("一键领取", regions=[8, 9], timeout=5)
             if res:
                 for _ in range(3):
                     touch(res["center"])
                     sleep(1)
-            back_to_main()
+            self.router.go_to(SCREEN_CITY)
             self.logger.info("✅ 领取邮件成功")
         except Exception as e:
             self.logger.warning(f"⚠️ 未找到一键领取: {e}")
+            self.router.invalidate()
             back_to_main()
 
     # 向后兼容的函数名
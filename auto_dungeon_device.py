@@ -10,17 +10,28 @@ from __future__ import annotations
 import os
 from typing import Optional
 
-from airtest.core.api import auto_setup, connect_device, snapshot
-from vibe_ocr import OCRHelper
-
-from auto_dungeon_config import CLICK_INTERVAL
+from airtest.core.api import auto_setup, connect_device
+
+from auto_dungeon_config import (
+    CLICK_INTERVAL,
+    OCR_BINARY_UPLOAD,
+    OCR_CACHE_MAX_SIZE,
+    OCR_IMAGE_FORMAT,
+    OCR_IMAGE_QUALITY,
+    OCR_TEXT_FILTER,
+)
 from emulator_manager import (
     EmulatorConnectionError,
     EmulatorConnectionManager,
 )
+from frame_bus import FrameBus, airtest_capture, get_frame_bus
 from game_actions import GameActions
+from input_channel import InputChannel, get_input_channel
 from logger_config import setup_logger_from_config
+from ocr_client import OCRClient, ocr_server_urls
+from ocr_helper import OCRHelper
 from project_paths import ensure_project_path
+from raw_capture import load_capture_method, make_capture_func
 
 logger = setup_logger_from_config(use_color=True)
 
@@ -31,8 +42,9 @@ class DeviceManager:
 
     职责：
     1. 使用 EmulatorConnectionManager 检测 ADB 连接
-    2. 初始化 OCRHelper
-    3. 初始化 GameActions
+    2. 初始化设备帧总线（FrameBus）和按键通道（InputChannel）
+    3. 初始化 OCRHelper
+    4. 初始化 GameActions
 
     这样职责分离：
     - EmulatorConnectionManager 只负责 ADB 连接检测
@@ -54,6 +66,8 @@ class DeviceManager:
         # 初始化状态
         self.ocr_helper: Optional[OCRHelper] = None
         self.game_actions: Optional[GameActions] = None
+        self.frame_bus: Optional[FrameBus] = None
+        self.input_channel: Optional[InputChannel] = None
         self._emulator_name: Optional[str] = None
 
     def initialize(
@@ -95,14 +109,37 @@ class DeviceManager:
             self.connection_manager.connection_string = "Android:///"
             auto_setup(__file__)
 
+        # 初始化帧总线：OCR 与各检测器共享同一份截图
+        capture_method = load_capture_method(self._emulator_name)
+        self.frame_bus = get_frame_bus(
+            self._emulator_name,
+            capture_func=make_capture_func(
+                capture_method, self._emulator_name, fallback=airtest_capture
+            ),
+        )
+        logger.info(f"[FrameBus] 初始化完成: {self.frame_bus.name}（截图方式: {capture_method}）")
+
+        # 按键通道：经 adb server 长连接下发按键，不再每次启动 adb 进程
+        # （未指定模拟器时沿用 Airtest）
+        if self._emulator_name:
+            self.input_channel = get_input_channel(self._emulator_name)
+
         # 初始化 OCR
         self.ocr_helper = OCRHelper(
             output_dir="output",
-            max_cache_size=200,
+            max_cache_size=OCR_CACHE_MAX_SIZE,
             max_width=960,
             delete_temp_screenshots=True,
             correction_map=correction_map,
-            snapshot_func=snapshot,
+            snapshot_func=self.frame_bus.snapshot,
+            frame_func=self.frame_bus.get_image,
+            text_filter=OCR_TEXT_FILTER,
+            ocr_client=OCRClient(
+                ocr_server_urls(),
+                image_format=OCR_IMAGE_FORMAT,
+                quality=OCR_IMAGE_QUALITY,
+                binary=OCR_BINARY_UPLOAD,
+            ),
         )
         logger.info("[OCR] 初始化完成")
 
@@ -122,6 +159,16 @@ class DeviceManager:
             raise EmulatorConnectionError("GameActions 未初始化，请先调用 initialize()")
         return self.game_actions
 
+    def get_frame_bus(self) -> FrameBus:
+        """获取设备帧总线"""
+        if self.frame_bus is None:
+            raise EmulatorConnectionError("FrameBus 未初始化，请先调用 initialize()")
+        return self.frame_bus
+
+    def get_input_channel(self) -> Optional[InputChannel]:
+        """获取设备按键通道（未指定模拟器时为 None）"""
+        return self.input_channel
+
     def get_target_emulator(self) -> Optional[str]:
         """获取目标模拟器地址"""
         return self._emulator_name
@@ -6,33 +6,75 @@ import logging
 import os
 import time
 from datetime import datetime
+from typing import Callable, List, Optional, Tuple
+
+import numpy as np
 
 from airtest.core.api import (
-    keyevent,
     shell,
-    touch,
     wait,
     exists,
     snapshot,
 )
 from airtest.core.error import TargetNotFoundError
 
-from auto_dungeon_utils import sleep
+from auto_dungeon_container import get_container
+from auto_dungeon_utils import (
+    current_frame,
+    press_key,
+    sleep,
+    tap_burst,
+    touch,
+    wait_for_change,
+    wait_for_stable_frame,
+)
 from auto_dungeon_ui import find_text_and_click_safe
 from auto_dungeon_config import (
     ENTER_GAME_BUTTON_TEMPLATE,
     GIFTS_TEMPLATE,
     MAP_DUNGEON_TEMPLATE,
+    CLICK_INTERVAL,
+    FRAME_SETTLE_MIN_WAIT,
     LAST_OCCURRENCE,
+    MAIN_WORLD_CHECK_TIMEOUT,
+    MAP_LOAD_WAIT,
+    PIXEL_SIGNATURES_FILE,
+    TEMPLATE_ROI_MARGIN,
 )
+from dungeon_label_cache import get_dungeon_label_cache, hash_distance, map_hash
+from frame_bus import wait_until
 from coordinates import (
     BACK_BUTTON,
     CLOSE_ZONE_MENU,
     MAP_BUTTON,
 )
+from pixel_signature import SignatureDetector
+from screen_classifier import (
+    SCREEN_CHARACTER_SELECT,
+    SCREEN_MAIN_WORLD,
+    SCREEN_MAP,
+    SCREEN_UNKNOWN,
+)
 
 logger = logging.getLogger(__name__)
 
+# 像素签名检测器：学习过签名时微秒级判断，否则退回模板匹配
+MAIN_WORLD_DETECTOR = SignatureDetector(
+    GIFTS_TEMPLATE,
+    roi_margin=TEMPLATE_ROI_MARGIN,
+    signatures_file=PIXEL_SIGNATURES_FILE,
+)
+CHARACTER_SELECTION_DETECTOR = SignatureDetector(
+    ENTER_GAME_BUTTON_TEMPLATE,
+    roi_margin=TEMPLATE_ROI_MARGIN,
+    signatures_file=PIXEL_SIGNATURES_FILE,
+)
+MAP_DETECTOR = SignatureDetector(
+    MAP_DUNGEON_TEMPLATE,
+    roi_margin=TEMPLATE_ROI_MARGIN,
+    signatures_file=PIXEL_SIGNATURES_FILE,
+)
+
 
 def save_error_screenshot(operation_name: str) -> str:
     """保存错误截图到log目录，返回文件路径"""
@@ -48,23 +90,128 @@ def save_error_screenshot(operation_name: str) -> str:
         logger.debug(f"📸 保存错误截图失败: {e}")
         return ""
 
+# 能由检测器确认的界面；界面识别器的结论必须经检测器确认才算数
+SCREEN_DETECTORS = {
+    SCREEN_MAIN_WORLD: MAIN_WORLD_DETECTOR,
+    SCREEN_MAP: MAP_DETECTOR,
+    SCREEN_CHARACTER_SELECT: CHARACTER_SELECTION_DETECTOR,
+}
+
+
+def _classify(max_age_ms: Optional[float] = None) -> Tuple[str, Optional[np.ndarray]]:
+    """界面识别器的原始结论与所用的帧；没有帧总线或识别器时返回 unknown"""
+    container = get_container()
+    bus, classifier = container.frame_bus, container.screen_classifier
+    if bus is None or classifier is None:
+        return SCREEN_UNKNOWN, None
+    image = bus.get_image(max_age_ms=max_age_ms)
+    return classifier.classify(image).screen, image
+
+
+def current_screen(max_age_ms: Optional[float] = None) -> str:
+    """判断当前界面：识别器给出候选，再用该界面的检测器在同一帧上确认
+
+    识别器只在内存里学习，参考帧可能很少，不能单独作为依据；
+    没有检测器的界面或检测器未确认时返回 unknown。
+    """
+    screen, image = _classify(max_age_ms)
+    detector = SCREEN_DETECTORS.get(screen)
+    if detector is None or image is None:
+        return SCREEN_UNKNOWN
+    return screen if detector.detect(image, final=True) else SCREEN_UNKNOWN
+
+
+def _observe_screen(screen: str, image: Optional[np.ndarray]) -> None:
+    """检测器已在 ``image`` 上确认当前界面时，把这一帧补充进界面库"""
+    classifier = get_container().screen_classifier
+    if classifier is not None and image is not None:
+        classifier.observe(screen, image)
+
+
+def _screen_check(
+    screen: str,
+    detector: SignatureDetector,
+    on_match: Optional[Callable[[np.ndarray], None]] = None,
+):
+    """构造逐帧检测函数：命中一律由检测器判断
+
+    界面识别器只用来跳过明确属于其他界面的帧；最后一次检测总是交给检测器，
+    识别器误判也不会漏掉目标界面。
+
+    Args:
+        on_match: 检测器命中时以命中的帧调用
+    """
+    classifier = get_container().screen_classifier
+
+    def check(image, final: bool):
+        if not final and classifier is not None:
+            if classifier.classify(image).screen not in (screen, SCREEN_UNKNOWN):
+                return None
+        pos = detector.detect(image, final)
+        if pos and on_match is not None:
+            on_match(image)
+        return pos
+
+    return check
+
+
+def _wait_screen(
+    screen: str, detector: SignatureDetector, timeout: float, interval: float = 0.1
+) -> bool:
+    """在帧总线上轮询直到检测器确认目标界面，命中的帧补充进界面库"""
+    matched: List[np.ndarray] = []
+    check = _screen_check(screen, detector, on_match=matched.append)
+    bus = get_container().frame_bus
+    if not wait_until(check, bus, timeout=timeout, interval=interval):
+        return False
+    _observe_screen(screen, matched[-1])
+    return True
+
+
+def _check_screen(screen: str, detector: SignatureDetector, timeout: float) -> bool:
+    """短时检测当前是否处于某界面（需要帧总线）
+
+    - 识别为其他已知界面：只在当前帧上用检测器确认一次，不再轮询等待
+    - 其他情况（包括识别为目标界面）：轮询检测器，命中后把该帧加入界面库
+    """
+    recognized, image = _classify()
+    if recognized not in (screen, SCREEN_UNKNOWN):
+        return image is not None and bool(detector.detect(image, final=True))
+    return _wait_screen(screen, detector, timeout)
+
+
 def open_map() -> None:
-    """打开地图"""
+    """打开地图（已在地图界面时直接返回）"""
+    if current_screen() == SCREEN_MAP:
+        logger.info("🗺️ 已在地图界面")
+        return
     back_to_main()
     touch(MAP_BUTTON)
     logger.info("🗺️ 打开地图")
-    sleep(2, "等待地图加载完毕")
+    if get_container().frame_bus is None:
+        sleep(MAP_LOAD_WAIT, "等待地图加载完毕")
+        return
+    # 地图界面出现即继续，最多等待 MAP_LOAD_WAIT 秒
+    if _wait_screen(SCREEN_MAP, MAP_DETECTOR, timeout=MAP_LOAD_WAIT, interval=0.2):
+        # 地图界面出现后副本名称可能还在淡入，等画面稳定再识别
+        wait_for_stable_frame(max_wait=1, reason="等待地图加载完毕")
+    else:
+        logger.debug("地图界面未确认，按原等待时间继续")
 
 
 def is_on_map() -> bool:
     """检查是否在地图界面"""
+    if get_container().frame_bus is not None:
+        return _check_screen(SCREEN_MAP, MAP_DETECTOR, timeout=0)
     return exists(MAP_DUNGEON_TEMPLATE)
 
 
 def is_main_world() -> bool:
-    """检查是否在主世界"""
+    """检查是否在主世界（有帧总线时复用共享帧）"""
+    if get_container().frame_bus is not None:
+        return _check_screen(SCREEN_MAIN_WORLD, MAIN_WORLD_DETECTOR, MAIN_WORLD_CHECK_TIMEOUT)
     try:
-        result = wait(GIFTS_TEMPLATE, timeout=0.3, interval=0.1)
+        result = wait(GIFTS_TEMPLATE, timeout=MAIN_WORLD_CHECK_TIMEOUT, interval=0.1)
         return bool(result)
     except Exception:
         return False
@@ -74,6 +221,8 @@ def is_on_character_selection(timeout: int = 30) -> bool:
     """检查是否在角色选择界面"""
     try:
         logger.info("🔍 等待进入角色选择界面...")
+        if get_container().frame_bus is not None:
+            return _wait_screen(SCREEN_CHARACTER_SELECT, CHARACTER_SELECTION_DETECTOR, timeout)
         wait(ENTER_GAME_BUTTON_TEMPLATE, timeout=timeout, interval=0.1)
         return True
     except TargetNotFoundError:
@@ -102,17 +251,14 @@ def back_to_main(max_duration: float = 15, backoff_interval: float = 0.2) -> Non
 
         attempt += 1
 
-        for _ in range(3):
-            try:
-                touch(BACK_BUTTON)
-            except Exception as e:
-                logger.warning(f"⚠️ 发送返回点击失败: {e}")
-                break
-            sleep(0.1)
+        try:
+            tap_burst(BACK_BUTTON, times=3, interval=0.1)
+        except Exception as e:
+            logger.warning(f"⚠️ 发送返回点击失败: {e}")
 
         if attempt % 3 == 0:
             try:
-                keyevent("BACK")
+                press_key("BACK")
             except Exception as e:
                 logger.warning(f"⚠️ 系统返回键发送失败: {e}")
 
@@ -136,7 +282,16 @@ def switch_to_zone(zone_name: str, max_attempts: int = 3) -> bool:
 
         if find_text_and_click_safe(zone_name, timeout=10, occurrence=2):
             logger.info(f"✅ 成功切换到: {zone_name}")
+            before = current_frame()
             touch(CLOSE_ZONE_MENU)
+            if wait_for_change(
+                before, max_wait=CLICK_INTERVAL, reason="等待区域菜单关闭", settle=False
+            ):
+                wait_for_stable_frame(
+                    max_wait=CLICK_INTERVAL,
+                    min_wait=FRAME_SETTLE_MIN_WAIT,
+                    reason="等待区域地图显示",
+                )
             return True
 
         logger.error(f"❌ 切换失败: {zone_name} (第 {attempt + 1}/{max_attempts} 次)")
@@ -151,8 +306,59 @@ def switch_to_zone(zone_name: str, max_attempts: int = 3) -> bool:
     return False
 
 
+DUNGEON_CLICK_VERIFY_TIMEOUT = 1.0
+"""按缓存坐标点击后，等待地图画面变化（弹出副本窗口）的最长时间（秒）"""
+
+
+def _click_cached_dungeon(dungeon_name: str, zone_name: str) -> bool:
+    """按学习到的坐标直接点击副本名称
+
+    画面哈希与名称签名校验通过才点击；点击后画面没有变化说明坐标已失效，
+    删除该记录并返回 False 交给 OCR。
+    """
+    bus = get_container().frame_bus
+    cache = get_dungeon_label_cache()
+    if bus is None or not cache.has(zone_name, dungeon_name):
+        return False
+
+    image = bus.get_image()
+    pos = cache.lookup(zone_name, dungeon_name, image)
+    if pos is None:
+        logger.debug(f"📍 副本坐标缓存未命中: {dungeon_name}")
+        return False
+
+    before = map_hash(image)
+    touch(pos)
+    logger.info(f"📍 按缓存坐标点击副本: {dungeon_name} {pos}")
+
+    def view_changed(frame, final):
+        return hash_distance(map_hash(frame), before) > cache.max_hash_distance or None
+
+    if wait_until(view_changed, bus, timeout=DUNGEON_CLICK_VERIFY_TIMEOUT, interval=0.1):
+        return True
+    logger.warning(f"⚠️ 按缓存坐标点击后画面未变化，改用 OCR: {dungeon_name}")
+    cache.forget(zone_name, dungeon_name)
+    return False
+
+
+def _learn_dungeon_location(dungeon_name: str, zone_name: str, element) -> None:
+    """把 OCR 命中的副本名称位置记入缓存"""
+    ocr_helper = get_container().ocr_helper
+    frame = getattr(ocr_helper, "last_frame", None)
+    bbox = element.get("bbox") if isinstance(element, dict) else None
+    if frame is None or not bbox:
+        return
+    center: Optional[Tuple[int, int]] = element.get("center")
+    try:
+        get_dungeon_label_cache().learn(zone_name, dungeon_name, frame, bbox, center=center)
+    except Exception as e:
+        logger.debug(f"记录副本坐标失败: {e}")
+
+
 def focus_and_click_dungeon(dungeon_name: str, zone_name: str, max_attempts: int = 2) -> bool:
-    """尝试聚焦到指定副本并点击"""
+    """尝试聚焦到指定副本并点击（优先使用学习到的坐标，失败再 OCR）"""
+    if _click_cached_dungeon(dungeon_name, zone_name):
+        return True
     for attempt in range(max_attempts):
         use_cache = attempt == 0
         result = find_text_and_click_safe(
@@ -162,6 +368,7 @@ def focus_and_click_dungeon(dungeon_name: str, zone_name: str, max_attempts: int
             use_cache=use_cache,
         )
         if result:
+            _learn_dungeon_location(dungeon_name, zone_name, result)
             return True
         logger.warning(f"⚠️ 未能找到副本: {dungeon_name} (第 {attempt + 1}/{max_attempts} 次尝试)")
         if attempt < max_attempts - 1:
@@ -170,6 +377,6 @@ def focus_and_click_dungeon(dungeon_name: str, zone_name: str, max_attempts: int
             if not switch_to_zone(zone_name):
                 logger.warning(f"⚠️ 刷新区域失败: {zone_name}")
                 continue
-            sleep(1)
+            wait_for_stable_frame(max_wait=1, reason="等待区域地图刷新")
     save_error_screenshot("focus_and_click_dungeon")
     return False
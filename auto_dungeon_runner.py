@@ -18,6 +18,14 @@ from auto_dungeon_daily import DailyCollectManager
 from auto_dungeon_device import DeviceManager
 from auto_dungeon_state_machine import DungeonStateMachine
 from database import DungeonProgressDB
+from dungeon_planner import (
+    STEP_DAILY_TASK,
+    STEP_DUNGEON,
+    STEP_SELL,
+    load_step_timings,
+    plan_dungeons,
+    timed_step,
+)
 
 import logging
 logger = logging.getLogger(__name__)
@@ -173,6 +181,7 @@ class DungeonBot:
         total: int,
         completed_dungeons: int = 0,
         remaining_dungeons: int = 0,
+        keep_map: bool = False,
     ) -> bool:
         """
         处理单个副本
@@ -184,6 +193,7 @@ class DungeonBot:
             total: 总副本数
             completed_dungeons: 已完成的副本数
             remaining_dungeons: 需要完成的副本总数
+            keep_map: 下一个副本在同一区域；无免费次数时关闭弹窗后留在地图上
 
         Returns:
             bool: 是否成功完成
@@ -193,6 +203,8 @@ class DungeonBot:
         # 处理日常任务
         if zone_name == "日常任务":
             self.logger.info(f"📋 执行日常任务: {dungeon_name}")
+            # 日常任务可能在地图上切换过区域
+            self.state_machine.current_zone = None
             if self.daily_collect_manager.execute_task(dungeon_name):
                 self.db.mark_dungeon_completed(zone_name, dungeon_name)
                 return True
@@ -213,6 +225,8 @@ class DungeonBot:
         if not battle_started:
             self.logger.warning("⚠️ 无免费按钮，标记为已完成")
             self.db.mark_dungeon_completed(zone_name, dungeon_name)
+            if keep_map and self.state_machine.close_dungeon_state():
+                return True
             from auto_dungeon_core import click_back
 
             click_back()
@@ -243,65 +257,60 @@ class DungeonBot:
             self.logger.error("❌ 区域副本配置未初始化")
             return 0
 
-        dungeon_index = 0
         processed_dungeons = 0
 
-        # 计算需要完成的副本总数
-        remaining_dungeons = self._count_remaining_selected_dungeons()
-        self.logger.info(f"📊 需要完成的副本总数: {remaining_dungeons}")
-
         # 获取今天已完成的副本数
         completed_today = self.db.get_today_completed_count()
         self.logger.info(f"📊 今天已完成的副本数: {completed_today}")
 
         self.state_machine.ensure_main()
-
-        # 遍历所有区域
-        for zone_idx, (zone_name, dungeons) in enumerate(zone_dungeons.items(), 1):
-            self.logger.info(f"\n{'#' * 60}")
-            self.logger.info(f"# 🌍 [{zone_idx}/{len(zone_dungeons)}] 区域: {zone_name}")
-            self.logger.info(f"# 🎯 副本数: {len(dungeons)}")
-            self.logger.info(f"{'#' * 60}")
-
-            # 遍历副本
-            for dungeon_dict in dungeons:
-                # 在每个副本开始前检查停止信号
-                if self.check_stop_signal():
-                    self.logger.info(f"\n📊 统计: 本次运行完成 {processed_dungeons} 个副本")
-                    self.logger.info("👋 已停止执行")
-                    self.state_machine.ensure_main()
-                    return processed_dungeons
-
-                dungeon_name = dungeon_dict["name"]
-                is_selected = dungeon_dict["selected"]
-                dungeon_index += 1
-
-                # 检查是否选定该副本
-                if not is_selected:
-                    self.logger.info(
-                        f"⏭️ [{dungeon_index}/{len(zone_dungeons)}] 未选定，跳过: {dungeon_name}"
-                    )
-                    continue
-
-                # 先检查是否已通关
-                if self.db.is_dungeon_completed(zone_name, dungeon_name):
-                    self.logger.info(
-                        f"⏭️ [{dungeon_index}/{len(zone_dungeons)}] 已通关，跳过: {dungeon_name}"
-                    )
-                    continue
-
-                # 完成副本
-                if self.process_dungeon(
-                    dungeon_name,
-                    zone_name,
-                    dungeon_index,
-                    len(zone_dungeons),
+        self.state_machine.timing_recorder = self.db.record_step_timing
+
+        # 执行前规划访问顺序：同区域连续执行、日常任务不计入卖垃圾
+        plan = plan_dungeons(
+            zone_dungeons,
+            self.db.is_dungeon_completed,
+            current_zone=self.state_machine.current_zone,
+            timings=load_step_timings(self.db),
+        )
+        remaining_dungeons = len(plan)
+        self.logger.info(f"📊 需要完成的副本总数: {remaining_dungeons}")
+        plan.log()
+
+        zone_name = None
+        for entry in plan:
+            # 在每个副本开始前检查停止信号
+            if self.check_stop_signal():
+                self.logger.info(f"\n📊 统计: 本次运行完成 {processed_dungeons} 个副本")
+                self.logger.info("👋 已停止执行")
+                self.state_machine.ensure_main()
+                return processed_dungeons
+
+            if entry.zone_name != zone_name:
+                if zone_name is not None:
+                    self.logger.info(f"\n✅ 完成区域: {zone_name}")
+                zone_name = entry.zone_name
+                self.logger.info(f"\n{'#' * 60}")
+                self.logger.info(f"# 🌍 区域: {zone_name}")
+                self.logger.info(f"{'#' * 60}")
+
+            # 完成副本
+            step = STEP_DAILY_TASK if entry.is_daily_task else STEP_DUNGEON
+            with timed_step(self.db.record_step_timing, step):
+                processed = self.process_dungeon(
+                    entry.dungeon_name,
+                    entry.zone_name,
+                    entry.index,
+                    plan.total,
                     completed_today + processed_dungeons,
                     remaining_dungeons,
-                ):
-                    processed_dungeons += 1
-                    # 每完成3个副本就卖垃圾
-                    if processed_dungeons % 3 == 0:
+                    keep_map=entry.keep_map and not entry.sell_after,
+                )
+            if processed:
+                processed_dungeons += 1
+                # 按计划卖垃圾
+                if entry.sell_after:
+                    with timed_step(self.db.record_step_timing, STEP_SELL):
                         if self.state_machine.sell_loot():
                             self.state_machine.finish_sell_loot()
                         else:
@@ -311,6 +320,7 @@ class DungeonBot:
                             back_to_main()
                             self.state_machine.ensure_main()
 
+        if zone_name is not None:
             self.logger.info(f"\n✅ 完成区域: {zone_name}")
 
         return processed_dungeons
@@ -452,6 +462,8 @@ class DungeonBot:
         self.logger.info("\n" + "=" * 60)
         self.logger.info(f"🎉 全部完成！今天共通关 {self.db.get_today_completed_count()} 个副本")
         self.logger.info("=" * 60 + "\n")
+        if self._device_manager is not None and self._device_manager.ocr_helper is not None:
+            self._device_manager.ocr_helper.log_cache_stats()
         self.state_machine.ensure_main()
 
 
@@ -3,23 +3,27 @@ auto_dungeon 状态机模块
 """
 
 import logging
-from typing import Optional
+from typing import Callable, Optional
 from transitions import Machine, MachineError
 
 from auto_dungeon_navigation import (
+    is_main_world,
     open_map,
     switch_to_zone,
     back_to_main,
     focus_and_click_dungeon,
 )
 from auto_dungeon_combat import auto_combat
-from auto_dungeon_ui import click_free_button, find_text_and_click_safe, sell_trashes
-from auto_dungeon_account import select_character
+from auto_dungeon_ui import click_back, click_free_button, find_text_and_click_safe, sell_trashes
+from auto_dungeon_account import select_character, switch_character
 from auto_dungeon_daily import execute_daily_collect
+from dungeon_planner import STEP_OPEN_MAP, STEP_SWITCH_ZONE, timed_step
+
 STATES = [
     "character_selection",
     "main_menu",
     "dungeon_selection",
+    "zone_map",
     "dungeon_battle",
     "reward_claim",
     "sell_loot",
@@ -33,8 +37,10 @@ class DungeonStateMachine:
         self.game_actions = game_actions
         self.logger = logger or logging.getLogger(__name__)
         
+        # 地图上当前选中的区域：只在留在地图上时可信，返回主界面后清空
         self.current_zone = None
         self.active_dungeon = None
+        self.timing_recorder: Optional[Callable[[str, float], None]] = None
         self._state = "character_selection"
         self._machine = Machine(
             model=self,
@@ -61,6 +67,23 @@ class DungeonStateMachine:
             dest="main_menu",
             before="_on_select_character",
         )
+        self._machine.add_transition(
+            trigger="attach_main_menu",
+            source="character_selection",
+            dest="main_menu",
+            conditions="_is_game_on_main_world",
+        )
+        self._machine.add_transition(
+            trigger="trigger_switch_character",
+            source="main_menu",
+            dest="character_selection",
+            conditions="_switch_character_in_game",
+        )
+        self._machine.add_transition(
+            trigger="game_restarted",
+            source="*",
+            dest="character_selection",
+        )
         self._machine.add_transition(
             trigger="ensure_main_menu",
             source="*",
@@ -69,7 +92,7 @@ class DungeonStateMachine:
         )
         self._machine.add_transition(
             trigger="prepare_dungeon",
-            source="main_menu",
+            source=["main_menu", "zone_map"],
             dest="dungeon_selection",
             conditions="_prepare_dungeon_selection",
         )
@@ -97,6 +120,12 @@ class DungeonStateMachine:
             dest="main_menu",
             before="_on_return_to_main",
         )
+        self._machine.add_transition(
+            trigger="close_dungeon",
+            source="dungeon_selection",
+            dest="zone_map",
+            before="_on_close_dungeon",
+        )
         self._machine.add_transition(
             trigger="start_selling",
             source="main_menu",
@@ -124,6 +153,25 @@ class DungeonStateMachine:
             return self.state == "main_menu"
         return self.ensure_main()
 
+    def switch_character_in_game(self) -> bool:
+        """游戏仍停留在上一个角色的主界面时，在游戏内切回角色选择界面
+
+        Returns:
+            是否已进入角色选择界面；游戏未运行或切换失败返回 False，需要重启游戏
+        """
+        self._safe_trigger("attach_main_menu")
+        if self.state != "main_menu":
+            self.logger.info("ℹ️ 游戏不在主界面，无法游戏内切换角色")
+            return False
+        self._safe_trigger("trigger_switch_character")
+        return self.state == "character_selection"
+
+    def restarted_game(self) -> None:
+        """游戏重启后回到角色选择状态"""
+        self._safe_trigger("game_restarted")
+        self.current_zone = None
+        self.active_dungeon = None
+
     def ensure_main(self) -> bool:
         self._safe_trigger("ensure_main_menu")
         return self.state == "main_menu"
@@ -162,6 +210,11 @@ class DungeonStateMachine:
         self._safe_trigger("return_to_main")
         return self.state == "main_menu"
 
+    def close_dungeon_state(self) -> bool:
+        """关闭副本弹窗并留在地图上，供同区域的下一个副本直接使用"""
+        self._safe_trigger("close_dungeon")
+        return self.state == "zone_map"
+
     def sell_loot(self) -> bool:
         self._safe_trigger("start_selling")
         return self.state == "sell_loot"
@@ -177,6 +230,18 @@ class DungeonStateMachine:
             return
         self.logger.info(f"🎭 状态机: 选择职业 {char_class}")
         select_character(char_class)
+        self.current_zone = None
+
+    def _is_game_on_main_world(self, event) -> bool:
+        return is_main_world()
+
+    def _switch_character_in_game(self, event) -> bool:
+        self.logger.info("🔄 状态机: 游戏内切换角色")
+        switched = switch_character()
+        if switched:
+            self.current_zone = None
+            self.active_dungeon = None
+        return switched
 
     def _prepare_dungeon_selection(self, event) -> bool:
         zone_name = event.kwargs.get("zone_name")
@@ -188,12 +253,18 @@ class DungeonStateMachine:
             return False
 
         self.logger.info(f"🗺️ 状态机: 前往区域 {zone_name}，寻找副本 {dungeon_name}")
-        open_map()
+        with timed_step(self.timing_recorder, STEP_OPEN_MAP):
+            open_map()
         if self.current_zone != zone_name:
-            if not switch_to_zone(zone_name):
+            with timed_step(self.timing_recorder, STEP_SWITCH_ZONE):
+                switched = switch_to_zone(zone_name)
+            if not switched:
                 self.logger.warning(f"⚠️ 状态机无法切换到区域: {zone_name}")
+                self.current_zone = None
                 return False
             self.current_zone = zone_name
+        else:
+            self.logger.info(f"🗺️ 地图已停留在区域 {zone_name}，无需切换")
 
         success = focus_and_click_dungeon(dungeon_name, zone_name, max_attempts=max_attempts)
 
@@ -241,6 +312,11 @@ class DungeonStateMachine:
         self.current_zone = None
         self.active_dungeon = None
 
+    def _on_close_dungeon(self, event):
+        self.logger.info("🗺️ 状态机: 关闭副本弹窗，留在地图")
+        click_back()
+        self.active_dungeon = None
+
     def _on_sell_loot(self, event):
         self.logger.info("🧹 状态机: 卖出垃圾道具")
         sell_trashes()
@@ -5,11 +5,9 @@ auto_dungeon UI 交互模块
 import logging
 from typing import Any, Dict, List, Optional
 
-from airtest.core.api import touch
-
 from auto_dungeon_config import CLICK_INTERVAL
 from auto_dungeon_container import get_container
-from auto_dungeon_utils import sleep
+from auto_dungeon_utils import current_frame, sleep, touch, wait_for_change
 from coordinates import BACK_BUTTON
 
 logger = logging.getLogger(__name__)
@@ -52,6 +50,16 @@ def find_text_and_click_safe(*args, **kwargs) -> bool:
     return kwargs.get("default_return", False)
 
 
+def find_many(*args, **kwargs) -> List[Dict[str, Any]]:
+    """同一屏上一次 OCR 查找多个 (文字, 区域)"""
+    ga = get_container().game_actions
+    if ga:
+        return ga.find_many(*args, **kwargs)
+    logger.error("❌ GameActions 未初始化")
+    queries = args[0] if args else kwargs.get("queries", [])
+    return [{} for _ in queries]
+
+
 def find_all_texts(*args, **kwargs) -> List[Dict[str, Any]]:
     """查找所有匹配的文本"""
     ga = get_container().game_actions
@@ -76,8 +84,9 @@ def find_all(*args, **kwargs):
 def click_back() -> bool:
     """点击返回按钮"""
     try:
+        before = current_frame()
         touch(BACK_BUTTON)
-        sleep(CLICK_INTERVAL)
+        wait_for_change(before, max_wait=CLICK_INTERVAL, reason="等待返回生效")
         logger.info("🔙 点击返回按钮")
         return True
     except Exception as e:
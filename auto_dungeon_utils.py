@@ -4,10 +4,24 @@ auto_dungeon 工具函数模块
 
 import logging
 import os
-from typing import Optional
+import time
+from typing import Optional, Sequence, Union
 
+import numpy as np
+from airtest.core.api import keyevent as airtest_keyevent
 from airtest.core.api import sleep as airtest_sleep
-from auto_dungeon_config import STOP_FILE
+from airtest.core.api import swipe as airtest_swipe
+from airtest.core.api import touch as airtest_touch
+from adb_client import AdbError
+from auto_dungeon_config import (
+    FRAME_CHANGE_THRESHOLD,
+    FRAME_SETTLE_MIN_WAIT,
+    FRAME_STABLE_THRESHOLD,
+    STOP_FILE,
+)
+from auto_dungeon_container import get_container
+from frame_bus import frame_difference, thumbnail
+from input_channel import InputBatch, InputNotDelivered
 
 logger = logging.getLogger(__name__)
 
@@ -17,6 +31,189 @@ def sleep(seconds: float, reason: str = "[需要填写原因]") -> None:
     airtest_sleep(seconds)
 
 
+def invalidate_frames() -> None:
+    """输入操作之后作废帧总线上的旧帧，之后的检测必然重新抓帧"""
+    bus = get_container().frame_bus
+    if bus is not None:
+        bus.invalidate()
+
+
+def touch(pos: Sequence[float]):
+    """点击（Airtest ``touch`` 的封装），点击后作废帧总线上的旧帧"""
+    try:
+        return airtest_touch(pos)
+    finally:
+        invalidate_frames()
+
+
+def swipe(start: Sequence[float], end: Sequence[float], **kwargs):
+    """滑动（Airtest ``swipe`` 的封装），滑动后作废帧总线上的旧帧"""
+    try:
+        return airtest_swipe(start, end, **kwargs)
+    finally:
+        invalidate_frames()
+
+
+def current_frame() -> Optional[np.ndarray]:
+    """现抓一帧作为点击前的参考画面（不复用旧帧）；没有帧总线返回 None
+
+    参考帧必须是点击前这一刻的画面：复用更早的帧时，画面与参考不同可能只是因为
+    之前的操作，``wait_for_change`` 会在点击生效前就返回。
+    """
+    bus = get_container().frame_bus
+    if bus is None:
+        return None
+    return bus.get_image(max_age_ms=0)
+
+
+def wait_for_stable_frame(
+    max_wait: float,
+    min_wait: float = 0.0,
+    stable_frames: int = 2,
+    threshold: float = FRAME_STABLE_THRESHOLD,
+    interval: float = 0.1,
+    reason: str = "等待画面稳定",
+) -> bool:
+    """等待画面稳定（连续 ``stable_frames`` 帧几乎没有变化），替代固定时长的 sleep
+
+    没有帧总线时退化为 ``sleep(max_wait)``。
+
+    Args:
+        max_wait: 最长等待时间（秒），即原来的固定等待时长
+        min_wait: 最短等待时间（秒）
+        stable_frames: 需要连续相同的帧数
+        threshold: 相邻帧缩略图平均差异阈值
+        interval: 取帧间隔（秒）
+        reason: 日志中的等待原因
+
+    Returns:
+        画面是否在 ``max_wait`` 内稳定下来
+    """
+    bus = get_container().frame_bus
+    if bus is None:
+        sleep(max_wait, reason)
+        return True
+
+    start = time.monotonic()
+    previous = None
+    run = 0
+    last_seq = None
+    while True:
+        frame = bus.get_frame(max_age_ms=interval * 1000, newer_than=last_seq)
+        elapsed = time.monotonic() - start
+        if frame is not None:
+            thumb = thumbnail(frame.image)
+            if previous is not None and frame_difference(thumb, previous) <= threshold:
+                run += 1
+            else:
+                run = 1
+            previous = thumb
+            last_seq = frame.seq
+            if run >= stable_frames and elapsed >= min_wait:
+                logger.debug(f"🖼️ 画面已稳定，用时 {elapsed:.2f} 秒: {reason}")
+                return True
+        if elapsed >= max_wait:
+            logger.debug(f"🖼️ 画面 {max_wait} 秒内未稳定，继续执行: {reason}")
+            return False
+        time.sleep(interval)
+
+
+def wait_for_change(
+    reference: Optional[np.ndarray],
+    max_wait: float,
+    min_wait: float = 0.0,
+    threshold: float = FRAME_CHANGE_THRESHOLD,
+    interval: float = 0.1,
+    reason: str = "等待画面变化",
+    settle: bool = True,
+) -> bool:
+    """等待画面相对参考帧发生变化（例如点击后界面开始切换），替代固定时长的 sleep
+
+    没有帧总线或没有参考帧时退化为 ``sleep(max_wait)``。
+
+    Args:
+        reference: 点击前现抓的参考帧（``current_frame()``）
+        max_wait: 最长等待时间（秒），即原来的固定等待时长
+        min_wait: 最短等待时间（秒）
+        threshold: 与参考帧的缩略图平均差异阈值
+        interval: 取帧间隔（秒）
+        reason: 日志中的等待原因
+        settle: 画面变化后是否继续等到画面稳定（至少 ``FRAME_SETTLE_MIN_WAIT`` 秒）
+
+    Returns:
+        画面是否在 ``max_wait`` 内发生了变化
+    """
+    bus = get_container().frame_bus
+    if bus is None or reference is None:
+        sleep(max_wait, reason)
+        return True
+
+    start = time.monotonic()
+    reference_thumb = thumbnail(reference)
+    last_seq = None
+    while True:
+        frame = bus.get_frame(max_age_ms=0, newer_than=last_seq)
+        elapsed = time.monotonic() - start
+        if frame is not None:
+            last_seq = frame.seq
+            changed = frame_difference(thumbnail(frame.image), reference_thumb) > threshold
+            if changed and elapsed >= min_wait:
+                logger.debug(f"🖼️ 画面已变化，用时 {elapsed:.2f} 秒: {reason}")
+                if settle:
+                    wait_for_stable_frame(
+                        max_wait=max(max_wait - elapsed, FRAME_SETTLE_MIN_WAIT),
+                        min_wait=FRAME_SETTLE_MIN_WAIT,
+                        interval=interval,
+                        reason=reason,
+                    )
+                return True
+        if elapsed >= max_wait:
+            logger.debug(f"🖼️ 画面 {max_wait} 秒内未变化，继续执行: {reason}")
+            return False
+        time.sleep(interval)
+
+
+def _run_input(batch: InputBatch) -> bool:
+    """通过按键通道下发一批命令
+
+    Returns:
+        False 表示命令没有下发（没有通道、adb server 未启动或通道打不开），由调用方改用 Airtest；
+        已下发但未等到执行完成时只记录警告并返回 True，不再重发，避免重复按键
+    """
+    channel = get_container().input_channel
+    if channel is None:
+        return False
+    try:
+        channel.run(batch)
+    except InputNotDelivered as e:
+        logger.debug(f"按键通道不可用，改用 Airtest: {e}")
+        return False
+    except AdbError as e:
+        logger.warning(f"⚠️ 按键已下发，但未确认执行完成: {e}")
+    return True
+
+
+def tap_burst(pos: Sequence[float], times: int = 1, interval: float = 0.1) -> None:
+    """连续点击同一位置 ``times`` 次，每两次之间等待 ``interval`` 秒
+
+    点击走 Airtest 的 ``touch``（minitouch/maxtouch 长连接），不经按键通道：
+    设备端每条 ``input tap`` 都要冷启动一次 app_process，反而更慢。
+    """
+    for i in range(times):
+        if i:
+            airtest_sleep(interval)
+        touch(pos)
+
+
+def press_key(key: Union[str, int]) -> None:
+    """发送按键（如 "BACK"），有按键通道时不再启动 adb 进程"""
+    try:
+        if not _run_input(InputBatch().keyevent(key)):
+            airtest_keyevent(str(key))
+    finally:
+        invalidate_frames()
+
+
 def normalize_emulator_name(name: Optional[str]) -> Optional[str]:
     """规范化模拟器名称"""
     if not name:
@@ -4,7 +4,6 @@
 如果金币数 < 100k，自动点击一口价按钮并确定
 """
 
-import os
 import logging
 import re
 from typing import Optional, Tuple
@@ -18,8 +17,9 @@ from airtest.core.api import (
 # 导入通用日志配置模块
 from device_utils import connect_device_with_timeout
 from logger_config import setup_logger_from_config
-from vibe_ocr import OCRHelper
 from emulator_manager import EmulatorManager
+from frame_bus import get_frame_bus
+from ocr_helper import OCRHelper
 from error_dialog_monitor import ErrorDialogMonitor
 
 logging.getLogger("airtest").setLevel(logging.CRITICAL)
@@ -79,7 +79,12 @@ def initialize_device_and_ocr(emulator_name: Optional[str] = None):
         raise
 
     if ocr_helper is None:
-        ocr_helper = OCRHelper(output_dir="output")
+        frame_bus = get_frame_bus(emulator_name)
+        ocr_helper = OCRHelper(
+            output_dir="output",
+            snapshot_func=frame_bus.snapshot,
+            frame_func=frame_bus.get_image,
+        )
 
 
 def parse_gold_amount(text: str) -> Optional[int]:
@@ -141,24 +146,9 @@ def find_all_matching_prices(price_threshold: int) -> list:
         return []
 
     try:
-        # 截图并获取全屏幕的所有文字
-        import tempfile
-        import uuid
-        from datetime import datetime
-
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        unique_id = str(uuid.uuid4())[:8]
-        screenshot_path = os.path.join(
-            tempfile.gettempdir(), f"market_screenshot_{timestamp}_{unique_id}.png"
-        )
-
-        # 截图
-        from airtest.core.api import snapshot
-
-        snapshot(filename=screenshot_path)
-
-        # 获取全屏幕的所有文字
-        all_texts = ocr_helper.get_all_texts_from_image(screenshot_path)
+        # 截图（内存帧）并获取全屏幕的所有文字，价格随时变化，不使用缓存
+        screen = ocr_helper.capture_frame()
+        all_texts = ocr_helper.get_all_texts_from_frame(screen, use_cache=False)
 
         if not all_texts:
             logger.warning("⚠️ 未识别到任何文字")
@@ -239,12 +229,6 @@ def find_all_matching_prices(price_threshold: int) -> list:
                 else:
                     logger.warning(f"   ⚠️ 无法解析价格: {text}")
 
-        # 清理临时截图
-        try:
-            os.remove(screenshot_path)
-        except Exception:
-            pass
-
         logger.info("\n" + "=" * 80)
         logger.info(f"📊 找到 {len(matching_results)} 个符合条件的商品")
         for idx, result in enumerate(matching_results, 1):
@@ -1,25 +1,27 @@
 import cv2
 import numpy as np
 import logging
-from typing import Optional, Tuple, List, Dict, Any
+from typing import Optional, Tuple, List, Dict, Any, Union
 
 logger = logging.getLogger("color_helper")
 
 class ColorHelper:
     @staticmethod
-    def find_green_text(image_path: str, ocr_results: List[Dict[str, Any]]) -> Optional[Tuple[int, int]]:
+    def find_green_text(
+        image: Union[str, np.ndarray], ocr_results: List[Dict[str, Any]]
+    ) -> Optional[Tuple[int, int]]:
         """
         在给定的 OCR 结果中查找具有高比例绿色像素的文本区域
         
         Args:
-            image_path: 图片路径
+            image: 图片路径，或与 OCR 结果同源的 BGR 内存帧
             ocr_results: OCR 结果列表，每个项包含 'bbox' (或者 'poly'), 'text' 等
         
         Returns:
             (x, y) 绿色文字中心坐标，未找到返回 None
         """
         try:
-            img = cv2.imread(image_path)
+            img = cv2.imread(image) if isinstance(image, str) else image
             if img is None:
                 return None
 
@@ -0,0 +1,265 @@
+"""
+战斗结束检测模块
+
+战斗中反复做主界面模板匹配既慢又浪费：战斗平稳阶段画面变化有限，真正需要密集检测的
+只是战斗即将结束的那一小段。CombatWatcher 在帧总线上：
+
+- 平稳阶段按 ``slow_interval`` 低频检测
+- 出现结束迹象（相邻帧缩略图差异剧增，或 ``end_cue`` 判断画面已不是战斗）后，
+  在 ``cue_hold`` 秒内按 ``fast_interval`` 高频检测
+- 订阅帧总线：其他检测器（错误弹窗监控、后台抓帧线程）发布的帧出现结束迹象时
+  立即唤醒等待，不必等到下一个轮询点
+- 确认战斗结束后立刻设置 ``finished`` 事件
+
+每场战斗记录检测延迟：最后一帧仍判定为战斗中到确认结束之间的时间，即结束检测最多
+晚了多久。最近若干场的统计见 ``get_combat_stats()``。
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Callable, Deque, Dict, Optional
+
+import numpy as np
+
+from frame_bus import Frame, FrameBus, frame_difference, thumbnail
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SLOW_INTERVAL = 1.0
+DEFAULT_FAST_INTERVAL = 0.1
+
+DEFAULT_CUE_HOLD = 3.0
+"""出现结束迹象后保持高频检测的时长（秒）"""
+
+DEFAULT_CHANGE_THRESHOLD = 25.0
+"""相邻帧灰度缩略图平均差异超过该值视为结束迹象（0-255）"""
+
+STATUS_FINISHED = "finished"
+STATUS_TIMEOUT = "timeout"
+STATUS_STOPPED = "stopped"
+
+HISTORY_SIZE = 50
+
+
+@dataclass(frozen=True)
+class CombatResult:
+    """一场战斗的检测结果
+
+    Attributes:
+        status: finished / timeout / stopped
+        duration: 战斗时长（秒）
+        latency_ms: 结束检测延迟（毫秒），未结束时为 None
+        polls: 结束检测次数
+        cues: 出现结束迹象的次数
+    """
+
+    status: str
+    duration: float
+    latency_ms: Optional[float]
+    polls: int
+    cues: int
+
+    @property
+    def finished(self) -> bool:
+        return self.status == STATUS_FINISHED
+
+
+_history: Deque[CombatResult] = deque(maxlen=HISTORY_SIZE)
+_history_lock = threading.Lock()
+
+
+class CombatWatcher:
+    """基于帧总线的战斗结束检测器"""
+
+    def __init__(
+        self,
+        bus: FrameBus,
+        is_finished: Callable[[np.ndarray, bool], bool],
+        end_cue: Optional[Callable[[np.ndarray], bool]] = None,
+        slow_interval: float = DEFAULT_SLOW_INTERVAL,
+        fast_interval: float = DEFAULT_FAST_INTERVAL,
+        cue_hold: float = DEFAULT_CUE_HOLD,
+        change_threshold: float = DEFAULT_CHANGE_THRESHOLD,
+    ):
+        """
+        Args:
+            bus: 帧总线
+            is_finished: ``is_finished(image, final)``，判断帧是否已回到战斗结束后的界面；
+                ``final`` 为 True 时可做代价更高的完整确认
+            end_cue: 可选的廉价结束迹象判断，例如界面识别器认为画面已不是战斗
+            slow_interval: 平稳阶段检测间隔（秒）
+            fast_interval: 出现结束迹象后的检测间隔（秒）
+            cue_hold: 出现结束迹象后保持高频检测的时长（秒）
+            change_threshold: 相邻帧缩略图平均差异阈值
+        """
+        self.bus = bus
+        self.is_finished = is_finished
+        self.end_cue = end_cue
+        self.slow_interval = slow_interval
+        self.fast_interval = fast_interval
+        self.cue_hold = cue_hold
+        self.change_threshold = change_threshold
+
+        self.finished = threading.Event()
+        self._wake = threading.Event()
+        self._lock = threading.Lock()
+        self._fast_until = 0.0
+        self._cue_seq = 0
+        self._cues = 0
+        self._last_thumb: Optional[np.ndarray] = None
+
+    # ------------------------------------------------------------------
+    # 结束迹象
+    # ------------------------------------------------------------------
+
+    def _is_cue(self, image: np.ndarray) -> bool:
+        thumb = thumbnail(image)
+        previous, self._last_thumb = self._last_thumb, thumb
+        if previous is not None and frame_difference(thumb, previous) > self.change_threshold:
+            return True
+        return bool(self.end_cue is not None and self.end_cue(image))
+
+    def _observe(self, frame: Frame) -> bool:
+        """检查帧是否出现结束迹象（每帧只检查一次），出现时切换到高频检测"""
+        with self._lock:
+            if frame.seq <= self._cue_seq:
+                return False
+            self._cue_seq = frame.seq
+            try:
+                cue = self._is_cue(frame.image)
+            except Exception as e:
+                logger.debug(f"结束迹象检测失败: {e}")
+                return False
+            if cue:
+                self._cues += 1
+                self._fast_until = time.monotonic() + self.cue_hold
+            return cue
+
+    def _on_frame(self, frame: Frame) -> None:
+        if self._observe(frame):
+            self._wake.set()
+
+    def _interval(self) -> float:
+        return self.fast_interval if time.monotonic() < self._fast_until else self.slow_interval
+
+    # ------------------------------------------------------------------
+    # 等待战斗结束
+    # ------------------------------------------------------------------
+
+    def run(
+        self,
+        timeout: float,
+        should_stop: Optional[Callable[[], bool]] = None,
+        on_tick: Optional[Callable[[], None]] = None,
+        tick_interval: float = 1.0,
+    ) -> CombatResult:
+        """等待战斗结束
+
+        Args:
+            timeout: 最长等待时间（秒）
+            should_stop: 返回 True 时提前结束（停止信号）
+            on_tick: 战斗中每隔 ``tick_interval`` 秒调用一次（例如手动释放技能、更新进度条）
+            tick_interval: ``on_tick`` 调用间隔（秒）
+
+        Returns:
+            CombatResult: 检测结果，同时记入统计
+        """
+        start = time.monotonic()
+        last_fighting = start
+        last_seq: Optional[int] = None
+        next_tick = start
+        polls = 0
+        status = STATUS_TIMEOUT
+        latency_ms: Optional[float] = None
+
+        unsubscribe = self.bus.subscribe(self._on_frame)
+        try:
+            while True:
+                now = time.monotonic()
+                if should_stop is not None and should_stop():
+                    status = STATUS_STOPPED
+                    break
+                final = now - start >= timeout
+                if on_tick is not None and now >= next_tick and not final:
+                    on_tick()
+                    next_tick = now + tick_interval
+
+                frame = self.bus.get_frame(
+                    max_age_ms=self.fast_interval * 1000, newer_than=last_seq
+                )
+                if frame is not None:
+                    polls += 1
+                    self._observe(frame)
+                    # 结束迹象出现后允许检测器做完整（整帧）确认
+                    decisive = final or time.monotonic() < self._fast_until
+                    if self.is_finished(frame.image, decisive):
+                        status = STATUS_FINISHED
+                        latency_ms = (time.monotonic() - last_fighting) * 1000
+                        self.finished.set()
+                        break
+                    last_fighting = frame.timestamp
+                    last_seq = frame.seq
+                if final:
+                    break
+
+                wait = self._interval()
+                if on_tick is not None:
+                    wait = min(wait, max(0.0, next_tick - time.monotonic()))
+                wait = min(wait, max(0.0, start + timeout - time.monotonic()))
+                self._wake.wait(wait)
+                self._wake.clear()
+        finally:
+            unsubscribe()
+
+        with self._lock:
+            cues = self._cues
+        result = CombatResult(
+            status=status,
+            duration=time.monotonic() - start,
+            latency_ms=latency_ms,
+            polls=polls,
+            cues=cues,
+        )
+        with _history_lock:
+            _history.append(result)
+        if result.finished:
+            logger.info(
+                f"⏱️ 战斗结束检测延迟 {latency_ms:.0f}ms（战斗 {result.duration:.1f}s，"
+                f"检测 {polls} 次，结束迹象 {cues} 次）"
+            )
+        return result
+
+
+def get_combat_stats() -> Dict[str, float]:
+    """最近若干场战斗的检测统计"""
+    with _history_lock:
+        results = list(_history)
+    latencies = [r.latency_ms for r in results if r.latency_ms is not None]
+    return {
+        "battles": len(results),
+        "finished": len(latencies),
+        "avg_latency_ms": round(sum(latencies) / len(latencies), 1) if latencies else 0.0,
+        "max_latency_ms": round(max(latencies), 1) if latencies else 0.0,
+        "avg_polls": round(sum(r.polls for r in results) / len(results), 1) if results else 0.0,
+    }
+
+
+def reset_combat_stats() -> None:
+    with _history_lock:
+        _history.clear()
+
+
+__all__ = [
+    "CombatResult",
+    "CombatWatcher",
+    "STATUS_FINISHED",
+    "STATUS_STOPPED",
+    "STATUS_TIMEOUT",
+    "get_combat_stats",
+    "reset_combat_stats",
+]
@@ -31,6 +31,7 @@ from emulator_control import (
     restart_emulator,
 )
 from logger_config import setup_logger
+from ocr_backend_pool import health_url_for
 from run_dungeons import filter_pending_configs
 
 SCRIPT_DIR = Path(__file__).parent
@@ -763,23 +764,45 @@ def run_poe_stats(logger: logging.Logger) -> bool:
     return False
 
 
+def ocr_health_urls() -> list[str]:
+    """OCR 健康检查地址列表。
+
+    ``OCR_HEALTH_URL`` 可写多个（逗号分隔）；未设置但配置了多个 OCR 后端
+    （``OCR_SERVER_URLS``）时，检查每个后端的 ``/health``。
+
+    Returns:
+        健康检查地址列表。
+    """
+    configured = [u.strip() for u in os.getenv("OCR_HEALTH_URL", "").split(",") if u.strip()]
+    if configured:
+        return configured
+    servers = [u.strip() for u in os.getenv("OCR_SERVER_URLS", "").split(",") if u.strip()]
+    if servers:
+        return [health_url_for(url) for url in servers]
+    return ["http://localhost:8081/health"]
+
+
 def check_ocr_health(logger: logging.Logger) -> bool:
     """检查 OCR 服务健康状态。
 
     Args:
-        logger: 日志对象（保留参数便于后续扩展日志输出）。
+        logger: 日志对象。
 
     Returns:
-        OCR 服务是否健康。
+        至少一个 OCR 后端健康时为 ``True``（其余后端由 OCR 客户端熔断跳过）。
     """
-    url = os.getenv("OCR_HEALTH_URL", "http://localhost:8081/health")
-    try:
-        with urllib.request.urlopen(url, timeout=30) as response:
-            if response.status == 200:
-                return True
-    except Exception:
-        pass
-    return False
+    urls = ocr_health_urls()
+    healthy = 0
+    for url in urls:
+        try:
+            with urllib.request.urlopen(url, timeout=30) as response:
+                if response.status == 200:
+                    healthy += 1
+        except Exception:
+            pass
+    if len(urls) > 1:
+        logger.info(f"🩺 OCR 后端健康 {healthy}/{len(urls)}")
+    return healthy > 0
 
 
 def launch_ocr_service(logger: logging.Logger) -> bool:
@@ -12,6 +12,8 @@ from dataclasses import dataclass
 from datetime import datetime
 from typing import Any, Dict, List, Optional, Set, Tuple
 
+from adb_client import AdbError, get_adb_client
+
 @dataclass(frozen=True)
 class EmulatorSession:
     name: str
@@ -70,6 +72,13 @@ def parse_adb_devices_output(stdout: str) -> Set[str]:
     return devices
 
 def get_connected_adb_devices(timeout_sec: float = 5.0) -> Set[str]:
+    # Served from the adb server's track-devices table; fall back to the CLI
+    # (which also starts the server) when it is not running.
+    try:
+        devices = get_adb_client().devices()
+        return {serial for serial, state in devices.items() if state == 'device'}
+    except AdbError:
+        pass
     try:
         result = subprocess.run(
             ['adb', 'devices'],
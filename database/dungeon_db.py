@@ -10,6 +10,7 @@ from datetime import datetime, timedelta, timezone
 from peewee import (
     CharField,
     DateTimeField,
+    FloatField,
     IntegerField,
     Model,
     SqliteDatabase,
@@ -69,6 +70,18 @@ class EventItemProgress(BaseModel):
         indexes = ((("config_name", "cycle_id", "event_name", "item_key"), True),)
 
 
+class StepTiming(BaseModel):
+    """副本流程步骤耗时记录（打开地图、切换区域、单个副本、卖垃圾等）"""
+
+    step = CharField(index=True)  # 步骤名称
+    seconds = FloatField()  # 耗时（秒）
+    recorded_at = DateTimeField(index=True)  # 记录时间
+
+    class Meta:  # type: ignore
+        database = db
+        table_name = "step_timing"
+
+
 class DungeonProgressDB:
     """副本通关进度数据库管理类"""
 
@@ -92,7 +105,7 @@ class DungeonProgressDB:
         """
         db.init(self.db_path)
         db.connect()
-        db.create_tables([DungeonProgress, EventItemProgress], safe=True)
+        db.create_tables([DungeonProgress, EventItemProgress, StepTiming], safe=True)
         logger.info(f"📊 数据库初始化完成: {self.db_path}")
         logger.info(f"🎮 当前配置: {self.config_name}")
 
@@ -313,6 +326,35 @@ class DungeonProgressDB:
         if deleted_count > 0:
             logger.info(f"🗑️ 清理了 {deleted_count} 条旧记录")
 
+        cutoff_time = datetime.now() - timedelta(days=days_to_keep)
+        StepTiming.delete().where(StepTiming.recorded_at < cutoff_time).execute()
+
+    def record_step_timing(self, step, seconds):
+        """记录一次流程步骤耗时
+
+        Args:
+            step: 步骤名称
+            seconds: 耗时（秒）
+        """
+        StepTiming.create(step=step, seconds=float(seconds), recorded_at=datetime.now())
+
+    def get_step_timings(self, days=7):
+        """获取最近N天各步骤的平均耗时
+
+        Returns:
+            dict: 步骤名称 -> 平均耗时（秒）
+        """
+        cutoff_time = datetime.now() - timedelta(days=days)
+        query = (
+            StepTiming.select(
+                StepTiming.step,
+                fn.AVG(StepTiming.seconds).alias("avg_seconds"),  # type: ignore
+            )
+            .where(StepTiming.recorded_at >= cutoff_time)
+            .group_by(StepTiming.step)
+        )
+        return {r.step: float(r.avg_seconds) for r in query}
+
     def get_zone_stats(self, include_special=False):
         """获取各区域的通关统计"""
         today = self.get_today_date()
@@ -0,0 +1,131 @@
+"""
+设备会话：在同一模拟器的多个配置之间复用已初始化的设备
+
+``run_dungeons`` 在同一进程里依次运行多个配置（角色），每个配置都重新进入
+``auto_dungeon.main``：新建 ``DeviceManager``、重连 Airtest、重建 ``OCRHelper`` /
+``OCRClient`` / ``GameActions``，失败重试前还要再完整初始化一次。
+
+``DeviceSession`` 持有一个已初始化的 ``DeviceManager``，激活后 ``auto_dungeon.main``
+直接复用它：Airtest 连接、帧总线、按键通道、OCR 的分块缓存和哈希索引、OCR 服务的
+长连接都保持热状态。只有 ADB 连接断开或 OCR 纠错表变化时才重新初始化。
+
+    session = DeviceSession("192.168.1.150:5555")
+    with session.activate():
+        for cfg in configs:
+            run(cfg)          # auto_dungeon.main 内部调用 get_active_session()
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, Optional
+
+from auto_dungeon_device import DeviceManager
+
+logger = logging.getLogger(__name__)
+
+
+class DeviceSession:
+    """单个模拟器的长生命周期设备会话"""
+
+    def __init__(
+        self,
+        emulator: str,
+        correction_map: Optional[Dict[str, str]] = None,
+        device_manager_factory: Callable[[], DeviceManager] = DeviceManager,
+    ):
+        """
+        Args:
+            emulator: 模拟器地址，如 '192.168.1.150:5555'
+            correction_map: 默认 OCR 纠错表（``ensure_ready`` 未指定时使用）
+            device_manager_factory: 创建 DeviceManager 的工厂（测试时可替换）
+        """
+        self.emulator = emulator
+        self.default_correction_map = correction_map or {}
+        self.device_manager_factory = device_manager_factory
+        self.device_manager: Optional[DeviceManager] = None
+        self._correction_map: Optional[Dict[str, str]] = None
+        self.initializations = 0
+        self.reuses = 0
+        self.init_seconds = 0.0
+
+    def _alive(self) -> bool:
+        manager = self.device_manager
+        if manager is None:
+            return False
+        try:
+            return manager.emulator_manager.is_connected(self.emulator)
+        except Exception as e:
+            logger.debug(f"[Session] 检查连接失败: {e}")
+            return False
+
+    def ensure_ready(self, correction_map: Optional[Dict[str, str]] = None) -> DeviceManager:
+        """返回可用的 DeviceManager
+
+        首次调用完整初始化；之后只确认 ADB 连接仍在（走 adb server 设备表，几乎无开销），
+        连接断开或纠错表变化时才重新初始化。
+
+        Raises:
+            EmulatorConnectionError: 初始化失败
+        """
+        if correction_map is None:
+            correction_map = self.default_correction_map
+        if self.device_manager is not None:
+            if correction_map != self._correction_map:
+                logger.info("[Session] OCR 纠错表变化，重新初始化设备")
+            elif self._alive():
+                self.reuses += 1
+                logger.info(
+                    f"♻️ [Session] 复用已初始化的设备: {self.emulator}（第 {self.reuses} 次）"
+                )
+                return self.device_manager
+            else:
+                logger.warning(f"⚠️ [Session] 设备连接已断开，重新初始化: {self.emulator}")
+
+        self.device_manager = None
+        start = time.perf_counter()
+        manager = self.device_manager_factory()
+        manager.initialize(emulator_name=self.emulator, correction_map=correction_map or None)
+        elapsed = time.perf_counter() - start
+        self.device_manager = manager
+        self._correction_map = correction_map
+        self.initializations += 1
+        self.init_seconds += elapsed
+        logger.info(f"🔌 [Session] 设备初始化完成: {self.emulator}，耗时 {elapsed:.1f}s")
+        return manager
+
+    def summary(self) -> str:
+        return (
+            f"设备初始化 {self.initializations} 次（共 {self.init_seconds:.1f}s），"
+            f"复用 {self.reuses} 次"
+        )
+
+    @contextmanager
+    def activate(self) -> Iterator["DeviceSession"]:
+        """在 with 块内作为当前进程的活动会话"""
+        global _active_session
+        previous = _active_session
+        _active_session = self
+        try:
+            yield self
+        finally:
+            _active_session = previous
+
+
+_active_session: Optional[DeviceSession] = None
+
+
+def get_active_session(emulator: Optional[str] = None) -> Optional[DeviceSession]:
+    """当前活动会话；指定 ``emulator`` 时只返回同一模拟器的会话"""
+    session = _active_session
+    if session is None or (emulator is not None and session.emulator != emulator):
+        return None
+    return session
+
+
+__all__ = [
+    "DeviceSession",
+    "get_active_session",
+]
@@ -0,0 +1,378 @@
+"""
+副本名称坐标缓存
+
+区域地图上副本名称的位置是固定的。每次 OCR 在地图上找到副本名称并点击成功后，
+记录该名称的点击坐标和名称区域的像素签名，按「区域 -> 副本 -> 地图画面哈希」保存在
+``dungeon_locations.json``。
+
+下次在同一区域找同一个副本时：
+
+1. 当前帧的画面哈希与记录的哈希相近（同一地图视图）
+2. 名称区域的像素签名仍然匹配（名称确实还在原位置）
+
+两项都满足就直接点击记录的坐标，不再整图 OCR；任一项不满足则退回 OCR，
+并用新的命中结果覆盖该视图下的记录。
+
+多个模拟器进程共用同一个缓存文件：写盘在文件锁内先与文件中的记录合并（本进程改过的
+副本以内存为准，其余以文件为准），再写临时文件后 ``os.replace``，读取方不会读到半截文件。
+学习结果按 ``save_interval`` 批量写盘，进程退出时补写。
+"""
+
+from __future__ import annotations
+
+import atexit
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from dataclasses import dataclass, replace
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+
+import cv2
+import numpy as np
+from filelock import FileLock, Timeout
+
+from pixel_signature import PixelSignature, learn_signature
+from project_paths import resolve_project_path
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LOCATIONS_FILE = str(resolve_project_path("dungeon_locations.json"))
+"""默认坐标缓存文件"""
+
+DEFAULT_MAX_HASH_DISTANCE = 10
+"""画面哈希（64 位）允许的最大汉明距离"""
+
+DEFAULT_LABEL_SAMPLES = 25
+"""名称区域签名的采样点数量"""
+
+DEFAULT_LABEL_MIN_RATIO = 0.9
+"""名称区域签名至少多少比例的采样点匹配才算命中（容忍地图动画）"""
+
+MAX_VIEWS_PER_DUNGEON = 4
+"""每个副本最多保留的地图视图数量"""
+
+DEFAULT_SAVE_INTERVAL = 30.0
+"""两次写盘的最短间隔（秒），期间的修改留在内存里，之后或退出时一并写盘"""
+
+SAVE_LOCK_TIMEOUT = 5.0
+"""等待缓存文件锁的最长时间（秒）"""
+
+HIT = "hit"
+MISS = "miss"
+REJECTED = "rejected"
+
+
+def map_hash(image: np.ndarray) -> int:
+    """64 位差值哈希（dHash），用于判断是否为同一地图视图"""
+    if image.ndim == 3:
+        image = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    small = cv2.resize(image, (9, 8), interpolation=cv2.INTER_AREA)
+    bits = (small[:, 1:] > small[:, :-1]).ravel()
+    return int(np.packbits(bits).view(">u8")[0])
+
+
+def hash_distance(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+Locations = Dict[str, Dict[str, List["LabelLocation"]]]
+
+
+def _bbox_rect(bbox: Sequence[Sequence[float]]) -> Tuple[int, int, int, int]:
+    """OCR 多边形 -> (x, y, w, h)"""
+    xs = [float(p[0]) for p in bbox]
+    ys = [float(p[1]) for p in bbox]
+    x0, y0 = int(min(xs)), int(min(ys))
+    return x0, y0, max(1, int(max(xs)) - x0), max(1, int(max(ys)) - y0)
+
+
+@dataclass
+class LabelLocation:
+    """某个地图视图下副本名称的位置
+
+    Attributes:
+        view_hash: 学习时地图画面的哈希
+        center: 点击坐标（基于签名分辨率）
+        signature: 名称区域的像素签名
+        hits: 直接点击命中次数
+    """
+
+    view_hash: int
+    center: Tuple[int, int]
+    signature: PixelSignature
+    hits: int = 0
+
+    def scaled_center(self, image: np.ndarray) -> Tuple[int, int]:
+        height, width = image.shape[:2]
+        res_w, res_h = self.signature.resolution
+        return (int(self.center[0] * width / res_w), int(self.center[1] * height / res_h))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "view_hash": f"{self.view_hash:016x}",
+            "center": list(self.center),
+            "signature": self.signature.to_dict(),
+            "hits": self.hits,
+        }
+
+    @classmethod
+    def from_dict(cls, name: str, data: Dict[str, Any]) -> "LabelLocation":
+        return cls(
+            view_hash=int(data["view_hash"], 16),
+            center=tuple(data["center"]),
+            signature=PixelSignature.from_dict(name, data["signature"]),
+            hits=int(data.get("hits", 0)),
+        )
+
+
+class DungeonLabelCache:
+    """副本名称坐标缓存"""
+
+    def __init__(
+        self,
+        path: Optional[str] = DEFAULT_LOCATIONS_FILE,
+        max_hash_distance: int = DEFAULT_MAX_HASH_DISTANCE,
+        label_samples: int = DEFAULT_LABEL_SAMPLES,
+        save_interval: float = DEFAULT_SAVE_INTERVAL,
+    ):
+        """
+        Args:
+            path: 持久化文件，None 表示只在内存中缓存
+            max_hash_distance: 画面哈希允许的最大汉明距离
+            label_samples: 名称区域签名的采样点数量
+            save_interval: 两次写盘的最短间隔（秒），0 表示每次修改都写盘
+        """
+        self.path = path
+        self.max_hash_distance = max_hash_distance
+        self.label_samples = label_samples
+        self.save_interval = save_interval
+        self.stats: Dict[str, int] = {}
+
+        self._locations: Locations = {}
+        self._dirty: Set[Tuple[str, str]] = set()
+        self._last_save = float("-inf")
+        self._lock = threading.Lock()
+        if path:
+            self.load(path)
+
+    def _count(self, outcome: str) -> None:
+        self.stats[outcome] = self.stats.get(outcome, 0) + 1
+
+    def has(self, zone_name: str, dungeon_name: str) -> bool:
+        with self._lock:
+            return bool(self._locations.get(zone_name, {}).get(dungeon_name))
+
+    def lookup(
+        self, zone_name: str, dungeon_name: str, image: Optional[np.ndarray]
+    ) -> Optional[Tuple[int, int]]:
+        """查询当前帧上副本名称的点击坐标
+
+        Returns:
+            命中且签名校验通过时返回 (x, y)，否则 None
+        """
+        with self._lock:
+            views = list(self._locations.get(zone_name, {}).get(dungeon_name, []))
+        if image is None or not views:
+            self._count(MISS)
+            return None
+
+        current = map_hash(image)
+        candidates = [
+            v for v in views if hash_distance(v.view_hash, current) <= self.max_hash_distance
+        ]
+        if not candidates:
+            self._count(MISS)
+            return None
+        candidates.sort(key=lambda v: hash_distance(v.view_hash, current))
+        for view in candidates:
+            if view.signature.matches(image):
+                view.hits += 1
+                self._count(HIT)
+                return view.scaled_center(image)
+        self._count(REJECTED)
+        return None
+
+    def learn(
+        self,
+        zone_name: str,
+        dungeon_name: str,
+        image: np.ndarray,
+        bbox: Sequence[Sequence[float]],
+        center: Optional[Tuple[int, int]] = None,
+    ) -> LabelLocation:
+        """记录 OCR 命中的副本名称位置（覆盖同一视图下的旧记录）
+
+        Args:
+            image: OCR 使用的帧
+            bbox: OCR 返回的名称多边形（整帧坐标）
+            center: 点击坐标，默认取多边形中心
+        """
+        rect = _bbox_rect(bbox)
+        signature = replace(
+            learn_signature(f"{zone_name}/{dungeon_name}", image, rect, count=self.label_samples),
+            min_ratio=DEFAULT_LABEL_MIN_RATIO,
+        )
+        if center is None:
+            center = (rect[0] + rect[2] // 2, rect[1] + rect[3] // 2)
+        location = LabelLocation(
+            view_hash=map_hash(image),
+            center=(int(center[0]), int(center[1])),
+            signature=signature,
+        )
+
+        with self._lock:
+            views = self._locations.setdefault(zone_name, {}).setdefault(dungeon_name, [])
+            views[:] = [
+                v
+                for v in views
+                if hash_distance(v.view_hash, location.view_hash) > self.max_hash_distance
+            ]
+            views.append(location)
+            del views[:-MAX_VIEWS_PER_DUNGEON]
+            self._dirty.add((zone_name, dungeon_name))
+        logger.debug(f"📍 记录副本坐标: {zone_name} - {dungeon_name} @ {location.center}")
+        self._save_if_due()
+        return location
+
+    def forget(self, zone_name: str, dungeon_name: str) -> None:
+        """删除某个副本的所有记录"""
+        with self._lock:
+            self._locations.get(zone_name, {}).pop(dungeon_name, None)
+            self._dirty.add((zone_name, dungeon_name))
+        self._save_if_due()
+
+    def _save_if_due(self) -> None:
+        if self.path and time.monotonic() - self._last_save >= self.save_interval:
+            self.save(self.path)
+
+    def flush(self) -> None:
+        """把尚未写盘的修改写入缓存文件"""
+        if self.path and self._dirty:
+            self.save(self.path)
+
+    # ------------------------------------------------------------------
+    # 持久化
+    # ------------------------------------------------------------------
+
+    def save(self, path: str = DEFAULT_LOCATIONS_FILE) -> None:
+        """与文件中的记录合并后原子写回
+
+        本进程学习或删除过的副本以内存为准，其余副本以文件为准（同时更新到内存，
+        其他进程学到的坐标本进程也能用上）。
+        """
+        try:
+            with FileLock(f"{path}.lock", timeout=SAVE_LOCK_TIMEOUT):
+                try:
+                    on_disk = _read_locations(path)
+                except Exception as e:
+                    logger.warning(f"⚠️ 缓存文件无法读取，以内存记录覆盖 {path}: {e}")
+                    on_disk = {}
+                with self._lock:
+                    dirty = set(self._dirty)
+                    merged = _merge(on_disk, self._locations, dirty)
+                    self._locations = merged
+                    self._dirty.clear()
+                try:
+                    _write_atomic(path, _serialize(merged))
+                except OSError:
+                    with self._lock:
+                        self._dirty |= dirty
+                    raise
+        except (OSError, Timeout) as e:
+            logger.warning(f"⚠️ 保存副本坐标缓存失败 {path}: {e}")
+        self._last_save = time.monotonic()
+
+    def load(self, path: str = DEFAULT_LOCATIONS_FILE) -> int:
+        """读取缓存文件，返回记录数量；文件不存在返回 0"""
+        try:
+            locations = _read_locations(path)
+        except Exception as e:
+            logger.warning(f"⚠️ 读取副本坐标缓存失败 {path}: {e}")
+            return 0
+        with self._lock:
+            self._locations = locations
+        return sum(len(views) for dungeons in locations.values() for views in dungeons.values())
+
+
+def _read_locations(path: str) -> Locations:
+    """读取缓存文件；文件不存在返回空字典，内容损坏时抛出异常"""
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        raw = json.load(f)
+    return {
+        zone: {
+            dungeon: [LabelLocation.from_dict(f"{zone}/{dungeon}", view) for view in views]
+            for dungeon, views in dungeons.items()
+        }
+        for zone, dungeons in raw.items()
+    }
+
+
+def _merge(on_disk: Locations, memory: Locations, dirty: Set[Tuple[str, str]]) -> Locations:
+    """文件记录为底，覆盖本进程改过的副本（内存中已删除的从结果中去掉）"""
+    merged = {zone: dict(dungeons) for zone, dungeons in on_disk.items()}
+    for zone, dungeon in dirty:
+        views = memory.get(zone, {}).get(dungeon)
+        if views:
+            merged.setdefault(zone, {})[dungeon] = list(views)
+        else:
+            merged.get(zone, {}).pop(dungeon, None)
+    return merged
+
+
+def _serialize(locations: Locations) -> Dict[str, Any]:
+    return {
+        zone: {
+            dungeon: [view.to_dict() for view in views]
+            for dungeon, views in dungeons.items()
+            if views
+        }
+        for zone, dungeons in locations.items()
+    }
+
+
+def _write_atomic(path: str, data: Dict[str, Any]) -> None:
+    """写临时文件后替换，读取方只会看到旧文件或完整的新文件"""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(
+        prefix=f".{os.path.basename(path)}.", suffix=".tmp", dir=directory
+    )
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+# ====== 全局实例 ======
+
+_cache: Optional[DungeonLabelCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_dungeon_label_cache() -> DungeonLabelCache:
+    """获取全局副本坐标缓存（首次调用时加载缓存文件）"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = DungeonLabelCache()
+            atexit.register(_cache.flush)
+        return _cache
+
+
+__all__ = [
+    "DungeonLabelCache",
+    "LabelLocation",
+    "get_dungeon_label_cache",
+    "hash_distance",
+    "map_hash",
+]
@@ -0,0 +1,237 @@
+"""
+副本遍历规划模块
+
+在执行前根据配置中选定、且今天尚未通关的副本生成执行计划：
+
+- 日常任务不依赖地图，排在最前面，执行完再开始刷图
+- 同一区域的副本连续执行，当前已选中的区域排第一个
+- 回到主界面后不假定地图仍停留在原区域，下一个副本重新切换区域
+- 卖垃圾只按有掉落的副本计数（日常任务不产生垃圾）
+- 同区域的下一个副本紧随其后时，无免费次数的副本关闭弹窗后直接留在地图上
+
+计划中的预计耗时来自数据库里各步骤的历史平均耗时（``DungeonProgressDB.get_step_timings``），
+没有历史数据的步骤使用默认估计。
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterator, List, Mapping, Optional, Sequence
+
+from auto_dungeon_config import SELL_LOOT_EVERY
+
+logger = logging.getLogger(__name__)
+
+DAILY_TASK_ZONE = "日常任务"
+"""配置中的日常任务区域，不需要打开地图"""
+
+STEP_OPEN_MAP = "open_map"
+STEP_SWITCH_ZONE = "switch_zone"
+STEP_DUNGEON = "dungeon"
+STEP_DAILY_TASK = "daily_task"
+STEP_SELL = "sell"
+STEP_SWITCH_CHARACTER = "switch_character"
+STEP_RESTART_GAME = "restart_game"
+
+DEFAULT_STEP_SECONDS = {
+    STEP_OPEN_MAP: 3.0,
+    STEP_SWITCH_ZONE: 5.0,
+    STEP_DUNGEON: 60.0,
+    STEP_DAILY_TASK: 20.0,
+    STEP_SELL: 15.0,
+    STEP_SWITCH_CHARACTER: 15.0,
+    STEP_RESTART_GAME: 60.0,
+}
+"""没有历史数据时各步骤的预计耗时（秒）"""
+
+
+@dataclass
+class PlannedDungeon:
+    """计划中的一个副本
+
+    Attributes:
+        zone_name: 区域名称
+        dungeon_name: 副本名称
+        index: 在配置中的序号（从 1 开始，用于日志）
+        switch_zone: 执行前是否需要切换区域
+        sell_after: 完成后是否卖垃圾
+        keep_map: 下一个副本在同一区域，可以留在地图上
+    """
+
+    zone_name: str
+    dungeon_name: str
+    index: int
+    switch_zone: bool = False
+    sell_after: bool = False
+    keep_map: bool = False
+
+    @property
+    def is_daily_task(self) -> bool:
+        return self.zone_name == DAILY_TASK_ZONE
+
+
+@dataclass
+class DungeonPlan:
+    """副本执行计划"""
+
+    entries: List[PlannedDungeon] = field(default_factory=list)
+    total: int = 0
+    skipped_unselected: int = 0
+    skipped_completed: int = 0
+    timings: Dict[str, float] = field(default_factory=dict)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __iter__(self) -> Iterator[PlannedDungeon]:
+        return iter(self.entries)
+
+    @property
+    def zone_switches(self) -> int:
+        return sum(1 for entry in self.entries if entry.switch_zone)
+
+    @property
+    def map_opens(self) -> int:
+        """打开地图次数（每场战斗结束后都会回到主界面）"""
+        return sum(1 for entry in self.entries if not entry.is_daily_task)
+
+    @property
+    def sell_trips(self) -> int:
+        return sum(1 for entry in self.entries if entry.sell_after)
+
+    def step_seconds(self, step: str) -> float:
+        return self.timings.get(step, DEFAULT_STEP_SECONDS[step])
+
+    @property
+    def estimated_seconds(self) -> float:
+        daily = sum(1 for entry in self.entries if entry.is_daily_task)
+        return (
+            daily * self.step_seconds(STEP_DAILY_TASK)
+            + self.map_opens * (self.step_seconds(STEP_DUNGEON) + self.step_seconds(STEP_OPEN_MAP))
+            + self.zone_switches * self.step_seconds(STEP_SWITCH_ZONE)
+            + self.sell_trips * self.step_seconds(STEP_SELL)
+        )
+
+    def log(self) -> None:
+        """执行前输出计划"""
+        logger.info(f"\n{'#' * 60}")
+        logger.info(
+            f"# 🧭 副本计划: {len(self.entries)} 个待完成"
+            f"（未选定 {self.skipped_unselected}，已通关 {self.skipped_completed}）"
+        )
+        logger.info(
+            f"# 🌍 切换区域 {self.zone_switches} 次 | 🗺️ 打开地图 {self.map_opens} 次 | "
+            f"🧹 卖垃圾 {self.sell_trips} 次 | ⏱️ 预计 {self.estimated_seconds / 60:.1f} 分钟"
+        )
+        logger.info(f"{'#' * 60}")
+        zone = None
+        for entry in self.entries:
+            if entry.zone_name != zone:
+                zone = entry.zone_name
+                logger.info(f"🌍 {zone}")
+            marks = " 🧹" if entry.sell_after else ""
+            logger.info(f"   [{entry.index}/{self.total}] {entry.dungeon_name}{marks}")
+
+
+def plan_dungeons(
+    zone_dungeons: Mapping[str, Sequence[dict]],
+    is_completed: Callable[[str, str], bool],
+    current_zone: Optional[str] = None,
+    timings: Optional[Dict[str, float]] = None,
+    sell_every: int = SELL_LOOT_EVERY,
+) -> DungeonPlan:
+    """生成副本执行计划
+
+    Args:
+        zone_dungeons: 区域 -> 副本配置列表（``ConfigLoader.get_zone_dungeons``）
+        is_completed: 判断副本今天是否已通关的函数，参数为 (区域, 副本)
+        current_zone: 地图上当前已选中的区域，该区域排在最前面且不需要切换
+        timings: 各步骤历史平均耗时（秒）
+        sell_every: 每打完多少个有掉落的副本卖一次垃圾，0 表示不卖
+
+    Returns:
+        DungeonPlan: 执行计划
+    """
+    plan = DungeonPlan(timings=dict(timings or {}))
+    groups: Dict[str, List[PlannedDungeon]] = {}
+
+    index = 0
+    for zone_name, dungeons in zone_dungeons.items():
+        for dungeon_dict in dungeons:
+            index += 1
+            dungeon_name = dungeon_dict["name"]
+            if not dungeon_dict.get("selected", True):
+                plan.skipped_unselected += 1
+                continue
+            if is_completed(zone_name, dungeon_name):
+                plan.skipped_completed += 1
+                continue
+            groups.setdefault(zone_name, []).append(
+                PlannedDungeon(zone_name=zone_name, dungeon_name=dungeon_name, index=index)
+            )
+    plan.total = index
+
+    # 日常任务最先执行，其后当前区域，其余区域保持配置顺序
+    order = list(groups)
+    order.sort(key=lambda zone: (zone != DAILY_TASK_ZONE, zone != current_zone))
+
+    selected_zone = current_zone
+    loot_count = 0
+    for zone_name in order:
+        group = groups[zone_name]
+        for position, entry in enumerate(group):
+            if not entry.is_daily_task:
+                entry.switch_zone = zone_name != selected_zone
+                # 战斗结束会回到主界面，地图选中的区域不再可信
+                selected_zone = None
+                entry.keep_map = position < len(group) - 1
+                loot_count += 1
+                if sell_every > 0 and loot_count % sell_every == 0:
+                    entry.sell_after = True
+            plan.entries.append(entry)
+    return plan
+
+
+def load_step_timings(db, days: int = 7) -> Dict[str, float]:
+    """从数据库读取各步骤历史平均耗时，读取失败返回空字典"""
+    try:
+        timings = db.get_step_timings(days=days)
+    except Exception as e:
+        logger.debug(f"读取步骤耗时失败: {e}")
+        return {}
+    return dict(timings) if isinstance(timings, dict) else {}
+
+
+@contextmanager
+def timed_step(recorder: Optional[Callable[[str, float], None]], step: str) -> Iterator[None]:
+    """记录代码块耗时；recorder 为 None 或记录失败时不影响执行"""
+    start = time.monotonic()
+    try:
+        yield
+    finally:
+        if recorder is not None:
+            try:
+                recorder(step, time.monotonic() - start)
+            except Exception as e:
+                logger.debug(f"记录步骤耗时失败 {step}: {e}")
+
+
+__all__ = [
+    "DAILY_TASK_ZONE",
+    "DEFAULT_STEP_SECONDS",
+    "DungeonPlan",
+    "PlannedDungeon",
+    "STEP_DAILY_TASK",
+    "STEP_DUNGEON",
+    "STEP_OPEN_MAP",
+    "STEP_RESTART_GAME",
+    "STEP_SELL",
+    "STEP_SWITCH_CHARACTER",
+    "STEP_SWITCH_ZONE",
+    "load_step_timings",
+    "plan_dungeons",
+    "timed_step",
+]
@@ -5,6 +5,9 @@
 - 检测用户要求的连接是否是一个有效的 ADB 连接
 - 如果连接失败则尝试重启模拟器并等待重试
 - 确保交给调用者的端口是可用的（需要用 ADB 命令测试通过）
+
+设备查询、connect 和连接测试优先直接走 adb server 协议（见 ``adb_client``），
+adb server 未启动时回退到 adb 命令。
 """
 
 from __future__ import annotations
@@ -16,6 +19,8 @@ import time
 from shutil import which
 from typing import Optional
 
+from adb_client import AdbClient, AdbError, AdbServerUnavailable, get_adb_client
+
 # ==================== 模块级 Logger ====================
 # 外部可通过 `from emulator_manager import logger` 导入并修改此 logger
 logger = logging.getLogger(__name__)
@@ -49,17 +54,22 @@ class EmulatorConnectionManager:
     def __init__(
         self,
         start_cmd: Optional[str] = None,
+        use_adb_server: bool = True,
+        adb_client: Optional[AdbClient] = None,
     ):
         """
         初始化模拟器连接管理器
 
         Args:
             start_cmd: 启动模拟器的命令行字符串
-            logger: 可选的自定义 logger，默认为模块级 logger
+            use_adb_server: 是否直接通过 adb server 协议查询（False 时始终调用 adb 命令）
+            adb_client: 自定义 adb server 客户端，默认使用进程内共享的客户端
         """
         self.logger = logger
         self.adb_path = self._resolve_adb_path()
         self.start_cmd = start_cmd
+        self.use_adb_server = use_adb_server
+        self._adb_client = adb_client
 
         # 初始化状态
         self.target_emulator: Optional[str] = None
@@ -93,10 +103,26 @@ class EmulatorConnectionManager:
             self.logger.error(f"[Start] 执行失败: {exc}")
             return False
 
+    def _server(self) -> Optional[AdbClient]:
+        """adb server 客户端；禁用时返回 None"""
+        if not self.use_adb_server:
+            return None
+        if self._adb_client is None:
+            self._adb_client = get_adb_client()
+        return self._adb_client
+
     # ==================== ADB 设备列表操作 ====================
 
     def get_devices(self) -> dict[str, str]:
         """获取已连接的 ADB 设备列表"""
+        client = self._server()
+        if client is not None:
+            try:
+                return client.devices()
+            except AdbServerUnavailable:
+                pass
+            except AdbError as exc:
+                self.logger.debug(f"[ADB] adb server 查询失败，改用 adb 命令: {exc}")
         try:
             result = subprocess.run(
                 [self.adb_path, "devices"],
@@ -134,6 +160,20 @@ class EmulatorConnectionManager:
 
     def connect(self, emulator: str) -> bool:
         """尝试通过 adb connect 连接模拟器"""
+        client = self._server()
+        if client is not None:
+            try:
+                ok, message = client.connect(emulator)
+                if ok:
+                    self.logger.info(f"[ADB] 已连接: {emulator}")
+                else:
+                    self.logger.warning(f"[ADB] 连接失败: {message}")
+                return ok
+            except AdbServerUnavailable:
+                pass
+            except AdbError as exc:
+                self.logger.warning(f"[ADB] 连接失败: {exc}")
+                return False
         try:
             result = subprocess.run(
                 [self.adb_path, "connect", emulator],
@@ -228,6 +268,19 @@ class EmulatorConnectionManager:
         Returns:
             bool: 连接可用返回 True
         """
+        client = self._server()
+        if client is not None:
+            try:
+                if client.shell(emulator, "echo test").strip() == "test":
+                    self.logger.info(f"[ADB] 连接测试成功: {emulator}")
+                    return True
+                self.logger.warning(f"[ADB] 连接测试失败: {emulator}")
+                return False
+            except AdbServerUnavailable:
+                pass
+            except (AdbError, OSError) as exc:
+                self.logger.warning(f"[ADB] 连接测试失败: {emulator}, {exc}")
+                return False
         try:
             result = subprocess.run(
                 [self.adb_path, "-s", emulator, "shell", "echo", "test"],
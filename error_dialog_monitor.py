@@ -6,9 +6,13 @@
 
 import threading
 import time
-from typing import Iterable, Optional, Sequence
+from typing import Callable, Iterable, Optional, Sequence
 
-from airtest.core.api import Template, exists, touch, wait
+from airtest.core.api import Template, exists, wait
+
+from auto_dungeon_config import PIXEL_SIGNATURES_FILE
+from auto_dungeon_utils import touch
+from pixel_signature import SignatureDetector
 
 ENTER_GAME_BUTTON_TEMPLATE = Template(
     r"images/enter_game_button.png", resolution=(720, 1280)
@@ -25,6 +29,8 @@ class ErrorDialogMonitor:
         ok_button_template: Optional[Template] = None,
         enter_game_template: Optional[Template] = None,
         check_interval: float = 0.5,
+        frame_bus_provider: Optional[Callable[[], Optional[object]]] = None,
+        signatures_file: Optional[str] = PIXEL_SIGNATURES_FILE,
     ):
         """
         Args:
@@ -32,9 +38,14 @@ class ErrorDialogMonitor:
             error_templates: 要检测的错误弹窗模板列表
             ok_button_template: 关闭弹窗的确认按钮模板
             check_interval: 检测间隔（秒）
+            frame_bus_provider: 返回当前设备帧总线的函数；提供时复用共享帧，
+                不再为每次检测单独截图
+            signatures_file: 像素签名文件；学习过签名的弹窗在共享帧上用像素签名预判，
+                命中后再用模板确认；None 表示只用模板匹配
         """
         self.logger = logger
         self.check_interval = max(0.1, check_interval)
+        self.frame_bus_provider = frame_bus_provider
         self._stop_event = threading.Event()
         self._thread: Optional[threading.Thread] = None
 
@@ -47,6 +58,10 @@ class ErrorDialogMonitor:
             ),
         ]
         self.error_templates = list(default_error_templates)
+        self._detectors = [
+            SignatureDetector(template, signatures_file=signatures_file)
+            for template in self.error_templates
+        ]
 
         self.ok_button_template = ok_button_template or Template(
             r"images/ok_button.png", resolution=(720, 1280)
@@ -81,10 +96,24 @@ class ErrorDialogMonitor:
         """立即检测一次错误弹窗（同步调用）"""
         self._handle_dialogs()
 
+    def _current_screen(self):
+        """从帧总线读取一帧，帧龄不超过一个检测周期；不可用时返回 None"""
+        if self.frame_bus_provider is None:
+            return None
+        bus = self.frame_bus_provider()
+        if bus is None:
+            return None
+        return bus.get_image(max_age_ms=self.check_interval * 1000)
+
     def _handle_dialogs(self):
         try:
-            for template in self.error_templates:
-                if exists(template):
+            screen = self._current_screen()
+            for template, detector in zip(self.error_templates, self._detectors):
+                if screen is not None:
+                    found = detector.detect(screen, final=False)
+                else:
+                    found = exists(template)
+                if found:
                     self.logger.warning("⚠️ 检测到错误对话框")
                     handled = self._click_ok_button()
                     if handled and self._requires_relogin(template):
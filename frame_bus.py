@@ -0,0 +1,413 @@
+"""
+设备帧总线模块
+
+同一台设备上的检测器（主界面检测、错误弹窗监控、战斗循环、OCR）共享截图。
+FrameBus 维护一个小型环形缓冲区，读取方通过 ``get_frame(max_age_ms)`` 获取
+“不超过 N 毫秒”的最新帧；帧过期时由第一个读取者抓取新帧，其余并发读取者直接复用，
+从而避免每个检测器各自触发一次 screencap。
+
+也可以调用 ``start()`` 启动后台抓帧线程，由其按固定间隔持续发布帧；
+``subscribe()`` 注册的回调会在每帧发布时被调用，用于事件驱动的检测。
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+import roi_matcher
+from auto_dungeon_config import TEMPLATE_ROI_MARGIN
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_AGE_MS = 300
+"""默认帧最大可复用时长（毫秒）"""
+
+DEFAULT_BUFFER_SIZE = 4
+"""环形缓冲区默认容量"""
+
+DEFAULT_CAPTURE_INTERVAL = 0.2
+"""后台抓帧线程默认间隔（秒）"""
+
+
+@dataclass(frozen=True)
+class Frame:
+    """一帧屏幕截图。
+
+    Attributes:
+        image: BGR 格式的 numpy 图像，多个读取方共享，请勿原地修改。
+        timestamp: 抓取时刻（``time.monotonic()``）。
+        seq: 单调递增的帧序号。
+    """
+
+    image: np.ndarray
+    timestamp: float
+    seq: int
+
+    @property
+    def age_ms(self) -> float:
+        """帧距今的毫秒数"""
+        return (time.monotonic() - self.timestamp) * 1000
+
+
+def airtest_capture() -> Optional[np.ndarray]:
+    """通过当前 Airtest 设备抓取一帧（不落盘）"""
+    from airtest.core.helper import G
+    from airtest.core.settings import Settings as ST
+
+    if G.DEVICE is None:
+        raise RuntimeError("Airtest 设备未连接")
+    return G.DEVICE.snapshot(filename=None, quality=ST.SNAPSHOT_QUALITY)
+
+
+class FrameBus:
+    """按设备共享截图的帧总线"""
+
+    def __init__(
+        self,
+        capture_func: Optional[Callable[[], Optional[np.ndarray]]] = None,
+        buffer_size: int = DEFAULT_BUFFER_SIZE,
+        default_max_age_ms: float = DEFAULT_MAX_AGE_MS,
+        name: str = "default",
+    ):
+        """
+        Args:
+            capture_func: 抓帧函数，返回 BGR numpy 图像；默认使用 Airtest 当前设备
+            buffer_size: 环形缓冲区容量
+            default_max_age_ms: ``get_frame`` 未指定 ``max_age_ms`` 时使用的默认值
+            name: 总线名称（一般为设备序列号），用于日志
+        """
+        self.capture_func = capture_func or airtest_capture
+        self.default_max_age_ms = default_max_age_ms
+        self.name = name
+
+        self._frames: Deque[Frame] = deque(maxlen=max(1, buffer_size))
+        self._seq = 0
+        self._lock = threading.Lock()
+        self._capture_lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._subscribers: List[Callable[[Frame], None]] = []
+
+        # 统计：实际抓帧次数与复用次数
+        self.capture_count = 0
+        self.reuse_count = 0
+
+    # ------------------------------------------------------------------
+    # 发布与读取
+    # ------------------------------------------------------------------
+
+    def publish(self, image: np.ndarray) -> Frame:
+        """发布一帧到缓冲区"""
+        with self._lock:
+            self._seq += 1
+            frame = Frame(image=image, timestamp=time.monotonic(), seq=self._seq)
+            self._frames.append(frame)
+            subscribers = list(self._subscribers)
+        for callback in subscribers:
+            try:
+                callback(frame)
+            except Exception as e:
+                logger.debug(f"[FrameBus:{self.name}] 帧订阅回调失败: {e}")
+        return frame
+
+    def subscribe(self, callback: Callable[[Frame], None]) -> Callable[[], None]:
+        """订阅新帧：每次发布帧后在发布线程中调用 ``callback(frame)``
+
+        回调应尽量轻量，不要在回调里抓帧。
+
+        Returns:
+            取消订阅的函数
+        """
+        with self._lock:
+            self._subscribers.append(callback)
+
+        def unsubscribe() -> None:
+            with self._lock:
+                if callback in self._subscribers:
+                    self._subscribers.remove(callback)
+
+        return unsubscribe
+
+    def latest(self) -> Optional[Frame]:
+        """返回缓冲区中的最新帧（不检查新鲜度）"""
+        with self._lock:
+            return self._frames[-1] if self._frames else None
+
+    def capture(self) -> Optional[Frame]:
+        """抓取并发布一帧。
+
+        同一时刻只有一个线程真正抓帧；等待锁期间若已有其他线程发布了新帧，
+        则直接返回该帧而不再重复抓取。
+        """
+        with self._lock:
+            seq_before = self._seq
+        with self._capture_lock:
+            current = self.latest()
+            if current is not None and current.seq > seq_before:
+                self.reuse_count += 1
+                return current
+            try:
+                image = self.capture_func()
+            except Exception as e:
+                logger.debug(f"[FrameBus:{self.name}] 抓帧失败: {e}")
+                return None
+            if image is None:
+                logger.debug(f"[FrameBus:{self.name}] 抓帧返回空图像")
+                return None
+            self.capture_count += 1
+            return self.publish(image)
+
+    def get_frame(
+        self,
+        max_age_ms: Optional[float] = None,
+        newer_than: Optional[int] = None,
+    ) -> Optional[Frame]:
+        """获取足够新的一帧，必要时抓取新帧。
+
+        Args:
+            max_age_ms: 可接受的最大帧龄（毫秒），默认使用 ``default_max_age_ms``
+            newer_than: 仅接受序号大于该值的帧（用于轮询时强制取到下一帧）
+
+        Returns:
+            满足条件的帧；抓帧失败时返回 None
+        """
+        if max_age_ms is None:
+            max_age_ms = self.default_max_age_ms
+
+        current = self.latest()
+        if (
+            current is not None
+            and current.age_ms <= max_age_ms
+            and (newer_than is None or current.seq > newer_than)
+        ):
+            self.reuse_count += 1
+            return current
+        return self.capture()
+
+    def get_image(self, max_age_ms: Optional[float] = None) -> Optional[np.ndarray]:
+        """获取足够新的一帧图像"""
+        frame = self.get_frame(max_age_ms=max_age_ms)
+        return frame.image if frame is not None else None
+
+    def invalidate(self) -> None:
+        """清空缓冲区，下次读取必然抓取新帧（例如点击之后）"""
+        with self._lock:
+            self._frames.clear()
+
+    def snapshot(
+        self,
+        filename: Optional[str] = None,
+        msg: str = "",
+        quality: Optional[int] = None,
+        max_size: Optional[int] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """与 ``airtest.core.api.snapshot`` 兼容的截图函数。
+
+        供 OCRHelper 等仍以文件路径为接口的组件复用总线中的帧。
+        """
+        frame = self.get_frame()
+        if frame is None:
+            raise RuntimeError(f"[FrameBus:{self.name}] 无法获取屏幕帧")
+        height, width = frame.image.shape[:2]
+        if filename:
+            directory = os.path.dirname(filename)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            cv2.imwrite(filename, frame.image)
+        return {"screen": filename, "resolution": (width, height)}
+
+    def stats(self) -> Dict[str, int]:
+        """返回抓帧/复用统计"""
+        return {"captures": self.capture_count, "reuses": self.reuse_count}
+
+    # ------------------------------------------------------------------
+    # 后台抓帧线程
+    # ------------------------------------------------------------------
+
+    def start(self, interval: float = DEFAULT_CAPTURE_INTERVAL) -> None:
+        """启动后台抓帧线程"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(
+            target=self._run,
+            args=(max(0.05, interval),),
+            name=f"FrameBus-{self.name}",
+            daemon=True,
+        )
+        self._thread.start()
+        logger.debug(f"[FrameBus:{self.name}] 后台抓帧线程已启动")
+
+    def stop(self) -> None:
+        """停止后台抓帧线程"""
+        if not self._thread:
+            return
+        self._stop_event.set()
+        self._thread.join(timeout=2)
+        self._thread = None
+        logger.debug(f"[FrameBus:{self.name}] 后台抓帧线程已停止")
+
+    @property
+    def running(self) -> bool:
+        return bool(self._thread and self._thread.is_alive())
+
+    def _run(self, interval: float) -> None:
+        while not self._stop_event.is_set():
+            self.capture()
+            self._stop_event.wait(interval)
+
+
+# ====== 设备级注册表 ======
+
+_buses: Dict[str, FrameBus] = {}
+_buses_lock = threading.Lock()
+
+
+def get_frame_bus(device_id: Optional[str] = None, **kwargs) -> FrameBus:
+    """获取（或创建）指定设备的帧总线
+
+    Args:
+        device_id: 设备标识，如 '192.168.1.150:5555'；None 表示默认设备
+        **kwargs: 首次创建时传给 FrameBus 的参数
+    """
+    key = device_id or "default"
+    with _buses_lock:
+        bus = _buses.get(key)
+        if bus is None:
+            bus = FrameBus(name=key, **kwargs)
+            _buses[key] = bus
+        return bus
+
+
+def release_frame_bus(device_id: Optional[str] = None) -> None:
+    """停止并移除指定设备的帧总线"""
+    key = device_id or "default"
+    with _buses_lock:
+        bus = _buses.pop(key, None)
+    if bus is not None:
+        bus.stop()
+
+
+# ====== 帧差异 ======
+
+THUMBNAIL_SIZE = (36, 64)
+"""比较画面变化时使用的灰度缩略图尺寸 (宽, 高)"""
+
+
+def thumbnail(image: np.ndarray) -> np.ndarray:
+    """帧 -> 灰度缩略图（int16，便于直接相减）"""
+    if image.ndim == 3:
+        image = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    return cv2.resize(image, THUMBNAIL_SIZE, interpolation=cv2.INTER_AREA).astype(np.int16)
+
+
+def frame_difference(a: np.ndarray, b: np.ndarray) -> float:
+    """两帧灰度缩略图的平均绝对差（0-255）；参数可以是原始帧或 ``thumbnail`` 的结果"""
+    if a.shape != THUMBNAIL_SIZE[::-1]:
+        a = thumbnail(a)
+    if b.shape != THUMBNAIL_SIZE[::-1]:
+        b = thumbnail(b)
+    return float(np.abs(a - b).mean())
+
+
+# ====== 基于帧总线的模板匹配 ======
+
+
+def match_template(
+    template: Any,
+    bus: FrameBus,
+    max_age_ms: Optional[float] = None,
+    roi_margin: Optional[int] = TEMPLATE_ROI_MARGIN,
+) -> Optional[Tuple[float, float]]:
+    """在总线最新帧上执行一次模板匹配
+
+    Args:
+        roi_margin: 带 record_pos 的模板只搜索预测位置周围的窗口，未命中再整帧匹配；
+            None 表示始终整帧匹配
+
+    Returns:
+        匹配到的坐标，未找到或抓帧失败返回 None
+    """
+    frame = bus.get_frame(max_age_ms=max_age_ms)
+    if frame is None:
+        return None
+    try:
+        return roi_matcher.match(template, frame.image, margin=roi_margin).pos
+    except Exception as e:
+        logger.debug(f"模板匹配失败: {e}")
+        return None
+
+
+def wait_until(
+    check: Callable[[np.ndarray, bool], Optional[Tuple[float, float]]],
+    bus: FrameBus,
+    timeout: float = 0.3,
+    interval: float = 0.1,
+    max_age_ms: Optional[float] = None,
+) -> Optional[Tuple[float, float]]:
+    """在总线帧上轮询检测函数直到命中或超时（不抛异常）
+
+    Args:
+        check: ``check(image, final)``，返回命中坐标或 None；``final`` 表示本次是最后一次检测
+
+    第一次检测可复用已有的新鲜帧，后续每次只接受更新的帧。
+    """
+    deadline = time.monotonic() + timeout
+    last_seq: Optional[int] = None
+    while True:
+        frame = bus.get_frame(max_age_ms=max_age_ms, newer_than=last_seq)
+        is_last = time.monotonic() >= deadline
+        if frame is not None:
+            try:
+                pos = check(frame.image, is_last)
+            except Exception as e:
+                logger.debug(f"帧检测失败: {e}")
+                pos = None
+            if pos:
+                return pos
+            last_seq = frame.seq
+        if is_last:
+            return None
+        time.sleep(interval)
+
+
+def wait_template(
+    template: Any,
+    bus: FrameBus,
+    timeout: float = 0.3,
+    interval: float = 0.1,
+    max_age_ms: Optional[float] = None,
+    roi_margin: Optional[int] = TEMPLATE_ROI_MARGIN,
+) -> Optional[Tuple[float, float]]:
+    """在总线帧上轮询模板直到超时（``airtest.wait`` 的帧总线版本，不抛异常）
+
+    启用区域匹配时，中间的轮询只搜索预测窗口，最后一次才回退到整帧匹配。
+    """
+
+    def check(image: np.ndarray, final: bool) -> Optional[Tuple[float, float]]:
+        return roi_matcher.match(template, image, margin=roi_margin, fallback=final).pos
+
+    return wait_until(check, bus, timeout=timeout, interval=interval, max_age_ms=max_age_ms)
+
+
+__all__ = [
+    "Frame",
+    "FrameBus",
+    "airtest_capture",
+    "frame_difference",
+    "thumbnail",
+    "get_frame_bus",
+    "release_frame_bus",
+    "match_template",
+    "wait_template",
+    "wait_until",
+]
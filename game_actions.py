@@ -6,30 +6,46 @@
 """
 
 import logging
+import threading
 import time
+from contextlib import contextmanager
 from functools import wraps
-from typing import Any, List, Optional
+from typing import Any, Callable, Iterator, List, Optional, Sequence, Tuple
 
 from vibe_ocr.game_actions import GameActions as BaseGameActions
 
+from auto_dungeon_utils import touch as touch_and_invalidate
+
 # Re-export classes from library
-from vibe_ocr.game_actions import GameElementCollection
+from vibe_ocr.game_actions import GameElement, GameElementCollection
 
 logger = logging.getLogger("bottools.game_actions")
 
 
-def timer_decorator(func):
+def timer_decorator(func=None, *, note: Optional[Callable[..., str]] = None):
     """
     装饰器：计算函数的执行时间
+
+    Args:
+        note: 可选，调用前以被装饰函数的参数调用，返回一个无参函数；
+            调用结束后由它生成附加在计时日志后的说明（例如本次 OCR 跳过比例），
+            可写作 ``@timer_decorator(note=...)``
     """
+    if func is None:
+        return lambda f: timer_decorator(f, note=note)
 
     @wraps(func)
     def wrapper(*args, **kwargs):
+        finish_note = note(*args, **kwargs) if note is not None else None
         start_time = time.perf_counter()
         result = func(*args, **kwargs)
         elapsed_time = time.perf_counter() - start_time
 
         log_msg = f"{func.__name__} 执行时间: {elapsed_time:.4f}秒"
+        if finish_note is not None:
+            extra = finish_note()
+            if extra:
+                log_msg = f"{log_msg}，{extra}"
         if elapsed_time < 0.01:
             logger.debug(f"⚡ {log_msg} (< 10ms)")
         elif elapsed_time < 0.5:
@@ -44,6 +60,22 @@ def timer_decorator(func):
     return wrapper
 
 
+def _ocr_skip_note(actions: "GameActions", *args, **kwargs) -> Callable[[], str]:
+    """计时日志附加的 OCR 跳过比例：只统计本次被装饰的调用"""
+    helper = actions.ocr_helper
+    snapshot = getattr(helper, "ocr_skip_snapshot", None)
+    summary = getattr(helper, "ocr_skip_summary", None)
+    if not callable(snapshot) or not callable(summary):
+        return lambda: ""
+    before = snapshot()
+
+    def finish() -> str:
+        text = summary(since=before)
+        return text if isinstance(text, str) else ""
+
+    return finish
+
+
 class GameActions(BaseGameActions):
     """
     封装游戏内的查找和操作逻辑
@@ -52,17 +84,124 @@ class GameActions(BaseGameActions):
 
     def __init__(self, ocr_helper, click_interval=1):
         super().__init__(ocr_helper, click_interval)
+        self._local = threading.local()
+
+    @contextmanager
+    def _text_filter_scope(self, text_filter: Optional[bool]) -> Iterator[None]:
+        """作用域内父类方法调用的 ``find_all`` 使用指定的 text_filter（None 表示不覆盖）"""
+        if text_filter is None:
+            yield
+            return
+        previous = getattr(self._local, "text_filter", None)
+        self._local.text_filter = text_filter
+        try:
+            yield
+        finally:
+            self._local.text_filter = previous
+
+    def touch(self, pos):
+        """点击后作废帧总线上的旧帧，随后的查找不会拿到点击前的画面"""
+        logger.debug(f"Touch: {pos}")
+        touch_and_invalidate(pos)
 
-    @timer_decorator
+    @timer_decorator(note=_ocr_skip_note)
     def find_all(
         self,
         use_cache: bool = True,
         regions: Optional[List[int]] = None,
+        text_filter: Optional[bool] = None,
     ) -> GameElementCollection:
         """
         覆盖父类方法以添加计时装饰器
+
+        Args:
+            text_filter: 送 OCR 前是否先判断区域有没有文字，None 使用外层 ``find`` 指定的值，
+                都未指定时使用 OCRHelper 的默认值
+        """
+        if text_filter is None:
+            text_filter = getattr(self._local, "text_filter", None)
+        if text_filter is None or self.ocr_helper is None:
+            return super().find_all(use_cache=use_cache, regions=regions)
+        results = self.ocr_helper.capture_and_get_all_texts(
+            use_cache=use_cache, regions=regions, text_filter=text_filter
+        )
+        return GameElementCollection(results, self)
+
+    def find(self, text: str, *args, text_filter: Optional[bool] = None, **kwargs) -> GameElement:
+        """
+        父类 ``find`` 增加 ``text_filter`` 参数（见 ``find_all``）
+        """
+        with self._text_filter_scope(text_filter):
+            return super().find(text, *args, **kwargs)
+
+    def text_exists(self, *args, text_filter: Optional[bool] = None, **kwargs) -> GameElement:
+        """
+        父类 ``text_exists`` 增加 ``text_filter`` 参数（见 ``find_all``）
+        """
+        with self._text_filter_scope(text_filter):
+            return super().text_exists(*args, **kwargs)
+
+    @timer_decorator(note=_ocr_skip_note)
+    def find_many(
+        self,
+        queries: Sequence[Tuple[str, Optional[List[int]]]],
+        timeout: float = 1,
+        similarity_threshold: float = 0.7,
+        use_cache: bool = True,
+        text_filter: Optional[bool] = None,
+    ) -> List[GameElement]:
+        """
+        在同一屏上一次查找多个 (文字, 区域)
+
+        每轮只截一次图，对所有区域的并集只做一次 OCR，再按区域分别匹配；
+        直到全部找到或超时。适合一个界面上有多个按钮要找的场景。
+
+        Args:
+            text_filter: 送 OCR 前是否先判断区域有没有文字，None 使用 OCRHelper 的默认值
+
+        Returns:
+            与 queries 一一对应的元素，未找到的为空元素
         """
-        return super().find_all(use_cache=use_cache, regions=regions)
+        results: List[GameElement] = [GameElement.empty(self) for _ in queries]
+        if self.ocr_helper is None or not queries:
+            return results
+
+        start_time = time.time()
+        pending = list(range(len(queries)))
+        while True:
+            if hasattr(self.ocr_helper, "capture_and_get_texts_for_region_groups"):
+                filter_kwargs = {} if text_filter is None else {"text_filter": text_filter}
+                grouped = self.ocr_helper.capture_and_get_texts_for_region_groups(
+                    [queries[i][1] for i in pending], use_cache=use_cache, **filter_kwargs
+                )
+            else:
+                grouped = [
+                    self.ocr_helper.capture_and_get_all_texts(
+                        use_cache=use_cache, regions=queries[i][1]
+                    )
+                    for i in pending
+                ]
+
+            for i, items in zip(list(pending), grouped):
+                text = queries[i][0]
+                el = (
+                    GameElementCollection(items, self)
+                    .contains(text)
+                    .min_confidence(similarity_threshold)
+                    .first()
+                )
+                if el:
+                    logger.info(f"Found: '{text}' at {el.center}")
+                    results[i] = el
+                    pending.remove(i)
+
+            if not pending or time.time() - start_time >= timeout:
+                break
+            time.sleep(0.1)
+
+        for i in pending:
+            logger.debug(f"Not found: '{queries[i][0]}'")
+        return results
 
     # 兼容性方法：find_text_and_click_safe
     # 父类没有这个方法，这里保留作为扩展
@@ -0,0 +1,192 @@
+"""
+设备按键通道
+
+Airtest 的 ``keyevent`` 每次都在主机上启动一个 ``adb shell input keyevent`` 进程。
+``InputChannel`` 为每台设备保持一条 ``exec:sh`` 长连接（经 adb server，不启动 adb
+进程），``InputBatch`` 把一组按键与等待写成一段 shell 脚本一次下发；脚本末尾回显一个
+标记，读到标记即整批完成。
+
+点击不走这里：Airtest 的 ``touch`` 已经通过 minitouch/maxtouch 长连接下发，而设备端每条
+``input tap`` 都要冷启动一次 app_process（模拟器上常见数百毫秒），只会更慢。
+
+    channel = get_input_channel("192.168.1.150:5555")
+    channel.run(InputBatch().keyevent("BACK", times=3, interval=0.1))
+"""
+
+from __future__ import annotations
+
+import logging
+import re
+import socket
+import threading
+import time
+from typing import Dict, List, Optional, Union
+
+from adb_client import AdbClient, AdbError, get_adb_client
+
+_KEY_PATTERN = re.compile(r"^[A-Za-z0-9_]+$")
+
+logger = logging.getLogger(__name__)
+
+
+class InputNotDelivered(AdbError):
+    """命令一条都没有下发（连不上 adb server、打开通道或写入失败），可以改用其他方式重发"""
+
+
+class InputBatch:
+    """一批按键命令（链式构造）"""
+
+    def __init__(self):
+        self.commands: List[str] = []
+        self.duration = 0.0
+        """批内等待时间之和（秒）"""
+
+    def keyevent(self, key: Union[str, int], times: int = 1, interval: float = 0.0) -> "InputBatch":
+        """按键，``key`` 为键码或名称（如 4、"BACK"、"KEYCODE_HOME"）"""
+        key = str(key)
+        if not _KEY_PATTERN.match(key):
+            raise ValueError(f"无效的按键: {key!r}")
+        for i in range(times):
+            if i and interval > 0:
+                self.wait(interval)
+            self.commands.append(f"input keyevent {key}")
+        return self
+
+    def wait(self, seconds: float) -> "InputBatch":
+        """设备端等待"""
+        if seconds > 0:
+            self.commands.append(f"sleep {seconds:g}")
+            self.duration += seconds
+        return self
+
+    def script(self) -> str:
+        return "".join(f"{command}\n" for command in self.commands)
+
+    def __len__(self) -> int:
+        return len(self.commands)
+
+
+class InputChannel:
+    """单台设备的长连接输入通道（线程安全）"""
+
+    def __init__(self, serial: str, client: Optional[AdbClient] = None, timeout: float = 10.0):
+        """
+        Args:
+            serial: 设备序列号
+            client: adb server 客户端，默认使用进程内共享的客户端
+            timeout: 等待整批完成时，在批内等待时间之外额外允许的秒数
+        """
+        self.serial = serial
+        self.client = client or get_adb_client()
+        self.timeout = timeout
+        self._sock: Optional[socket.socket] = None
+        self._buffer = b""
+        self._seq = 0
+        self._lock = threading.Lock()
+        self.batches = 0
+        self.commands = 0
+
+    def _connect(self) -> socket.socket:
+        if self._sock is None:
+            self._sock = self.client.open_service(self.serial, "exec:sh")
+            self._buffer = b""
+            logger.debug(f"[Input] 已打开输入通道: {self.serial}")
+        return self._sock
+
+    def run(self, batch: InputBatch, wait: bool = True) -> None:
+        """下发一批命令
+
+        Args:
+            batch: 命令批
+            wait: 是否等待设备执行完整批（False 时立即返回，命令在设备端继续执行）
+
+        Raises:
+            InputNotDelivered: 打开通道或写入失败，命令没有下发
+            AdbError: 已下发，但通道随后断开或等待超时（命令可能已经执行）
+        """
+        if not batch.commands:
+            return
+        with self._lock:
+            self._seq += 1
+            marker = f"__input_done_{self._seq}__".encode()
+            script = batch.script() + f"echo {marker.decode()}\n"
+            try:
+                sock = self._connect()
+                sock.sendall(script.encode())
+            except (AdbError, OSError) as exc:
+                self._close()
+                raise InputNotDelivered(f"输入通道不可用: {exc}") from exc
+            self.batches += 1
+            self.commands += len(batch)
+            if not wait:
+                return
+            try:
+                self._read_until(sock, marker, batch.duration + self.timeout)
+            except (AdbError, OSError) as exc:
+                self._close()
+                if isinstance(exc, AdbError):
+                    raise
+                raise AdbError(f"输入通道异常: {exc}") from exc
+
+    def _read_until(self, sock: socket.socket, marker: bytes, timeout: float) -> None:
+        deadline = time.monotonic() + timeout
+        while marker not in self._buffer:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise AdbError(f"等待输入完成超时（{timeout:.1f}s）")
+            sock.settimeout(remaining)
+            chunk = sock.recv(4096)
+            if not chunk:
+                raise AdbError("输入通道被设备关闭")
+            self._buffer += chunk
+        self._buffer = self._buffer.split(marker, 1)[1]
+
+    def keyevent(self, key: Union[str, int], times: int = 1, interval: float = 0.0) -> None:
+        self.run(InputBatch().keyevent(key, times, interval))
+
+    def _close(self) -> None:
+        if self._sock is not None:
+            try:
+                self._sock.close()
+            except OSError:
+                pass
+            self._sock = None
+
+    def close(self) -> None:
+        with self._lock:
+            self._close()
+
+
+_channels: Dict[str, InputChannel] = {}
+_channels_lock = threading.Lock()
+
+
+def get_input_channel(serial: str, **kwargs) -> InputChannel:
+    """获取（或创建）指定设备的输入通道；连接在首次下发时建立
+
+    Args:
+        serial: 设备序列号
+        **kwargs: 首次创建时传给 InputChannel 的参数
+    """
+    with _channels_lock:
+        channel = _channels.get(serial)
+        if channel is None:
+            channel = _channels[serial] = InputChannel(serial, **kwargs)
+        return channel
+
+
+def release_input_channel(serial: str) -> None:
+    """关闭并移除指定设备的输入通道"""
+    with _channels_lock:
+        channel = _channels.pop(serial, None)
+    if channel is not None:
+        channel.close()
+
+
+__all__ = [
+    "InputBatch",
+    "InputChannel",
+    "InputNotDelivered",
+    "get_input_channel",
+    "release_input_channel",
+]
@@ -3,11 +3,10 @@
 from __future__ import annotations
 
 import logging
-import os
 import time
 
 import requests
-from airtest.core.api import exists, sleep, snapshot, swipe, touch
+from airtest.core.api import exists, sleep, swipe, touch
 from config import BARK_URL
 from state import WorldState
 
@@ -118,11 +117,9 @@ def action_request_task(state: WorldState) -> None:
             logger.warning("未找到切换区域元素")
             return
 
-        temp_path = os.path.join(state.ocr.temp_dir, "task_request.png")
-        snapshot(filename=temp_path)
-
-        ocr_results = state.ocr.get_all_texts_from_image(temp_path)
-        green_pos = ColorHelper.find_green_text(temp_path, ocr_results)
+        screen = state.ocr.capture_frame()
+        ocr_results = state.ocr.get_all_texts_from_frame(screen, use_cache=False)
+        green_pos = ColorHelper.find_green_text(screen, ocr_results)
 
         if green_pos:
             logger.info("检测到当前区域（绿色文字）: %s", green_pos)
@@ -134,9 +131,6 @@ def action_request_task(state: WorldState) -> None:
             logger.warning("未找到绿色文字，需要手动选择")
             send_notification("副本助手 - 错误", "未找到绿色文字")
 
-        if os.path.exists(temp_path):
-            os.remove(temp_path)
-
     back_to_main(state)
     clear_signal(state, "request_task_el")
 
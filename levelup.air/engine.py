@@ -6,16 +6,15 @@ import asyncio
 import logging
 import time
 
-from airtest.core.api import snapshot
-
 from behavior_setup import build_behavior_tree
 from behavior_rule import BehaviorRule
 from config import DECISION_INTERVAL, FAST_SCAN_INTERVAL, WORKFLOW_SCAN_INTERVAL
 from detectors import scan_fast, scan_workflow
+from frame_bus import get_frame_bus
 from game_actions import GameActions
+from ocr_helper import OCRHelper
 from state import WorldState
 from templates import build_templates
-from vibe_ocr import OCRHelper
 
 
 class LevelUpEngine:
@@ -27,7 +26,8 @@ class LevelUpEngine:
 
     def __init__(self, logger: logging.Logger) -> None:
         self._logger = logger
-        ocr = OCRHelper(snapshot_func=snapshot)
+        frame_bus = get_frame_bus()
+        ocr = OCRHelper(snapshot_func=frame_bus.snapshot, frame_func=frame_bus.get_image)
         actions = GameActions(ocr)
         templates = build_templates()
 
@@ -9,7 +9,7 @@ from typing import Any, Dict
 from airtest.core.api import Template
 
 from game_actions import GameActions
-from vibe_ocr import OCRHelper
+from ocr_helper import OCRHelper
 
 
 @dataclass
@@ -0,0 +1,347 @@
+"""
+界面导航图
+
+把游戏界面声明为图的节点、把点击/OCR 点击声明为带耗时的边，Router 按最短耗时路径
+从当前界面移动到目标界面。每条边执行后按实测耗时更新代价（指数滑动平均），
+这样同一个进程里后续的路径规划会越来越贴近真实情况。
+
+当前界面的判断顺序：界面识别器认出的界面 > 最近一次导航留下的位置（未过期）>
+未知（先返回主界面再规划）。边执行失败时同样回到主界面重新规划。
+"""
+
+from __future__ import annotations
+
+import heapq
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, List, Optional, Set
+
+from screen_classifier import SCREEN_MAIN_WORLD, SCREEN_MAP
+
+logger = logging.getLogger(__name__)
+
+SCREEN_CITY = "city"
+SCREEN_SHOP = "shop"
+SCREEN_TREASURY = "treasury"
+SCREEN_MAILBOX = "mailbox"
+SCREEN_RETINUE = "retinue"
+SCREEN_GIFTS = "gifts"
+SCREEN_TRIAL_TOWER = "trial_tower"
+
+DEFAULT_BELIEF_TTL = 60.0
+"""导航留下的位置信息有效期（秒），过期后需要重新确认"""
+
+COST_SMOOTHING = 0.3
+"""实测耗时的滑动平均系数"""
+
+
+@dataclass
+class Edge:
+    """一次界面跳转
+
+    Attributes:
+        source: 起点界面
+        target: 终点界面
+        name: 动作描述（用于日志）
+        action: 执行跳转的函数，返回是否成功
+        cost: 预计耗时（秒），执行后按实测值更新
+        samples: 已实测次数
+    """
+
+    source: str
+    target: str
+    name: str
+    action: Callable[[], bool]
+    cost: float
+    samples: int = 0
+
+    def record(self, elapsed: float) -> None:
+        """按实测耗时更新代价"""
+        if self.samples == 0:
+            self.cost = elapsed
+        else:
+            self.cost = (1 - COST_SMOOTHING) * self.cost + COST_SMOOTHING * elapsed
+        self.samples += 1
+
+
+@dataclass
+class NavigationGraph:
+    """界面导航图"""
+
+    edges: Dict[str, List[Edge]] = field(default_factory=dict)
+
+    def add_edge(
+        self,
+        source: str,
+        target: str,
+        action: Callable[[], bool],
+        cost: float,
+        name: str = "",
+    ) -> Edge:
+        edge = Edge(source, target, name or f"{source}->{target}", action, cost)
+        self.edges.setdefault(source, []).append(edge)
+        self.edges.setdefault(target, [])
+        return edge
+
+    @property
+    def screens(self) -> Set[str]:
+        return set(self.edges)
+
+    def shortest_path(self, source: str, target: str) -> Optional[List[Edge]]:
+        """Dijkstra 最短耗时路径；不可达返回 None，起终点相同返回空列表"""
+        if source == target:
+            return []
+        best = {source: 0.0}
+        previous: Dict[str, Edge] = {}
+        queue = [(0.0, source)]
+        while queue:
+            cost, screen = heapq.heappop(queue)
+            if screen == target:
+                break
+            if cost > best.get(screen, float("inf")):
+                continue
+            for edge in self.edges.get(screen, []):
+                new_cost = cost + max(0.0, edge.cost)
+                if new_cost < best.get(edge.target, float("inf")):
+                    best[edge.target] = new_cost
+                    previous[edge.target] = edge
+                    heapq.heappush(queue, (new_cost, edge.target))
+
+        if target not in previous:
+            return None
+        path = []
+        screen = target
+        while screen != source:
+            edge = previous[screen]
+            path.append(edge)
+            screen = edge.source
+        path.reverse()
+        return path
+
+
+class Router:
+    """按导航图在界面之间移动"""
+
+    def __init__(
+        self,
+        graph: NavigationGraph,
+        locate: Optional[Callable[[], Optional[str]]] = None,
+        reset: Optional[Callable[[], None]] = None,
+        verifiers: Optional[Dict[str, Callable[[], bool]]] = None,
+        compatible: Optional[Dict[str, Iterable[str]]] = None,
+        home: str = SCREEN_MAIN_WORLD,
+        belief_ttl: float = DEFAULT_BELIEF_TTL,
+        max_replans: int = 2,
+    ):
+        """
+        Args:
+            graph: 导航图
+            locate: 识别当前界面的函数，返回界面名或 None/unknown
+            reset: 回到 ``home`` 的兜底函数（通常为 back_to_main）
+            verifiers: 界面 -> 确认函数；认为已在目标界面时用来复核
+            compatible: 识别结果 -> 与之兼容的导航位置，例如主城也会被识别为主界面
+            home: 兜底位置
+            belief_ttl: 导航留下的位置信息有效期（秒）
+            max_replans: 失败后最多重新规划次数
+        """
+        self.graph = graph
+        self.locate = locate
+        self.reset = reset
+        self.verifiers = verifiers or {}
+        self.compatible = {k: set(v) for k, v in (compatible or {}).items()}
+        self.home = home
+        self.belief_ttl = belief_ttl
+        self.max_replans = max_replans
+
+        self._current: Optional[str] = None
+        self._current_at = 0.0
+        self._lock = threading.RLock()
+
+    # ------------------------------------------------------------------
+    # 位置
+    # ------------------------------------------------------------------
+
+    def mark(self, screen: Optional[str]) -> None:
+        """记录当前所在界面（流程自行导航后调用）"""
+        self._current = screen
+        self._current_at = time.monotonic()
+
+    def invalidate(self) -> None:
+        """流程离开了导航图覆盖的界面，下次导航重新确认位置"""
+        self._current = None
+
+    def where(self) -> Optional[str]:
+        """当前所在界面；无法确定时返回 None"""
+        located = None
+        if self.locate is not None:
+            try:
+                located = self.locate()
+            except Exception as e:
+                logger.debug(f"识别当前界面失败: {e}")
+        belief = self._current
+        if belief is not None and time.monotonic() - self._current_at > self.belief_ttl:
+            belief = None
+
+        if located in self.graph.screens:
+            if belief is not None and belief in self.compatible.get(located, ()):
+                return belief
+            return located
+        return belief
+
+    def _go_home(self) -> None:
+        if self.reset is not None:
+            self.reset()
+        self.mark(self.home)
+
+    # ------------------------------------------------------------------
+    # 导航
+    # ------------------------------------------------------------------
+
+    def go_to(self, target: str, max_replans: Optional[int] = None) -> bool:
+        """移动到目标界面
+
+        Args:
+            target: 目标界面
+            max_replans: 本次失败后最多重新规划次数，默认使用构造参数
+
+        Returns:
+            是否到达
+        """
+        if target not in self.graph.screens:
+            raise ValueError(f"导航图中没有界面: {target}")
+        replans = self.max_replans if max_replans is None else max_replans
+
+        with self._lock:
+            for _ in range(replans + 1):
+                source = self.where()
+                if source is None:
+                    self._go_home()
+                    source = self.home
+
+                if source == target:
+                    verify = self.verifiers.get(target)
+                    if verify is None or verify():
+                        self.mark(target)
+                        return True
+                    self._go_home()
+                    source = self.home
+                    if source == target:
+                        return True
+
+                path = self.graph.shortest_path(source, target)
+                if path is None:
+                    logger.warning(f"⚠️ 导航图中 {source} 无法到达 {target}，回到 {self.home} 重试")
+                    self._go_home()
+                    continue
+
+                route = " -> ".join([source] + [edge.target for edge in path])
+                logger.info(f"🧭 导航: {route}")
+                if self._follow(path):
+                    return True
+
+            logger.error(f"❌ 导航到 {target} 失败（已重试 {replans} 次）")
+            self.invalidate()
+            return False
+
+    def _follow(self, path: List[Edge]) -> bool:
+        for edge in path:
+            start = time.monotonic()
+            try:
+                success = edge.action() is not False
+            except Exception as e:
+                logger.warning(f"⚠️ 导航动作 {edge.name} 异常: {e}")
+                success = False
+            if not success:
+                logger.warning(f"⚠️ 导航动作失败: {edge.name}")
+                self.invalidate()
+                return False
+            edge.record(time.monotonic() - start)
+            self.mark(edge.target)
+        return True
+
+    def costs(self) -> Dict[str, float]:
+        """各条边当前的代价（秒）"""
+        return {
+            edge.name: round(edge.cost, 3)
+            for edges in self.graph.edges.values()
+            for edge in edges
+        }
+
+
+# ====== 游戏导航图 ======
+
+
+def build_game_graph() -> NavigationGraph:
+    """构建游戏界面导航图（代价为初始估计，运行中按实测更新）"""
+    import auto_dungeon_navigation as navigation
+    import auto_dungeon_ui as ui
+
+    def back() -> bool:
+        navigation.back_to_main()
+        return True
+
+    def open_map() -> bool:
+        navigation.open_map()
+        return True
+
+    def click(text: str, regions: List[int]) -> Callable[[], bool]:
+        return lambda: ui.find_text_and_click_safe(text, regions=regions)
+
+    graph = NavigationGraph()
+    graph.add_edge(SCREEN_MAIN_WORLD, SCREEN_MAP, open_map, 2.5, "打开地图")
+    graph.add_edge(SCREEN_MAIN_WORLD, SCREEN_CITY, click("主城", [9]), 1.5, "主城")
+    graph.add_edge(SCREEN_MAIN_WORLD, SCREEN_RETINUE, click("随从", [7]), 1.5, "随从")
+    graph.add_edge(SCREEN_MAIN_WORLD, SCREEN_GIFTS, click("礼包", [3]), 1.5, "礼包")
+    graph.add_edge(SCREEN_CITY, SCREEN_SHOP, click("商店", [4]), 1.5, "商店")
+    graph.add_edge(SCREEN_CITY, SCREEN_TREASURY, click("宝库", [9]), 1.5, "宝库")
+    graph.add_edge(SCREEN_CITY, SCREEN_MAILBOX, click("邮箱", [5]), 1.5, "邮箱")
+    graph.add_edge(SCREEN_MAP, SCREEN_TRIAL_TOWER, click("试炼塔", [9]), 1.5, "试炼塔")
+
+    # 返回：主城本身也是主界面视图，从主城子菜单返回后停留在主城
+    for screen in (SCREEN_SHOP, SCREEN_TREASURY, SCREEN_MAILBOX):
+        graph.add_edge(screen, SCREEN_CITY, back, 1.0, f"{screen}->返回主城")
+    for screen in (SCREEN_CITY, SCREEN_MAP, SCREEN_RETINUE, SCREEN_GIFTS, SCREEN_TRIAL_TOWER):
+        graph.add_edge(screen, SCREEN_MAIN_WORLD, back, 1.0, f"{screen}->返回主界面")
+    return graph
+
+
+_router: Optional[Router] = None
+_router_lock = threading.Lock()
+
+
+def get_router() -> Router:
+    """获取全局游戏导航器"""
+    global _router
+    with _router_lock:
+        if _router is None:
+            import auto_dungeon_navigation as navigation
+
+            _router = Router(
+                build_game_graph(),
+                locate=navigation.current_screen,
+                reset=navigation.back_to_main,
+                verifiers={
+                    SCREEN_MAIN_WORLD: navigation.is_main_world,
+                    SCREEN_MAP: navigation.is_on_map,
+                },
+                compatible={SCREEN_MAIN_WORLD: {SCREEN_CITY}},
+            )
+        return _router
+
+
+__all__ = [
+    "Edge",
+    "NavigationGraph",
+    "Router",
+    "SCREEN_CITY",
+    "SCREEN_GIFTS",
+    "SCREEN_MAILBOX",
+    "SCREEN_RETINUE",
+    "SCREEN_SHOP",
+    "SCREEN_TREASURY",
+    "SCREEN_TRIAL_TOWER",
+    "build_game_graph",
+    "get_router",
+]
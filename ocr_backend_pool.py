@@ -0,0 +1,205 @@
+"""
+OCR 后端池：负载均衡 + 熔断
+
+多个模拟器会话同时请求一个 OCR 容器时，容器成为瓶颈；挂掉时所有会话都在等超时。
+``OCRBackendPool`` 管理多个 OCR 服务地址：
+
+- 选择后端：按「(进行中请求数 + 1) × 平均延迟」取最小，忙的、慢的后端少分请求
+- 熔断：连续失败 ``failure_threshold`` 次后断开，``cooldown`` 秒内不再分配请求；
+  冷却结束后由后台线程请求 ``/health``，健康才恢复（半开状态）
+- 故障转移：一次请求失败后换下一个可用后端重试，会话代码无感知
+
+``OCRClient`` 持有一个后端池，地址见 ``ocr_client.ocr_server_urls``。
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+import urllib.request
+from typing import List, Optional, Sequence
+from urllib.parse import urlsplit, urlunsplit
+
+DEFAULT_FAILURE_THRESHOLD = 3
+"""连续失败多少次后熔断"""
+
+DEFAULT_COOLDOWN = 10.0
+"""熔断后多少秒再探测 /health"""
+
+HEALTH_TIMEOUT = 2.0
+"""探测 /health 的超时（秒）"""
+
+LATENCY_PRIOR = 0.2
+"""还没有请求记录时假定的延迟（秒）"""
+
+LATENCY_ALPHA = 0.2
+"""延迟指数移动平均的权重"""
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+logger = logging.getLogger(__name__)
+
+
+class OCRBackendUnavailable(RuntimeError):
+    """所有 OCR 后端都处于熔断状态"""
+
+
+def health_url_for(url: str) -> str:
+    """OCR 地址对应的健康检查地址（同一主机端口的 ``/health``）"""
+    parts = urlsplit(url)
+    return urlunsplit((parts.scheme, parts.netloc, "/health", "", ""))
+
+
+def probe_health(url: str, timeout: float = HEALTH_TIMEOUT) -> bool:
+    try:
+        with urllib.request.urlopen(url, timeout=timeout) as response:
+            return response.status == 200
+    except Exception:
+        return False
+
+
+class OCRBackend:
+    """单个 OCR 后端的负载和熔断状态（由 ``OCRBackendPool`` 加锁访问）"""
+
+    def __init__(self, url: str, health_url: Optional[str] = None):
+        self.url = url
+        self.health_url = health_url or health_url_for(url)
+        self.state = CLOSED
+        self.outstanding = 0
+        self.latency = LATENCY_PRIOR
+        self.failures = 0
+        self.opened_at = 0.0
+        self.requests = 0
+        self.errors = 0
+
+    def score(self) -> float:
+        return (self.outstanding + 1) * self.latency
+
+    def __repr__(self) -> str:
+        return f"OCRBackend({self.url!r}, {self.state}, outstanding={self.outstanding})"
+
+
+class OCRBackendPool:
+    """OCR 后端池（线程安全）"""
+
+    def __init__(
+        self,
+        urls: Sequence[str],
+        failure_threshold: int = DEFAULT_FAILURE_THRESHOLD,
+        cooldown: float = DEFAULT_COOLDOWN,
+        health_check=probe_health,
+    ):
+        """
+        Args:
+            urls: OCR 服务地址列表
+            failure_threshold: 连续失败多少次后熔断
+            cooldown: 熔断后多少秒探测 /health
+            health_check: ``(health_url) -> bool``，测试时可替换
+        """
+        if not urls:
+            raise ValueError("OCR 后端列表为空")
+        self.backends = [OCRBackend(url) for url in urls]
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.health_check = health_check
+        self._lock = threading.Lock()
+
+    def acquire(self, exclude: Sequence[OCRBackend] = ()) -> OCRBackend:
+        """选一个后端并登记一个进行中的请求
+
+        Raises:
+            OCRBackendUnavailable: 除 ``exclude`` 外没有可用后端
+        """
+        now = time.monotonic()
+        with self._lock:
+            candidates = [b for b in self.backends if b not in exclude and b.state == CLOSED]
+            for backend in self.backends:
+                if (
+                    backend.state == OPEN
+                    and backend not in exclude
+                    and now - backend.opened_at >= self.cooldown
+                ):
+                    backend.state = HALF_OPEN
+                    threading.Thread(
+                        target=self._probe, args=(backend,), name="ocr-health", daemon=True
+                    ).start()
+            if not candidates:
+                raise OCRBackendUnavailable(
+                    "没有可用的 OCR 后端: "
+                    + ", ".join(f"{b.url}({b.state})" for b in self.backends)
+                )
+            backend = min(candidates, key=OCRBackend.score)
+            backend.outstanding += 1
+            backend.requests += 1
+            return backend
+
+    def release(self, backend: OCRBackend, elapsed: float, ok: bool) -> None:
+        """登记请求结果：成功更新延迟，失败累计并在达到阈值时熔断"""
+        with self._lock:
+            backend.outstanding -= 1
+            if ok:
+                backend.failures = 0
+                backend.latency += LATENCY_ALPHA * (elapsed - backend.latency)
+                return
+            backend.errors += 1
+            backend.failures += 1
+            tripped = backend.state == CLOSED and backend.failures >= self.failure_threshold
+            if tripped:
+                backend.state = OPEN
+                backend.opened_at = time.monotonic()
+        if tripped:
+            logger.warning(f"⚡ OCR 后端熔断: {backend.url}（连续失败 {backend.failures} 次）")
+
+    def _probe(self, backend: OCRBackend) -> None:
+        healthy = self.health_check(backend.health_url)
+        with self._lock:
+            if healthy:
+                backend.state = CLOSED
+                backend.failures = 0
+            else:
+                backend.state = OPEN
+                backend.opened_at = time.monotonic()
+        if healthy:
+            logger.info(f"✅ OCR 后端恢复: {backend.url}")
+
+    def check_all(self) -> int:
+        """同步探测所有后端的 /health，更新熔断状态，返回健康的后端数"""
+        healthy = 0
+        for backend in self.backends:
+            ok = self.health_check(backend.health_url)
+            with self._lock:
+                if ok:
+                    backend.state = CLOSED
+                    backend.failures = 0
+                    healthy += 1
+                else:
+                    backend.state = OPEN
+                    backend.opened_at = time.monotonic()
+        return healthy
+
+    def status(self) -> List[dict]:
+        with self._lock:
+            return [
+                {
+                    "url": b.url,
+                    "state": b.state,
+                    "outstanding": b.outstanding,
+                    "latency_ms": round(b.latency * 1000, 1),
+                    "requests": b.requests,
+                    "errors": b.errors,
+                }
+                for b in self.backends
+            ]
+
+    def __len__(self) -> int:
+        return len(self.backends)
+
+
+__all__ = [
+    "OCRBackend",
+    "OCRBackendPool",
+    "OCRBackendUnavailable",
+    "health_url_for",
+    "probe_health",
+]
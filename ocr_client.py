@@ -0,0 +1,314 @@
+"""
+OCR 服务 HTTP 客户端
+
+``scripts/quick_test_ocr_api.py`` 里的调用方式是每次 ``requests.post`` 一个 base64 PNG：
+每次请求都重新建立 TCP 连接，PNG 体积大，base64 还要再膨胀三分之一。``OCRClient``：
+
+- 复用一个 ``requests.Session`` 连接池（keep-alive），连接错误和 502/503/504 自动重试
+- 可配置多个服务地址（``OCR_SERVER_URLS``），按负载分配请求，故障后端熔断并自动
+  转移到其他后端（见 ``ocr_backend_pool``）
+- 连接超时和读取超时分开设置，服务没起来时几秒内失败，而不是等满 60 秒
+- 图像可编码为 PNG / JPEG / WebP（有损格式可配置质量）；服务支持时可直接上传
+  原始字节（``binary=True``），省掉 base64
+- 记录编码耗时、请求耗时的直方图和发送字节数，便于对比不同编码/服务的延迟
+"""
+
+from __future__ import annotations
+
+import base64
+import bisect
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+import cv2
+import numpy as np
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from ocr_backend_pool import OCRBackend, OCRBackendPool, OCRBackendUnavailable
+
+DEFAULT_OCR_URL = "http://localhost:8080/ocr"
+
+OCR_CONNECT_TIMEOUT = 3.0
+"""连接 OCR 服务的超时（秒）"""
+
+OCR_READ_TIMEOUT = 30.0
+"""等待 OCR 结果的超时（秒）"""
+
+OCR_RETRIES = 2
+"""连接失败或服务返回 502/503/504 时的重试次数（读取超时不重试）"""
+
+IMAGE_FORMATS = {
+    "png": (".png", "image/png"),
+    "jpg": (".jpg", "image/jpeg"),
+    "webp": (".webp", "image/webp"),
+}
+
+LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+"""直方图桶上界（毫秒），最后还有一个溢出桶"""
+
+# PaddleX OCR 产线的请求参数（游戏截图不需要文档矫正）
+PADDLE_OPTIONS = {
+    "useDocOrientationClassify": False,
+    "useDocUnwarping": False,
+    "useTextlineOrientation": False,
+}
+
+
+def ocr_server_url() -> str:
+    """OCR 服务地址：环境变量 ``OCR_SERVER_URL``，与 vibe_ocr 的默认值一致"""
+    return os.getenv("OCR_SERVER_URL", DEFAULT_OCR_URL)
+
+
+def ocr_server_urls(default: Optional[str] = None) -> List[str]:
+    """OCR 后端列表：环境变量 ``OCR_SERVER_URLS``（逗号分隔），未设置时只有一个默认地址"""
+    urls = [url.strip() for url in os.getenv("OCR_SERVER_URLS", "").split(",") if url.strip()]
+    return urls or [default or ocr_server_url()]
+
+
+class LatencyHistogram:
+    """固定桶的延迟直方图（线程安全）"""
+
+    def __init__(self, buckets_ms: Sequence[float] = LATENCY_BUCKETS_MS):
+        self.buckets_ms = tuple(buckets_ms)
+        self._counts = [0] * (len(self.buckets_ms) + 1)
+        self._total_ms = 0.0
+        self._max_ms = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float) -> None:
+        ms = seconds * 1000
+        index = bisect.bisect_left(self.buckets_ms, ms)
+        with self._lock:
+            self._counts[index] += 1
+            self._total_ms += ms
+            self._max_ms = max(self._max_ms, ms)
+
+    @property
+    def count(self) -> int:
+        with self._lock:
+            return sum(self._counts)
+
+    def percentile(self, p: float) -> float:
+        """第 p 百分位所在桶的上界（毫秒）；落在溢出桶时返回最大值"""
+        with self._lock:
+            total = sum(self._counts)
+            if not total:
+                return 0.0
+            rank = max(1, int(np.ceil(total * p / 100)))
+            seen = 0
+            for index, count in enumerate(self._counts):
+                seen += count
+                if seen >= rank:
+                    if index < len(self.buckets_ms):
+                        return float(self.buckets_ms[index])
+                    return self._max_ms
+            return self._max_ms
+
+    def snapshot(self) -> Dict[str, Any]:
+        """各桶计数（键为 "<=上界ms"，溢出桶为 ">最大上界ms"）、平均值和最大值"""
+        with self._lock:
+            counts = list(self._counts)
+            total_ms, max_ms = self._total_ms, self._max_ms
+        buckets = {f"<={bound}ms": n for bound, n in zip(self.buckets_ms, counts)}
+        buckets[f">{self.buckets_ms[-1]}ms"] = counts[-1]
+        total = sum(counts)
+        return {
+            "count": total,
+            "mean_ms": round(total_ms / total, 1) if total else 0.0,
+            "max_ms": round(max_ms, 1),
+            "buckets": buckets,
+        }
+
+    def summary(self) -> str:
+        count = self.count
+        if not count:
+            return "无数据"
+        snap = self.snapshot()
+        return (
+            f"{count} 次，平均 {snap['mean_ms']:.0f}ms，"
+            f"p50≤{self.percentile(50):.0f}ms，p90≤{self.percentile(90):.0f}ms，"
+            f"p99≤{self.percentile(99):.0f}ms，最大 {snap['max_ms']:.0f}ms"
+        )
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counts = [0] * (len(self.buckets_ms) + 1)
+            self._total_ms = 0.0
+            self._max_ms = 0.0
+
+
+class OCRClient:
+    """OCR 服务客户端：连接复用、压缩编码、超时重试、延迟直方图"""
+
+    def __init__(
+        self,
+        url: Union[str, Sequence[str]],
+        image_format: str = "png",
+        quality: int = 90,
+        binary: bool = False,
+        connect_timeout: float = OCR_CONNECT_TIMEOUT,
+        read_timeout: float = OCR_READ_TIMEOUT,
+        retries: int = OCR_RETRIES,
+        pool_size: int = 4,
+    ):
+        """
+        Args:
+            url: OCR 服务地址（PaddleX 产线 ``/ocr``），或多个地址组成后端池
+            image_format: 上传的图像格式，"png"、"jpg" 或 "webp"
+            quality: JPEG / WebP 质量（1-100），PNG 忽略
+            binary: 是否以原始字节上传（``Content-Type: image/*``），
+                PaddleX 官方服务只接受 JSON base64，需服务端支持时再开启
+            connect_timeout / read_timeout: 连接超时和读取超时（秒）
+            retries: 连接失败和 502/503/504 的重试次数
+            pool_size: 连接池大小（并发请求数）
+        """
+        if image_format not in IMAGE_FORMATS:
+            raise ValueError(f"不支持的图像格式: {image_format}（可选 {', '.join(IMAGE_FORMATS)}）")
+        urls = [url] if isinstance(url, str) else list(url)
+        self.pool = OCRBackendPool(urls)
+        self.url = urls[0]
+        self.image_format = image_format
+        self.quality = int(quality)
+        self.binary = binary
+        self.timeout = (connect_timeout, read_timeout)
+
+        retry = Retry(
+            total=retries,
+            connect=retries,
+            read=0,
+            status=retries,
+            status_forcelist=(502, 503, 504),
+            allowed_methods=frozenset({"POST"}),
+            backoff_factor=0.2,
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retry)
+        self.session = requests.Session()
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self.latency = LatencyHistogram()
+        self.encode_latency = LatencyHistogram()
+        self._stats_lock = threading.Lock()
+        self._stats = {"requests": 0, "failures": 0, "failovers": 0, "bytes_sent": 0}
+
+    def _encode_params(self) -> List[int]:
+        if self.image_format == "jpg":
+            return [cv2.IMWRITE_JPEG_QUALITY, self.quality]
+        if self.image_format == "webp":
+            return [cv2.IMWRITE_WEBP_QUALITY, self.quality]
+        return []
+
+    def encode(self, image: np.ndarray) -> Optional[bytes]:
+        """按配置的格式编码图像，失败返回 None"""
+        start = time.perf_counter()
+        extension, _ = IMAGE_FORMATS[self.image_format]
+        success, buffer = cv2.imencode(extension, image, self._encode_params())
+        self.encode_latency.record(time.perf_counter() - start)
+        return buffer.tobytes() if success else None
+
+    def _count(self, **amounts: int) -> None:
+        with self._stats_lock:
+            for key, amount in amounts.items():
+                self._stats[key] += amount
+
+    def post_image(self, encoded: bytes) -> Dict[str, Any]:
+        """上传已编码的图像，返回服务的 JSON 响应
+
+        连接失败、超时或服务端 5xx 时换下一个可用后端再试，直到所有后端都试过。
+
+        Raises:
+            requests.RequestException: 所有后端都失败时抛出最后一个错误
+            OCRBackendUnavailable: 所有后端都处于熔断状态
+        """
+        if self.binary:
+            _, content_type = IMAGE_FORMATS[self.image_format]
+            kwargs: Dict[str, Any] = {"data": encoded, "headers": {"Content-Type": content_type}}
+            sent = len(encoded)
+        else:
+            payload = {"file": base64.b64encode(encoded).decode("ascii"), "fileType": 1}
+            payload.update(PADDLE_OPTIONS)
+            kwargs = {"json": payload}
+            sent = len(payload["file"])
+
+        start = time.perf_counter()
+        tried: List[OCRBackend] = []
+        last_error: Optional[Exception] = None
+        try:
+            while True:
+                try:
+                    backend = self.pool.acquire(exclude=tried)
+                except OCRBackendUnavailable:
+                    if last_error is not None:
+                        raise last_error
+                    raise
+                if tried:
+                    self._count(failovers=1)
+                try:
+                    result = self._post_to(backend, kwargs)
+                    break
+                except Exception as e:
+                    response = getattr(e, "response", None)
+                    if response is not None and response.status_code < 500:
+                        raise
+                    tried.append(backend)
+                    last_error = e
+        except Exception:
+            self._count(requests=1, failures=1, bytes_sent=sent)
+            raise
+        finally:
+            self.latency.record(time.perf_counter() - start)
+        self._count(requests=1, bytes_sent=sent)
+        return result
+
+    def _post_to(self, backend: OCRBackend, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        """向单个后端发请求并登记结果；4xx 是请求本身的问题，不算后端故障"""
+        start = time.perf_counter()
+        ok = False
+        try:
+            response = self.session.post(backend.url, timeout=self.timeout, **kwargs)
+            ok = response.status_code < 500
+            response.raise_for_status()
+            return response.json()
+        finally:
+            self.pool.release(backend, time.perf_counter() - start, ok)
+
+    def predict(self, image: np.ndarray) -> Optional[Dict[str, Any]]:
+        """编码并上传图像，编码失败返回 None"""
+        encoded = self.encode(image)
+        if encoded is None:
+            return None
+        return self.post_image(encoded)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """请求数、失败数、故障转移次数、发送字节数，请求/编码延迟直方图，以及各后端状态"""
+        with self._stats_lock:
+            stats: Dict[str, Any] = dict(self._stats)
+        stats["backends"] = self.pool.status()
+        stats["latency"] = self.latency.snapshot()
+        stats["encode_latency"] = self.encode_latency.snapshot()
+        return stats
+
+    def latency_summary(self) -> str:
+        with self._stats_lock:
+            stats = dict(self._stats)
+        failures, sent = stats["failures"], stats["bytes_sent"]
+        backends = ""
+        if len(self.pool) > 1:
+            backends = f"，后端 {len(self.pool)} 个（故障转移 {stats['failovers']} 次）"
+        return (
+            f"请求 {self.latency.summary()}；失败 {failures}{backends}，"
+            f"上传 {sent / 1024:.0f}KB（{self.image_format}"
+            f"{'' if self.image_format == 'png' else f' q{self.quality}'}"
+            f"{'，二进制' if self.binary else ''}）"
+        )
+
+    def close(self) -> None:
+        self.session.close()
+
+
+__all__ = ["IMAGE_FORMATS", "LatencyHistogram", "OCRClient", "ocr_server_url"]
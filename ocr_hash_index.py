@@ -0,0 +1,182 @@
+"""
+OCR 缓存的感知哈希内存索引
+
+OCR 缓存表 ``ocr_cache`` 里每条记录都有一个感知哈希（默认 dhash）。原来的相似查找
+每次从 SQLite 取最近访问的 100 条记录逐条算汉明距离：缓存越大越慢，而且超出这 100
+条的记录永远查不到。
+
+``OCRHashIndex`` 在内存中按区域（``regions`` 列）各维护一份多索引哈希表：
+
+- 64 位哈希切成 4 段分别建表，阈值 10 的查询只需枚举每段 2 位以内的变化取候选，
+  上万条记录的查询仍在亚毫秒级（BK 树对分布较散的 64 位哈希剪枝效果差，
+  阈值 10 时几乎要遍历整棵树）
+- 启动时从 SQLite 加载，OCRHelper 写入、淘汰、清理过期记录时同步更新
+- 索引只保存 ``image_hash -> (区域, 感知哈希)``，OCR 结果仍按主键从 SQLite 读取
+"""
+
+from __future__ import annotations
+
+import threading
+from itertools import combinations
+from typing import Dict, Hashable, Iterable, List, Optional, Set, Tuple
+
+RegionKey = Optional[str]
+"""区域键：与 ``ocr_cache.regions`` 列一致（排序后的区域 JSON，整图为 None）"""
+
+
+def parse_hash(value: Optional[str]) -> Optional[int]:
+    """十六进制哈希字符串 -> int，无效返回 None"""
+    if not value:
+        return None
+    try:
+        return int(value, 16)
+    except (TypeError, ValueError):
+        return None
+
+
+def hamming(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+def _flip_masks(width: int, radius: int) -> List[int]:
+    """``width`` 位内所有至多翻转 ``radius`` 位的掩码（含 0）"""
+    return [
+        sum(1 << bit for bit in bits)
+        for r in range(radius + 1)
+        for bits in combinations(range(width), r)
+    ]
+
+
+class MultiIndexHash:
+    """多索引哈希（multi-index hashing）
+
+    把 ``bits`` 位哈希切成 ``chunks`` 段，每段一张「段值 -> 键」的表。两个哈希距离
+    不超过 d 时，按鸽巢原理至少有一段的距离不超过 ``d // chunks``，因此只需在每张
+    表中枚举该半径内的段值取候选，再逐个核对完整距离。查询代价与记录数基本无关。
+    """
+
+    def __init__(self, bits: int = 64, chunks: int = 4):
+        self.bits = bits
+        self.chunks = chunks
+        self._width = -(-bits // chunks)
+        self._chunk_mask = (1 << self._width) - 1
+        self._tables: List[Dict[int, Set[Hashable]]] = [{} for _ in range(chunks)]
+        self._values: Dict[Hashable, int] = {}
+        self._masks: Dict[int, List[int]] = {}
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def _split(self, value: int) -> List[int]:
+        return [(value >> (i * self._width)) & self._chunk_mask for i in range(self.chunks)]
+
+    def add(self, value: int, key: Hashable) -> None:
+        self.remove(key)
+        self._values[key] = value
+        for table, part in zip(self._tables, self._split(value)):
+            table.setdefault(part, set()).add(key)
+
+    def remove(self, key: Hashable) -> bool:
+        value = self._values.pop(key, None)
+        if value is None:
+            return False
+        for table, part in zip(self._tables, self._split(value)):
+            bucket = table.get(part)
+            if bucket is not None:
+                bucket.discard(key)
+                if not bucket:
+                    del table[part]
+        return True
+
+    def search(self, value: int, max_distance: int) -> List[Tuple[int, Hashable]]:
+        """查找距离不超过 ``max_distance`` 的键，按距离升序返回 [(距离, 键), ...]"""
+        radius = max_distance // self.chunks
+        masks = self._masks.get(radius)
+        if masks is None:
+            masks = self._masks[radius] = _flip_masks(self._width, radius)
+
+        candidates: Set[Hashable] = set()
+        for table, part in zip(self._tables, self._split(value)):
+            for mask in masks:
+                bucket = table.get(part ^ mask)
+                if bucket:
+                    candidates.update(bucket)
+
+        found = []
+        for key in candidates:
+            distance = hamming(value, self._values[key])
+            if distance <= max_distance:
+                found.append((distance, key))
+        found.sort(key=lambda item: item[0])
+        return found
+
+
+class OCRHashIndex:
+    """按区域划分的 OCR 缓存哈希索引（线程安全）"""
+
+    def __init__(self):
+        self._tables: Dict[RegionKey, MultiIndexHash] = {}
+        self._entries: Dict[str, Tuple[RegionKey, Optional[int]]] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def __contains__(self, image_hash: str) -> bool:
+        with self._lock:
+            return image_hash in self._entries
+
+    def region_of(self, image_hash: str) -> Tuple[bool, RegionKey]:
+        """返回 (是否存在, 区域键)"""
+        with self._lock:
+            entry = self._entries.get(image_hash)
+        return (False, None) if entry is None else (True, entry[0])
+
+    def add(self, image_hash: str, region: RegionKey, perceptual_hash: Optional[str]) -> None:
+        """添加或替换一条记录（与 ``INSERT OR REPLACE`` 语义一致）"""
+        value = parse_hash(perceptual_hash)
+        with self._lock:
+            self._discard(image_hash)
+            self._entries[image_hash] = (region, value)
+            if value is not None:
+                self._tables.setdefault(region, MultiIndexHash()).add(value, image_hash)
+
+    def remove(self, image_hash: str) -> bool:
+        with self._lock:
+            return self._discard(image_hash)
+
+    def remove_many(self, image_hashes: Iterable[str]) -> int:
+        with self._lock:
+            return sum(1 for image_hash in image_hashes if self._discard(image_hash))
+
+    def _discard(self, image_hash: str) -> bool:
+        entry = self._entries.pop(image_hash, None)
+        if entry is None:
+            return False
+        region, value = entry
+        table = self._tables.get(region)
+        if table is not None and value is not None:
+            table.remove(image_hash)
+            if not len(table):
+                del self._tables[region]
+        return True
+
+    def nearest(
+        self, region: RegionKey, perceptual_hash: str, max_distance: int
+    ) -> List[Tuple[int, str]]:
+        """同一区域内距离不超过 ``max_distance`` 的记录，按距离升序返回 [(距离, image_hash), ...]"""
+        value = parse_hash(perceptual_hash)
+        if value is None:
+            return []
+        with self._lock:
+            table = self._tables.get(region)
+            return table.search(value, max_distance) if table is not None else []
+
+    def clear(self) -> None:
+        with self._lock:
+            self._tables.clear()
+            self._entries.clear()
+
+
+__all__ = ["MultiIndexHash", "OCRHashIndex", "hamming", "parse_hash"]
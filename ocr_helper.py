@@ -1,14 +1,29 @@
 """
 OCR Helper Class - 基于PaddleOCR的文字识别和定位工具类
 Wrapper around vibe-ocr library.
+
+在库的基础上增加了内存帧路径：提供 ``frame_func`` 时，截图、裁剪、编码、OCR、
+颜色分析都在同一个 numpy 数组上完成，不再写入/读取/删除临时 PNG 文件。
 """
+import hashlib
+import json
+import os
+import threading
 import time
 import sqlite3
-from typing import Dict, Optional, Any
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
 from dotenv import load_dotenv
 from airtest.core.api import snapshot
 from project_paths import ensure_project_path
 from logger_config import setup_logger_from_config
+from ocr_client import OCRClient, ocr_server_urls
+from ocr_hash_index import OCRHashIndex
+from text_presence import may_contain_text
+from tile_change_detector import TileChangeDetector
 
 # Import from library
 from vibe_ocr.ocr_helper import OCRHelper as BaseOCRHelper
@@ -18,6 +33,22 @@ load_dotenv()
 # 缓存过期时间：24小时（秒）
 CACHE_TTL_SECONDS = 24 * 60 * 60
 
+# 内存哈希索引同步其他进程写入的间隔（秒）
+CACHE_INDEX_SYNC_INTERVAL = 30
+
+# 后台清理过期缓存的间隔（秒）；过期条目在读取时也会被惰性剔除
+CACHE_SWEEP_INTERVAL = 10 * 60
+
+# 按格子识别缺失区域时向外多取的像素，保证跨格子边界的文字能被完整识别
+TILE_OCR_PADDING = 40
+
+# 缓存统计项
+CACHE_STAT_KEYS = ("hits", "similar_hits", "misses", "expired", "evicted")
+
+
+def _env_flag(name: str) -> bool:
+    return os.getenv(name, "").strip().lower() in {"1", "true", "yes", "on"}
+
 
 class OCRHelper(BaseOCRHelper):
     def __init__(
@@ -31,7 +62,23 @@ class OCRHelper(BaseOCRHelper):
         hash_threshold=10,
         correction_map: Optional[Dict[str, str]] = None,
         snapshot_func: Optional[Any] = None,
+        frame_func: Optional[Callable[[], Optional[np.ndarray]]] = None,
+        dump_frames: Optional[bool] = None,
+        text_filter: bool = False,
+        ocr_client: Optional[OCRClient] = None,
     ):
+        """
+        Args:
+            frame_func: 返回当前屏幕 BGR numpy 图像的函数（如 ``FrameBus.get_image``）；
+                提供后所有 capture_* 接口走内存路径
+            dump_frames: 是否把送去 OCR 的帧另存到 ``output/debug_frames`` 便于排查；
+                默认读取环境变量 ``OCR_DUMP_FRAMES``
+            text_filter: 送 OCR 前是否先判断区域有没有文字（见 ``text_presence``），
+                没有文字的区域直接返回空结果；可在每次调用时单独指定
+            ocr_client: OCR 服务客户端（连接复用、编码格式、超时重试），
+                默认按 ``OCR_SERVER_URLS`` / ``ocr_url`` 创建一个上传 PNG 的客户端
+            其余参数见 vibe_ocr.OCRHelper
+        """
         resolved_output_dir = ensure_project_path(output_dir)
 
         super().__init__(
@@ -46,48 +93,905 @@ class OCRHelper(BaseOCRHelper):
             snapshot_func=snapshot_func or snapshot,
         )
 
+        self.frame_func = frame_func
+        self.last_frame: Optional[np.ndarray] = None
+        self.dump_frames = _env_flag("OCR_DUMP_FRAMES") if dump_frames is None else dump_frames
+        self.debug_frames_dir = os.path.join(self.output_dir, "debug_frames")
+        self.text_filter = text_filter
+        self.ocr_client = ocr_client or OCRClient(ocr_server_urls(self.ocr_url))
+
         # Override logger to match project config
         self.logger = setup_logger_from_config(use_color=True)
 
+        # 缓存相似查找走内存哈希索引，SQLite 只负责持久化和按主键读取结果；
+        # 所有缓存读写共用一个长连接，过期清理由后台线程定期执行
+        self.hash_index = OCRHashIndex()
+        self.cache_stats: Dict[str, int] = {key: 0 for key in CACHE_STAT_KEYS}
+        self.change_detector = TileChangeDetector()
+        self.ocr_skip_stats: Dict[str, int] = {"calls": 0, "skipped": 0, "no_text": 0}
+        self._cache_lock = threading.RLock()
+        self._cache_conn = self._open_cache_connection()
+        self._index_synced_at = 0.0
+        self._last_sweep = 0.0
+        self._sweeping = False
+        self._sync_hash_index()
+
+    # ------------------------------------------------------------------
+    # 缓存数据库
+    # ------------------------------------------------------------------
+
+    def _open_cache_connection(self) -> sqlite3.Connection:
+        """打开缓存数据库长连接（WAL 模式，多个模拟器进程可同时读写）"""
+        conn = sqlite3.connect(self.cache_db_path, timeout=5, check_same_thread=False)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+        except sqlite3.Error as e:
+            self.logger.debug(f"设置缓存数据库模式失败: {e}")
+        return conn
+
+    def close_cache(self) -> None:
+        """关闭缓存数据库连接"""
+        with self._cache_lock:
+            self._cache_conn.close()
+
+    def _count(self, key: str, amount: int = 1) -> None:
+        with self._cache_lock:
+            self.cache_stats[key] += amount
+
+    def _count_skip(self, key: str = "skipped") -> None:
+        with self._cache_lock:
+            self.ocr_skip_stats[key] += 1
+
+    def ocr_skip_snapshot(self) -> Dict[str, int]:
+        """当前跳过计数的副本，配合 ``ocr_skip_summary(since=...)`` 统计一段调用"""
+        with self._cache_lock:
+            return dict(self.ocr_skip_stats)
+
+    def ocr_skip_summary(self, since: Optional[Dict[str, int]] = None) -> str:
+        """画面未变化而跳过 OCR 的比例，附在 ``timer_decorator`` 的计时日志后
+
+        Args:
+            since: ``ocr_skip_snapshot`` 的返回值，只统计此后的调用；None 统计全部
+        """
+        stats = self.ocr_skip_snapshot()
+        if since:
+            stats = {key: value - since.get(key, 0) for key, value in stats.items()}
+        calls, skipped = stats["calls"], stats["skipped"]
+        if not calls:
+            return ""
+        summary = f"画面未变跳过 OCR {skipped}/{calls} ({skipped / calls:.0%})"
+        if stats["no_text"]:
+            summary += f"，无文字区域跳过 {stats['no_text']} 个"
+        return summary
+
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """缓存命中统计：hits / similar_hits / misses / expired / evicted，以及条目数和命中率"""
+        with self._cache_lock:
+            stats: Dict[str, Any] = dict(self.cache_stats)
+        lookups = stats["hits"] + stats["misses"]
+        stats["entries"] = len(self.hash_index)
+        stats["hit_rate"] = round(stats["hits"] / lookups, 3) if lookups else 0.0
+        return stats
+
+    def log_cache_stats(self) -> None:
+        stats = self.get_cache_stats()
+        self.logger.info(
+            f"📊 OCR 缓存: 命中 {stats['hits']}（相似 {stats['similar_hits']}）/ "
+            f"未命中 {stats['misses']}，命中率 {stats['hit_rate']:.0%}；"
+            f"过期 {stats['expired']}，淘汰 {stats['evicted']}，当前 {stats['entries']} 条"
+        )
+        if self.ocr_client.latency.count:
+            self.logger.info(f"📡 OCR 服务: {self.ocr_client.latency_summary()}")
+
     def _clean_expired_cache(self) -> int:
         """
-        清理已过期的缓存条目（超过24小时）。
+        清理已过期的缓存条目（超过24小时），同时从内存索引中移除。
 
         Returns:
             已删除的条目数量
         """
         try:
             expire_time = time.time() - CACHE_TTL_SECONDS
-            with sqlite3.connect(self.cache_db_path) as conn:
-                cursor = conn.cursor()
-                cursor.execute(
-                    "SELECT COUNT(*) FROM ocr_cache WHERE created_time < ?",
-                    (expire_time,),
-                )
-                expired_count = cursor.fetchone()[0]
-                if expired_count > 0:
-                    cursor.execute(
-                        "DELETE FROM ocr_cache WHERE created_time < ?",
+            with self._cache_lock, self._cache_conn as conn:
+                expired = [
+                    row[0]
+                    for row in conn.execute(
+                        "SELECT image_hash FROM ocr_cache WHERE created_time < ?",
                         (expire_time,),
                     )
-                    conn.commit()
-                    self.logger.info(f"清理了 {expired_count} 个过期缓存条目（超过24小时）")
-                return expired_count
+                ]
+                if expired:
+                    conn.execute("DELETE FROM ocr_cache WHERE created_time < ?", (expire_time,))
+            if expired:
+                self.hash_index.remove_many(expired)
+                self._count("expired", len(expired))
+                self.logger.info(f"清理了 {len(expired)} 个过期缓存条目（超过24小时）")
+            return len(expired)
         except Exception as e:
             self.logger.error(f"清理过期缓存失败: {e}")
             return 0
 
-    def _find_similar_cached_image(self, current_image_path, regions: Optional[list] = None):
+    def _maybe_sweep(self) -> None:
+        """距上次清理超过 ``CACHE_SWEEP_INTERVAL`` 时在后台线程清理过期缓存，不阻塞查找"""
+        now = time.time()
+        with self._cache_lock:
+            if self._sweeping or now - self._last_sweep < CACHE_SWEEP_INTERVAL:
+                return
+            self._last_sweep = now
+            self._sweeping = True
+        threading.Thread(target=self._sweep, name="ocr-cache-sweeper", daemon=True).start()
+
+    def _sweep(self) -> None:
+        try:
+            self._clean_expired_cache()
+            self._sync_hash_index()
+        finally:
+            with self._cache_lock:
+                self._sweeping = False
+
+    def _find_similar_cached_frame(self, image: np.ndarray, regions: Optional[list] = None):
+        """内存帧版本的 ``_find_similar_cached_image``"""
+        return self._find_similar_in_cache(image=image, regions=regions)
+
+    # ------------------------------------------------------------------
+    # 缓存哈希索引
+    # ------------------------------------------------------------------
+
+    def _sync_hash_index(self) -> int:
+        """把 SQLite 中新写入的记录（包括其他进程写入的）加入内存索引
+
+        Returns:
+            本次加载的记录数量
+        """
+        now = time.time()
+        # 多留一个同步间隔的余量，覆盖其他进程写入后才提交的记录；重复加入是幂等的
+        since = max(self._index_synced_at - CACHE_INDEX_SYNC_INTERVAL, now - CACHE_TTL_SECONDS)
+        try:
+            with self._cache_lock:
+                rows = self._cache_conn.execute(
+                    f"SELECT image_hash, regions, {self.hash_type} FROM ocr_cache "
+                    "WHERE created_time >= ?",
+                    (since,),
+                ).fetchall()
+        except Exception as e:
+            self.logger.error(f"加载缓存索引失败: {e}")
+            return 0
+        for image_hash, regions_json, perceptual_hash in rows:
+            self.hash_index.add(image_hash, regions_json, perceptual_hash)
+        if not self._index_synced_at:
+            self.logger.debug(f"🗂️ OCR 缓存索引加载了 {len(rows)} 条记录")
+        self._index_synced_at = now
+        return len(rows)
+
+    @staticmethod
+    def _cache_key(image_bytes: bytes, region: Optional[str]) -> str:
+        """缓存主键：图像字节的 MD5；区域缓存再混入区域键，
+        避免不同位置内容相同的格子（如全黑格子）互相覆盖"""
+        digest = hashlib.md5(image_bytes)
+        if region:
+            digest.update(region.encode("utf-8"))
+        return digest.hexdigest()
+
+    def _read_cached_result(self, image_hash: str) -> Optional[Dict[str, Any]]:
+        """按主键读取缓存的 OCR 结果并更新访问信息
+
+        记录已被其他进程删除时同步移出索引；记录已过期时就地删除（惰性过期），
+        不必等后台清理。
+        """
+        now = time.time()
+        with self._cache_lock, self._cache_conn as conn:
+            row = conn.execute(
+                "SELECT json_data, created_time FROM ocr_cache WHERE image_hash = ?",
+                (image_hash,),
+            ).fetchone()
+            if not row or not row[0]:
+                self.hash_index.remove(image_hash)
+                return None
+            if row[1] is not None and row[1] < now - CACHE_TTL_SECONDS:
+                conn.execute("DELETE FROM ocr_cache WHERE image_hash = ?", (image_hash,))
+                self.hash_index.remove(image_hash)
+                self.cache_stats["expired"] += 1
+                return None
+            conn.execute(
+                "UPDATE ocr_cache SET hit_count = hit_count + 1, last_access_time = ? "
+                "WHERE image_hash = ?",
+                (now, image_hash),
+            )
+        return json.loads(row[0])
+
+    def _find_similar_in_cache(
+        self,
+        image_path: Optional[str] = None,
+        image: Optional[Any] = None,
+        regions: Optional[List[int]] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        在缓存中查找相同或相似的图像（内存索引版本）。
+
+        先按精确哈希查找，再在同一区域的哈希索引中查找汉明距离不超过
+        ``hash_threshold`` 的记录，按距离从近到远读取结果。
+        """
+        self._maybe_sweep()
+        try:
+            if time.time() - self._index_synced_at >= CACHE_INDEX_SYNC_INTERVAL:
+                self._sync_hash_index()
+
+            region = json.dumps(sorted(regions)) if regions else None
+            image_bytes = self._get_image_bytes(image_path=image_path, image=image)
+            if image_bytes is None:
+                return None
+            image_hash = self._cache_key(image_bytes, region)
+
+            exists, cached_region = self.hash_index.region_of(image_hash)
+            if exists and cached_region == region:
+                result = self._read_cached_result(image_hash)
+                if result is not None:
+                    self._count("hits")
+                    self.logger.debug("🎯 缓存命中（完全相同）")
+                    return result
+
+            perceptual_hash = self._compute_image_hash(image_path=image_path, image=image)
+            if perceptual_hash:
+                for distance, cached_hash in self.hash_index.nearest(
+                    region, perceptual_hash, self.hash_threshold
+                ):
+                    if cached_hash == image_hash:
+                        continue
+                    result = self._read_cached_result(cached_hash)
+                    if result is not None:
+                        self._count("hits")
+                        self._count("similar_hits")
+                        self.logger.debug(f"🎯 缓存命中（哈希相似，距离={distance}）")
+                        return result
+        except Exception as e:
+            self.logger.error(f"查找缓存失败: {e}")
+        self._count("misses")
+        return None
+
+    def _save_to_cache_db(
+        self,
+        image_path: Optional[str] = None,
+        ocr_result: Optional[Dict[str, Any]] = None,
+        regions: Optional[List[int]] = None,
+        image: Optional[Any] = None,
+    ):
+        """保存缓存条目到数据库，并加入内存索引"""
+        if ocr_result is None:
+            return
+        try:
+            image_bytes = self._get_image_bytes(image_path=image_path, image=image)
+            if image_bytes is None:
+                return
+            regions_json = json.dumps(sorted(regions)) if regions else None
+            image_hash = self._cache_key(image_bytes, regions_json)
+            # 保留全部哈希列，与其他使用 vibe_ocr 的进程共用同一张表
+            hashes = self._compute_all_hashes(image_path=image_path, image=image)
+            now = time.time()
+            with self._cache_lock, self._cache_conn as conn:
+                conn.execute(
+                    """
+                    INSERT OR REPLACE INTO ocr_cache
+                    (image_hash, phash, dhash, ahash, whash, regions,
+                     hit_count, last_access_time, created_time, image_size, json_data)
+                    VALUES (?, ?, ?, ?, ?, ?, 1, ?, ?, ?, ?)
+                    """,
+                    (
+                        image_hash,
+                        hashes.get("phash"),
+                        hashes.get("dhash"),
+                        hashes.get("ahash"),
+                        hashes.get("whash"),
+                        regions_json,
+                        now,
+                        now,
+                        len(image_bytes),
+                        json.dumps(ocr_result, ensure_ascii=False),
+                    ),
+                )
+            self.hash_index.add(image_hash, regions_json, hashes.get(self.hash_type))
+            self._evict_cache()
+        except Exception as e:
+            self.logger.error(f"保存缓存到数据库失败: {e}")
+
+    def _evict_cache(self):
+        """淘汰最久未访问的缓存条目，保持缓存大小在限制内，并同步移出内存索引"""
+        try:
+            with self._cache_lock, self._cache_conn as conn:
+                count = conn.execute("SELECT COUNT(*) FROM ocr_cache").fetchone()[0]
+                if count <= self.max_cache_size:
+                    return
+                # 多删除一些，避免频繁操作
+                to_delete = count - self.max_cache_size + 10
+                evicted = [
+                    row[0]
+                    for row in conn.execute(
+                        "SELECT image_hash FROM ocr_cache ORDER BY last_access_time ASC LIMIT ?",
+                        (to_delete,),
+                    )
+                ]
+                conn.executemany(
+                    "DELETE FROM ocr_cache WHERE image_hash = ?",
+                    [(image_hash,) for image_hash in evicted],
+                )
+                self.cache_stats["evicted"] += len(evicted)
+            self.hash_index.remove_many(evicted)
+            self.logger.debug(f"🗑️ 淘汰了 {len(evicted)} 个缓存条目")
+        except Exception as e:
+            self.logger.error(f"淘汰缓存失败: {e}")
+
+    def _get_image_bytes(
+        self, image_path: Optional[str] = None, image: Optional[Any] = None
+    ) -> Optional[bytes]:
+        """
+        获取图像字节数据，用于计算精确哈希。
+
+        内存图像直接使用原始像素字节，避免仅为计算 MD5 而做一次 PNG 编码。
+        """
+        if image is not None:
+            try:
+                header = f"{image.shape}|{image.dtype}".encode("utf-8")
+                return header + np.ascontiguousarray(image).tobytes()
+            except Exception as e:
+                self.logger.debug(f"读取图像字节失败: {e}")
+                return None
+        return super()._get_image_bytes(image_path=image_path)
+
+    # ------------------------------------------------------------------
+    # 内存帧路径
+    # ------------------------------------------------------------------
+
+    def capture_frame(self) -> np.ndarray:
+        """抓取当前屏幕帧（不落盘）
+
+        Raises:
+            RuntimeError: 未配置 frame_func 或抓帧失败
+        """
+        if self.frame_func is None:
+            raise RuntimeError("frame_func is not set. Cannot capture frame in memory.")
+        image = self.frame_func()
+        if image is None:
+            raise RuntimeError("frame_func returned no frame")
+        # 记录最近一次送去识别的帧，调用方可据此学习命中位置
+        self.last_frame = image
+        return image
+
+    def _dump_frame(self, image: np.ndarray, tag: str) -> None:
+        """调试：保存送去识别的帧"""
+        if not self.dump_frames:
+            return
+        try:
+            os.makedirs(self.debug_frames_dir, exist_ok=True)
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+            path = os.path.join(self.debug_frames_dir, f"{tag}_{timestamp}.png")
+            cv2.imwrite(path, image)
+            self.logger.debug(f"🔍 调试帧已保存: {path}")
+        except Exception as e:
+            self.logger.debug(f"保存调试帧失败: {e}")
+
+    def _encode_for_ocr(self, image: np.ndarray) -> Tuple[Optional[bytes], float]:
+        """在内存中缩放并按 ``ocr_client`` 配置的格式编码一次
+
+        Returns:
+            (图像字节, 缩放比例)，编码失败返回 (None, 1.0)
+        """
+        scale = 1.0
+        height, width = image.shape[:2]
+        if self.resize_image and width > self.max_width:
+            scale = self.max_width / width
+            image = cv2.resize(
+                image, (self.max_width, int(height * scale)), interpolation=cv2.INTER_AREA
+            )
+        encoded = self.ocr_client.encode(image)
+        if encoded is None:
+            return None, 1.0
+        return encoded, scale
+
+    def _parse_ocr_response(
+        self, json_resp: Dict[str, Any], scale: float
+    ) -> Optional[Dict[str, Any]]:
+        """将 PaddleX 3.0 响应转换为 OCRHelper 使用的结果格式，并还原缩放坐标"""
+        if json_resp.get("errorCode") != 0:
+            self.logger.error(f"OCR Server Error: {json_resp.get('errorMsg')}")
+            return None
+
+        ocr_results = json_resp.get("result", {}).get("ocrResults", [])
+        if not ocr_results:
+            self.logger.warning("OCR Server returned empty ocrResults")
+            return None
+
+        pruned = ocr_results[0].get("prunedResult", {})
+        dt_polys = pruned.get("dt_polys", [])
+        if scale != 1.0 and dt_polys:
+            dt_polys = [
+                [[int(point[0] / scale), int(point[1] / scale)] for point in poly]
+                for poly in dt_polys
+            ]
+
+        rec_texts = pruned.get("rec_texts", [])
+        if self.correction_map:
+            rec_texts = [self.correction_map.get(t, t) for t in rec_texts]
+
+        return {
+            "rec_texts": rec_texts,
+            "rec_scores": pruned.get("rec_scores", []),
+            "dt_polys": dt_polys,
+        }
+
+    def _predict_frame(self, image: np.ndarray) -> Optional[Dict[str, Any]]:
+        """对内存帧执行 OCR 识别并记录耗时"""
+        start_time = time.time()
+        result = None
+        try:
+            encoded, scale = self._encode_for_ocr(image)
+            if encoded is None:
+                self.logger.error("OCR 图像编码失败")
+                return None
+            result = self._parse_ocr_response(self.ocr_client.post_image(encoded), scale)
+        except Exception as e:
+            self.logger.error(f"OCR Request Failed: {e}")
+
+        elapsed_time = time.time() - start_time
+        height, width = image.shape[:2]
+        self.logger.debug(f"⏱️ OCR识别耗时: {elapsed_time:.3f}秒 (内存帧 {width}x{height})")
+        return result
+
+    def _predict_with_timing(self, image_path):
+        """覆盖父类的文件路径识别，同样走 ``ocr_client``（连接复用、压缩编码）"""
+        image = cv2.imread(image_path)
+        if image is None:
+            self.logger.error(f"无法读取图片: {image_path}")
+            return None
+        return self._predict_frame(image)
+
+    def _ocr_frame(
+        self,
+        image: np.ndarray,
+        use_cache: bool = True,
+        regions: Optional[List[int]] = None,
+        refresh_cache: bool = False,
+    ) -> Optional[Dict[str, Any]]:
+        """获取或创建内存帧的 OCR 结果（带缓存）
+
+        Args:
+            image: 已裁剪好的帧
+            use_cache: 是否读取缓存
+            regions: 缓存键中的区域信息
+            refresh_cache: 跳过缓存读取但仍写回结果（用于刷新过期的缓存命中）
+        """
+        if use_cache and not refresh_cache:
+            cached_result = self._find_similar_cached_frame(image, regions)
+            if cached_result:
+                return cached_result
+
+        self._dump_frame(image, "ocr")
+        result = self._predict_frame(image)
+        if result and (use_cache or refresh_cache):
+            self._save_to_cache_db(image=image, ocr_result=result, regions=regions)
+        return result
+
+    # ------------------------------------------------------------------
+    # 按 3x3 格子缓存
+    # ------------------------------------------------------------------
+
+    def _covered_tiles(self, regions: Optional[List[int]]) -> List[int]:
+        """请求区域（合并后的矩形）覆盖的格子编号"""
+        min_row, max_row, min_col, max_col = self._merge_regions(regions or [])
+        return [
+            row * 3 + col + 1
+            for row in range(min_row, max_row + 1)
+            for col in range(min_col, max_col + 1)
+        ]
+
+    @staticmethod
+    def _tile_of(point: Tuple[float, float], shape: Tuple[int, int]) -> int:
+        """整帧坐标所在的格子编号（与 ``_get_region_bounds`` 的划分一致）"""
+        height, width = shape
+        col = min(2, max(0, int(point[0]) // max(1, width // 3)))
+        row = min(2, max(0, int(point[1]) // max(1, height // 3)))
+        return row * 3 + col + 1
+
+    def _ocr_tiles(self, image: np.ndarray, tiles: List[int]) -> Dict[int, Dict[str, Any]]:
+        """识别若干格子，按文字中心拆分到各格子
+
+        缺失格子的外接矩形不超过缺失格子数的两倍时合并为一次请求（例如同一屏上分散的
+        几个按钮区域），否则逐个识别。每次识别向外多取 ``TILE_OCR_PADDING`` 像素，
+        只保留中心落在本次格子内的文字。
+
+        Returns:
+            {格子: OCR 结果}，坐标相对格子左上角；识别失败的格子不在结果中
+        """
+        shape = image.shape[:2]
+        height, width = shape
+        min_row, max_row, min_col, max_col = self._merge_regions(tiles)
+        if (max_row - min_row + 1) * (max_col - min_col + 1) <= 2 * len(tiles):
+            groups = [tiles]
+        else:
+            groups = [[tile] for tile in tiles]
+
+        results: Dict[int, Dict[str, Any]] = {}
+        for group in groups:
+            x, y, w, h = self._get_region_bounds(shape, group)
+            x0, y0 = max(0, x - TILE_OCR_PADDING), max(0, y - TILE_OCR_PADDING)
+            x1 = min(width, x + w + TILE_OCR_PADDING)
+            y1 = min(height, y + h + TILE_OCR_PADDING)
+            crop = image[y0:y1, x0:x1]
+            self._dump_frame(crop, "ocr")
+            data = self._predict_frame(crop)
+            if data is None:
+                continue
+
+            for tile in group:
+                results[tile] = {"rec_texts": [], "rec_scores": [], "dt_polys": []}
+            for text, score, poly in zip(data["rec_texts"], data["rec_scores"], data["dt_polys"]):
+                points = [[point[0] + x0, point[1] + y0] for point in poly]
+                center = (
+                    sum(p[0] for p in points) / len(points),
+                    sum(p[1] for p in points) / len(points),
+                )
+                tile = self._tile_of(center, shape)
+                if tile not in group:
+                    continue
+                tile_x, tile_y, _, _ = self._get_region_bounds(shape, [tile])
+                result = results[tile]
+                result["rec_texts"].append(text)
+                result["rec_scores"].append(score)
+                result["dt_polys"].append([[px - tile_x, py - tile_y] for px, py in points])
+        return results
+
+    @staticmethod
+    def _sort_text_boxes(entries: List[Tuple[str, float, List[List[int]]]]):
+        """按从上到下、从左到右排序（与 PaddleOCR 的文本框排序规则一致）"""
+        entries.sort(key=lambda e: (e[2][0][1], e[2][0][0]))
+        for i in range(len(entries) - 1):
+            for j in range(i, -1, -1):
+                upper, lower = entries[j][2][0], entries[j + 1][2][0]
+                if abs(lower[1] - upper[1]) < 10 and lower[0] < upper[0]:
+                    entries[j], entries[j + 1] = entries[j + 1], entries[j]
+                else:
+                    break
+        return entries
+
+    def _ocr_frame_by_tiles(
+        self,
+        image: np.ndarray,
+        regions: Optional[List[int]] = None,
+        refresh_cache: bool = False,
+        text_filter: bool = False,
+    ) -> Optional[Dict[str, Any]]:
+        """按格子读取缓存，只识别画面有变化的格子
+
+        每个格子单独缓存（键为格子裁剪图的哈希），例如只有中间弹出对话框时，
+        其余 8 个格子直接用缓存，只识别格子 5。
+
+        Returns:
+            合并后的 OCR 结果（整帧坐标），所有格子都没有结果时返回 None
+        """
+        shape = image.shape[:2]
+        tiles = self._covered_tiles(regions)
+        tile_results: Dict[int, Dict[str, Any]] = {}
+        thumbs: Dict[int, np.ndarray] = {}
+        missing = []
+        unchanged = 0
+        for tile in tiles:
+            crop, _ = self._extract_region(image, [tile])
+            previous, thumbs[tile] = self.change_detector.check(("tile", tile), crop)
+            if previous is not None and not refresh_cache:
+                # 与上次识别时画面相同，连缓存查找都不需要
+                tile_results[tile] = previous
+                unchanged += 1
+                continue
+            cached = None if refresh_cache else self._find_similar_cached_frame(crop, [tile])
+            if cached is not None:
+                tile_results[tile] = cached
+                self.change_detector.remember(("tile", tile), thumbs[tile], cached)
+            else:
+                missing.append(tile)
+        if unchanged == len(tiles):
+            self._count_skip()
+
+        if missing and text_filter:
+            # 没有文字的格子不送 OCR，也不写入缓存（预判只是启发式，不持久化）
+            for tile in list(missing):
+                crop, _ = self._extract_region(image, [tile])
+                if not may_contain_text(crop):
+                    result = {"rec_texts": [], "rec_scores": [], "dt_polys": []}
+                    self.change_detector.remember(("tile", tile), thumbs[tile], result)
+                    tile_results[tile] = result
+                    missing.remove(tile)
+                    self._count_skip("no_text")
+
+        if missing:
+            self.logger.debug(
+                f"🧩 格子缓存命中 {len(tiles) - len(missing)}/{len(tiles)}，识别格子 {missing}"
+            )
+            for tile, result in self._ocr_tiles(image, missing).items():
+                crop, _ = self._extract_region(image, [tile])
+                self._save_to_cache_db(image=crop, ocr_result=result, regions=[tile])
+                self.change_detector.remember(("tile", tile), thumbs[tile], result)
+                tile_results[tile] = result
+        if not tile_results:
+            return None
+
+        entries = []
+        for tile, result in tile_results.items():
+            tile_x, tile_y, _, _ = self._get_region_bounds(shape, [tile])
+            for text, score, poly in zip(
+                result.get("rec_texts", []),
+                result.get("rec_scores", []),
+                result.get("dt_polys", []),
+            ):
+                entries.append((text, score, [[px + tile_x, py + tile_y] for px, py in poly]))
+        self._sort_text_boxes(entries)
+        return {
+            "rec_texts": [e[0] for e in entries],
+            "rec_scores": [e[1] for e in entries],
+            "dt_polys": [e[2] for e in entries],
+        }
+
+    def get_all_texts_from_frame(
+        self,
+        image: np.ndarray,
+        use_cache: bool = True,
+        regions: Optional[List[int]] = None,
+        refresh_cache: bool = False,
+        text_filter: Optional[bool] = None,
+    ) -> List[Dict[str, Any]]:
+        """识别内存帧（或其指定区域）中的所有文字
+
+        区域画面与上次识别时相同时直接复用上次的结果（见 ``TileChangeDetector``），
+        不查缓存也不请求 OCR 服务。
+
+        Args:
+            text_filter: 是否先判断区域有没有文字，None 使用实例默认值
+
+        Returns:
+            文字信息列表，坐标均为整帧坐标，每项包含 text/confidence/center/bbox/index
+        """
+        with self._cache_lock:
+            self.ocr_skip_stats["calls"] += 1
+        if text_filter is None:
+            text_filter = self.text_filter
+        if use_cache or refresh_cache:
+            ocr_data = self._ocr_frame_by_tiles(
+                image, regions, refresh_cache=refresh_cache, text_filter=text_filter
+            )
+            offset = (0, 0)
+        else:
+            if regions:
+                region_img, offset = self._extract_region(image, regions)
+                if region_img is None:
+                    return []
+            else:
+                region_img, offset = image, (0, 0)
+            key = ("crop", tuple(sorted(regions)) if regions else None)
+            ocr_data, thumb = self.change_detector.check(key, region_img)
+            if ocr_data is not None:
+                self._count_skip()
+            elif text_filter and not may_contain_text(region_img):
+                ocr_data = {"rec_texts": [], "rec_scores": [], "dt_polys": []}
+                self.change_detector.remember(key, thumb, ocr_data)
+                self._count_skip("no_text")
+            else:
+                ocr_data = self._ocr_frame(region_img, use_cache=False)
+                if ocr_data:
+                    self.change_detector.remember(key, thumb, ocr_data)
+        if not ocr_data:
+            return []
+
+        items = self._find_text_in_json(
+            ocr_data, target_text="", confidence_threshold=0.0, return_all=True
+        )
+        if offset == (0, 0):
+            return items
+
+        offset_x, offset_y = offset
+        for item in items:
+            item["bbox"] = self._adjust_coordinates_to_full_image(item["bbox"], offset)
+            center_x, center_y = item["center"]
+            item["center"] = (center_x + offset_x, center_y + offset_y)
+        return items
+
+    def find_text_in_frame(
+        self,
+        image: np.ndarray,
+        target_text: str,
+        confidence_threshold: float = 0.5,
+        occurrence: int = 1,
+        use_cache: bool = True,
+        regions: Optional[List[int]] = None,
+        return_all: bool = False,
+        refresh_cache: bool = False,
+        text_filter: Optional[bool] = None,
+    ):
+        """在内存帧中查找目标文字，返回格式与 ``find_text_in_image`` 一致
+
+        Args:
+            text_filter: 是否先判断区域有没有文字，None 使用实例默认值
         """
-        查找缓存中是否有相似的图片，在查找前先清理过期条目。
+        items = self.get_all_texts_from_frame(
+            image,
+            use_cache=use_cache,
+            regions=regions,
+            refresh_cache=refresh_cache,
+            text_filter=text_filter,
+        )
+        matches = []
+        for item in items:
+            if item["confidence"] >= confidence_threshold and target_text in item["text"]:
+                match = dict(item)
+                match["index"] = len(matches) + 1
+                matches.append(match)
+
+        if return_all:
+            return matches
+        if not matches:
+            return self._empty_result()
+
+        selected_index = min(occurrence, len(matches))
+        selected_match = matches[selected_index - 1]
+        return {
+            "found": True,
+            "center": selected_match["center"],
+            "text": selected_match["text"],
+            "confidence": selected_match["confidence"],
+            "bbox": selected_match["bbox"],
+            "total_matches": len(matches),
+            "selected_index": selected_index,
+        }
+
+    def get_texts_for_region_groups(
+        self,
+        image: np.ndarray,
+        region_groups: List[Optional[List[int]]],
+        use_cache: bool = True,
+        text_filter: Optional[bool] = None,
+    ) -> List[List[Dict[str, Any]]]:
+        """对同一帧的多组区域只识别一次
+
+        识别所有区域的并集（合并为一个矩形），再按文字中心把结果分回各组；
+        每组的结果与单独用该组区域调用 ``get_all_texts_from_frame`` 一致。
 
         Args:
-            current_image_path: 当前图片路径
-            regions: 区域列表
+            image: 整帧
+            region_groups: 每组的区域列表，None 表示整帧
 
         Returns:
-            缓存的 OCR 结果，如果没有找到则返回 None
+            与 ``region_groups`` 一一对应的文字列表（整帧坐标）
         """
-        # 先清理过期缓存，防止读取到错误的旧截图结果
-        self._clean_expired_cache()
-        return super()._find_similar_cached_image(current_image_path, regions)
\ No newline at end of file
+        if any(not regions for regions in region_groups):
+            union = None
+        else:
+            union = sorted({region for regions in region_groups for region in regions})
+        items = self.get_all_texts_from_frame(
+            image, use_cache=use_cache, regions=union, text_filter=text_filter
+        )
+
+        shape = image.shape[:2]
+        grouped = []
+        for regions in region_groups:
+            x, y, w, h = self._get_region_bounds(shape, regions or None)
+            grouped.append(
+                [
+                    item
+                    for item in items
+                    if x <= item["center"][0] < x + w and y <= item["center"][1] < y + h
+                ]
+            )
+        return grouped
+
+    def find_all_matching_texts_in_frame(
+        self,
+        image: np.ndarray,
+        target_text: str,
+        confidence_threshold: float = 0.5,
+        text_filter: Optional[bool] = None,
+    ) -> List[Dict[str, Any]]:
+        """内存帧版本的 ``find_all_matching_texts``（不使用缓存）"""
+        return self.find_text_in_frame(
+            image,
+            target_text,
+            confidence_threshold=confidence_threshold,
+            use_cache=False,
+            return_all=True,
+            text_filter=text_filter,
+        )
+
+    # ------------------------------------------------------------------
+    # capture_* 接口：配置了 frame_func 时走内存路径
+    # ------------------------------------------------------------------
+
+    def capture_and_get_all_texts(
+        self,
+        use_cache=True,
+        regions: Optional[List[int]] = None,
+        text_filter: Optional[bool] = None,
+    ):
+        if self.frame_func is None:
+            return super().capture_and_get_all_texts(use_cache=use_cache, regions=regions)
+        return self.get_all_texts_from_frame(
+            self.capture_frame(), use_cache, regions, text_filter=text_filter
+        )
+
+    def capture_and_get_texts_for_region_groups(
+        self,
+        region_groups: List[Optional[List[int]]],
+        use_cache: bool = True,
+        text_filter: Optional[bool] = None,
+    ) -> List[List[Dict[str, Any]]]:
+        """截一次图，见 ``get_texts_for_region_groups``"""
+        if self.frame_func is None:
+            return [
+                self.capture_and_get_all_texts(use_cache=use_cache, regions=regions)
+                for regions in region_groups
+            ]
+        return self.get_texts_for_region_groups(
+            self.capture_frame(), region_groups, use_cache, text_filter=text_filter
+        )
+
+    def capture_and_find_all_texts(
+        self,
+        target_text,
+        confidence_threshold=0.5,
+        use_cache=True,
+        regions: Optional[List[int]] = None,
+        text_filter: Optional[bool] = None,
+    ):
+        if self.frame_func is None:
+            return super().capture_and_find_all_texts(
+                target_text, confidence_threshold, use_cache=use_cache, regions=regions
+            )
+        return self.find_text_in_frame(
+            self.capture_frame(),
+            target_text,
+            confidence_threshold,
+            use_cache=use_cache,
+            regions=regions,
+            return_all=True,
+            text_filter=text_filter,
+        )
+
+    def capture_and_find_text(
+        self,
+        target_text,
+        confidence_threshold=0.5,
+        occurrence=1,
+        use_cache=True,
+        regions: Optional[List[int]] = None,
+        debug_save_path: Optional[str] = None,
+        screenshot_path: Optional[str] = None,
+        text_filter: Optional[bool] = None,
+    ):
+        if self.frame_func is None or screenshot_path or debug_save_path:
+            return super().capture_and_find_text(
+                target_text,
+                confidence_threshold=confidence_threshold,
+                occurrence=occurrence,
+                use_cache=use_cache,
+                regions=regions,
+                debug_save_path=debug_save_path,
+                screenshot_path=screenshot_path,
+            )
+
+        result = self.find_text_in_frame(
+            self.capture_frame(),
+            target_text,
+            confidence_threshold,
+            occurrence,
+            use_cache=use_cache,
+            regions=regions,
+            text_filter=text_filter,
+        )
+        # 缓存结果中没有目标文字时，重新截图并绕过缓存识别，同时刷新缓存
+        if use_cache and not result.get("found"):
+            self.logger.debug(f"缓存未找到文字 '{target_text}'，尝试禁用缓存重新识别...")
+            result = self.find_text_in_frame(
+                self.capture_frame(),
+                target_text,
+                confidence_threshold,
+                occurrence,
+                regions=regions,
+                refresh_cache=True,
+                text_filter=text_filter,
+            )
+        return result
@@ -0,0 +1,412 @@
+"""
+像素签名检测器
+
+游戏里很多状态判断（主界面礼包按钮、自动战斗标记、进入游戏按钮、错误弹窗）都是
+固定坐标上的固定 UI。像素签名只记录这些位置上的少量像素颜色及容差，判断时直接在
+帧数组上取样比较，耗时为微秒级，不需要模板匹配。
+
+签名从参考截图中学习并保存在 ``pixel_signatures.json``，名称约定为对应模板图片的
+文件名（不含扩展名），例如 ``gifts_button``。未学习签名的检测器自动退回模板匹配。
+
+学习签名::
+
+    python pixel_signature.py learn --screenshot ref.png --template images/gifts_button.png
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import math
+import os
+import sys
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import cv2
+import numpy as np
+
+import roi_matcher
+from auto_dungeon_config import PIXEL_SIGNATURES_FILE, TEMPLATE_ROI_MARGIN
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TOLERANCE = 24
+"""每个通道允许的颜色偏差"""
+
+DEFAULT_SAMPLE_COUNT = 12
+"""学习签名时的采样点数量"""
+
+DEFAULT_FALLBACK_EVERY = 10
+"""签名连续未命中多少次后用模板兜底一次"""
+
+DEFAULT_RESOLUTION = (720, 1280)
+
+PATH_SIGNATURE = "signature"
+PATH_VERIFIED = "signature+template"
+PATH_REJECTED = "rejected"
+PATH_TEMPLATE = "template"
+PATH_MISS = "miss"
+
+
+@dataclass
+class PixelSignature:
+    """一组采样像素及其期望颜色
+
+    Attributes:
+        name: 签名名称（约定为模板文件名）
+        points: [(x, y), ...]，基于 ``resolution`` 的坐标
+        colors: [(b, g, r), ...]，与 points 一一对应
+        tolerance: 每个通道允许的最大偏差
+        min_ratio: 至少多少比例的采样点匹配才算命中
+        resolution: 学习时的屏幕分辨率 (宽, 高)
+    """
+
+    name: str
+    points: List[Tuple[int, int]]
+    colors: List[Tuple[int, int, int]]
+    tolerance: int = DEFAULT_TOLERANCE
+    min_ratio: float = 1.0
+    resolution: Tuple[int, int] = DEFAULT_RESOLUTION
+    _scaled: Dict[Tuple[int, int], Tuple[np.ndarray, np.ndarray]] = field(
+        default_factory=dict, init=False, repr=False, compare=False
+    )
+
+    def __post_init__(self):
+        self._expected = np.asarray(self.colors, dtype=np.int16).reshape(-1, 3)
+        self._required = max(1, math.ceil(len(self.points) * self.min_ratio))
+
+    @property
+    def center(self) -> Tuple[int, int]:
+        """采样点的中心（作为命中时返回的坐标）"""
+        xs = [p[0] for p in self.points]
+        ys = [p[1] for p in self.points]
+        return (sum(xs) // len(xs), sum(ys) // len(ys))
+
+    def _indices(self, width: int, height: int) -> Tuple[np.ndarray, np.ndarray]:
+        """按帧分辨率缩放采样坐标（按分辨率缓存）"""
+        key = (width, height)
+        cached = self._scaled.get(key)
+        if cached is None:
+            pts = np.asarray(self.points, dtype=np.float64).reshape(-1, 2)
+            scale_x = width / self.resolution[0]
+            scale_y = height / self.resolution[1]
+            xs = np.clip((pts[:, 0] * scale_x).astype(np.intp), 0, width - 1)
+            ys = np.clip((pts[:, 1] * scale_y).astype(np.intp), 0, height - 1)
+            cached = (xs, ys)
+            self._scaled[key] = cached
+        return cached
+
+    def matches(self, image: np.ndarray) -> bool:
+        """判断帧是否符合签名"""
+        if image is None or not self.points:
+            return False
+        height, width = image.shape[:2]
+        xs, ys = self._indices(width, height)
+        sampled = image[ys, xs, :3].astype(np.int16)
+        diff = np.abs(sampled - self._expected).max(axis=1)
+        return int((diff <= self.tolerance).sum()) >= self._required
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "points": [list(p) for p in self.points],
+            "colors": [list(c) for c in self.colors],
+            "tolerance": self.tolerance,
+            "min_ratio": self.min_ratio,
+            "resolution": list(self.resolution),
+        }
+
+    @classmethod
+    def from_dict(cls, name: str, data: Dict[str, Any]) -> "PixelSignature":
+        return cls(
+            name=name,
+            points=[tuple(p) for p in data["points"]],
+            colors=[tuple(c) for c in data["colors"]],
+            tolerance=int(data.get("tolerance", DEFAULT_TOLERANCE)),
+            min_ratio=float(data.get("min_ratio", 1.0)),
+            resolution=tuple(data.get("resolution", DEFAULT_RESOLUTION)),
+        )
+
+
+# ====== 学习 ======
+
+
+def learn_signature(
+    name: str,
+    screenshot: np.ndarray,
+    rect: Tuple[int, int, int, int],
+    count: int = DEFAULT_SAMPLE_COUNT,
+    tolerance: int = DEFAULT_TOLERANCE,
+) -> PixelSignature:
+    """在参考截图的指定矩形内均匀采样，生成像素签名
+
+    Args:
+        rect: (x, y, w, h)
+    """
+    x, y, w, h = rect
+    side = max(1, math.ceil(math.sqrt(count)))
+    # 只在内部 80% 的区域采样，避开抗锯齿边缘
+    xs = np.linspace(x + w * 0.1, x + w * 0.9, side).astype(int)
+    ys = np.linspace(y + h * 0.1, y + h * 0.9, side).astype(int)
+    points = [(int(px), int(py)) for py in ys for px in xs][:count]
+    colors = [tuple(int(v) for v in screenshot[py, px, :3]) for px, py in points]
+    height, width = screenshot.shape[:2]
+    return PixelSignature(
+        name=name,
+        points=points,
+        colors=colors,
+        tolerance=tolerance,
+        resolution=(width, height),
+    )
+
+
+def learn_from_template(
+    screenshot: np.ndarray,
+    template: Any,
+    name: Optional[str] = None,
+    count: int = DEFAULT_SAMPLE_COUNT,
+    tolerance: int = DEFAULT_TOLERANCE,
+) -> Optional[PixelSignature]:
+    """在参考截图中定位模板，并在命中区域内学习签名
+
+    Returns:
+        签名；截图中找不到模板时返回 None
+    """
+    pos = template.match_in(screenshot)
+    if not pos:
+        return None
+    tpl = template._resize_image(template._imread(), screenshot, None)
+    tpl_h, tpl_w = tpl.shape[:2]
+    rect = (int(pos[0] - tpl_w / 2), int(pos[1] - tpl_h / 2), tpl_w, tpl_h)
+    return learn_signature(
+        name or signature_name(template), screenshot, rect, count=count, tolerance=tolerance
+    )
+
+
+# ====== 持久化 ======
+
+_cache: Dict[str, Tuple[float, Dict[str, PixelSignature]]] = {}
+_cache_lock = threading.Lock()
+_missing_reported: set = set()
+
+
+def signature_name(template: Any) -> str:
+    """模板对应的签名名称：图片文件名（不含扩展名）"""
+    filename = getattr(template, "filename", None) or str(template)
+    return os.path.splitext(os.path.basename(filename))[0]
+
+
+def load_signatures(path: str = PIXEL_SIGNATURES_FILE) -> Dict[str, PixelSignature]:
+    """读取签名文件（按修改时间缓存），文件不存在时返回空字典"""
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        if path not in _missing_reported:
+            _missing_reported.add(path)
+            logger.info(
+                f"ℹ️ 未找到像素签名文件 {path}，检测只用模板匹配"
+                "（用 python pixel_signature.py learn 生成）"
+            )
+        return {}
+    with _cache_lock:
+        cached = _cache.get(path)
+        if cached and cached[0] == mtime:
+            return cached[1]
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            raw = json.load(f)
+        signatures = {name: PixelSignature.from_dict(name, data) for name, data in raw.items()}
+    except Exception as e:
+        logger.warning(f"⚠️ 读取像素签名失败 {path}: {e}")
+        return {}
+    with _cache_lock:
+        _cache[path] = (mtime, signatures)
+    return signatures
+
+
+def save_signatures(
+    signatures: Sequence[PixelSignature], path: str = PIXEL_SIGNATURES_FILE
+) -> None:
+    """保存签名（与文件中已有签名合并）"""
+    existing = {}
+    if os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as f:
+            existing = json.load(f)
+    for signature in signatures:
+        existing[signature.name] = signature.to_dict()
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(existing, f, ensure_ascii=False, indent=2)
+
+
+def get_signature(name: str, path: str = PIXEL_SIGNATURES_FILE) -> Optional[PixelSignature]:
+    return load_signatures(path).get(name)
+
+
+# ====== 检测器 ======
+
+
+class SignatureDetector:
+    """像素签名 + 模板校验的组合检测器
+
+    - 未学习签名：直接模板匹配
+    - 签名未命中：判定为不存在（微秒级）；``final=True`` 或连续未命中
+      ``fallback_every`` 次时再用模板兜底一次，防止签名过时导致一直漏检
+    - 签名命中：``verify=True`` 时用模板确认后才算命中
+    """
+
+    def __init__(
+        self,
+        template: Any,
+        signature: Optional[PixelSignature] = None,
+        verify: bool = True,
+        roi_margin: Optional[int] = TEMPLATE_ROI_MARGIN,
+        signatures_file: Optional[str] = PIXEL_SIGNATURES_FILE,
+        fallback_every: int = DEFAULT_FALLBACK_EVERY,
+    ):
+        """
+        Args:
+            template: 校验/兜底用的 Airtest 模板
+            signature: 像素签名；None 时按模板文件名从 ``signatures_file`` 中查找
+            verify: 签名命中后是否用模板确认
+            roi_margin: 模板匹配使用的区域窗口，见 roi_matcher
+            signatures_file: 签名文件；None 表示不加载
+            fallback_every: 签名连续未命中多少次后用模板兜底一次；0 表示只在 final 时兜底
+        """
+        self.template = template
+        self.name = signature_name(template)
+        self._signature = signature
+        self.signatures_file = signatures_file
+        self.verify = verify
+        self.roi_margin = roi_margin
+        self.fallback_every = fallback_every
+        self._consecutive_misses = 0
+        self._stale_warned = False
+        self.stats: Dict[str, int] = {}
+
+    @property
+    def signature(self) -> Optional[PixelSignature]:
+        if self._signature is not None:
+            return self._signature
+        if self.signatures_file:
+            return get_signature(self.name, self.signatures_file)
+        return None
+
+    def _template_match(self, screen: np.ndarray, final: bool) -> Optional[Tuple[float, float]]:
+        return roi_matcher.match(
+            self.template, screen, margin=self.roi_margin, fallback=final
+        ).pos
+
+    def _count(self, path: str) -> None:
+        self.stats[path] = self.stats.get(path, 0) + 1
+
+    def detect(self, screen: np.ndarray, final: bool = True) -> Optional[Tuple[float, float]]:
+        """检测一帧
+
+        Args:
+            screen: BGR 屏幕帧
+            final: 是否为本轮轮询的最后一次（决定签名未命中时是否用模板兜底）
+
+        Returns:
+            命中坐标，未命中返回 None
+        """
+        signature = self.signature
+        if signature is None:
+            pos = self._template_match(screen, final)
+            self._count(PATH_TEMPLATE if pos else PATH_MISS)
+            return pos
+
+        if signature.matches(screen):
+            self._consecutive_misses = 0
+            if not self.verify:
+                self._count(PATH_SIGNATURE)
+                return signature.center
+            pos = self._template_match(screen, True)
+            if pos:
+                self._count(PATH_VERIFIED)
+                return pos
+            self._count(PATH_REJECTED)
+            logger.debug(f"像素签名 {self.name} 命中但模板校验未通过")
+            return None
+
+        self._consecutive_misses += 1
+        periodic = self.fallback_every and self._consecutive_misses % self.fallback_every == 0
+        if final or periodic:
+            pos = self._template_match(screen, True)
+            if pos:
+                self._count(PATH_TEMPLATE)
+                if not self._stale_warned:
+                    self._stale_warned = True
+                    logger.warning(f"⚠️ 像素签名 {self.name} 未命中但模板命中，签名可能需要重新学习")
+                return pos
+        self._count(PATH_MISS)
+        return None
+
+    def __call__(self, screen: np.ndarray, final: bool = True) -> Optional[Tuple[float, float]]:
+        return self.detect(screen, final)
+
+
+# ====== 命令行 ======
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="像素签名工具")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    learn = sub.add_parser("learn", help="从参考截图学习签名")
+    learn.add_argument("--screenshot", required=True, help="参考截图路径")
+    learn.add_argument("--template", required=True, action="append", help="模板图片，可重复")
+    learn.add_argument("--count", type=int, default=DEFAULT_SAMPLE_COUNT)
+    learn.add_argument("--tolerance", type=int, default=DEFAULT_TOLERANCE)
+    learn.add_argument("--output", default=PIXEL_SIGNATURES_FILE)
+
+    check = sub.add_parser("check", help="检查截图是否符合已保存的签名")
+    check.add_argument("--screenshot", required=True)
+    check.add_argument("--output", default=PIXEL_SIGNATURES_FILE)
+
+    args = parser.parse_args(argv)
+    screenshot = cv2.imread(args.screenshot)
+    if screenshot is None:
+        print(f"❌ 无法读取截图: {args.screenshot}")
+        return 1
+
+    if args.command == "check":
+        for name, signature in sorted(load_signatures(args.output).items()):
+            print(f"{'✅' if signature.matches(screenshot) else '❌'} {name}")
+        return 0
+
+    from airtest.core.api import Template
+
+    height, width = screenshot.shape[:2]
+    learned = []
+    for template_path in args.template:
+        template = Template(template_path, resolution=(width, height))
+        signature = learn_from_template(
+            screenshot, template, count=args.count, tolerance=args.tolerance
+        )
+        if signature is None:
+            print(f"❌ 截图中未找到模板: {template_path}")
+            continue
+        learned.append(signature)
+        print(f"✅ {signature.name}: {len(signature.points)} 个采样点")
+    if learned:
+        save_signatures(learned, args.output)
+        print(f"💾 已保存到 {args.output}")
+    return 0 if learned else 1
+
+
+__all__ = [
+    "PixelSignature",
+    "SignatureDetector",
+    "get_signature",
+    "learn_from_template",
+    "learn_signature",
+    "load_signatures",
+    "save_signatures",
+    "signature_name",
+]
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,157 @@
+"""
+原始帧缓冲截图
+
+Airtest 默认的 ADB 截图走 ``screencap -p``：设备端把整屏编码成 PNG，主机再解码，
+1080p 一帧两端各要几十到上百毫秒。``screencap`` 不带 ``-p`` 时直接输出原始像素：
+
+    width(u32) height(u32) format(u32) [colorspace(u32), Android 9+] RGBA 像素...
+
+``RawScreencap`` 通过 adb server 的 ``exec:`` 服务取这段字节（不启动 adb 进程、
+不经过 pty 换行转换），用 ``np.frombuffer`` 零拷贝映射成数组，只在 RGBA→BGR
+转换时拷贝一次；``downsample`` > 1 时先按步长切片再转换，拷贝量也随之减少。
+
+按模拟器在 ``emulators.json`` 中选择截图方式：
+
+    {"name": "main", "emulator": "192.168.1.150:5555", "capture_method": "raw", ...}
+
+取值见 ``CAPTURE_METHODS``，默认 ``airtest``。环境变量 ``CAPTURE_METHOD`` 优先。
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import struct
+from typing import Callable, Optional
+
+import cv2
+import numpy as np
+
+from adb_client import AdbClient, AdbError, get_adb_client
+from project_paths import ensure_project_path
+
+CAPTURE_AIRTEST = "airtest"
+CAPTURE_RAW = "raw"
+CAPTURE_METHODS = (CAPTURE_AIRTEST, CAPTURE_RAW)
+
+PIXEL_FORMAT_RGBA_8888 = 1
+PIXEL_FORMAT_RGBX_8888 = 2
+PIXEL_FORMAT_BGRA_8888 = 5
+
+logger = logging.getLogger(__name__)
+
+
+def decode_raw_screencap(data: bytes, downsample: int = 1) -> np.ndarray:
+    """``screencap`` 原始输出 -> BGR 图像
+
+    Args:
+        data: ``screencap``（不带 ``-p``）的完整输出
+        downsample: 行列步长，2 表示输出宽高各一半
+
+    Raises:
+        ValueError: 数据长度与头部声明的尺寸不符或像素格式不支持
+    """
+    if len(data) < 12:
+        raise ValueError(f"screencap 输出过短: {len(data)} 字节")
+    width, height, pixel_format = struct.unpack_from("<III", data)
+    pixels = width * height * 4
+    # Android 9 起头部多一个 colorspace 字段
+    header = len(data) - pixels
+    if header not in (12, 16):
+        raise ValueError(f"screencap 输出长度不符: {width}x{height}, {len(data)} 字节")
+    if pixel_format in (PIXEL_FORMAT_RGBA_8888, PIXEL_FORMAT_RGBX_8888):
+        code = cv2.COLOR_RGBA2BGR
+    elif pixel_format == PIXEL_FORMAT_BGRA_8888:
+        code = cv2.COLOR_BGRA2BGR
+    else:
+        raise ValueError(f"不支持的像素格式: {pixel_format}")
+
+    image = np.frombuffer(data, dtype=np.uint8, count=pixels, offset=header)
+    image = image.reshape(height, width, 4)
+    if downsample > 1:
+        image = image[::downsample, ::downsample]
+    return cv2.cvtColor(image, code)
+
+
+class RawScreencap:
+    """通过 adb server 抓取原始帧缓冲，可作为 ``FrameBus`` 的 ``capture_func``"""
+
+    def __init__(
+        self,
+        serial: str,
+        client: Optional[AdbClient] = None,
+        downsample: int = 1,
+        timeout: float = 10.0,
+        fallback: Optional[Callable[[], Optional[np.ndarray]]] = None,
+    ):
+        """
+        Args:
+            serial: 设备序列号，如 '192.168.1.150:5555'
+            client: adb server 客户端，默认使用进程内共享的客户端
+            downsample: 行列步长；> 1 时输出的坐标不再是设备坐标，只适合做画面检测
+            timeout: 单帧超时（秒）
+            fallback: 原始截图失败时改用的抓帧函数
+        """
+        self.serial = serial
+        self.client = client or get_adb_client()
+        self.downsample = max(1, int(downsample))
+        self.timeout = timeout
+        self.fallback = fallback
+        self.failures = 0
+
+    def __call__(self) -> Optional[np.ndarray]:
+        try:
+            data = self.client.exec_out(self.serial, "screencap", timeout=self.timeout)
+            return decode_raw_screencap(data, self.downsample)
+        except (AdbError, OSError, ValueError) as exc:
+            self.failures += 1
+            if self.fallback is None:
+                raise
+            if self.failures == 1:
+                logger.warning(f"⚠️ [Capture] 原始截图失败，改用 Airtest 截图: {exc}")
+            return self.fallback()
+
+
+def load_capture_method(emulator: Optional[str], path: str = "emulators.json") -> str:
+    """读取模拟器的截图方式（``CAPTURE_METHOD`` 环境变量优先，其次 emulators.json）"""
+    method = os.environ.get("CAPTURE_METHOD", "").strip().lower()
+    if not method and emulator:
+        try:
+            with open(ensure_project_path(path), "r", encoding="utf-8") as f:
+                data = json.load(f)
+            sessions = data.get("sessions", []) if isinstance(data, dict) else data
+            for session in sessions:
+                if str(session.get("emulator", "")).strip() == emulator:
+                    method = str(session.get("capture_method", "")).strip().lower()
+                    break
+        except (OSError, ValueError, AttributeError) as exc:
+            logger.debug(f"[Capture] 读取 {path} 失败: {exc}")
+    if not method:
+        return CAPTURE_AIRTEST
+    if method not in CAPTURE_METHODS:
+        logger.warning(f"⚠️ [Capture] 未知的截图方式 {method!r}，使用 {CAPTURE_AIRTEST}")
+        return CAPTURE_AIRTEST
+    return method
+
+
+def make_capture_func(
+    method: str,
+    serial: Optional[str],
+    fallback: Optional[Callable[[], Optional[np.ndarray]]] = None,
+) -> Optional[Callable[[], Optional[np.ndarray]]]:
+    """按截图方式构造 ``FrameBus`` 的抓帧函数；None 表示使用 Airtest 默认截图"""
+    if method == CAPTURE_RAW and serial:
+        return RawScreencap(serial, fallback=fallback)
+    return None
+
+
+__all__ = [
+    "CAPTURE_AIRTEST",
+    "CAPTURE_METHODS",
+    "CAPTURE_RAW",
+    "RawScreencap",
+    "decode_raw_screencap",
+    "load_capture_method",
+    "make_capture_func",
+]
@@ -0,0 +1,206 @@
+"""
+基于 record_pos 的区域模板匹配
+
+Airtest 的 ``wait()/exists()`` 会在整帧上依次尝试 ``mstpl/tpl/sift/brisk``，
+对固定位置的 UI 元素（礼包按钮、自动战斗标记、地图副本按钮）来说浪费了大量时间。
+本模块根据模板的 ``record_pos`` 和 ``resolution`` 预测元素在屏幕上的位置，
+只在其周围 ``margin`` 像素的窗口内做一次灰度模板匹配；窗口内未命中时可回退到
+Airtest 原有的整帧匹配。每次匹配都会记录命中路径（roi / full / miss），
+便于确认区域窗口设置是否合理。
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+from airtest.aircv.error import BaseError
+from airtest.aircv.template_matching import TemplateMatching
+from airtest.core.cv import Predictor
+from airtest.core.settings import Settings as ST
+from airtest.utils.transform import TargetPos
+
+from auto_dungeon_config import TEMPLATE_ROI_MARGIN
+
+logger = logging.getLogger(__name__)
+
+PATH_ROI = "roi"
+PATH_FULL = "full"
+PATH_MISS = "miss"
+
+
+@dataclass(frozen=True)
+class MatchResult:
+    """一次模板匹配的结果
+
+    Attributes:
+        pos: 匹配到的点击坐标（整帧坐标），未命中为 None
+        path: 命中路径：``roi`` / ``full`` / ``miss``
+        elapsed_ms: 匹配耗时（毫秒）
+    """
+
+    pos: Optional[Tuple[float, float]]
+    path: str
+    elapsed_ms: float
+
+    def __bool__(self) -> bool:
+        return self.pos is not None
+
+
+# 模板按屏幕分辨率缩放后的缓存：(模板路径, 屏幕宽, 屏幕高) -> 图像
+_template_cache: Dict[Tuple[str, int, int], np.ndarray] = {}
+_stats: Dict[str, Dict[str, int]] = {}
+_lock = threading.Lock()
+
+
+def _template_key(template: Any) -> str:
+    return str(getattr(template, "filename", None) or template)
+
+
+def _load_template_image(template: Any, screen: np.ndarray) -> np.ndarray:
+    """读取模板并按当前屏幕分辨率缩放（结果缓存，避免每次读盘）"""
+    height, width = screen.shape[:2]
+    key = (_template_key(template), width, height)
+    with _lock:
+        cached = _template_cache.get(key)
+    if cached is not None:
+        return cached
+    image = template._resize_image(template._imread(), screen, ST.RESIZE_METHOD)
+    with _lock:
+        _template_cache[key] = image
+    return image
+
+
+def predict_area(
+    template: Any,
+    screen: np.ndarray,
+    margin: int = TEMPLATE_ROI_MARGIN,
+    template_image: Optional[np.ndarray] = None,
+) -> Optional[Tuple[int, int, int, int]]:
+    """根据 record_pos 预测模板所在区域
+
+    Returns:
+        (x_min, y_min, x_max, y_max)，已裁剪到屏幕范围内；模板没有 record_pos 时返回 None
+    """
+    record_pos = getattr(template, "record_pos", None)
+    if not record_pos:
+        return None
+    if template_image is None:
+        template_image = _load_template_image(template, screen)
+
+    screen_h, screen_w = screen.shape[:2]
+    tpl_h, tpl_w = template_image.shape[:2]
+    center_x, center_y = Predictor.get_predict_point(record_pos, (screen_w, screen_h))
+    radius_x = tpl_w / 2 + margin
+    radius_y = tpl_h / 2 + margin
+
+    x_min = max(0, int(center_x - radius_x))
+    y_min = max(0, int(center_y - radius_y))
+    x_max = min(screen_w, int(center_x + radius_x))
+    y_max = min(screen_h, int(center_y + radius_y))
+    if x_max - x_min < tpl_w or y_max - y_min < tpl_h:
+        return None
+    return x_min, y_min, x_max, y_max
+
+
+def _match_roi(
+    template: Any, screen: np.ndarray, margin: int
+) -> Optional[Tuple[float, float]]:
+    template_image = _load_template_image(template, screen)
+    area = predict_area(template, screen, margin, template_image)
+    if area is None:
+        return None
+
+    x_min, y_min, x_max, y_max = area
+    crop = screen[y_min:y_max, x_min:x_max]
+    try:
+        ret = TemplateMatching(
+            template_image, crop, threshold=template.threshold, rgb=template.rgb
+        ).find_best_result()
+    except BaseError as e:
+        logger.debug(f"区域模板匹配失败: {e}")
+        return None
+    if not ret:
+        return None
+
+    ret["result"] = (ret["result"][0] + x_min, ret["result"][1] + y_min)
+    ret["rectangle"] = [(x + x_min, y + y_min) for x, y in ret["rectangle"]]
+    return TargetPos().getXY(ret, template.target_pos)
+
+
+def _record(template: Any, path: str) -> None:
+    name = _template_key(template)
+    with _lock:
+        counters = _stats.setdefault(name, {PATH_ROI: 0, PATH_FULL: 0, PATH_MISS: 0})
+        counters[path] += 1
+
+
+def match(
+    template: Any,
+    screen: np.ndarray,
+    margin: Optional[int] = TEMPLATE_ROI_MARGIN,
+    fallback: bool = True,
+) -> MatchResult:
+    """在屏幕帧上匹配模板，优先搜索 record_pos 附近的窗口
+
+    Args:
+        template: Airtest Template（或任何提供 ``match_in`` 的对象）
+        screen: BGR 屏幕帧
+        margin: 窗口扩展像素；None 表示直接整帧匹配
+        fallback: 窗口内未命中时是否回退到整帧匹配
+
+    Returns:
+        MatchResult，``path`` 标明命中路径
+    """
+    start = time.perf_counter()
+    pos = None
+    path = PATH_MISS
+
+    roi_enabled = margin is not None and getattr(template, "record_pos", None)
+    if roi_enabled:
+        try:
+            pos = _match_roi(template, screen, margin)
+        except Exception as e:
+            logger.debug(f"区域模板匹配异常，回退整帧: {e}")
+            pos = None
+        if pos:
+            path = PATH_ROI
+
+    if pos is None and (fallback or not roi_enabled):
+        pos = template.match_in(screen)
+        if pos:
+            path = PATH_FULL
+
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    _record(template, path)
+    logger.debug(f"模板匹配 {_template_key(template)}: {path} ({elapsed_ms:.1f}ms)")
+    return MatchResult(pos=pos, path=path, elapsed_ms=elapsed_ms)
+
+
+def get_stats() -> Dict[str, Dict[str, int]]:
+    """返回每个模板的命中路径统计"""
+    with _lock:
+        return {name: dict(counters) for name, counters in _stats.items()}
+
+
+def reset_stats() -> None:
+    """清空命中统计与模板缓存"""
+    with _lock:
+        _stats.clear()
+        _template_cache.clear()
+
+
+__all__ = [
+    "MatchResult",
+    "PATH_FULL",
+    "PATH_MISS",
+    "PATH_ROI",
+    "get_stats",
+    "match",
+    "predict_area",
+    "reset_stats",
+]
@@ -19,6 +19,7 @@ from auto_dungeon_notification import send_notification
 from auto_dungeon_device import DeviceManager
 from config_loader import load_config
 from database import DungeonProgressDB
+from device_session import DeviceSession, get_active_session
 
 SCRIPT_DIR = Path(__file__).parent
 os.environ["PATH"] = f"/opt/homebrew/bin:{os.environ.get('PATH', '')}"
@@ -154,6 +155,14 @@ def filter_pending_configs(configs: Iterable[str], logger) -> List[str]:
     return pending_cfgs
 
 
+def _load_correction_map(config_name: str) -> dict:
+    """读取配置中的 OCR 纠错表，失败时返回空表"""
+    try:
+        return load_config(str(_get_config_path(config_name))).get_ocr_correction_map() or {}
+    except Exception:
+        return {}
+
+
 def _invoke_auto_dungeon_once(config_name: str, emulator: str, session: str) -> int:
     """执行一次 auto_dungeon 对应配置。
 
@@ -199,13 +208,18 @@ def _invoke_auto_dungeon_once(config_name: str, emulator: str, session: str) ->
 def _ensure_emulator_ready(emulator: str, logger) -> bool:
     """确保模拟器已就绪。
 
-    使用 DeviceManager 检查并启动模拟器。
+    使用 DeviceManager 检查并启动模拟器；处于设备会话中时由会话初始化，
+    已初始化且连接正常则直接复用。
     """
     try:
         logger.info(f"🛠️ 检查模拟器状态: {emulator}")
-        device_manager = DeviceManager()
-        # initialize 会自动处理连接和启动
-        device_manager.initialize(emulator_name=emulator)
+        session = get_active_session(emulator)
+        if session is not None:
+            session.ensure_ready()
+        else:
+            device_manager = DeviceManager()
+            # initialize 会自动处理连接和启动
+            device_manager.initialize(emulator_name=emulator)
         logger.info(f"✅ 模拟器 {emulator} 已就绪")
         return True
     except Exception as e:
@@ -259,7 +273,9 @@ def run_configs(
         logger.info("✅ 所有配置当日任务已完成，无需启动模拟器，脚本退出")
         return 0
 
-    with prevent_system_sleep(logger):
+    # 设备会话：各配置及重试之间复用同一套设备连接与 OCR 状态
+    session = DeviceSession(emulator, correction_map=_load_correction_map(pending_cfgs[0]))
+    with prevent_system_sleep(logger), session.activate():
         # 确保模拟器已启动
         if not _ensure_emulator_ready(emulator, logger):
             logger.error("❌ 无法启动或连接模拟器，任务终止")
@@ -315,6 +331,7 @@ def run_configs(
         logger.info("")
         logger.info("=" * 50)
         logger.info(f"📊 总计: {total}，成功: {success}，失败: {failed}，耗时: {duration}s")
+        logger.info(f"🔌 {session.summary()}")
         logger.info("=" * 50)
 
         summary_lines = [
@@ -0,0 +1,318 @@
+"""
+界面识别模块
+
+维护一个已知界面库（主界面、地图、区域菜单、副本弹窗、战斗、角色选择、登录、错误弹窗），
+每个界面保存若干参考帧的特征向量。识别时把当前帧缩成小尺寸灰度图、去均值归一化，
+与库中所有向量做一次矩阵乘法得到余弦相似度，一次比较即可判断当前所在界面，
+无需依次等待多个模板。
+
+参考帧可以用命令行加入::
+
+    python screen_classifier.py add --screen map --screenshot map.png
+
+运行中也会在模板确认某个界面时自动补充参考帧（``observe``）。运行中学到的参考帧
+只在内存里，识别结论只作为候选：导航模块用它跳过明显属于其他界面的帧，
+判定“处于某界面”仍由模板/像素签名检测器确认。
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import os
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import cv2
+import numpy as np
+
+from project_paths import resolve_project_path
+
+logger = logging.getLogger(__name__)
+
+SCREEN_MAIN_WORLD = "main_world"
+SCREEN_MAP = "map"
+SCREEN_ZONE_MENU = "zone_menu"
+SCREEN_DUNGEON_DIALOG = "dungeon_dialog"
+SCREEN_BATTLE = "battle"
+SCREEN_CHARACTER_SELECT = "character_select"
+SCREEN_LOGIN = "login"
+SCREEN_ERROR_DIALOG = "error_dialog"
+SCREEN_UNKNOWN = "unknown"
+
+KNOWN_SCREENS = (
+    SCREEN_MAIN_WORLD,
+    SCREEN_MAP,
+    SCREEN_ZONE_MENU,
+    SCREEN_DUNGEON_DIALOG,
+    SCREEN_BATTLE,
+    SCREEN_CHARACTER_SELECT,
+    SCREEN_LOGIN,
+    SCREEN_ERROR_DIALOG,
+)
+
+DEFAULT_LIBRARY_FILE = str(resolve_project_path("screen_library.npz"))
+"""默认界面库文件"""
+
+DEFAULT_FEATURE_SIZE = (18, 32)
+"""特征缩略图尺寸 (宽, 高)，与 720x1280 同比例"""
+
+DEFAULT_MIN_SIMILARITY = 0.92
+"""判定为某界面所需的最低相似度"""
+
+DEFAULT_MIN_MARGIN = 0.02
+"""最佳界面与次佳（其他）界面的最小相似度差"""
+
+DEFAULT_MAX_REFS = 8
+"""每个界面最多保留的参考帧数量"""
+
+
+@dataclass(frozen=True)
+class Classification:
+    """一次识别结果
+
+    Attributes:
+        screen: 界面名称，无法判断时为 ``unknown``
+        similarity: 最佳匹配的余弦相似度
+        elapsed_ms: 识别耗时（毫秒）
+    """
+
+    screen: str
+    similarity: float
+    elapsed_ms: float
+
+    @property
+    def known(self) -> bool:
+        return self.screen != SCREEN_UNKNOWN
+
+
+class ScreenClassifier:
+    """基于缩略图特征向量的界面识别器"""
+
+    def __init__(
+        self,
+        feature_size: Tuple[int, int] = DEFAULT_FEATURE_SIZE,
+        min_similarity: float = DEFAULT_MIN_SIMILARITY,
+        min_margin: float = DEFAULT_MIN_MARGIN,
+        max_refs_per_screen: int = DEFAULT_MAX_REFS,
+    ):
+        self.feature_size = tuple(feature_size)
+        self.min_similarity = min_similarity
+        self.min_margin = min_margin
+        self.max_refs_per_screen = max_refs_per_screen
+
+        self._refs: Dict[str, List[np.ndarray]] = {}
+        self._matrix: Optional[np.ndarray] = None
+        self._labels: Optional[np.ndarray] = None
+        self._lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    # 特征与参考库
+    # ------------------------------------------------------------------
+
+    def features(self, image: np.ndarray) -> np.ndarray:
+        """帧 -> 去均值、L2 归一化的灰度缩略图向量"""
+        if image.ndim == 3:
+            image = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        thumb = cv2.resize(image, self.feature_size, interpolation=cv2.INTER_AREA)
+        vector = thumb.astype(np.float32).ravel()
+        vector -= vector.mean()
+        norm = float(np.linalg.norm(vector))
+        if norm > 1e-6:
+            vector /= norm
+        return vector
+
+    def add(self, screen: str, image: np.ndarray) -> None:
+        """加入一帧参考图"""
+        self.add_vector(screen, self.features(image))
+
+    def add_vector(self, screen: str, vector: np.ndarray) -> None:
+        with self._lock:
+            refs = self._refs.setdefault(screen, [])
+            refs.append(np.asarray(vector, dtype=np.float32))
+            if len(refs) > self.max_refs_per_screen:
+                refs.pop(0)
+            self._matrix = None
+
+    def observe(self, screen: str, image: np.ndarray) -> bool:
+        """模板已确认当前界面时调用：识别不出或识别错误时把该帧补充为参考
+
+        Returns:
+            是否新增了参考帧
+        """
+        result = self.classify(image)
+        if result.screen == screen:
+            return False
+        self.add(screen, image)
+        logger.debug(
+            f"🖼️ 界面库新增参考帧: {screen}"
+            f"（原识别为 {result.screen}, 相似度 {result.similarity:.3f}）"
+        )
+        return True
+
+    def screens(self) -> Dict[str, int]:
+        """返回各界面的参考帧数量"""
+        with self._lock:
+            return {name: len(refs) for name, refs in self._refs.items()}
+
+    def _stacked(self) -> Tuple[Optional[np.ndarray], Optional[np.ndarray]]:
+        with self._lock:
+            if self._matrix is None and self._refs:
+                labels = []
+                vectors = []
+                for name, refs in self._refs.items():
+                    labels.extend([name] * len(refs))
+                    vectors.extend(refs)
+                self._matrix = np.stack(vectors)
+                self._labels = np.asarray(labels)
+            return self._matrix, self._labels
+
+    # ------------------------------------------------------------------
+    # 识别
+    # ------------------------------------------------------------------
+
+    def classify(self, image: Optional[np.ndarray]) -> Classification:
+        """识别当前帧所属界面"""
+        start = time.perf_counter()
+        matrix, labels = self._stacked()
+        if image is None or matrix is None:
+            return Classification(SCREEN_UNKNOWN, 0.0, 0.0)
+
+        similarities = matrix @ self.features(image)
+        best = int(np.argmax(similarities))
+        best_screen = str(labels[best])
+        best_similarity = float(similarities[best])
+
+        others = similarities[labels != best_screen]
+
+        # 库里至少要有两个界面才能比较相似度差，只认识一个界面时不下结论
+        screen = SCREEN_UNKNOWN
+        if others.size:
+            margin = best_similarity - float(others.max())
+            if best_similarity >= self.min_similarity and margin >= self.min_margin:
+                screen = best_screen
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        return Classification(screen, best_similarity, elapsed_ms)
+
+    # ------------------------------------------------------------------
+    # 持久化
+    # ------------------------------------------------------------------
+
+    def save(self, path: str = DEFAULT_LIBRARY_FILE) -> None:
+        matrix, labels = self._stacked()
+        if matrix is None:
+            return
+        np.savez_compressed(
+            path,
+            labels=labels,
+            vectors=matrix,
+            feature_size=np.asarray(self.feature_size),
+        )
+
+    def load(self, path: str = DEFAULT_LIBRARY_FILE) -> int:
+        """从文件加载参考库，返回加载的参考帧数量；文件不存在返回 0"""
+        if not os.path.exists(path):
+            return 0
+        try:
+            with np.load(path) as data:
+                feature_size = tuple(int(v) for v in data["feature_size"])
+                if feature_size != self.feature_size:
+                    logger.warning(
+                        f"⚠️ 界面库特征尺寸不一致 {feature_size} != {self.feature_size}，忽略"
+                    )
+                    return 0
+                labels = [str(label) for label in data["labels"]]
+                vectors = data["vectors"]
+        except Exception as e:
+            logger.warning(f"⚠️ 读取界面库失败 {path}: {e}")
+            return 0
+        for label, vector in zip(labels, vectors):
+            self.add_vector(label, vector)
+        return len(labels)
+
+
+# ====== 全局实例 ======
+
+_classifier: Optional[ScreenClassifier] = None
+_classifier_lock = threading.Lock()
+
+
+def get_screen_classifier(library_file: Optional[str] = DEFAULT_LIBRARY_FILE) -> ScreenClassifier:
+    """获取全局界面识别器（首次调用时加载界面库）"""
+    global _classifier
+    with _classifier_lock:
+        if _classifier is None:
+            _classifier = ScreenClassifier()
+            if library_file:
+                count = _classifier.load(library_file)
+                if count:
+                    logger.debug(f"🖼️ 已加载界面库: {count} 个参考帧")
+        return _classifier
+
+
+# ====== 命令行 ======
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="界面识别库工具")
+    parser.add_argument("--library", default=DEFAULT_LIBRARY_FILE)
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    add = sub.add_parser("add", help="加入参考截图")
+    add.add_argument("--screen", required=True, choices=KNOWN_SCREENS)
+    add.add_argument("--screenshot", required=True, action="append")
+
+    classify = sub.add_parser("classify", help="识别截图")
+    classify.add_argument("--screenshot", required=True, action="append")
+
+    sub.add_parser("list", help="列出界面库")
+
+    args = parser.parse_args(argv)
+    classifier = ScreenClassifier()
+    classifier.load(args.library)
+
+    if args.command == "list":
+        for name, count in sorted(classifier.screens().items()):
+            print(f"{name}: {count}")
+        return 0
+
+    for path in args.screenshot:
+        image = cv2.imread(path)
+        if image is None:
+            print(f"❌ 无法读取截图: {path}")
+            return 1
+        if args.command == "add":
+            classifier.add(args.screen, image)
+            print(f"✅ {args.screen} <- {path}")
+        else:
+            result = classifier.classify(image)
+            print(f"{path}: {result.screen} ({result.similarity:.3f}, {result.elapsed_ms:.2f}ms)")
+
+    if args.command == "add":
+        classifier.save(args.library)
+        print(f"💾 已保存到 {args.library}")
+    return 0
+
+
+__all__ = [
+    "Classification",
+    "KNOWN_SCREENS",
+    "SCREEN_BATTLE",
+    "SCREEN_CHARACTER_SELECT",
+    "SCREEN_DUNGEON_DIALOG",
+    "SCREEN_ERROR_DIALOG",
+    "SCREEN_LOGIN",
+    "SCREEN_MAIN_WORLD",
+    "SCREEN_MAP",
+    "SCREEN_UNKNOWN",
+    "SCREEN_ZONE_MENU",
+    "ScreenClassifier",
+    "get_screen_classifier",
+]
+
+
+if __name__ == "__main__":
+    sys.exit(main())
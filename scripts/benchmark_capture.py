@@ -0,0 +1,104 @@
+"""
+截图方式基准测试
+
+对比同一台设备上：
+- airtest: Airtest 当前截图方式（connect_device 后 G.DEVICE.snapshot）
+- png:     ``screencap -p``（Airtest ADB 截图的设备端编码 + 主机端解码）
+- raw:     原始帧缓冲（raw_capture.RawScreencap）
+- raw/N:   原始帧缓冲 + 行列步长 N 降采样
+
+用法：
+    python scripts/benchmark_capture.py 192.168.1.150:5555 -n 20 --downsample 2
+"""
+
+import argparse
+import os
+import sys
+import time
+from statistics import mean, median
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from adb_client import get_adb_client  # noqa: E402
+from raw_capture import RawScreencap  # noqa: E402
+
+
+def png_capture(serial):
+    """``screencap -p`` + cv2 解码"""
+    client = get_adb_client()
+
+    def capture():
+        data = client.exec_out(serial, "screencap -p")
+        return cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_COLOR)
+
+    return capture
+
+
+def airtest_capture(serial):
+    from airtest.core.api import connect_device
+
+    device = connect_device(f"Android://127.0.0.1:5037/{serial}")
+    return lambda: device.snapshot()
+
+
+def benchmark_capture(name, capture, count=20, warmup=2):
+    """运行 ``count`` 次抓帧，返回耗时统计（毫秒）"""
+    for _ in range(warmup):
+        capture()
+    times = []
+    shape = None
+    for _ in range(count):
+        start = time.perf_counter()
+        image = capture()
+        times.append((time.perf_counter() - start) * 1000)
+        shape = image.shape if image is not None else None
+    stats = {
+        "name": name,
+        "shape": shape,
+        "mean_ms": mean(times),
+        "median_ms": median(times),
+        "min_ms": min(times),
+        "max_ms": max(times),
+    }
+    print(
+        f"{name:<10} {str(shape):<16} 平均 {stats['mean_ms']:7.1f}ms  "
+        f"中位 {stats['median_ms']:7.1f}ms  最快 {stats['min_ms']:7.1f}ms  "
+        f"最慢 {stats['max_ms']:7.1f}ms"
+    )
+    return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="截图方式基准测试")
+    parser.add_argument("serial", help="设备序列号，如 192.168.1.150:5555")
+    parser.add_argument("-n", "--count", type=int, default=20, help="每种方式的抓帧次数")
+    parser.add_argument("--downsample", type=int, default=2, help="raw 降采样步长（<=1 跳过）")
+    parser.add_argument("--skip-airtest", action="store_true", help="不测试 Airtest 截图")
+    args = parser.parse_args(argv)
+
+    methods = [
+        ("png", png_capture(args.serial)),
+        ("raw", RawScreencap(args.serial)),
+    ]
+    if args.downsample > 1:
+        methods.append(
+            (f"raw/{args.downsample}", RawScreencap(args.serial, downsample=args.downsample))
+        )
+    if not args.skip_airtest:
+        methods.insert(0, ("airtest", airtest_capture(args.serial)))
+
+    print(f"📸 截图基准测试: {args.serial}，每种方式 {args.count} 次")
+    results = [benchmark_capture(name, capture, args.count) for name, capture in methods]
+
+    baseline = results[0]["median_ms"]
+    print("\n相对第一种方式（中位数）:")
+    for stats in results:
+        print(f"  {stats['name']:<10} {baseline / stats['median_ms']:5.2f}x")
+    return results
+
+
+if __name__ == "__main__":
+    main()
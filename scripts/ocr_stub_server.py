@@ -0,0 +1,368 @@
+#!/usr/bin/env python3
+"""本地 OCR 替身服务（离线压测用）。
+
+不需要 PaddleX Docker 镜像、GPU 和网络，就能跑通 OCR 链路：
+
+- 协议与 PaddleX 产线一致：``POST /ocr``（JSON base64 或原始图像字节）、``GET /health``
+- 结果来自录制的语料：先按解码后像素的 md5 精确匹配，再按 dhash 找最相近的记录
+  （JPEG 等有损编码后像素会变，但 dhash 基本不变）；都没有时返回空结果
+- 可注入延迟、抖动、错误率，并可限制并发（模拟单卡 OCR 服务排队）
+- ``--record-from`` 把未命中的请求转发给真实服务并写入语料，用来录制语料
+
+用法::
+
+    # 录制：转发到真实服务，边用边录
+    python scripts/ocr_stub_server.py --port 8090 --record-from http://localhost:8080/ocr
+    # 回放：200ms ± 50ms 延迟，2% 错误
+    python scripts/ocr_stub_server.py --port 8090 --latency 0.2 --jitter 0.05 --error-rate 0.02
+    # 压测 / 全流程
+    OCR_SERVER_URL=http://localhost:8090/ocr python scripts/quick_test_ocr_api.py 50 0
+"""
+
+from __future__ import annotations
+
+import argparse
+import base64
+import hashlib
+import json
+import random
+import sys
+import threading
+import time
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Optional
+
+import cv2
+import numpy as np
+
+SCRIPT_DIR = Path(__file__).resolve().parent.parent
+if str(SCRIPT_DIR) not in sys.path:
+    sys.path.insert(0, str(SCRIPT_DIR))
+
+from ocr_hash_index import MultiIndexHash  # noqa: E402
+
+DEFAULT_CORPUS = SCRIPT_DIR / "output" / "ocr_corpus.jsonl"
+
+DEFAULT_MAX_DISTANCE = 6
+"""dhash 相似匹配的最大汉明距离"""
+
+EMPTY_RESPONSE = {
+    "errorCode": 0,
+    "errorMsg": "Success",
+    "result": {
+        "ocrResults": [{"prunedResult": {"rec_texts": [], "rec_scores": [], "dt_polys": []}}]
+    },
+}
+
+
+def decode_image(body: bytes, content_type: str) -> Optional[np.ndarray]:
+    """解析 /ocr 请求体中的图像。
+
+    Args:
+        body: 请求体。
+        content_type: 请求的 Content-Type。
+
+    Returns:
+        BGR 图像，无法解析时为 ``None``。
+    """
+    try:
+        if content_type.startswith("application/json"):
+            body = base64.b64decode(json.loads(body)["file"])
+        return cv2.imdecode(np.frombuffer(body, dtype=np.uint8), cv2.IMREAD_COLOR)
+    except Exception:
+        return None
+
+
+def image_keys(image: np.ndarray) -> tuple[str, int]:
+    """图像的 (像素 md5, 64 位 dhash)。
+
+    Args:
+        image: BGR 图像。
+
+    Returns:
+        像素 md5 字符串和 dhash 整数。
+    """
+    digest = hashlib.md5(image.tobytes() + str(image.shape).encode()).hexdigest()
+    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    small = cv2.resize(gray, (9, 8), interpolation=cv2.INTER_AREA)
+    bits = (small[:, 1:] > small[:, :-1]).flatten()
+    dhash = int("".join("1" if bit else "0" for bit in bits), 2)
+    return digest, dhash
+
+
+class OCRCorpus:
+    """录制的 OCR 语料：图像 -> PaddleX 响应（线程安全，JSONL 持久化）。"""
+
+    def __init__(self, path: Optional[Path] = None, max_distance: int = DEFAULT_MAX_DISTANCE):
+        self.path = Path(path) if path else None
+        self.max_distance = max_distance
+        self._responses: list[dict[str, Any]] = []
+        self._by_md5: dict[str, int] = {}
+        self._by_dhash = MultiIndexHash()
+        self._lock = threading.Lock()
+        if self.path and self.path.exists():
+            with self.path.open(encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        self._add(entry["md5"], int(entry["dhash"], 16), entry["response"])
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._responses)
+
+    def _add(self, digest: str, dhash: int, response: dict[str, Any]) -> None:
+        index = len(self._responses)
+        self._responses.append(response)
+        self._by_md5[digest] = index
+        self._by_dhash.add(dhash, index)
+
+    def add(self, image: np.ndarray, response: dict[str, Any]) -> None:
+        """记录一条响应（有路径时追加写入文件）。
+
+        Args:
+            image: 请求的图像。
+            response: 服务返回的 JSON。
+        """
+        digest, dhash = image_keys(image)
+        with self._lock:
+            self._add(digest, dhash, response)
+            if self.path:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                with self.path.open("a", encoding="utf-8") as f:
+                    entry = {"md5": digest, "dhash": f"{dhash:016x}", "response": response}
+                    f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+    def lookup(self, image: np.ndarray) -> tuple[Optional[dict[str, Any]], str]:
+        """查找图像对应的响应。
+
+        Args:
+            image: 请求的图像。
+
+        Returns:
+            (响应或 ``None``, 命中方式 "exact" / "similar" / "miss")。
+        """
+        digest, dhash = image_keys(image)
+        with self._lock:
+            index = self._by_md5.get(digest)
+            if index is not None:
+                return self._responses[index], "exact"
+            found = self._by_dhash.search(dhash, self.max_distance)
+            if found:
+                return self._responses[found[0][1]], "similar"
+        return None, "miss"
+
+
+class OCRStubServer:
+    """PaddleX 协议的 OCR 替身服务，可在后台线程运行。"""
+
+    def __init__(
+        self,
+        corpus: Optional[OCRCorpus] = None,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        concurrency: int = 0,
+        record_from: Optional[str] = None,
+        seed: Optional[int] = None,
+    ):
+        """
+        Args:
+            corpus: 语料，默认空语料（所有请求返回空结果）。
+            host: 监听地址。
+            port: 监听端口，0 表示随机端口。
+            latency: 每个请求的基础延迟（秒）。
+            jitter: 延迟抖动（秒，均匀分布 ±jitter）。
+            error_rate: 返回 503 的概率。
+            concurrency: 同时处理的请求数上限，0 表示不限制；超出的请求排队。
+            record_from: 未命中时转发到的真实 OCR 服务地址，响应写入语料。
+            seed: 随机数种子（延迟抖动和错误注入）。
+        """
+        self.corpus = corpus if corpus is not None else OCRCorpus()
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.record_from = record_from
+        self.stats = {
+            "requests": 0,
+            "exact": 0,
+            "similar": 0,
+            "miss": 0,
+            "recorded": 0,
+            "errors": 0,
+        }
+        self._rng = random.Random(seed)
+        self._slots = threading.BoundedSemaphore(concurrency) if concurrency > 0 else None
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self._httpd.daemon_threads = True
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}/ocr"
+
+    @property
+    def health_url(self) -> str:
+        return self.url[: -len("/ocr")] + "/health"
+
+    def _count(self, key: str) -> None:
+        with self._lock:
+            self.stats[key] += 1
+
+    def _delay(self) -> float:
+        with self._lock:
+            return max(0.0, self.latency + self._rng.uniform(-self.jitter, self.jitter))
+
+    def _should_fail(self) -> bool:
+        with self._lock:
+            return self._rng.random() < self.error_rate
+
+    def handle_ocr(self, body: bytes, content_type: str) -> tuple[int, dict[str, Any]]:
+        """处理一次 /ocr 请求。
+
+        Args:
+            body: 请求体。
+            content_type: 请求的 Content-Type。
+
+        Returns:
+            (HTTP 状态码, 响应 JSON)。
+        """
+        self._count("requests")
+        if self._slots is not None:
+            self._slots.acquire()
+        try:
+            time.sleep(self._delay())
+            if self._should_fail():
+                self._count("errors")
+                return 503, {"errorCode": 503, "errorMsg": "injected error"}
+
+            image = decode_image(body, content_type)
+            if image is None:
+                return 400, {"errorCode": 400, "errorMsg": "invalid image"}
+
+            response, how = self.corpus.lookup(image)
+            self._count(how)
+            if response is None and self.record_from:
+                response = self._record(image, body, content_type)
+            return 200, response or EMPTY_RESPONSE
+        finally:
+            if self._slots is not None:
+                self._slots.release()
+
+    def _record(self, image: np.ndarray, body: bytes, content_type: str) -> Optional[dict]:
+        if not content_type.startswith("application/json"):
+            # 真实的 PaddleX 服务只接受 JSON base64
+            payload = {"file": base64.b64encode(body).decode("ascii"), "fileType": 1}
+            body = json.dumps(payload).encode()
+            content_type = "application/json"
+        request = urllib.request.Request(
+            self.record_from, data=body, headers={"Content-Type": content_type}, method="POST"
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=60) as result:
+                response = json.loads(result.read())
+        except Exception:
+            return None
+        if response.get("errorCode") == 0:
+            self.corpus.add(image, response)
+            self._count("recorded")
+        return response
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def _reply(self, status: int, payload: dict[str, Any]) -> None:
+                data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                if self.path.rstrip("/") == "/health":
+                    self._reply(200, {"errorCode": 0, "errorMsg": "Healthy"})
+                else:
+                    self._reply(404, {"errorCode": 404, "errorMsg": "Not Found"})
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                if self.path.rstrip("/") != "/ocr":
+                    self._reply(404, {"errorCode": 404, "errorMsg": "Not Found"})
+                    return
+                content_type = self.headers.get("Content-Type", "application/json")
+                self._reply(*server.handle_ocr(body, content_type))
+
+        return Handler
+
+    def start(self) -> "OCRStubServer":
+        """在后台线程启动服务。"""
+        self._thread = threading.Thread(
+            target=self._httpd.serve_forever, name="ocr-stub", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def serve_forever(self) -> None:
+        self._httpd.serve_forever()
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self) -> "OCRStubServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="本地 OCR 替身服务（PaddleX /ocr + /health 协议）")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--corpus", type=Path, default=DEFAULT_CORPUS, help="语料文件（JSONL）")
+    parser.add_argument("--latency", type=float, default=0.0, help="基础延迟（秒）")
+    parser.add_argument("--jitter", type=float, default=0.0, help="延迟抖动（秒）")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="返回 503 的概率")
+    parser.add_argument("--concurrency", type=int, default=0, help="并发上限，0 不限制")
+    parser.add_argument("--record-from", default=None, help="未命中时转发并录制的真实服务地址")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    corpus = OCRCorpus(args.corpus)
+    server = OCRStubServer(
+        corpus,
+        host=args.host,
+        port=args.port,
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        concurrency=args.concurrency,
+        record_from=args.record_from,
+        seed=args.seed,
+    )
+    print(f"🧪 OCR 替身服务: {server.url}（语料 {len(corpus)} 条: {args.corpus}）")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print(f"📊 {server.stats}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
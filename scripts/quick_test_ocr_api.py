@@ -1,10 +1,21 @@
+import argparse
+import asyncio
 import base64
+import json
 import os
+import random
+import sys
 import time
 from statistics import mean, median, stdev
 
+import cv2
+import httpx
 import requests
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ocr_client import IMAGE_FORMATS, PADDLE_OPTIONS, OCRClient  # noqa: E402
+
 
 def ocr_request_once(image_path, url="http://localhost:8080/ocr", verbose=True):
     """执行一次OCR请求并返回耗时（秒）"""
@@ -150,17 +161,269 @@ def benchmark_ocr(image_path, url="http://localhost:8080/ocr", num_requests=10,
     print(f"{'='*60}\n")
 
 
+# ====== 并发压测 ======
+
+# 区域尺寸：与 OCRHelper 的 3x3 区域对应（整屏 / 一行三格 / 单格）
+REGION_SIZES = {
+    "full": (0, 0, 3, 3),
+    "row": (0, 1, 3, 1),
+    "tile": (1, 1, 1, 1),
+}
+
+
+def parse_region_mix(spec):
+    """解析区域尺寸混合比例，如 "full=1,row=2,tile=4" -> {"full": 1, "row": 2, "tile": 4}"""
+    mix = {}
+    for part in spec.split(","):
+        name, _, weight = part.strip().partition("=")
+        if name not in REGION_SIZES:
+            raise ValueError(f"未知区域尺寸: {name}（可选 {', '.join(REGION_SIZES)}）")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def build_payloads(image, region_mix, image_format="png", quality=90, max_width=960, binary=False):
+    """按区域尺寸裁剪、缩放、编码测试图，返回 {尺寸: (请求体, Content-Type)}"""
+    encoder = OCRClient("http://unused/ocr", image_format=image_format, quality=quality)
+    height, width = image.shape[:2]
+    payloads = {}
+    for name in region_mix:
+        col, row, cols, rows = REGION_SIZES[name]
+        crop = image[
+            row * height // 3 : (row + rows) * height // 3,
+            col * width // 3 : (col + cols) * width // 3,
+        ]
+        if max_width and crop.shape[1] > max_width:
+            scale = max_width / crop.shape[1]
+            crop = cv2.resize(
+                crop, (max_width, int(crop.shape[0] * scale)), interpolation=cv2.INTER_AREA
+            )
+        encoded = encoder.encode(crop)
+        if binary:
+            payloads[name] = (encoded, IMAGE_FORMATS[image_format][1])
+        else:
+            body = {"file": base64.b64encode(encoded).decode("ascii"), "fileType": 1}
+            body.update(PADDLE_OPTIONS)
+            payloads[name] = (json.dumps(body).encode(), "application/json")
+    encoder.close()
+    return payloads
+
+
+def percentile(values, p):
+    """最近秩百分位（values 为空返回 0）"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * p // 100))
+    return ordered[int(rank) - 1]
+
+
+def _latency_stats(latencies):
+    ms = [t * 1000 for t in latencies]
+    return {
+        "p50": round(percentile(ms, 50), 1),
+        "p95": round(percentile(ms, 95), 1),
+        "p99": round(percentile(ms, 99), 1),
+        "mean": round(mean(ms), 1) if ms else 0.0,
+        "max": round(max(ms), 1) if ms else 0.0,
+    }
+
+
+async def _run_load(url, payloads, region_mix, num_requests, concurrency, rate, timeout, seed):
+    rng = random.Random(seed)
+    names = list(region_mix)
+    weights = [region_mix[name] for name in names]
+    plan = rng.choices(names, weights=weights, k=num_requests)
+    records = []  # (尺寸, 耗时秒, 是否成功)
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(limits=limits, timeout=timeout) as client:
+
+        async def send(name, started):
+            body, content_type = payloads[name]
+            ok = False
+            try:
+                response = await client.post(
+                    url, content=body, headers={"Content-Type": content_type}
+                )
+                ok = response.status_code == 200 and response.json().get("errorCode") == 0
+            except Exception:
+                pass
+            records.append((name, time.perf_counter() - started, ok))
+
+        start = time.perf_counter()
+        if rate:
+            # 固定速率（开环）：按计划时刻发出，耗时从计划时刻算起，排队等待也计入
+            tasks = []
+            for i, name in enumerate(plan):
+                due = start + i / rate
+                await asyncio.sleep(max(0.0, due - time.perf_counter()))
+                tasks.append(asyncio.create_task(send(name, due)))
+            await asyncio.gather(*tasks)
+        else:
+            # 闭环：concurrency 个客户端各自收到响应后立即发下一个
+            queue = iter(plan)
+
+            async def worker():
+                for name in queue:
+                    await send(name, time.perf_counter())
+
+            await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+    return records, elapsed
+
+
+def load_test_ocr(
+    image_path,
+    url="http://localhost:8080/ocr",
+    num_requests=100,
+    concurrency=4,
+    rate=None,
+    region_mix="full=1,row=2,tile=4",
+    image_format="png",
+    quality=90,
+    max_width=960,
+    binary=False,
+    timeout=60.0,
+    seed=0,
+    per_emulator_rps=None,
+    json_path=None,
+    verbose=True,
+):
+    """
+    并发压测 OCR 服务，返回结果字典（可写入 JSON 便于对比不同配置）
+
+    Args:
+        image_path: 测试图片路径
+        url: OCR服务URL
+        num_requests: 请求总数
+        concurrency: 并发客户端数（闭环）/ 最大连接数（开环）
+        rate: 固定请求速率（次/秒）；None 为闭环模式
+        region_mix: 区域尺寸混合比例，如 "full=1,row=2,tile=4"
+        image_format / quality / max_width / binary: 请求编码配置，与 OCRClient 一致
+        per_emulator_rps: 单个模拟器的 OCR 请求速率（次/秒），给出时估算可支撑的模拟器数
+        json_path: 结果 JSON 输出路径
+    """
+    image = cv2.imread(image_path)
+    if image is None:
+        print(f"❌ 找不到图片: {image_path}")
+        return None
+
+    mix = parse_region_mix(region_mix)
+    payloads = build_payloads(image, mix, image_format, quality, max_width, binary)
+    records, elapsed = asyncio.run(
+        _run_load(url, payloads, mix, num_requests, concurrency, rate, timeout, seed)
+    )
+
+    ok_latencies = [t for _, t, ok in records if ok]
+    errors = sum(1 for _, _, ok in records if not ok)
+    result = {
+        "config": {
+            "url": url,
+            "image": image_path,
+            "mode": f"fixed-rate {rate}/s" if rate else "closed-loop",
+            "concurrency": concurrency,
+            "region_mix": mix,
+            "image_format": image_format,
+            "quality": quality,
+            "max_width": max_width,
+            "binary": binary,
+        },
+        "requests": len(records),
+        "errors": errors,
+        "error_rate": round(errors / len(records), 4) if records else 0.0,
+        "duration_s": round(elapsed, 3),
+        "throughput_rps": round(len(ok_latencies) / elapsed, 2) if elapsed else 0.0,
+        "latency_ms": _latency_stats(ok_latencies),
+        "by_region": {
+            name: {
+                "requests": sum(1 for n, _, _ in records if n == name),
+                "payload_bytes": len(payloads[name][0]),
+                "latency_ms": _latency_stats([t for n, t, ok in records if n == name and ok]),
+            }
+            for name in mix
+        },
+    }
+    if per_emulator_rps:
+        result["emulators_supported"] = int(result["throughput_rps"] // per_emulator_rps)
+
+    if verbose:
+        latency = result["latency_ms"]
+        print(f"\n{'='*60}")
+        print(f"📊 OCR并发压测 ({result['config']['mode']}, 并发 {concurrency})")
+        print(f"{'='*60}")
+        print(f"请求: {result['requests']}，失败: {errors} ({result['error_rate']:.1%})")
+        print(f"耗时: {elapsed:.2f}秒，吞吐: {result['throughput_rps']:.2f} 次/秒")
+        print(
+            f"⏱️  延迟 (毫秒): p50 {latency['p50']}  p95 {latency['p95']}  "
+            f"p99 {latency['p99']}  平均 {latency['mean']}  最大 {latency['max']}"
+        )
+        for name, stats in result["by_region"].items():
+            print(
+                f"  {name:5s} x{stats['requests']:<4d} {stats['payload_bytes'] / 1024:7.1f}KB  "
+                f"p50 {stats['latency_ms']['p50']}ms  p95 {stats['latency_ms']['p95']}ms"
+            )
+        if per_emulator_rps:
+            print(
+                f"🖥️  按每个模拟器 {per_emulator_rps} 次/秒估算，"
+                f"可支撑 {result['emulators_supported']} 个"
+            )
+        print(f"{'='*60}\n")
+
+    if json_path:
+        with open(json_path, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+    return result
+
+
+def _load_main(argv):
+    parser = argparse.ArgumentParser(description="OCR 并发压测")
+    parser.add_argument("--image", default="images/screenshots/example.png")
+    parser.add_argument("--url", default=os.getenv("OCR_SERVER_URL", "http://localhost:8080/ocr"))
+    parser.add_argument("-n", "--requests", type=int, default=100)
+    parser.add_argument("-c", "--concurrency", type=int, default=4)
+    parser.add_argument("--rate", type=float, default=None, help="固定速率（次/秒），默认闭环")
+    parser.add_argument("--regions", default="full=1,row=2,tile=4", help="区域尺寸混合比例")
+    parser.add_argument("--format", default="png", choices=["png", "jpg", "webp"])
+    parser.add_argument("--quality", type=int, default=90)
+    parser.add_argument("--max-width", type=int, default=960, help="0 表示不缩放")
+    parser.add_argument("--binary", action="store_true", help="以原始字节上传")
+    parser.add_argument("--per-emulator-rps", type=float, default=None)
+    parser.add_argument("--json", default=None, help="结果 JSON 输出路径")
+    args = parser.parse_args(argv)
+
+    load_test_ocr(
+        args.image,
+        url=args.url,
+        num_requests=args.requests,
+        concurrency=args.concurrency,
+        rate=args.rate,
+        region_mix=args.regions,
+        image_format=args.format,
+        quality=args.quality,
+        max_width=args.max_width,
+        binary=args.binary,
+        per_emulator_rps=args.per_emulator_rps,
+        json_path=args.json,
+    )
+
+
 if __name__ == "__main__":
-    import sys
+    # 并发压测：python scripts/quick_test_ocr_api.py load -n 200 -c 8 --format jpg --json out.json
+    if len(sys.argv) > 1 and sys.argv[1] == "load":
+        _load_main(sys.argv[2:])
+        sys.exit(0)
 
     # 使用项目现有的图片进行测试
     test_image = "images/screenshots/example.png"
+    # 可指向本地替身服务（scripts/ocr_stub_server.py）离线测试
+    url = os.getenv("OCR_SERVER_URL", "http://localhost:8080/ocr")
 
     # 如果指定了参数，则进行性能测试
     if len(sys.argv) > 1:
         num_requests = int(sys.argv[1]) if len(sys.argv) > 1 else 10
         interval = float(sys.argv[2]) if len(sys.argv) > 2 else 0.1
-        benchmark_ocr(test_image, num_requests=num_requests, interval=interval)
+        benchmark_ocr(test_image, url=url, num_requests=num_requests, interval=interval)
     else:
         # 默认进行单次测试
-        test_ocr(test_image)
+        test_ocr(test_image, url=url)
@@ -0,0 +1,198 @@
+"""
+测试 adb server 协议客户端
+"""
+
+import os
+import socket
+import socketserver
+import sys
+import threading
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from adb_client import AdbClient, AdbError, AdbServerUnavailable, parse_devices
+from emulator_manager import EmulatorConnectionManager
+
+
+def _message(text):
+    data = text.encode()
+    return b"%04x" % len(data) + data
+
+
+class FakeAdbServer:
+    """实现 adb server 的 host 服务子集；``push`` 向所有 track-devices 连接推送设备表"""
+
+    def __init__(self):
+        self.devices = {"emulator-5554": "device"}
+        self.framebuffer = b""
+        self.requests = []
+        self.trackers = []
+        fake = self
+
+        class Handler(socketserver.BaseRequestHandler):
+            def read_request(self):
+                length = int(self.request.recv(4), 16)
+                request = self.request.recv(length).decode()
+                fake.requests.append(request)
+                return request
+
+            def handle(self):
+                request = self.read_request()
+                if request == "host:devices":
+                    self.request.sendall(b"OKAY" + _message(fake.table()))
+                elif request == "host:version":
+                    self.request.sendall(b"OKAY" + _message("0029"))
+                elif request.startswith("host:connect:"):
+                    address = request.split(":", 2)[2]
+                    fake.devices[address] = "device"
+                    self.request.sendall(b"OKAY" + _message(f"connected to {address}"))
+                elif request.startswith("host:disconnect:"):
+                    address = request.split(":", 2)[2]
+                    if fake.devices.pop(address, None) is None:
+                        self.request.sendall(b"FAIL" + _message(f"no such device '{address}'"))
+                    else:
+                        self.request.sendall(b"OKAY" + _message(f"disconnected {address}"))
+                elif request.startswith("host:transport:"):
+                    serial = request.split(":", 2)[2]
+                    if serial not in fake.devices:
+                        self.request.sendall(b"FAIL" + _message(f"device '{serial}' not found"))
+                        return
+                    self.request.sendall(b"OKAY")
+                    service, command = self.read_request().split(":", 1)
+                    if service == "exec" and command == "screencap":
+                        self.request.sendall(b"OKAY" + fake.framebuffer)
+                    else:
+                        self.request.sendall(b"OKAY" + command.split(" ", 1)[1].encode() + b"\n")
+                elif request == "host:track-devices":
+                    self.request.sendall(b"OKAY" + _message(fake.table()))
+                    fake.trackers.append(self.request)
+                    # 保持连接直到客户端关闭
+                    while self.request.recv(1):
+                        pass
+
+        self.server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.port = self.server.server_address[1]
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def table(self):
+        return "".join(f"{serial}\t{state}\n" for serial, state in self.devices.items())
+
+    def push(self):
+        for sock in self.trackers:
+            sock.sendall(_message(self.table()))
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def fake_adb():
+    server = FakeAdbServer()
+    yield server
+    server.close()
+
+
+def _wait_until(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+def _dead_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def test_parse_devices():
+    assert parse_devices("a\tdevice\nb\toffline\n\n") == {"a": "device", "b": "offline"}
+
+
+def test_devices_cached_within_ttl(fake_adb):
+    client = AdbClient(port=fake_adb.port, cache_ttl=60)
+
+    assert client.devices() == {"emulator-5554": "device"}
+    assert client.devices() == {"emulator-5554": "device"}
+    assert fake_adb.requests.count("host:devices") == 1
+
+    client.invalidate()
+    client.devices()
+    assert fake_adb.requests.count("host:devices") == 2
+
+
+def test_track_devices_push_updates(fake_adb):
+    client = AdbClient(port=fake_adb.port, cache_ttl=0)
+    client.start_tracking()
+    try:
+        _wait_until(lambda: client.tracking)
+        fake_adb.devices["127.0.0.1:5555"] = "device"
+        fake_adb.push()
+        _wait_until(lambda: "127.0.0.1:5555" in client.devices())
+
+        # 跟踪在线时设备表直接来自推送，不再发一次性查询
+        assert "host:devices" not in fake_adb.requests
+    finally:
+        client.stop_tracking()
+    assert not client.tracking
+
+
+def test_connect_disconnect_and_shell(fake_adb):
+    client = AdbClient(port=fake_adb.port)
+
+    assert client.connect("127.0.0.1:5555") == (True, "connected to 127.0.0.1:5555")
+    assert "127.0.0.1:5555" in client.devices()
+    assert client.shell("127.0.0.1:5555", "echo test").strip() == "test"
+
+    assert client.disconnect("127.0.0.1:5555")[0] is True
+    assert "127.0.0.1:5555" not in client.devices()
+    assert client.disconnect("127.0.0.1:5555")[0] is False
+    with pytest.raises(AdbError):
+        client.shell("127.0.0.1:5555", "echo test")
+
+
+def test_exec_out_returns_raw_bytes(fake_adb):
+    fake_adb.framebuffer = bytes(range(256)) * 4096  # 含 \r\n，不应被转换
+    client = AdbClient(port=fake_adb.port)
+
+    assert client.exec_out("emulator-5554", "screencap") == fake_adb.framebuffer
+
+
+def test_server_unavailable():
+    client = AdbClient(port=_dead_port())
+
+    assert client.is_available() is False
+    with pytest.raises(AdbServerUnavailable):
+        client.devices()
+
+
+def test_manager_uses_adb_server(fake_adb, monkeypatch):
+    def fail(*args, **kwargs):
+        raise AssertionError("不应调用 adb 命令")
+
+    monkeypatch.setattr("emulator_manager.subprocess.run", fail)
+    manager = EmulatorConnectionManager(adb_client=AdbClient(port=fake_adb.port))
+
+    assert manager.ensure_connected("127.0.0.1:5555") is True
+    assert manager.test_connection("127.0.0.1:5555") is True
+
+
+def test_manager_falls_back_to_adb_command(monkeypatch):
+    class Result:
+        returncode = 0
+        stdout = "List of devices attached\nemulator-5554\tdevice\n"
+        stderr = ""
+
+    calls = []
+    monkeypatch.setattr(
+        "emulator_manager.subprocess.run", lambda cmd, **kwargs: calls.append(cmd) or Result()
+    )
+    manager = EmulatorConnectionManager(adb_client=AdbClient(port=_dead_port()))
+
+    assert manager.get_devices() == {"emulator-5554": "device"}
+    assert calls[0][1:] == ["devices"]
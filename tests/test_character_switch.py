@@ -0,0 +1,93 @@
+"""
+测试游戏内切换角色与重启游戏回退
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import auto_dungeon_core
+import auto_dungeon_state_machine
+from auto_dungeon_state_machine import DungeonStateMachine
+from dungeon_planner import STEP_RESTART_GAME, STEP_SWITCH_CHARACTER
+
+
+class FakeDB:
+    config_name = "test"
+
+    def __init__(self, timings=None):
+        self.timings = timings or {}
+        self.recorded = []
+
+    def get_step_timings(self, days=7):
+        return self.timings
+
+    def record_step_timing(self, step, seconds):
+        self.recorded.append(step)
+
+
+@pytest.fixture
+def game(monkeypatch):
+    """模拟游戏界面：on_main_world 表示游戏是否停留在主界面"""
+    state = {"on_main_world": True, "switch_ok": True, "calls": []}
+    module = auto_dungeon_state_machine
+
+    def switch_character():
+        state["calls"].append("switch")
+        return state["switch_ok"]
+
+    def restart_game():
+        state["calls"].append("restart")
+        return True
+
+    monkeypatch.setattr(module, "is_main_world", lambda: state["on_main_world"])
+    monkeypatch.setattr(module, "switch_character", switch_character)
+    monkeypatch.setattr(auto_dungeon_core, "restart_game", restart_game)
+    return state
+
+
+def test_switch_in_game(game):
+    machine = DungeonStateMachine()
+    machine.current_zone = "风暴群岛"
+    db = FakeDB(timings={STEP_RESTART_GAME: 60.0})
+
+    step = auto_dungeon_core.enter_character_selection(machine, db)
+
+    assert step == STEP_SWITCH_CHARACTER
+    assert game["calls"] == ["switch"]
+    assert db.recorded == [STEP_SWITCH_CHARACTER]
+    assert machine.state == "character_selection"
+    assert machine.current_zone is None
+
+
+@pytest.mark.parametrize(
+    "on_main_world, switch_ok, calls",
+    [
+        (False, True, ["restart"]),
+        (True, False, ["switch", "restart"]),
+    ],
+)
+def test_falls_back_to_restart(game, on_main_world, switch_ok, calls):
+    game["on_main_world"] = on_main_world
+    game["switch_ok"] = switch_ok
+    machine = DungeonStateMachine()
+    db = FakeDB()
+
+    step = auto_dungeon_core.enter_character_selection(machine, db)
+
+    assert step == STEP_RESTART_GAME
+    assert game["calls"] == calls
+    assert db.recorded == [STEP_RESTART_GAME]
+    assert machine.state == "character_selection"
+
+
+def test_in_game_disabled_restarts(game):
+    machine = DungeonStateMachine()
+    db = FakeDB()
+
+    step = auto_dungeon_core.enter_character_selection(machine, db, in_game=False)
+    assert step == STEP_RESTART_GAME
+    assert game["calls"] == ["restart"]
@@ -0,0 +1,157 @@
+"""
+测试战斗结束检测
+"""
+
+import os
+import sys
+import threading
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from combat_watcher import (
+    STATUS_FINISHED,
+    STATUS_STOPPED,
+    STATUS_TIMEOUT,
+    CombatWatcher,
+    get_combat_stats,
+    reset_combat_stats,
+)
+from frame_bus import FrameBus
+
+FIGHT = np.full((1280, 720, 3), 60, dtype=np.uint8)
+TRANSITION = np.full((1280, 720, 3), 200, dtype=np.uint8)
+END = np.full((1280, 720, 3), 201, dtype=np.uint8)
+
+
+def _is_end(image, final):
+    return image is END
+
+
+class Sequence:
+    """依次返回给定帧，用完后一直返回最后一帧"""
+
+    def __init__(self, *frames):
+        self.frames = list(frames)
+        self.calls = 0
+
+    def __call__(self):
+        frame = self.frames[min(self.calls, len(self.frames) - 1)]
+        self.calls += 1
+        return frame
+
+
+@pytest.fixture(autouse=True)
+def clean_stats():
+    reset_combat_stats()
+    yield
+    reset_combat_stats()
+
+
+def test_finishes_and_records_latency():
+    bus = FrameBus(capture_func=Sequence(FIGHT, END))
+    watcher = CombatWatcher(bus, _is_end, slow_interval=0.05, fast_interval=0.01)
+
+    result = watcher.run(timeout=2)
+
+    assert result.status == STATUS_FINISHED
+    assert watcher.finished.is_set()
+    assert result.latency_ms is not None and result.latency_ms < 1000
+    assert get_combat_stats()["finished"] == 1
+
+
+def test_end_cue_switches_to_fast_polling():
+    bus = FrameBus(capture_func=Sequence(FIGHT, FIGHT, TRANSITION, END))
+    watcher = CombatWatcher(bus, _is_end, slow_interval=0.3, fast_interval=0.01)
+
+    result = watcher.run(timeout=3)
+
+    assert result.status == STATUS_FINISHED
+    assert result.cues >= 1
+    # 不切换高频时需要 3 个慢间隔（0.9s）
+    assert result.duration < 0.8
+
+
+def test_published_frame_wakes_watcher():
+    capture = Sequence(FIGHT, END)
+    bus = FrameBus(capture_func=capture)
+    watcher = CombatWatcher(bus, _is_end, slow_interval=5, fast_interval=0.01)
+    timer = threading.Timer(0.1, lambda: bus.publish(TRANSITION))
+    timer.start()
+
+    result = watcher.run(timeout=10)
+    timer.join()
+
+    assert result.status == STATUS_FINISHED
+    assert result.duration < 2
+
+
+def test_timeout_and_ticks():
+    bus = FrameBus(capture_func=Sequence(FIGHT))
+    ticks = []
+    watcher = CombatWatcher(bus, _is_end, slow_interval=0.05, fast_interval=0.01)
+
+    result = watcher.run(timeout=0.3, on_tick=lambda: ticks.append(1), tick_interval=0.1)
+
+    assert result.status == STATUS_TIMEOUT
+    assert result.latency_ms is None
+    assert 2 <= len(ticks) <= 4
+
+
+def test_stop_signal():
+    bus = FrameBus(capture_func=Sequence(FIGHT))
+    watcher = CombatWatcher(bus, _is_end)
+
+    assert watcher.run(timeout=5, should_stop=lambda: True).status == STATUS_STOPPED
+
+
+def test_custom_end_cue():
+    bus = FrameBus(capture_func=Sequence(FIGHT, FIGHT, FIGHT, END))
+    watcher = CombatWatcher(
+        bus, _is_end, end_cue=lambda image: True, slow_interval=0.3, fast_interval=0.01
+    )
+
+    result = watcher.run(timeout=3)
+
+    assert result.status == STATUS_FINISHED
+    assert result.duration < 0.3
+
+
+class _Bar:
+    def update(self, n):
+        pass
+
+    def close(self):
+        pass
+
+
+@pytest.mark.parametrize("detector_hit", [False, True])
+def test_auto_combat_ends_only_on_main_world_detector(monkeypatch, detector_hit):
+    import auto_dungeon_combat as combat
+    from screen_classifier import SCREEN_BATTLE, SCREEN_MAIN_WORLD, ScreenClassifier
+
+    # 界面识别器认为战斗帧就是主界面，结束与否仍只由检测器决定
+    rng = np.random.default_rng(0)
+    fight = rng.integers(0, 255, size=(1280, 720, 3), dtype=np.uint8)
+    classifier = ScreenClassifier()
+    classifier.add(SCREEN_MAIN_WORLD, fight)
+    classifier.add(SCREEN_BATTLE, rng.integers(0, 255, size=(1280, 720, 3), dtype=np.uint8))
+
+    class Detector:
+        def detect(self, image, final=True):
+            return (1, 1) if detector_hit else None
+
+    container = combat.get_container()
+    monkeypatch.setattr(container, "_screen_classifier", classifier)
+    monkeypatch.setattr(combat, "MAIN_WORLD_DETECTOR", Detector())
+    monkeypatch.setattr(combat, "COMBAT_TIMEOUT_SECONDS", 0.3)
+    monkeypatch.setattr(combat, "check_stop_signal", lambda: False)
+    bus = FrameBus(capture_func=lambda: fight)
+
+    if detector_hit:
+        combat._watch_combat(bus, True, _Bar(), total_dungeons=1)
+    else:
+        with pytest.raises(TimeoutError):
+            combat._watch_combat(bus, True, _Bar(), total_dungeons=1)
@@ -0,0 +1,72 @@
+"""
+测试设备会话复用
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from device_session import DeviceSession, get_active_session
+
+
+class FakeConnection:
+    def __init__(self):
+        self.connected = True
+
+    def is_connected(self, emulator):
+        return self.connected
+
+
+class FakeDeviceManager:
+    created = []
+
+    def __init__(self):
+        self.emulator_manager = FakeConnection()
+        self.initialized_with = None
+        FakeDeviceManager.created.append(self)
+
+    def initialize(self, emulator_name=None, correction_map=None):
+        self.initialized_with = (emulator_name, correction_map)
+
+
+def _session(**kwargs):
+    FakeDeviceManager.created = []
+    return DeviceSession("127.0.0.1:5555", device_manager_factory=FakeDeviceManager, **kwargs)
+
+
+def test_reuses_initialized_device():
+    session = _session(correction_map={"梦魔": "梦魇"})
+
+    first = session.ensure_ready()
+    assert session.ensure_ready({"梦魔": "梦魇"}) is first
+    assert session.ensure_ready() is first
+
+    assert first.initialized_with == ("127.0.0.1:5555", {"梦魔": "梦魇"})
+    assert (session.initializations, session.reuses) == (1, 2)
+
+
+def test_reinitializes_when_disconnected_or_map_changes():
+    session = _session()
+
+    first = session.ensure_ready()
+    first.emulator_manager.connected = False
+    second = session.ensure_ready()
+    assert second is not first
+
+    third = session.ensure_ready({"a": "b"})
+    assert third is not second
+    assert third.initialized_with == ("127.0.0.1:5555", {"a": "b"})
+    assert session.initializations == 3
+
+
+def test_activate_scopes_session():
+    session = _session()
+    assert get_active_session() is None
+
+    with session.activate():
+        assert get_active_session() is session
+        assert get_active_session("127.0.0.1:5555") is session
+        assert get_active_session("127.0.0.1:5565") is None
+
+    assert get_active_session() is None
@@ -0,0 +1,152 @@
+"""
+测试副本名称坐标缓存
+"""
+
+import os
+import sys
+
+import cv2
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import auto_dungeon_navigation as navigation
+from auto_dungeon_container import get_container
+from dungeon_label_cache import DungeonLabelCache, HIT, MISS, REJECTED
+from frame_bus import FrameBus
+
+LABEL_BBOX = [[400, 600], [520, 600], [520, 640], [400, 640]]
+
+
+def _map_screen(seed=1, label_seed=7):
+    rng = np.random.default_rng(seed)
+    small = rng.integers(0, 255, size=(32, 18, 3), dtype=np.uint8)
+    screen = np.kron(small, np.ones((40, 40, 1), dtype=np.uint8))
+    label = np.random.default_rng(label_seed).integers(0, 255, size=(40, 120, 3), dtype=np.uint8)
+    screen[600:640, 400:520] = label
+    return screen
+
+
+@pytest.fixture
+def cache():
+    return DungeonLabelCache(path=None)
+
+
+def test_learned_location_is_returned(cache):
+    screen = _map_screen()
+    cache.learn("风暴群岛", "A1", screen, LABEL_BBOX)
+
+    assert cache.lookup("风暴群岛", "A1", screen) == (460, 620)
+    assert cache.stats == {HIT: 1}
+
+
+def test_other_map_view_misses(cache):
+    cache.learn("风暴群岛", "A1", _map_screen(), LABEL_BBOX)
+
+    assert cache.lookup("风暴群岛", "A1", _map_screen(seed=2)) is None
+    assert cache.lookup("军团领域", "A1", _map_screen()) is None
+    assert cache.stats == {MISS: 2}
+
+
+def test_changed_label_is_rejected(cache):
+    cache.learn("风暴群岛", "A1", _map_screen(), LABEL_BBOX)
+
+    assert cache.lookup("风暴群岛", "A1", _map_screen(label_seed=8)) is None
+    assert cache.stats == {REJECTED: 1}
+
+
+def test_center_scales_with_resolution(cache):
+    screen = _map_screen()
+    cache.learn("风暴群岛", "A1", screen, LABEL_BBOX)
+    half = cv2.resize(screen, (360, 640), interpolation=cv2.INTER_NEAREST)
+
+    assert cache.lookup("风暴群岛", "A1", half) == (230, 310)
+
+
+def test_persistence_roundtrip(tmp_path):
+    path = str(tmp_path / "locations.json")
+    DungeonLabelCache(path=path).learn("风暴群岛", "A1", _map_screen(), LABEL_BBOX)
+
+    loaded = DungeonLabelCache(path=path)
+
+    assert loaded.lookup("风暴群岛", "A1", _map_screen()) == (460, 620)
+
+
+def test_relearning_same_view_replaces_entry(cache):
+    cache.learn("风暴群岛", "A1", _map_screen(), LABEL_BBOX)
+    cache.learn("风暴群岛", "A1", _map_screen(), LABEL_BBOX, center=(450, 610))
+
+    assert cache.lookup("风暴群岛", "A1", _map_screen()) == (450, 610)
+
+
+@pytest.fixture
+def navigation_env(monkeypatch, cache):
+    container = get_container()
+    saved = container.frame_bus
+    frames = {"current": _map_screen()}
+    touches = []
+    ocr_calls = []
+
+    def touch(pos):
+        touches.append(pos)
+        if frames.get("after_touch") is not None:
+            frames["current"] = frames["after_touch"]
+
+    def ocr_click(*args, **kwargs):
+        ocr_calls.append(args[0])
+        return {"center": (460, 620), "bbox": LABEL_BBOX}
+
+    container.frame_bus = FrameBus(capture_func=lambda: frames["current"], default_max_age_ms=0)
+    monkeypatch.setattr(navigation, "get_dungeon_label_cache", lambda: cache)
+    monkeypatch.setattr(navigation, "touch", touch)
+    monkeypatch.setattr(navigation, "find_text_and_click_safe", ocr_click)
+    yield frames, touches, ocr_calls
+    container.frame_bus = saved
+
+
+def test_focus_uses_cached_location(navigation_env, cache):
+    frames, touches, ocr_calls = navigation_env
+    cache.learn("风暴群岛", "A1", frames["current"], LABEL_BBOX)
+    frames["after_touch"] = _map_screen(seed=3)
+
+    assert navigation.focus_and_click_dungeon("A1", "风暴群岛")
+    assert touches == [(460, 620)]
+    assert ocr_calls == []
+
+
+def test_focus_falls_back_to_ocr_when_click_has_no_effect(navigation_env, cache):
+    frames, touches, ocr_calls = navigation_env
+    cache.learn("风暴群岛", "A1", frames["current"], LABEL_BBOX)
+
+    assert navigation.focus_and_click_dungeon("A1", "风暴群岛")
+    assert touches == [(460, 620)]
+    assert ocr_calls == ["A1"]
+
+
+def test_processes_sharing_file_keep_each_others_entries(tmp_path):
+    path = str(tmp_path / "locations.json")
+    first = DungeonLabelCache(path=path, save_interval=0)
+    second = DungeonLabelCache(path=path, save_interval=0)
+
+    first.learn("风暴群岛", "A1", _map_screen(), LABEL_BBOX)
+    second.learn("军团领域", "B1", _map_screen(seed=2), LABEL_BBOX)
+    first.forget("风暴群岛", "A1")
+
+    loaded = DungeonLabelCache(path=path)
+    assert not loaded.has("风暴群岛", "A1")
+    assert loaded.has("军团领域", "B1")
+    assert first.has("军团领域", "B1")
+    assert sorted(os.listdir(tmp_path)) == ["locations.json", "locations.json.lock"]
+
+
+def test_saves_are_batched_until_flush(tmp_path):
+    path = str(tmp_path / "locations.json")
+    cache = DungeonLabelCache(path=path, save_interval=3600)
+
+    cache.learn("风暴群岛", "A1", _map_screen(), LABEL_BBOX)
+    cache.learn("风暴群岛", "A2", _map_screen(seed=2), LABEL_BBOX)
+    assert not DungeonLabelCache(path=path).has("风暴群岛", "A2")
+
+    cache.flush()
+    assert DungeonLabelCache(path=path).has("风暴群岛", "A2")
@@ -0,0 +1,150 @@
+"""
+测试副本遍历规划
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import auto_dungeon_state_machine
+from auto_dungeon_state_machine import DungeonStateMachine
+from database import DungeonProgressDB
+from dungeon_planner import (
+    DAILY_TASK_ZONE,
+    STEP_DUNGEON,
+    STEP_SELL,
+    load_step_timings,
+    plan_dungeons,
+)
+
+ZONES = {
+    "风暴群岛": [
+        {"name": "A1", "selected": True},
+        {"name": "A2", "selected": True},
+        {"name": "A3", "selected": False},
+    ],
+    DAILY_TASK_ZONE: [
+        {"name": "领取挂机奖励", "selected": True},
+    ],
+    "军团领域": [
+        {"name": "B1", "selected": True},
+        {"name": "B2", "selected": True},
+    ],
+}
+
+
+def _never_completed(zone_name, dungeon_name):
+    return False
+
+
+def _names(plan):
+    return [entry.dungeon_name for entry in plan]
+
+
+def test_daily_tasks_run_before_map_zones():
+    plan = plan_dungeons(ZONES, _never_completed)
+
+    assert _names(plan) == ["领取挂机奖励", "A1", "A2", "B1", "B2"]
+    assert plan.skipped_unselected == 1
+    assert plan.total == 6
+
+
+def test_current_zone_goes_first_without_switch():
+    plan = plan_dungeons(ZONES, _never_completed, current_zone="军团领域")
+
+    assert _names(plan)[1:3] == ["B1", "B2"]
+    assert plan.zone_switches == 3
+    assert [entry.switch_zone for entry in plan] == [False, False, True, True, True]
+
+
+def test_completed_dungeons_are_skipped():
+    plan = plan_dungeons(ZONES, lambda zone, name: name in ("A1", "B2"))
+
+    assert _names(plan) == ["领取挂机奖励", "A2", "B1"]
+    assert plan.skipped_completed == 2
+
+
+def test_sell_counts_only_loot_dungeons():
+    plan = plan_dungeons(ZONES, _never_completed, sell_every=3)
+
+    assert [entry.dungeon_name for entry in plan if entry.sell_after] == ["B1"]
+    assert plan.sell_trips == 1
+    assert plan_dungeons(ZONES, _never_completed, sell_every=0).sell_trips == 0
+
+
+def test_keep_map_only_within_zone():
+    plan = plan_dungeons(ZONES, _never_completed)
+
+    assert {entry.dungeon_name: entry.keep_map for entry in plan} == {
+        "领取挂机奖励": False,
+        "A1": True,
+        "A2": False,
+        "B1": True,
+        "B2": False,
+    }
+
+
+def test_estimate_uses_historical_timings():
+    default = plan_dungeons(ZONES, _never_completed)
+    slow = plan_dungeons(ZONES, _never_completed, timings={STEP_DUNGEON: 120.0})
+
+    assert slow.estimated_seconds - default.estimated_seconds == pytest.approx(4 * 60.0)
+
+
+def test_step_timings_roundtrip(tmp_path):
+    db = DungeonProgressDB(db_path=str(tmp_path / "progress.db"), config_name="test")
+    try:
+        db.record_step_timing(STEP_SELL, 10)
+        db.record_step_timing(STEP_SELL, 20)
+
+        assert load_step_timings(db) == {STEP_SELL: pytest.approx(15.0)}
+    finally:
+        db.close()
+
+
+def test_load_step_timings_tolerates_missing_data():
+    class Broken:
+        def get_step_timings(self, days=7):
+            raise RuntimeError("no table")
+
+    assert load_step_timings(Broken()) == {}
+
+
+@pytest.fixture
+def machine_calls(monkeypatch):
+    calls = []
+    module = auto_dungeon_state_machine
+    monkeypatch.setattr(module, "open_map", lambda: calls.append("open_map"))
+    monkeypatch.setattr(module, "back_to_main", lambda: calls.append("back"))
+    monkeypatch.setattr(module, "click_back", lambda: calls.append("click_back"))
+    monkeypatch.setattr(
+        module, "switch_to_zone", lambda zone: calls.append(f"switch:{zone}") or True
+    )
+    monkeypatch.setattr(module, "focus_and_click_dungeon", lambda *a, **k: True)
+    return calls
+
+
+def test_state_machine_switches_zone_again_after_battle(machine_calls):
+    machine = DungeonStateMachine()
+    machine.ensure_main()
+
+    assert machine.prepare_dungeon_state("风暴群岛", "A1")
+    machine.return_to_main_state()
+    assert machine.current_zone is None
+    assert machine.prepare_dungeon_state("风暴群岛", "A2")
+
+    assert machine_calls.count("switch:风暴群岛") == 2
+
+
+def test_state_machine_stays_on_map_after_closing_dialog(machine_calls):
+    machine = DungeonStateMachine()
+    machine.ensure_main()
+    machine.prepare_dungeon_state("风暴群岛", "A1")
+    machine_calls.clear()
+
+    assert machine.close_dungeon_state()
+    assert machine.prepare_dungeon_state("风暴群岛", "A2")
+    assert machine_calls == ["click_back", "open_map"]
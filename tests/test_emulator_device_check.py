@@ -20,8 +20,8 @@ class TestEmulatorDeviceCheck:
 
     @pytest.fixture
     def manager(self):
-        """创建 EmulatorConnectionManager 实例"""
-        return EmulatorConnectionManager()
+        """创建 EmulatorConnectionManager 实例（固定走 adb 命令，便于 mock subprocess）"""
+        return EmulatorConnectionManager(use_adb_server=False)
 
     @patch("subprocess.run")
     def test_get_adb_devices_success(self, mock_run, manager):
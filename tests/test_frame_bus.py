@@ -0,0 +1,138 @@
+"""Tests for the shared per-device frame bus."""
+
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from frame_bus import FrameBus, get_frame_bus, match_template, release_frame_bus, wait_template
+
+
+class CountingCapture:
+    def __init__(self, delay: float = 0.0):
+        self.calls = 0
+        self.delay = delay
+        self._lock = threading.Lock()
+
+    def __call__(self):
+        with self._lock:
+            self.calls += 1
+            value = self.calls
+        if self.delay:
+            time.sleep(self.delay)
+        return np.full((4, 4, 3), value, dtype=np.uint8)
+
+
+class FakeTemplate:
+    def __init__(self, hit_value: int):
+        self.hit_value = hit_value
+
+    def match_in(self, screen):
+        return (1, 1) if int(screen[0, 0, 0]) == self.hit_value else None
+
+
+def test_fresh_frame_is_shared_between_readers():
+    capture = CountingCapture()
+    bus = FrameBus(capture_func=capture, default_max_age_ms=10_000)
+
+    first = bus.get_frame()
+    second = bus.get_frame()
+
+    assert first is second
+    assert capture.calls == 1
+    assert bus.stats() == {"captures": 1, "reuses": 1}
+
+
+def test_stale_frame_triggers_new_capture():
+    capture = CountingCapture()
+    bus = FrameBus(capture_func=capture)
+
+    first = bus.get_frame()
+    second = bus.get_frame(max_age_ms=0)
+
+    assert second.seq == first.seq + 1
+    assert capture.calls == 2
+
+
+def test_newer_than_forces_next_frame():
+    capture = CountingCapture()
+    bus = FrameBus(capture_func=capture, default_max_age_ms=10_000)
+
+    first = bus.get_frame()
+    second = bus.get_frame(newer_than=first.seq)
+
+    assert second.seq > first.seq
+
+
+def test_concurrent_readers_share_single_capture():
+    capture = CountingCapture(delay=0.05)
+    bus = FrameBus(capture_func=capture, default_max_age_ms=10_000)
+    results = []
+
+    def reader():
+        results.append(bus.get_frame())
+
+    threads = [threading.Thread(target=reader) for _ in range(5)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert capture.calls == 1
+    assert len({frame.seq for frame in results}) == 1
+
+
+def test_capture_failure_returns_none():
+    def broken():
+        raise RuntimeError("adb gone")
+
+    bus = FrameBus(capture_func=broken)
+    assert bus.get_frame() is None
+    assert match_template(FakeTemplate(1), bus) is None
+
+
+def test_snapshot_writes_shared_frame(tmp_path):
+    bus = FrameBus(capture_func=CountingCapture(), default_max_age_ms=10_000)
+    target = tmp_path / "shot.png"
+
+    info = bus.snapshot(filename=str(target))
+
+    assert target.exists()
+    assert info["resolution"] == (4, 4)
+
+
+def test_wait_template_polls_newer_frames():
+    capture = CountingCapture()
+    bus = FrameBus(capture_func=capture, default_max_age_ms=10_000)
+
+    pos = wait_template(FakeTemplate(3), bus, timeout=1, interval=0)
+
+    assert pos == (1, 1)
+    assert capture.calls == 3
+
+
+def test_background_loop_publishes_frames():
+    capture = CountingCapture()
+    bus = FrameBus(capture_func=capture)
+    bus.start(interval=0.05)
+    try:
+        time.sleep(0.2)
+    finally:
+        bus.stop()
+
+    assert not bus.running
+    assert capture.calls >= 2
+
+
+def test_registry_returns_same_bus_per_device():
+    bus = get_frame_bus("test-device", capture_func=CountingCapture())
+    try:
+        assert get_frame_bus("test-device") is bus
+        assert get_frame_bus("other-device") is not bus
+    finally:
+        release_frame_bus("test-device")
+        release_frame_bus("other-device")
@@ -0,0 +1,136 @@
+"""
+测试画面稳定/变化等待
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import auto_dungeon_utils
+from auto_dungeon_container import get_container
+from auto_dungeon_utils import wait_for_change, wait_for_stable_frame
+from frame_bus import FrameBus, frame_difference
+
+DARK = np.full((1280, 720, 3), 30, dtype=np.uint8)
+BRIGHT = np.full((1280, 720, 3), 220, dtype=np.uint8)
+
+
+class Sequence:
+    """依次返回给定帧，用完后一直返回最后一帧"""
+
+    def __init__(self, *frames):
+        self.frames = list(frames)
+        self.calls = 0
+
+    def __call__(self):
+        frame = self.frames[min(self.calls, len(self.frames) - 1)]
+        self.calls += 1
+        return frame
+
+
+@pytest.fixture
+def use_bus():
+    container = get_container()
+    saved = container.frame_bus
+
+    def install(capture):
+        container.frame_bus = FrameBus(capture_func=capture, default_max_age_ms=0)
+        return container.frame_bus
+
+    yield install
+    container.frame_bus = saved
+
+
+def test_frame_difference():
+    assert frame_difference(DARK, DARK) == 0
+    assert frame_difference(DARK, BRIGHT) == pytest.approx(190, abs=1)
+
+
+def test_stable_frame_returns_early(use_bus):
+    use_bus(Sequence(BRIGHT, DARK))
+
+    start = time.monotonic()
+    assert wait_for_stable_frame(max_wait=3, interval=0.01)
+    assert time.monotonic() - start < 1
+
+
+def test_stable_frame_times_out_while_animating(use_bus):
+    capture = Sequence(*[(DARK, BRIGHT)[i % 2] for i in range(200)])
+    use_bus(capture)
+
+    assert not wait_for_stable_frame(max_wait=0.2, interval=0.01)
+    assert capture.calls > 2
+
+
+def test_wait_for_change_detects_transition(use_bus):
+    use_bus(Sequence(DARK, DARK, BRIGHT))
+
+    start = time.monotonic()
+    assert wait_for_change(DARK, max_wait=3, interval=0.01)
+    assert time.monotonic() - start < 1
+
+
+def test_wait_for_change_times_out(use_bus):
+    use_bus(Sequence(DARK))
+
+    assert not wait_for_change(DARK, max_wait=0.1, interval=0.01)
+
+
+def test_falls_back_to_sleep_without_frame_bus(monkeypatch, use_bus):
+    get_container().frame_bus = None
+    slept = []
+    monkeypatch.setattr(auto_dungeon_utils, "airtest_sleep", slept.append)
+
+    assert wait_for_stable_frame(max_wait=1.5)
+    assert wait_for_change(DARK, max_wait=0.5)
+    assert slept == [1.5, 0.5]
+
+
+def test_touch_invalidates_frames(monkeypatch, use_bus):
+    bus = use_bus(Sequence(DARK, BRIGHT))
+    bus.default_max_age_ms = 10_000
+    monkeypatch.setattr(auto_dungeon_utils, "airtest_touch", lambda pos: None)
+
+    assert bus.get_image() is DARK
+    auto_dungeon_utils.touch((1, 2))
+
+    assert bus.get_image() is BRIGHT
+
+
+def test_swipe_invalidates_frames(monkeypatch, use_bus):
+    bus = use_bus(Sequence(DARK, BRIGHT))
+    bus.default_max_age_ms = 10_000
+    monkeypatch.setattr(auto_dungeon_utils, "airtest_swipe", lambda start, end, **kw: None)
+
+    assert bus.get_image() is DARK
+    auto_dungeon_utils.swipe((1, 2), (3, 4))
+
+    assert bus.get_image() is BRIGHT
+
+
+def test_reference_frame_is_captured_fresh(use_bus):
+    """总线上残留的旧画面不能作为参考帧，否则点击还没生效就判定为已变化"""
+    bus = use_bus(Sequence(DARK))
+    bus.default_max_age_ms = 10_000
+    bus.publish(BRIGHT)
+
+    before = auto_dungeon_utils.current_frame()
+    start = time.monotonic()
+
+    assert before is DARK
+    assert not wait_for_change(before, max_wait=0.2, interval=0.01)
+    assert time.monotonic() - start >= 0.2
+
+
+def test_wait_for_change_settles_after_transition(use_bus):
+    capture = Sequence(DARK, BRIGHT, BRIGHT)
+    use_bus(capture)
+
+    start = time.monotonic()
+    assert wait_for_change(DARK, max_wait=3, interval=0.01)
+    assert time.monotonic() - start >= auto_dungeon_utils.FRAME_SETTLE_MIN_WAIT
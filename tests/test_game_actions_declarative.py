@@ -59,3 +59,78 @@ def test_find_all_delegation():
     mock_ocr.capture_and_get_all_texts.assert_called_with(use_cache=True, regions=[1,2])
     assert len(results) == 1
     assert results.first().text == "A"
+
+
+def test_find_passes_text_filter_to_ocr():
+    """测试 find 的 text_filter 参数透传给 OCRHelper"""
+    mock_ocr = MagicMock()
+    mock_ocr.capture_and_get_all_texts.return_value = [
+        {"text": "免费", "center": (5, 5), "confidence": 0.9}
+    ]
+
+    actions = GameActions(mock_ocr)
+    el = actions.find_text("免费", regions=[8], text_filter=False)
+
+    assert el.text == "免费"
+    mock_ocr.capture_and_get_all_texts.assert_called_with(
+        use_cache=True, regions=[8], text_filter=False
+    )
+
+    # 作用域结束后恢复默认值
+    actions.find_text("免费", regions=[8])
+    mock_ocr.capture_and_get_all_texts.assert_called_with(use_cache=True, regions=[8])
+
+
+def test_text_exists_passes_text_filter_to_ocr():
+    mock_ocr = MagicMock()
+    mock_ocr.capture_and_get_all_texts.return_value = []
+
+    actions = GameActions(mock_ocr)
+    assert not actions.text_exists(["免费"], regions=[8], text_filter=True)
+
+    mock_ocr.capture_and_get_all_texts.assert_called_with(
+        use_cache=True, regions=[8], text_filter=True
+    )
+
+
+def test_find_many_batches_queries_and_retries_pending():
+    """测试 find_many 每轮只调用一次批量识别，未找到的查询在下一轮继续"""
+    mock_ocr = MagicMock()
+    mock_ocr.capture_and_get_texts_for_region_groups.side_effect = [
+        [[{"text": "领取", "center": (600, 500), "confidence": 0.9}], []],
+        [[{"text": "上缴", "center": (360, 640), "confidence": 0.9}]],
+    ]
+
+    actions = GameActions(mock_ocr)
+    claim, donate = actions.find_many([("领取", [6]), ("上缴", [5])], timeout=2)
+
+    assert claim.center == (600, 500)
+    assert donate.center == (360, 640)
+    calls = mock_ocr.capture_and_get_texts_for_region_groups.call_args_list
+    assert [c.args[0] for c in calls] == [[[6], [5]], [[5]]]
+
+
+def test_find_many_returns_empty_elements_on_timeout():
+    mock_ocr = MagicMock()
+    mock_ocr.capture_and_get_texts_for_region_groups.return_value = [[], []]
+
+    actions = GameActions(mock_ocr)
+    results = actions.find_many([("领取", [6]), ("上缴", None)], timeout=0)
+
+    assert [bool(r) for r in results] == [False, False]
+    assert mock_ocr.capture_and_get_texts_for_region_groups.call_count == 1
+
+
+def test_timer_log_includes_ocr_skip_ratio(caplog):
+    mock_ocr = MagicMock()
+    mock_ocr.capture_and_get_all_texts.return_value = []
+    mock_ocr.ocr_skip_summary.return_value = "画面未变跳过 OCR 3/4 (75%)"
+
+    actions = GameActions(mock_ocr)
+    with caplog.at_level("DEBUG", logger="bottools.game_actions"):
+        actions.find_all()
+
+    assert "find_all 执行时间" in caplog.text
+    assert "画面未变跳过 OCR 3/4 (75%)" in caplog.text
+    before = mock_ocr.ocr_skip_snapshot.return_value
+    mock_ocr.ocr_skip_summary.assert_called_with(since=before)
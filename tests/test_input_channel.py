@@ -0,0 +1,169 @@
+"""
+测试设备输入通道
+"""
+
+import os
+import socket
+import socketserver
+import sys
+import threading
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import auto_dungeon_utils
+from adb_client import AdbClient, AdbError
+from auto_dungeon_container import get_container
+from input_channel import InputBatch, InputChannel, InputNotDelivered
+
+
+@pytest.fixture
+def fake_device():
+    """adb server + exec:sh：记录执行的命令，回显 echo 的内容"""
+    state = {"commands": [], "connections": 0}
+
+    class Handler(socketserver.StreamRequestHandler):
+        def read_request(self):
+            length = int(self.rfile.read(4), 16)
+            return self.rfile.read(length).decode()
+
+        def handle(self):
+            assert self.read_request() == "host:transport:emulator-5554"
+            self.wfile.write(b"OKAY")
+            assert self.read_request() == "exec:sh"
+            self.wfile.write(b"OKAY")
+            state["connections"] += 1
+            for line in self.rfile:
+                command = line.decode().strip()
+                if command.startswith("echo "):
+                    self.wfile.write(command[5:].encode() + b"\n")
+                else:
+                    state["commands"].append(command)
+
+    server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    state["client"] = AdbClient(port=server.server_address[1])
+    yield state
+    server.shutdown()
+    server.server_close()
+
+
+def test_batch_script():
+    batch = InputBatch().keyevent("BACK", times=3, interval=0.1).keyevent(4)
+
+    assert batch.commands == [
+        "input keyevent BACK",
+        "sleep 0.1",
+        "input keyevent BACK",
+        "sleep 0.1",
+        "input keyevent BACK",
+        "input keyevent 4",
+    ]
+    assert batch.duration == pytest.approx(0.2)
+    with pytest.raises(ValueError):
+        InputBatch().keyevent("BACK; reboot")
+
+
+def test_batches_share_one_connection(fake_device):
+    channel = InputChannel("emulator-5554", client=fake_device["client"])
+
+    channel.keyevent("BACK", times=2, interval=0.05)
+    channel.keyevent(4)
+
+    assert fake_device["commands"] == [
+        "input keyevent BACK",
+        "sleep 0.05",
+        "input keyevent BACK",
+        "input keyevent 4",
+    ]
+    assert fake_device["connections"] == 1
+    assert (channel.batches, channel.commands) == (2, 4)
+
+
+def test_unwaited_batches_are_drained(fake_device):
+    channel = InputChannel("emulator-5554", client=fake_device["client"])
+
+    channel.run(InputBatch().keyevent(1), wait=False)
+    channel.run(InputBatch().keyevent(2), wait=False)
+    channel.keyevent(3)
+
+    assert fake_device["commands"] == ["input keyevent 1", "input keyevent 2", "input keyevent 3"]
+
+
+def test_unavailable_server_raises():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    channel = InputChannel("emulator-5554", client=AdbClient(port=port))
+
+    with pytest.raises(InputNotDelivered):
+        channel.keyevent("BACK")
+
+
+@pytest.fixture
+def container():
+    container = get_container()
+    previous = container.input_channel
+    yield container
+    container.input_channel = previous
+
+
+@pytest.fixture
+def airtest_calls(monkeypatch):
+    calls = []
+    module = auto_dungeon_utils
+    monkeypatch.setattr(module, "airtest_touch", lambda pos: calls.append(("touch", pos)))
+    monkeypatch.setattr(module, "airtest_sleep", lambda s: calls.append(("sleep", s)))
+    monkeypatch.setattr(module, "airtest_keyevent", lambda k: calls.append(("key", k)))
+    return calls
+
+
+def test_press_key_uses_channel(fake_device, container, airtest_calls):
+    container.input_channel = InputChannel("emulator-5554", client=fake_device["client"])
+
+    auto_dungeon_utils.press_key("BACK")
+
+    assert fake_device["commands"] == ["input keyevent BACK"]
+    assert airtest_calls == []
+
+
+def test_tap_burst_always_uses_airtest(fake_device, container, airtest_calls):
+    container.input_channel = InputChannel("emulator-5554", client=fake_device["client"])
+
+    auto_dungeon_utils.tap_burst((5, 6), times=2, interval=0.1)
+
+    assert airtest_calls == [("touch", (5, 6)), ("sleep", 0.1), ("touch", (5, 6))]
+    assert fake_device["commands"] == []
+
+
+def test_press_key_falls_back_to_airtest(container, airtest_calls):
+    container.input_channel = None
+    auto_dungeon_utils.press_key("BACK")
+
+    assert airtest_calls == [("key", "BACK")]
+
+
+class FailingChannel:
+    def __init__(self, error):
+        self.error = error
+
+    def run(self, batch, wait=True):
+        raise self.error
+
+
+def test_undelivered_key_falls_back_to_airtest(container, airtest_calls):
+    container.input_channel = FailingChannel(InputNotDelivered("通道断开"))
+
+    auto_dungeon_utils.press_key("BACK")
+
+    assert airtest_calls == [("key", "BACK")]
+
+
+def test_delivered_key_is_not_resent(container, airtest_calls):
+    container.input_channel = FailingChannel(AdbError("等待输入完成超时"))
+
+    auto_dungeon_utils.press_key("BACK")
+
+    assert airtest_calls == []
@@ -0,0 +1,152 @@
+"""
+测试界面导航图与路由
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import auto_dungeon_daily
+from navigation_graph import (
+    SCREEN_CITY,
+    SCREEN_SHOP,
+    SCREEN_TREASURY,
+    NavigationGraph,
+    Router,
+)
+from screen_classifier import SCREEN_MAIN_WORLD, SCREEN_MAP
+
+
+class Recorder:
+    def __init__(self):
+        self.actions = []
+        self.failing = set()
+
+    def action(self, name):
+        def run():
+            self.actions.append(name)
+            return name not in self.failing
+
+        return run
+
+
+def _graph(recorder):
+    graph = NavigationGraph()
+    graph.add_edge(SCREEN_MAIN_WORLD, SCREEN_MAP, recorder.action("map"), 2.5)
+    graph.add_edge(SCREEN_MAIN_WORLD, SCREEN_CITY, recorder.action("主城"), 1.5)
+    graph.add_edge(SCREEN_CITY, SCREEN_SHOP, recorder.action("商店"), 1.5)
+    graph.add_edge(SCREEN_CITY, SCREEN_TREASURY, recorder.action("宝库"), 1.5)
+    for screen in (SCREEN_SHOP, SCREEN_TREASURY):
+        graph.add_edge(screen, SCREEN_CITY, recorder.action("back"), 1.0)
+    for screen in (SCREEN_CITY, SCREEN_MAP):
+        graph.add_edge(screen, SCREEN_MAIN_WORLD, recorder.action("back"), 1.0)
+    return graph
+
+
+@pytest.fixture
+def recorder():
+    return Recorder()
+
+
+@pytest.fixture
+def router(recorder):
+    return Router(_graph(recorder), reset=recorder.action("reset"))
+
+
+def test_shortest_path_prefers_cheapest_route(recorder):
+    graph = _graph(recorder)
+
+    path = graph.shortest_path(SCREEN_SHOP, SCREEN_TREASURY)
+
+    assert [edge.target for edge in path] == [SCREEN_CITY, SCREEN_TREASURY]
+    assert graph.shortest_path(SCREEN_MAP, SCREEN_MAP) == []
+
+
+def test_unknown_position_starts_from_home(router, recorder):
+    assert router.go_to(SCREEN_SHOP)
+
+    assert recorder.actions == ["reset", "主城", "商店"]
+
+
+def test_sibling_menu_skips_main_world(router, recorder):
+    router.go_to(SCREEN_SHOP)
+    recorder.actions.clear()
+
+    assert router.go_to(SCREEN_TREASURY)
+
+    assert recorder.actions == ["back", "宝库"]
+
+
+def test_failed_edge_replans_from_home(router, recorder):
+    router.mark(SCREEN_CITY)
+    recorder.failing.add("宝库")
+
+    assert router.go_to(SCREEN_TREASURY, max_replans=1) is False
+    assert recorder.actions == ["宝库", "reset", "主城", "宝库"]
+
+
+def test_measured_cost_updates_edge(router):
+    router.go_to(SCREEN_CITY)
+
+    assert router.costs()[f"{SCREEN_MAIN_WORLD}->{SCREEN_CITY}"] < 1.5
+
+
+def test_located_screen_overrides_belief(recorder):
+    router = Router(_graph(recorder), locate=lambda: SCREEN_MAP)
+    router.mark(SCREEN_SHOP)
+
+    assert router.go_to(SCREEN_MAP)
+    assert recorder.actions == []
+
+
+def test_compatible_belief_is_kept(recorder):
+    router = Router(
+        _graph(recorder),
+        locate=lambda: SCREEN_MAIN_WORLD,
+        compatible={SCREEN_MAIN_WORLD: {SCREEN_CITY}},
+    )
+    router.mark(SCREEN_CITY)
+
+    assert router.go_to(SCREEN_SHOP)
+    assert recorder.actions == ["商店"]
+
+
+def test_expired_belief_is_ignored(recorder):
+    router = Router(_graph(recorder), reset=recorder.action("reset"), belief_ttl=0)
+    router.mark(SCREEN_CITY)
+
+    router.go_to(SCREEN_SHOP)
+
+    assert recorder.actions[0] == "reset"
+
+
+def test_verifier_rejects_stale_target(recorder):
+    router = Router(
+        _graph(recorder),
+        reset=recorder.action("reset"),
+        verifiers={SCREEN_MAP: lambda: False},
+    )
+    router.mark(SCREEN_MAP)
+
+    assert router.go_to(SCREEN_MAP)
+    assert recorder.actions == ["reset", "map"]
+
+
+def test_daily_city_steps_share_the_city_hub(monkeypatch, router, recorder):
+    monkeypatch.setattr(auto_dungeon_daily, "touch", lambda *a, **k: None)
+    monkeypatch.setattr(auto_dungeon_daily, "sleep", lambda *a, **k: None)
+    monkeypatch.setattr(auto_dungeon_daily, "find_text_and_click", lambda *a, **k: True)
+    monkeypatch.setattr(auto_dungeon_daily, "find_text", lambda *a, **k: None)
+    manager = auto_dungeon_daily.DailyCollectManager(router=router)
+
+    manager._buy_market_items()
+    manager._open_chests("宝箱")
+
+    assert recorder.actions == [
+        "reset", "主城", "商店", "back",
+        "宝库", "back",
+        "宝库", "back",
+    ]
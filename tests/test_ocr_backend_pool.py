@@ -0,0 +1,159 @@
+"""
+测试 OCR 后端池的负载均衡、熔断和故障转移
+"""
+
+import json
+import os
+import socket
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ocr_backend_pool import (
+    CLOSED,
+    OPEN,
+    OCRBackendPool,
+    OCRBackendUnavailable,
+    health_url_for,
+)
+from ocr_client import OCRClient
+
+OK = {"errorCode": 0, "result": {"ocrResults": [{"prunedResult": {"rec_texts": []}}]}}
+
+
+def test_health_url_for():
+    assert health_url_for("http://10.0.0.2:8080/ocr") == "http://10.0.0.2:8080/health"
+
+
+def test_prefers_least_loaded_backend():
+    pool = OCRBackendPool(["http://a/ocr", "http://b/ocr"])
+
+    first = pool.acquire()
+    second = pool.acquire()
+    assert {first.url, second.url} == {"http://a/ocr", "http://b/ocr"}
+
+    # a 明显更慢：空闲时也优先分给 b
+    a, b = pool.backends
+    pool.release(first, 0.2, ok=True)
+    pool.release(second, 0.2, ok=True)
+    a.latency, b.latency = 0.25, 0.1
+    assert pool.acquire() is b
+    assert pool.acquire() is b
+    # b 有两个进行中的请求后（得分 3 × 0.1）轮到 a（1 × 0.25）
+    assert pool.acquire() is a
+
+
+def test_breaker_opens_and_recovers_after_health_check():
+    healthy = {"http://a/health": False}
+    pool = OCRBackendPool(
+        ["http://a/ocr", "http://b/ocr"],
+        failure_threshold=2,
+        cooldown=0.05,
+        health_check=lambda url: healthy.get(url, True),
+    )
+    a, b = pool.backends
+    a.latency = 0.01
+
+    for _ in range(2):
+        backend = pool.acquire()
+        assert backend is a
+        pool.release(backend, 1.0, ok=False)
+    assert a.state == OPEN
+
+    # 熔断期间只用 b
+    backend = pool.acquire()
+    assert backend is b
+    pool.release(backend, 0.1, ok=True)
+
+    # 冷却后探测仍不健康，继续熔断
+    time.sleep(0.06)
+    pool.release(pool.acquire(), 0.1, ok=True)
+    _wait_until(lambda: a.state == OPEN)
+
+    healthy["http://a/health"] = True
+    time.sleep(0.06)
+    pool.release(pool.acquire(), 0.1, ok=True)
+    _wait_until(lambda: a.state == CLOSED)
+    assert pool.acquire() is a
+
+
+def test_all_backends_open_fails_fast():
+    pool = OCRBackendPool(["http://a/ocr"], failure_threshold=1, cooldown=60)
+    pool.release(pool.acquire(), 1.0, ok=False)
+
+    with pytest.raises(OCRBackendUnavailable):
+        pool.acquire()
+
+
+def _wait_until(condition, timeout=1.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+@pytest.fixture
+def backend_server():
+    """按 state["status"] 返回；记录请求次数"""
+    state = {"status": 200, "calls": 0}
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def do_POST(self):
+            self.rfile.read(int(self.headers["Content-Length"]))
+            state["calls"] += 1
+            data = json.dumps(OK).encode() if state["status"] == 200 else b""
+            self.send_response(state["status"])
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    state["url"] = f"http://127.0.0.1:{httpd.server_address[1]}/ocr"
+    yield state
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def _dead_url():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    return f"http://127.0.0.1:{port}/ocr"
+
+
+def test_client_fails_over_to_healthy_backend(backend_server):
+    client = OCRClient([_dead_url(), backend_server["url"]], retries=0)
+    client.pool.backends[0].latency = 0.001  # 让死掉的后端先被选中
+    image = np.zeros((20, 20, 3), dtype=np.uint8)
+
+    for _ in range(4):
+        assert client.predict(image) == OK
+
+    stats = client.get_stats()
+    # 连续失败 3 次后熔断，第 4 次直接发给健康的后端
+    assert stats["failovers"] == 3
+    assert stats["failures"] == 0
+    assert [b["state"] for b in stats["backends"]] == [OPEN, CLOSED]
+    assert backend_server["calls"] == 4
+
+
+def test_client_does_not_fail_over_on_bad_request(backend_server):
+    backend_server["status"] = 400
+    client = OCRClient([backend_server["url"], backend_server["url"]], retries=0)
+
+    with pytest.raises(Exception):
+        client.predict(np.zeros((20, 20, 3), dtype=np.uint8))
+    assert backend_server["calls"] == 1
+    assert client.get_stats()["failovers"] == 0
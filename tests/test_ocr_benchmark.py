@@ -4,16 +4,26 @@
 测试 OCR API 性能基准测试功能
 """
 
+import json
 import os
 import sys
 from unittest.mock import MagicMock, Mock, patch
 
+import cv2
+import numpy as np
 import pytest
 
 # 添加父目录到路径
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from scripts.quick_test_ocr_api import benchmark_ocr, ocr_request_once
+from scripts.ocr_stub_server import OCRStubServer
+from scripts.quick_test_ocr_api import (
+    benchmark_ocr,
+    load_test_ocr,
+    ocr_request_once,
+    parse_region_mix,
+    percentile,
+)
 
 
 class TestOCRBenchmark:
@@ -214,5 +224,73 @@ class TestOCRBenchmark:
             assert call[0][0] == 0.5
 
 
+
+def _screen():
+    image = np.tile(np.linspace(20, 200, 320, dtype=np.uint8)[None, :, None], (240, 1, 3))
+    cv2.putText(image, "START", (100, 130), cv2.FONT_HERSHEY_SIMPLEX, 1.0, (255, 255, 255), 2)
+    return image
+
+
+class TestOCRLoadTest:
+    """测试并发压测模式（对本地替身服务）"""
+
+    def test_load_test_reports_percentiles(self, tmp_path):
+        """测试闭环压测的百分位、吞吐和 JSON 输出"""
+        image_path = tmp_path / "screen.png"
+        cv2.imwrite(str(image_path), np.tile(_screen(), (3, 3, 1)))
+        json_path = tmp_path / "result.json"
+
+        with OCRStubServer(latency=0.02, concurrency=2) as server:
+            result = load_test_ocr(
+                str(image_path),
+                url=server.url,
+                num_requests=20,
+                concurrency=4,
+                image_format="jpg",
+                per_emulator_rps=5,
+                json_path=str(json_path),
+                verbose=False,
+            )
+            assert server.stats["requests"] == 20
+
+        assert result["errors"] == 0
+        latency = result["latency_ms"]
+        assert 20 <= latency["p50"] <= latency["p95"] <= latency["p99"]
+        # 服务端同时只处理 2 个请求，每个 20ms：吞吐不超过 100 次/秒
+        assert 0 < result["throughput_rps"] <= 100
+        assert result["emulators_supported"] == int(result["throughput_rps"] // 5)
+        sizes = {name: stats["payload_bytes"] for name, stats in result["by_region"].items()}
+        assert sizes["tile"] < sizes["row"] < sizes["full"]
+        assert json.loads(json_path.read_text(encoding="utf-8"))["requests"] == 20
+
+    def test_load_test_fixed_rate_counts_errors(self, tmp_path):
+        """测试固定速率模式统计错误率"""
+        image_path = tmp_path / "screen.png"
+        cv2.imwrite(str(image_path), _screen())
+
+        with OCRStubServer(error_rate=1.0) as server:
+            result = load_test_ocr(
+                str(image_path),
+                url=server.url,
+                num_requests=5,
+                rate=100,
+                region_mix="tile",
+                verbose=False,
+            )
+
+        assert result["config"]["mode"] == "fixed-rate 100/s"
+        assert result["error_rate"] == 1.0
+        assert result["throughput_rps"] == 0
+        assert result["duration_s"] >= 0.04
+
+    def test_parse_region_mix(self):
+        """测试区域尺寸混合比例解析"""
+        assert parse_region_mix("full=1,tile=3") == {"full": 1.0, "tile": 3.0}
+        assert parse_region_mix("row") == {"row": 1.0}
+        with pytest.raises(ValueError):
+            parse_region_mix("huge=1")
+        assert percentile([5, 1, 3, 2, 4], 50) == 3
+        assert percentile([], 99) == 0.0
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
@@ -0,0 +1,130 @@
+"""
+测试 OCR 服务 HTTP 客户端
+"""
+
+import base64
+import json
+import os
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import cv2
+import numpy as np
+import pytest
+from requests.exceptions import HTTPError
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ocr_client import LatencyHistogram, OCRClient
+
+OK = {"errorCode": 0, "result": {"ocrResults": [{"prunedResult": {"rec_texts": ["好"]}}]}}
+
+
+@pytest.fixture
+def server():
+    """记录每个请求的客户端端口、Content-Type 和图像；state["fail"] 次返回 503"""
+    state = {"ports": [], "types": [], "images": [], "fail": 0}
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers["Content-Length"]))
+            state["ports"].append(self.client_address[1])
+            state["types"].append(self.headers["Content-Type"])
+            if state["fail"]:
+                state["fail"] -= 1
+                self.send_response(503)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            if self.headers["Content-Type"] == "application/json":
+                body = base64.b64decode(json.loads(body)["file"])
+            state["images"].append(cv2.imdecode(np.frombuffer(body, np.uint8), cv2.IMREAD_COLOR))
+            data = json.dumps(OK).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    state["url"] = f"http://127.0.0.1:{httpd.server_address[1]}/ocr"
+    yield state
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def _image():
+    image = np.full((200, 300, 3), 50, dtype=np.uint8)
+    cv2.putText(image, "OCR 123", (20, 110), cv2.FONT_HERSHEY_SIMPLEX, 1.5, (255, 255, 255), 3)
+    return image
+
+
+def test_requests_reuse_one_connection(server):
+    client = OCRClient(server["url"])
+
+    for _ in range(3):
+        assert client.predict(_image()) == OK
+
+    assert len(set(server["ports"])) == 1
+    assert client.get_stats()["requests"] == 3
+    assert client.latency.count == 3
+
+
+def test_lossy_formats_are_smaller(server):
+    # 带渐变和噪声的画面（接近游戏截图），纯色图 PNG 反而更小
+    rng = np.random.default_rng(0)
+    image = np.tile(np.linspace(0, 200, 300, dtype=np.uint8)[None, :, None], (200, 1, 3))
+    image = (image + rng.integers(0, 30, size=image.shape)).astype(np.uint8)
+    png = OCRClient(server["url"]).encode(image)
+    jpg = OCRClient(server["url"], image_format="jpg", quality=80).encode(image)
+
+    assert len(jpg) < len(png)
+    with pytest.raises(ValueError):
+        OCRClient(server["url"], image_format="bmp")
+
+
+def test_binary_upload(server):
+    client = OCRClient(server["url"], image_format="jpg", binary=True)
+
+    client.predict(_image())
+
+    assert server["types"] == ["image/jpeg"]
+    assert server["images"][0].shape == (200, 300, 3)
+
+
+def test_retries_unavailable_server(server):
+    server["fail"] = 2
+    client = OCRClient(server["url"], retries=2)
+
+    assert client.predict(_image()) == OK
+    assert len(server["types"]) == 3
+
+
+def test_gives_up_after_retries(server):
+    server["fail"] = 5
+    client = OCRClient(server["url"], retries=1)
+
+    with pytest.raises(HTTPError):
+        client.predict(_image())
+    assert client.get_stats()["failures"] == 1
+
+
+def test_latency_histogram_percentiles():
+    histogram = LatencyHistogram(buckets_ms=(10, 100, 1000))
+    for seconds in [0.005] * 8 + [0.05, 3.0]:
+        histogram.record(seconds)
+
+    assert histogram.percentile(50) == 10
+    assert histogram.percentile(90) == 100
+    assert histogram.percentile(100) == pytest.approx(3000)
+    snap = histogram.snapshot()
+    assert snap["buckets"] == {"<=10ms": 8, "<=100ms": 1, "<=1000ms": 0, ">1000ms": 1}
+    assert "p90≤100ms" in histogram.summary()
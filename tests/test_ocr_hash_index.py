@@ -0,0 +1,197 @@
+"""
+测试 OCR 缓存的内存哈希索引
+"""
+
+import os
+import random
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import ocr_client as ocr_client_module
+import ocr_helper as ocr_helper_module
+from ocr_hash_index import MultiIndexHash, OCRHashIndex, hamming
+from ocr_helper import OCRHelper
+from tile_change_detector import TileChangeDetector
+
+
+def test_multi_index_matches_brute_force():
+    rng = random.Random(3)
+    values = [rng.getrandbits(64) for _ in range(2000)]
+    # 加入一些相近的哈希
+    values += [values[0] ^ (1 << bit) for bit in range(8)]
+    table = MultiIndexHash()
+    for i, value in enumerate(values):
+        table.add(value, i)
+
+    query = values[0] ^ 0b101
+    expected = sorted(
+        (hamming(query, v), i) for i, v in enumerate(values) if hamming(query, v) <= 10
+    )
+
+    assert sorted(table.search(query, 10)) == expected
+    assert len(table) == len(values)
+
+
+def test_multi_index_remove_and_replace():
+    table = MultiIndexHash()
+    for i in range(100):
+        table.add(i, i)
+    for i in range(90):
+        assert table.remove(i)
+    table.add(1 << 63, 99)
+
+    assert not table.remove(0)
+    assert len(table) == 10
+    assert [key for _, key in table.search(95, 0)] == [95]
+    assert table.search(99, 0) == []
+
+
+def test_index_separates_regions_and_replaces_entries():
+    index = OCRHashIndex()
+    index.add("a", None, "ffff000000000000")
+    index.add("b", "[5]", "ffff000000000001")
+
+    assert index.nearest(None, "ffff000000000001", 2) == [(1, "a")]
+    assert index.nearest("[5]", "ffff000000000001", 2) == [(0, "b")]
+
+    index.add("a", "[5]", "ffff000000000000")
+    assert index.nearest(None, "ffff000000000000", 2) == []
+    assert len(index) == 2
+
+    assert index.remove_many(["a", "b", "c"]) == 2
+    assert len(index) == 0
+
+
+@pytest.fixture
+def fake_ocr_server(monkeypatch):
+    calls = []
+    payload = {
+        "errorCode": 0,
+        "result": {
+            "ocrResults": [
+                {
+                    "prunedResult": {
+                        "rec_texts": ["开始"],
+                        "rec_scores": [0.99],
+                        "dt_polys": [[[10, 10], [50, 10], [50, 30], [10, 30]]],
+                    }
+                }
+            ]
+        },
+    }
+
+    class FakeResponse:
+        status_code = 200
+
+        def raise_for_status(self):
+            return None
+
+        def json(self):
+            return payload
+
+    def fake_post(session, url, json=None, timeout=None, **kwargs):
+        calls.append(json)
+        return FakeResponse()
+
+    monkeypatch.setattr(ocr_client_module.requests.Session, "post", fake_post)
+    return calls
+
+
+def _make_helper(tmp_path, **kwargs):
+    """关闭画面未变复用，让每次查找都走缓存"""
+    helper = OCRHelper(output_dir=str(tmp_path / "ocr"), **kwargs)
+    helper.change_detector = TileChangeDetector(capacity=0)
+    return helper
+
+
+def _frame(seed, noise=0):
+    small = np.random.default_rng(seed).integers(0, 255, size=(16, 9, 3), dtype=np.uint8)
+    frame = np.kron(small, np.ones((50, 50, 1), dtype=np.uint8))
+    if noise:
+        frame[0, 0] = (frame[0, 0].astype(int) + noise) % 255
+    return frame
+
+
+def test_similar_frame_hits_index(tmp_path, fake_ocr_server):
+    helper = OCRHelper(output_dir=str(tmp_path / "ocr"))
+
+    helper.get_all_texts_from_frame(_frame(1))
+    helper.get_all_texts_from_frame(_frame(1, noise=7))
+    helper.get_all_texts_from_frame(_frame(2))
+
+    assert len(fake_ocr_server) == 2
+    # 每帧按 3x3 格子分别缓存
+    assert len(helper.hash_index) == 18
+
+
+def test_index_loaded_from_existing_cache(tmp_path, fake_ocr_server):
+    OCRHelper(output_dir=str(tmp_path / "ocr")).get_all_texts_from_frame(_frame(1))
+
+    helper = OCRHelper(output_dir=str(tmp_path / "ocr"))
+    assert len(helper.hash_index) == 9
+
+    helper.get_all_texts_from_frame(_frame(1, noise=7))
+    assert len(fake_ocr_server) == 1
+
+
+def test_eviction_keeps_index_in_sync(tmp_path, fake_ocr_server):
+    helper = OCRHelper(output_dir=str(tmp_path / "ocr"), max_cache_size=2)
+
+    for seed in range(15):
+        helper.get_all_texts_from_frame(_frame(seed))
+
+    with ocr_helper_module.sqlite3.connect(helper.cache_db_path) as conn:
+        rows = {row[0] for row in conn.execute("SELECT image_hash FROM ocr_cache")}
+    assert len(helper.hash_index) == len(rows)
+    assert all(image_hash in helper.hash_index for image_hash in rows)
+
+
+def _age_all_entries(helper, seconds):
+    with helper._cache_conn as conn:
+        conn.execute("UPDATE ocr_cache SET created_time = created_time - ?", (seconds,))
+
+
+def test_cache_stats_count_hits_and_misses(tmp_path, fake_ocr_server):
+    helper = _make_helper(tmp_path)
+
+    helper.get_all_texts_from_frame(_frame(1))
+    helper.get_all_texts_from_frame(_frame(1))
+    helper.get_all_texts_from_frame(_frame(1, noise=7))
+
+    # 每次查找 9 个格子；噪声只影响格子 1
+    stats = helper.get_cache_stats()
+    assert (stats["hits"], stats["similar_hits"], stats["misses"]) == (18, 1, 9)
+    assert stats["entries"] == 9
+    assert stats["hit_rate"] == pytest.approx(18 / 27, abs=0.001)
+
+
+def test_expired_entry_is_dropped_on_read(tmp_path, fake_ocr_server, monkeypatch):
+    monkeypatch.setattr(ocr_helper_module, "CACHE_SWEEP_INTERVAL", 10**9)
+    helper = _make_helper(tmp_path)
+    helper._last_sweep = ocr_helper_module.time.time()
+    helper.get_all_texts_from_frame(_frame(1))
+    _age_all_entries(helper, ocr_helper_module.CACHE_TTL_SECONDS + 1)
+
+    helper.get_all_texts_from_frame(_frame(1))
+
+    assert len(fake_ocr_server) == 2
+    assert helper.get_cache_stats()["expired"] == 9
+
+
+def test_lookup_does_not_sweep_synchronously(tmp_path, fake_ocr_server, monkeypatch):
+    helper = OCRHelper(output_dir=str(tmp_path / "ocr"))
+    sweeps = []
+    monkeypatch.setattr(helper, "_clean_expired_cache", lambda: sweeps.append(1) or 0)
+
+    for _ in range(5):
+        helper.get_all_texts_from_frame(_frame(1))
+    for _ in range(50):
+        if not helper._sweeping:
+            break
+        ocr_helper_module.time.sleep(0.01)
+
+    assert sweeps == [1]
@@ -0,0 +1,279 @@
+"""
+测试 OCRHelper 的内存帧路径（不落盘）
+"""
+
+import base64
+import os
+import sys
+
+import cv2
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import ocr_client as ocr_client_module
+import ocr_helper as ocr_helper_module
+from ocr_helper import OCRHelper
+
+
+class FakeResponse:
+    status_code = 200
+
+    def __init__(self, payload):
+        self._payload = payload
+
+    def raise_for_status(self):
+        return None
+
+    def json(self):
+        return self._payload
+
+
+def _paddle_response(texts):
+    """构造 PaddleX 3.0 格式的响应，texts 为 [(text, (x1, y1, x2, y2)), ...]"""
+    polys = [[[x1, y1], [x2, y1], [x2, y2], [x1, y2]] for _, (x1, y1, x2, y2) in texts]
+    return {
+        "errorCode": 0,
+        "result": {
+            "ocrResults": [
+                {
+                    "prunedResult": {
+                        "rec_texts": [text for text, _ in texts],
+                        "rec_scores": [0.99] * len(texts),
+                        "dt_polys": polys,
+                    }
+                }
+            ]
+        },
+    }
+
+
+@pytest.fixture
+def fake_ocr_server(monkeypatch):
+    calls = []
+    texts = [("开始", (10, 10, 50, 30)), ("开始", (10, 60, 50, 80)), ("取消", (60, 10, 100, 30))]
+
+    def fake_post(session, url, json=None, timeout=None, **kwargs):
+        calls.append(json)
+        return FakeResponse(_paddle_response(texts))
+
+    monkeypatch.setattr(ocr_client_module.requests.Session, "post", fake_post)
+    return calls
+
+
+@pytest.fixture
+def frame():
+    return np.full((900, 900, 3), 128, dtype=np.uint8)
+
+
+def _make_helper(tmp_path, frame, **kwargs):
+    return OCRHelper(output_dir=str(tmp_path / "ocr"), frame_func=lambda: frame, **kwargs)
+
+
+def test_region_offset_applied_to_frame_results(tmp_path, frame, fake_ocr_server):
+    helper = _make_helper(tmp_path, frame)
+
+    items = helper.get_all_texts_from_frame(frame, use_cache=False, regions=[5])
+
+    # 区域 5 是 3x3 网格中心，偏移量 (300, 300)
+    assert items[0]["center"] == (330, 320)
+    assert len(fake_ocr_server) == 1
+
+
+def test_find_text_in_frame_selects_occurrence(tmp_path, frame, fake_ocr_server):
+    helper = _make_helper(tmp_path, frame)
+
+    result = helper.find_text_in_frame(frame, "开始", occurrence=2, use_cache=False)
+
+    assert result["found"] is True
+    assert result["total_matches"] == 2
+    assert result["center"] == (30, 70)
+
+
+def test_capture_uses_frame_func_without_temp_files(tmp_path, frame, fake_ocr_server):
+    helper = _make_helper(tmp_path, frame)
+
+    texts = helper.capture_and_get_all_texts(use_cache=False)
+
+    assert [t["text"] for t in texts] == ["开始", "开始", "取消"]
+    assert os.listdir(helper.temp_dir) == []
+
+
+def test_cache_hit_skips_ocr_request(tmp_path, frame, fake_ocr_server):
+    helper = _make_helper(tmp_path, frame)
+
+    helper.capture_and_find_text("取消")
+    result = helper.capture_and_find_text("取消")
+
+    assert result["found"] is True
+    assert len(fake_ocr_server) == 1
+
+
+def test_dump_frames_writes_debug_images(tmp_path, frame, fake_ocr_server):
+    helper = _make_helper(tmp_path, frame, dump_frames=True)
+
+    helper.capture_and_get_all_texts(use_cache=False)
+
+    assert len(os.listdir(helper.debug_frames_dir)) == 1
+
+
+def test_capture_frame_without_frame_func_raises(tmp_path):
+    helper = OCRHelper(output_dir=str(tmp_path / "ocr"))
+
+    with pytest.raises(RuntimeError):
+        helper.capture_frame()
+
+
+@pytest.fixture
+def crop_server(monkeypatch):
+    """记录每次请求的图像尺寸，返回 state["texts"]"""
+    state = {"shapes": [], "texts": []}
+
+    def fake_post(session, url, json=None, timeout=None, **kwargs):
+        data = np.frombuffer(base64.b64decode(json["file"]), dtype=np.uint8)
+        state["shapes"].append(cv2.imdecode(data, cv2.IMREAD_COLOR).shape[:2])
+        return FakeResponse(_paddle_response(state["texts"]))
+
+    monkeypatch.setattr(ocr_client_module.requests.Session, "post", fake_post)
+    return state
+
+
+def _blocky_frame(seed=1):
+    small = np.random.default_rng(seed).integers(0, 255, size=(18, 18, 3), dtype=np.uint8)
+    return np.kron(small, np.ones((50, 50, 1), dtype=np.uint8))
+
+
+def test_only_changed_tile_is_recognized(tmp_path, crop_server):
+    frame = _blocky_frame()
+    helper = _make_helper(tmp_path, frame)
+    helper.get_all_texts_from_frame(frame, regions=[1, 9])
+
+    changed = frame.copy()
+    changed[300:600, 300:600] = _blocky_frame(seed=2)[300:600, 300:600]
+    helper.get_all_texts_from_frame(changed)
+
+    # 第一次整帧识别一次；第二次只识别格子 5（四周各多取 TILE_OCR_PADDING 像素）
+    padded = 300 + 2 * ocr_helper_module.TILE_OCR_PADDING
+    assert crop_server["shapes"] == [(900, 900), (padded, padded)]
+
+
+def test_tile_cache_keeps_positions_and_order(tmp_path, crop_server):
+    frame = _blocky_frame()
+    helper = _make_helper(tmp_path, frame)
+    crop_server["texts"] = [
+        ("右下", (700, 800, 760, 830)),
+        ("跨格子", (260, 100, 380, 130)),
+        ("左上", (10, 100, 60, 130)),
+    ]
+
+    first = helper.get_all_texts_from_frame(frame)
+    second = helper.get_all_texts_from_frame(frame)
+
+    assert len(crop_server["shapes"]) == 1
+    assert [t["text"] for t in first] == ["左上", "跨格子", "右下"]
+    assert [(t["text"], t["center"]) for t in second] == [(t["text"], t["center"]) for t in first]
+    assert first[1]["center"] == (320, 115)
+
+
+def test_region_request_uses_tile_cache(tmp_path, crop_server):
+    frame = _blocky_frame()
+    helper = _make_helper(tmp_path, frame)
+    crop_server["texts"] = [("确定", (620, 720, 680, 750))]
+    helper.get_all_texts_from_frame(frame)
+
+    result = helper.find_text_in_frame(frame, "确定", regions=[9])
+
+    assert result["found"] is True
+    assert result["center"] == (650, 735)
+    assert len(crop_server["shapes"]) == 1
+
+
+def test_region_groups_share_one_request(tmp_path, crop_server):
+    frame = _blocky_frame()
+    helper = _make_helper(tmp_path, frame)
+    # 坐标相对请求的裁剪区域（左上角为 (300, 300)）
+    crop_server["texts"] = [("领取", (320, 120, 380, 150)), ("上缴", (20, 120, 80, 150))]
+
+    claim, donate, bottom = helper.get_texts_for_region_groups(
+        frame, [[6], [5], [9]], use_cache=False
+    )
+
+    # 区域 5、6、9 的外接矩形为格子 5/6/8/9，只请求一次
+    assert crop_server["shapes"] == [(600, 600)]
+    assert [(t["text"], t["center"]) for t in claim] == [("领取", (650, 435))]
+    assert [(t["text"], t["center"]) for t in donate] == [("上缴", (350, 435))]
+    assert bottom == []
+
+
+def test_unchanged_frame_skips_ocr(tmp_path, crop_server):
+    frame = _blocky_frame()
+    helper = _make_helper(tmp_path, frame)
+    crop_server["texts"] = [("确定", (620, 720, 680, 750))]
+
+    for use_cache in (True, True, False, False):
+        assert helper.find_text_in_frame(frame, "确定", use_cache=use_cache)["found"]
+
+    # 缓存路径和非缓存路径各识别一次，其余两次画面未变直接复用
+    assert len(crop_server["shapes"]) == 2
+    assert helper.ocr_skip_stats == {"calls": 4, "skipped": 2, "no_text": 0}
+    assert helper.ocr_skip_summary() == "画面未变跳过 OCR 2/4 (50%)"
+
+    before = helper.ocr_skip_snapshot()
+    helper.get_all_texts_from_frame(frame)
+    assert helper.ocr_skip_summary(since=before) == "画面未变跳过 OCR 1/1 (100%)"
+
+
+def test_changed_frame_is_recognized_again(tmp_path, crop_server):
+    frame = _blocky_frame()
+    helper = _make_helper(tmp_path, frame)
+    helper.get_all_texts_from_frame(frame, use_cache=False)
+
+    helper.get_all_texts_from_frame(_blocky_frame(seed=2), use_cache=False)
+
+    assert len(crop_server["shapes"]) == 2
+    assert helper.ocr_skip_stats["skipped"] == 0
+
+
+def _text_frame():
+    """纯色底板，只有格子 5 里有一行字"""
+    frame = np.full((900, 900, 3), 40, dtype=np.uint8)
+    cv2.putText(frame, "Start", (360, 460), cv2.FONT_HERSHEY_SIMPLEX, 1.2, (255, 255, 255), 2)
+    return frame
+
+
+def test_text_filter_skips_blank_tiles(tmp_path, crop_server):
+    frame = _text_frame()
+    helper = _make_helper(tmp_path, frame, text_filter=True)
+
+    helper.get_all_texts_from_frame(frame)
+
+    padded = 300 + 2 * ocr_helper_module.TILE_OCR_PADDING
+    assert crop_server["shapes"] == [(padded, padded)]
+    assert helper.ocr_skip_stats["no_text"] == 8
+    assert helper.ocr_skip_summary().endswith("无文字区域跳过 8 个")
+    # 预判结果不写入缓存
+    assert helper.get_cache_stats()["entries"] == 1
+
+
+def test_text_filter_per_call_override(tmp_path, crop_server):
+    blank = np.full((900, 900, 3), 40, dtype=np.uint8)
+    helper = _make_helper(tmp_path, blank)
+
+    texts = helper.get_all_texts_from_frame(blank, use_cache=False, regions=[8], text_filter=True)
+    assert texts == []
+    assert crop_server["shapes"] == []
+
+    helper.get_all_texts_from_frame(blank, use_cache=False, regions=[7], text_filter=False)
+    assert len(crop_server["shapes"]) == 1
+
+
+def test_capture_and_find_text_passes_text_filter(tmp_path, crop_server):
+    blank = np.full((900, 900, 3), 40, dtype=np.uint8)
+    helper = _make_helper(tmp_path, blank, text_filter=True)
+
+    assert not helper.capture_and_find_text("开始", regions=[8])["found"]
+    assert crop_server["shapes"] == []
+
+    helper.capture_and_find_text("开始", regions=[8], text_filter=False)
+    assert crop_server["shapes"]
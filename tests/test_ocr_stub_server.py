@@ -0,0 +1,131 @@
+"""
+测试本地 OCR 替身服务
+"""
+
+import json
+import os
+import sys
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ocr_client import OCRClient
+from ocr_helper import OCRHelper
+from scripts.ocr_stub_server import OCRCorpus, OCRStubServer
+
+
+def _paddle(texts):
+    return {
+        "errorCode": 0,
+        "result": {
+            "ocrResults": [
+                {
+                    "prunedResult": {
+                        "rec_texts": [text for text, _ in texts],
+                        "rec_scores": [0.99] * len(texts),
+                        "dt_polys": [
+                            [[x1, y1], [x2, y1], [x2, y2], [x1, y2]]
+                            for _, (x1, y1, x2, y2) in texts
+                        ],
+                    }
+                }
+            ]
+        },
+    }
+
+
+def _screen(seed=0):
+    rng = np.random.default_rng(seed)
+    image = np.tile(np.linspace(20, 200, 320, dtype=np.uint8)[None, :, None], (240, 1, 3))
+    image[60:180, 80:240] = rng.integers(0, 255, size=3, dtype=np.uint8)
+    cv2.putText(image, "START", (100, 130), cv2.FONT_HERSHEY_SIMPLEX, 1.0, (255, 255, 255), 2)
+    return image
+
+
+@pytest.fixture
+def stub():
+    corpus = OCRCorpus()
+    corpus.add(_screen(), _paddle([("开始", (100, 100, 200, 140))]))
+    with OCRStubServer(corpus) as server:
+        yield server
+
+
+def _texts(response):
+    return response["result"]["ocrResults"][0]["prunedResult"]["rec_texts"]
+
+
+def test_health_endpoint(stub):
+    with urllib.request.urlopen(stub.health_url, timeout=5) as response:
+        assert response.status == 200
+        assert json.loads(response.read())["errorMsg"] == "Healthy"
+
+
+def test_answers_from_corpus(stub):
+    png = OCRClient(stub.url)
+    jpg = OCRClient(stub.url, image_format="jpg", quality=70, binary=True)
+
+    assert _texts(png.predict(_screen())) == ["开始"]
+    assert _texts(jpg.predict(_screen())) == ["开始"]
+    assert _texts(png.predict(np.zeros((240, 320, 3), dtype=np.uint8))) == []
+    assert (stub.stats["exact"], stub.stats["similar"], stub.stats["miss"]) == (1, 1, 1)
+
+
+def test_error_injection(stub):
+    stub.error_rate = 1.0
+    client = OCRClient(stub.url, retries=0)
+
+    with pytest.raises(Exception):
+        client.predict(_screen())
+    assert stub.stats["errors"] == 1
+
+
+def test_concurrency_limit_queues_requests():
+    with OCRStubServer(latency=0.05, concurrency=1) as server:
+        client = OCRClient(server.url)
+        start = time.monotonic()
+        with ThreadPoolExecutor(4) as pool:
+            list(pool.map(lambda _: client.predict(_screen()), range(4)))
+        assert time.monotonic() - start >= 0.2
+
+
+def test_records_misses_from_upstream(stub, tmp_path):
+    corpus_path = tmp_path / "corpus.jsonl"
+    with OCRStubServer(OCRCorpus(corpus_path), record_from=stub.url) as recorder:
+        client = OCRClient(recorder.url, image_format="jpg", binary=True)
+        assert _texts(client.predict(_screen())) == ["开始"]
+        assert recorder.stats["recorded"] == 1
+
+    replay = OCRCorpus(corpus_path)
+    assert len(replay) == 1
+    assert replay.lookup(_screen())[1] == "similar"
+
+
+def test_drives_ocr_helper(stub, tmp_path):
+    helper = OCRHelper(output_dir=str(tmp_path / "ocr"), ocr_client=OCRClient(stub.url))
+    frame = _screen()
+
+    result = helper.find_text_in_frame(frame, "开始", use_cache=False)
+
+    assert result["found"]
+    assert result["center"] == (150, 120)
+
+
+def test_drives_quick_test_benchmark(stub, tmp_path, capsys, monkeypatch):
+    import ocr_client
+    from scripts import quick_test_ocr_api
+
+    # 有的测试会把 sys.modules["requests"] 换成 Mock，这里确保用真实的 requests
+    monkeypatch.setattr(quick_test_ocr_api, "requests", ocr_client.requests)
+    image_path = tmp_path / "screen.png"
+    cv2.imwrite(str(image_path), _screen())
+
+    quick_test_ocr_api.benchmark_ocr(str(image_path), url=stub.url, num_requests=3, interval=0)
+
+    assert "成功: 3 (100.0%)" in capsys.readouterr().out
+    assert stub.stats["exact"] == 3
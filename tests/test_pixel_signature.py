@@ -0,0 +1,141 @@
+"""
+测试像素签名检测器
+"""
+
+import os
+import sys
+
+import cv2
+import numpy as np
+import pytest
+from airtest.core.cv import Template
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pixel_signature
+from pixel_signature import (
+    PixelSignature,
+    SignatureDetector,
+    learn_from_template,
+    learn_signature,
+    load_signatures,
+    save_signatures,
+)
+
+
+def _make_screen(with_button=True):
+    screen = np.zeros((1280, 720, 3), dtype=np.uint8)
+    if with_button:
+        rng = np.random.default_rng(7)
+        screen[300:340, 570:630] = rng.integers(0, 255, size=(40, 60, 3), dtype=np.uint8)
+    return screen
+
+
+class CountingTemplate:
+    """只记录调用次数的模板替身"""
+
+    def __init__(self, hit, filename="images/gifts_button.png"):
+        self.hit = hit
+        self.filename = filename
+        self.record_pos = None
+        self.calls = 0
+
+    def match_in(self, screen):
+        self.calls += 1
+        return (600, 320) if self.hit else None
+
+
+@pytest.fixture
+def signature():
+    return learn_signature("gifts_button", _make_screen(), (570, 300, 60, 40), count=9)
+
+
+def test_learned_signature_matches_reference(signature):
+    assert len(signature.points) == 9
+    assert signature.matches(_make_screen())
+    assert not signature.matches(_make_screen(with_button=False))
+
+
+def test_signature_scales_to_other_resolution(signature):
+    screen = _make_screen()
+    half = cv2.resize(screen, (360, 640), interpolation=cv2.INTER_NEAREST)
+
+    assert signature.matches(half)
+
+
+def test_signature_roundtrip(tmp_path, signature):
+    path = str(tmp_path / "signatures.json")
+    save_signatures([signature], path)
+
+    loaded = load_signatures(path)["gifts_button"]
+
+    assert loaded.points == signature.points
+    assert loaded.matches(_make_screen())
+
+
+def test_learn_from_template_locates_button(tmp_path):
+    screen = _make_screen()
+    tpl_path = tmp_path / "gifts_button.png"
+    cv2.imwrite(str(tpl_path), screen[300:340, 570:630])
+    template = Template(str(tpl_path), resolution=(720, 1280))
+
+    learned = learn_from_template(screen, template)
+
+    assert learned.name == "gifts_button"
+    assert all(570 <= x < 630 and 300 <= y < 340 for x, y in learned.points)
+
+
+def test_detector_without_signature_uses_template():
+    template = CountingTemplate(hit=True)
+    detector = SignatureDetector(template, signatures_file=None)
+
+    assert detector.detect(_make_screen()) == (600, 320)
+    assert template.calls == 1
+
+
+def test_detector_signature_miss_skips_template(signature):
+    template = CountingTemplate(hit=True)
+    detector = SignatureDetector(template, signature=signature, fallback_every=0)
+
+    assert detector.detect(_make_screen(with_button=False), final=False) is None
+    assert template.calls == 0
+    assert detector.stats == {pixel_signature.PATH_MISS: 1}
+
+
+def test_detector_verifies_signature_hit(signature):
+    template = CountingTemplate(hit=False)
+    detector = SignatureDetector(template, signature=signature)
+
+    assert detector.detect(_make_screen()) is None
+    assert detector.stats == {pixel_signature.PATH_REJECTED: 1}
+
+
+def test_detector_without_verify_trusts_signature(signature):
+    template = CountingTemplate(hit=False)
+    detector = SignatureDetector(template, signature=signature, verify=False)
+
+    assert detector.detect(_make_screen()) == signature.center
+    assert template.calls == 0
+
+
+def test_detector_falls_back_to_template_periodically(signature):
+    template = CountingTemplate(hit=True)
+    detector = SignatureDetector(template, signature=signature, fallback_every=3)
+    blank = _make_screen(with_button=False)
+
+    results = [detector.detect(blank, final=False) for _ in range(3)]
+
+    assert results == [None, None, (600, 320)]
+    assert template.calls == 1
+
+
+def test_signature_requires_min_ratio():
+    signature = PixelSignature(
+        name="x",
+        points=[(0, 0), (1, 0)],
+        colors=[(255, 255, 255), (0, 0, 0)],
+        min_ratio=0.5,
+    )
+    image = np.zeros((1280, 720, 3), dtype=np.uint8)
+
+    assert signature.matches(image)
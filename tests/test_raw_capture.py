@@ -0,0 +1,127 @@
+"""
+测试原始帧缓冲截图
+"""
+
+import json
+import os
+import struct
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from adb_client import AdbError
+from raw_capture import (
+    CAPTURE_AIRTEST,
+    CAPTURE_RAW,
+    RawScreencap,
+    decode_raw_screencap,
+    load_capture_method,
+)
+
+
+def _screencap(rgba, colorspace=True, pixel_format=1):
+    height, width = rgba.shape[:2]
+    header = struct.pack("<III", width, height, pixel_format)
+    if colorspace:
+        header += struct.pack("<I", 1)
+    return header + rgba.tobytes()
+
+
+def _rgba(height=6, width=8):
+    rng = np.random.default_rng(0)
+    return rng.integers(0, 256, size=(height, width, 4), dtype=np.uint8)
+
+
+@pytest.mark.parametrize("colorspace", [True, False])
+def test_decode_rgba_to_bgr(colorspace):
+    rgba = _rgba()
+
+    image = decode_raw_screencap(_screencap(rgba, colorspace))
+
+    assert image.shape == (6, 8, 3)
+    np.testing.assert_array_equal(image, rgba[:, :, 2::-1])
+
+
+def test_decode_downsample():
+    rgba = _rgba()
+
+    image = decode_raw_screencap(_screencap(rgba), downsample=2)
+
+    assert image.shape == (3, 4, 3)
+    np.testing.assert_array_equal(image, rgba[::2, ::2, 2::-1])
+
+
+def test_decode_rejects_bad_data():
+    data = _screencap(_rgba())
+    with pytest.raises(ValueError):
+        decode_raw_screencap(data[:-1])
+    with pytest.raises(ValueError):
+        decode_raw_screencap(_screencap(_rgba(), pixel_format=4))
+
+
+class FakeClient:
+    def __init__(self, data=None):
+        self.data = data
+        self.calls = []
+
+    def exec_out(self, serial, command, timeout=10.0):
+        self.calls.append((serial, command))
+        if self.data is None:
+            raise AdbError("device offline")
+        return self.data
+
+
+def test_raw_screencap_uses_exec_out():
+    rgba = _rgba()
+    client = FakeClient(_screencap(rgba))
+
+    image = RawScreencap("emulator-5554", client=client)()
+
+    assert client.calls == [("emulator-5554", "screencap")]
+    assert image.shape == (6, 8, 3)
+
+
+def test_raw_screencap_falls_back():
+    fallback_image = np.zeros((2, 2, 3), dtype=np.uint8)
+    capture = RawScreencap("emulator-5554", client=FakeClient(), fallback=lambda: fallback_image)
+
+    assert capture() is fallback_image
+    assert capture.failures == 1
+    with pytest.raises(AdbError):
+        RawScreencap("emulator-5554", client=FakeClient())()
+
+
+def test_load_capture_method(tmp_path, monkeypatch):
+    monkeypatch.delenv("CAPTURE_METHOD", raising=False)
+    path = tmp_path / "emulators.json"
+    path.write_text(
+        json.dumps(
+            {
+                "sessions": [
+                    {"emulator": "127.0.0.1:5555", "capture_method": "raw"},
+                    {"emulator": "127.0.0.1:5565", "capture_method": "minicap"},
+                ]
+            }
+        ),
+        encoding="utf-8",
+    )
+
+    assert load_capture_method("127.0.0.1:5555", str(path)) == CAPTURE_RAW
+    assert load_capture_method("127.0.0.1:5565", str(path)) == CAPTURE_AIRTEST
+    assert load_capture_method("127.0.0.1:5575", str(path)) == CAPTURE_AIRTEST
+    assert load_capture_method("127.0.0.1:5555", str(tmp_path / "missing.json")) == CAPTURE_AIRTEST
+
+    monkeypatch.setenv("CAPTURE_METHOD", "airtest")
+    assert load_capture_method("127.0.0.1:5555", str(path)) == CAPTURE_AIRTEST
+
+
+def test_benchmark_capture_reports_timings():
+    from scripts.benchmark_capture import benchmark_capture
+
+    stats = benchmark_capture("raw", lambda: decode_raw_screencap(_screencap(_rgba())), count=3)
+
+    assert stats["shape"] == (6, 8, 3)
+    assert 0 <= stats["min_ms"] <= stats["median_ms"] <= stats["max_ms"]
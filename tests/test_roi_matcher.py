@@ -0,0 +1,108 @@
+"""
+测试基于 record_pos 的区域模板匹配
+"""
+
+import os
+import sys
+
+import cv2
+import numpy as np
+import pytest
+from airtest.core.cv import Predictor, Template
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import roi_matcher
+
+SCREEN_W, SCREEN_H = 720, 1280
+
+
+def _make_patch():
+    rng = np.random.default_rng(42)
+    return rng.integers(0, 255, size=(40, 60, 3), dtype=np.uint8)
+
+
+def _screen_with_patch(patch, center):
+    screen = np.zeros((SCREEN_H, SCREEN_W, 3), dtype=np.uint8)
+    h, w = patch.shape[:2]
+    x0, y0 = center[0] - w // 2, center[1] - h // 2
+    screen[y0 : y0 + h, x0 : x0 + w] = patch
+    return screen
+
+
+@pytest.fixture(autouse=True)
+def _reset_stats():
+    roi_matcher.reset_stats()
+    yield
+    roi_matcher.reset_stats()
+
+
+@pytest.fixture
+def patch():
+    return _make_patch()
+
+
+@pytest.fixture
+def template(tmp_path, patch):
+    path = tmp_path / "button.png"
+    cv2.imwrite(str(path), patch)
+    record_pos = Predictor.count_record_pos((600, 300), (SCREEN_W, SCREEN_H))
+    return Template(str(path), record_pos=record_pos, resolution=(SCREEN_W, SCREEN_H))
+
+
+def test_predict_area_surrounds_record_pos(template):
+    screen = np.zeros((SCREEN_H, SCREEN_W, 3), dtype=np.uint8)
+
+    x_min, y_min, x_max, y_max = roi_matcher.predict_area(template, screen, margin=20)
+
+    assert x_min <= 600 <= x_max
+    assert y_min <= 300 <= y_max
+    assert x_max - x_min < SCREEN_W / 2
+
+
+def test_match_hits_inside_roi(template, patch):
+    screen = _screen_with_patch(patch, (600, 300))
+
+    result = roi_matcher.match(template, screen, margin=20)
+
+    assert result.path == roi_matcher.PATH_ROI
+    assert abs(result.pos[0] - 600) <= 1 and abs(result.pos[1] - 300) <= 1
+
+
+def test_match_falls_back_to_full_frame(template, patch):
+    screen = _screen_with_patch(patch, (100, 1000))
+
+    result = roi_matcher.match(template, screen, margin=20)
+
+    assert result.path == roi_matcher.PATH_FULL
+    assert abs(result.pos[0] - 100) <= 1 and abs(result.pos[1] - 1000) <= 1
+
+
+def test_match_without_fallback_reports_miss(template, patch):
+    screen = _screen_with_patch(patch, (100, 1000))
+
+    result = roi_matcher.match(template, screen, margin=20, fallback=False)
+
+    assert not result
+    assert result.path == roi_matcher.PATH_MISS
+
+
+def test_template_without_record_pos_uses_full_frame(tmp_path, patch):
+    path = tmp_path / "plain.png"
+    cv2.imwrite(str(path), patch)
+    plain = Template(str(path), resolution=(SCREEN_W, SCREEN_H))
+    screen = _screen_with_patch(patch, (360, 640))
+
+    result = roi_matcher.match(plain, screen)
+
+    assert result.path == roi_matcher.PATH_FULL
+
+
+def test_stats_count_paths_per_template(template, patch):
+    screen = _screen_with_patch(patch, (600, 300))
+    roi_matcher.match(template, screen, margin=20)
+    roi_matcher.match(template, np.zeros_like(screen), margin=20, fallback=False)
+
+    stats = roi_matcher.get_stats()[template.filename]
+
+    assert stats == {"roi": 1, "full": 0, "miss": 1}
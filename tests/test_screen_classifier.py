@@ -0,0 +1,159 @@
+"""
+测试界面识别器
+"""
+
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import auto_dungeon_navigation as navigation
+from auto_dungeon_container import get_container
+from frame_bus import FrameBus
+from screen_classifier import (
+    SCREEN_BATTLE,
+    SCREEN_MAIN_WORLD,
+    SCREEN_MAP,
+    SCREEN_UNKNOWN,
+    ScreenClassifier,
+)
+
+
+def _screen(seed):
+    rng = np.random.default_rng(seed)
+    small = rng.integers(0, 255, size=(32, 18, 3), dtype=np.uint8)
+    return np.kron(small, np.ones((40, 40, 1), dtype=np.uint8))
+
+
+def _noisy(image, seed=0, amount=8):
+    rng = np.random.default_rng(seed)
+    noise = rng.integers(-amount, amount, size=image.shape)
+    return np.clip(image.astype(np.int16) + noise, 0, 255).astype(np.uint8)
+
+
+@pytest.fixture
+def classifier():
+    clf = ScreenClassifier()
+    clf.add(SCREEN_MAIN_WORLD, _screen(1))
+    clf.add(SCREEN_MAP, _screen(2))
+    clf.add(SCREEN_BATTLE, _screen(3))
+    return clf
+
+
+def test_classify_known_screens(classifier):
+    assert classifier.classify(_noisy(_screen(1))).screen == SCREEN_MAIN_WORLD
+    assert classifier.classify(_noisy(_screen(2))).screen == SCREEN_MAP
+
+
+def test_unfamiliar_screen_is_unknown(classifier):
+    result = classifier.classify(_screen(99))
+
+    assert result.screen == SCREEN_UNKNOWN
+    assert not result.known
+
+
+def test_empty_library_is_unknown():
+    assert ScreenClassifier().classify(_screen(1)).screen == SCREEN_UNKNOWN
+
+
+def test_observe_adds_reference_only_when_needed(classifier):
+    assert classifier.observe(SCREEN_MAIN_WORLD, _screen(1)) is False
+    assert classifier.observe(SCREEN_MAIN_WORLD, _screen(50)) is True
+    assert classifier.classify(_screen(50)).screen == SCREEN_MAIN_WORLD
+
+
+def test_references_are_capped_per_screen():
+    clf = ScreenClassifier(max_refs_per_screen=2)
+    for seed in range(5):
+        clf.add(SCREEN_MAP, _screen(seed))
+
+    assert clf.screens() == {SCREEN_MAP: 2}
+
+
+def test_save_and_load_roundtrip(tmp_path, classifier):
+    path = str(tmp_path / "library.npz")
+    classifier.save(path)
+
+    loaded = ScreenClassifier()
+    assert loaded.load(path) == 3
+    assert loaded.classify(_screen(3)).screen == SCREEN_BATTLE
+
+
+class CountingDetector:
+    def __init__(self, hit):
+        self.hit = hit
+        self.calls = 0
+
+    def detect(self, image, final=True):
+        self.calls += 1
+        return (1, 1) if self.hit else None
+
+    __call__ = detect
+
+
+@pytest.fixture
+def navigation_env(monkeypatch, classifier):
+    container = get_container()
+    saved = (container.frame_bus, container.screen_classifier)
+
+    def use_screen(image):
+        container.frame_bus = FrameBus(capture_func=lambda: image, default_max_age_ms=10_000)
+
+    container.screen_classifier = classifier
+    yield use_screen
+    container.frame_bus, container.screen_classifier = saved
+
+
+def test_single_screen_library_is_unknown():
+    clf = ScreenClassifier()
+    clf.add(SCREEN_MAIN_WORLD, _screen(1))
+
+    assert clf.classify(_noisy(_screen(1))).screen == SCREEN_UNKNOWN
+
+
+def test_classifier_positive_needs_detector(monkeypatch, navigation_env):
+    detector = CountingDetector(hit=False)
+    monkeypatch.setattr(navigation, "MAIN_WORLD_DETECTOR", detector)
+    monkeypatch.setitem(navigation.SCREEN_DETECTORS, SCREEN_MAIN_WORLD, detector)
+    navigation_env(_screen(1))
+
+    assert navigation.is_main_world() is False
+    assert navigation.current_screen() == SCREEN_UNKNOWN
+    assert detector.calls >= 2
+
+
+def test_classifier_skips_detector_on_other_screen_until_final(monkeypatch, navigation_env):
+    detector = CountingDetector(hit=True)
+    check = navigation._screen_check(SCREEN_MAIN_WORLD, detector)
+
+    assert check(_screen(3), final=False) is None
+    assert detector.calls == 0
+    assert check(_screen(3), final=True) == (1, 1)
+
+
+def test_is_main_world_checks_once_on_other_known_screen(monkeypatch, navigation_env):
+    detector = CountingDetector(hit=False)
+    monkeypatch.setattr(navigation, "MAIN_WORLD_DETECTOR", detector)
+    navigation_env(_screen(3))
+
+    assert navigation.is_main_world() is False
+    assert detector.calls == 1
+
+
+def test_is_main_world_learns_matched_frame(monkeypatch, navigation_env, classifier):
+    class PublishingDetector(CountingDetector):
+        """命中的同时总线上到达了新帧"""
+
+        def detect(self, image, final=True):
+            get_container().frame_bus.publish(_screen(78))
+            return super().detect(image, final)
+
+    monkeypatch.setattr(navigation, "MAIN_WORLD_DETECTOR", PublishingDetector(hit=True))
+    navigation_env(_screen(77))
+
+    assert navigation.is_main_world() is True
+    assert classifier.classify(_screen(77)).screen == SCREEN_MAIN_WORLD
+    assert classifier.classify(_screen(78)).screen == SCREEN_UNKNOWN
@@ -0,0 +1,44 @@
+"""
+测试文字存在性预判
+"""
+
+import os
+import sys
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from text_presence import glyph_count, may_contain_text
+
+
+def _panel(value=60):
+    return np.full((300, 300, 3), value, dtype=np.uint8)
+
+
+def test_blank_and_gradient_have_no_text():
+    gradient = np.tile(np.linspace(0, 255, 300, dtype=np.uint8), (300, 1))
+    gradient = cv2.cvtColor(gradient, cv2.COLOR_GRAY2BGR)
+
+    assert not may_contain_text(_panel())
+    assert not may_contain_text(_panel(0))
+    assert not may_contain_text(gradient)
+    assert not may_contain_text(np.zeros((0, 0, 3), dtype=np.uint8))
+
+
+def test_frame_lines_are_not_glyphs():
+    image = _panel()
+    cv2.rectangle(image, (5, 5), (294, 294), (200, 200, 200), 2)
+    cv2.line(image, (5, 150), (294, 150), (200, 200, 200), 1)
+
+    assert glyph_count(image) == 0
+
+
+def test_text_is_detected():
+    image = _panel()
+    cv2.putText(image, "OK", (100, 160), cv2.FONT_HERSHEY_SIMPLEX, 1.0, (255, 255, 255), 2)
+
+    assert glyph_count(image) >= 1
+    assert may_contain_text(image)
+    assert may_contain_text(cv2.cvtColor(image, cv2.COLOR_BGR2GRAY))
@@ -0,0 +1,51 @@
+"""
+测试格子变化检测
+"""
+
+import os
+import sys
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tile_change_detector import TileChangeDetector
+
+
+def _tile(text="12"):
+    tile = np.full((300, 240, 3), 40, dtype=np.uint8)
+    cv2.putText(tile, text, (60, 160), cv2.FONT_HERSHEY_SIMPLEX, 1.5, (255, 255, 255), 3)
+    return tile
+
+
+def test_unchanged_tile_returns_previous_result():
+    detector = TileChangeDetector()
+    _, thumb = detector.check("t", _tile())
+    detector.remember("t", thumb, {"rec_texts": ["12"]})
+
+    noisy = _tile()
+    noisy[0, 0] += 5
+    result, _ = detector.check("t", noisy)
+
+    assert result == {"rec_texts": ["12"]}
+
+
+def test_single_digit_change_is_detected():
+    detector = TileChangeDetector()
+    _, thumb = detector.check("t", _tile("12"))
+    detector.remember("t", thumb, {"rec_texts": ["12"]})
+
+    result, _ = detector.check("t", _tile("13"))
+
+    assert result is None
+
+
+def test_capacity_evicts_oldest():
+    detector = TileChangeDetector(capacity=1)
+    for key in ("a", "b"):
+        _, thumb = detector.check(key, _tile())
+        detector.remember(key, thumb, key)
+
+    assert detector.check("a", _tile())[0] is None
+    assert detector.check("b", _tile())[0] == "b"
@@ -0,0 +1,67 @@
+"""
+文字存在性预判
+
+重试循环里很多 OCR 请求发给的是根本没有文字的区域（例如等待还没出现的“免费”按钮时，
+区域 8 只有纯色底板或黑屏过渡）。``may_contain_text`` 在送 OCR 之前用边缘检测做一次
+廉价判断：
+
+1. Canny 边缘，轻微膨胀把同一个字的笔画连起来
+2. 统计「像字形」的连通块：宽高都在字号范围内，且不是细长的直线（界面边框、分割线）
+
+一个像字形的连通块都没有时，区域不可能有可识别的文字，直接跳过 OCR。判断偏保守：
+有纹理的背景会被当作「可能有字」，只有纯色、渐变、黑屏等区域会被过滤掉。
+"""
+
+from __future__ import annotations
+
+import cv2
+import numpy as np
+
+DEFAULT_MIN_GLYPH = 6
+"""字形连通块的最小宽高（像素）"""
+
+DEFAULT_MAX_GLYPH = 200
+"""字形连通块的最大高度（像素），更高的是大块图形"""
+
+DEFAULT_MAX_ASPECT = 30.0
+"""连通块宽高比上限，超过视为直线（一行文字膨胀后宽高比一般在 15 以内）"""
+
+CANNY_LOW = 50
+CANNY_HIGH = 150
+
+
+def glyph_count(
+    image: np.ndarray,
+    min_glyph: int = DEFAULT_MIN_GLYPH,
+    max_glyph: int = DEFAULT_MAX_GLYPH,
+    max_aspect: float = DEFAULT_MAX_ASPECT,
+) -> int:
+    """区域内像字形（或一行文字）的连通块数量"""
+    if image is None or image.size == 0:
+        return 0
+    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if image.ndim == 3 else image
+    edges = cv2.Canny(gray, CANNY_LOW, CANNY_HIGH)
+    if not edges.any():
+        return 0
+    edges = cv2.dilate(edges, np.ones((3, 3), dtype=np.uint8))
+    _, _, stats, _ = cv2.connectedComponentsWithStats(edges, connectivity=8)
+
+    # stats[0] 为背景
+    widths = stats[1:, cv2.CC_STAT_WIDTH]
+    heights = stats[1:, cv2.CC_STAT_HEIGHT]
+    aspect = np.maximum(widths, heights) / np.maximum(1, np.minimum(widths, heights))
+    glyphs = (
+        (widths >= min_glyph)
+        & (heights >= min_glyph)
+        & (heights <= max_glyph)
+        & (aspect <= max_aspect)
+    )
+    return int(np.count_nonzero(glyphs))
+
+
+def may_contain_text(image: np.ndarray, min_glyphs: int = 1) -> bool:
+    """区域是否可能包含文字（False 时可以放心跳过 OCR）"""
+    return glyph_count(image) >= min_glyphs
+
+
+__all__ = ["glyph_count", "may_contain_text"]
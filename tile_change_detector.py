@@ -0,0 +1,90 @@
+"""
+格子变化检测
+
+``find_text(..., timeout=10)`` 等轮询查找每轮都重新截图、重新 OCR，而画面往往和上一轮
+完全一样。``TileChangeDetector`` 记住每个区域上次识别时的缩略图和识别结果：区域缩略图
+与上次相比没有明显变化时直接返回上次的结果，不再请求 OCR 服务。
+
+比较用的是 1/4 分辨率灰度图的最大绝对差（而不是平均差），文字哪怕只变了一个数字，
+对应小块的亮度也会明显变化，不会被误判为未变化。
+"""
+
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from typing import Any, Hashable, Optional, Tuple
+
+import cv2
+import numpy as np
+
+DEFAULT_SCALE = 4
+"""缩略图缩小倍数"""
+
+DEFAULT_MAX_DIFF = 12
+"""缩略图任一像素差异超过该值（0-255）即视为变化"""
+
+DEFAULT_CAPACITY = 64
+"""最多记住的区域数量"""
+
+
+def fingerprint(image: np.ndarray, scale: int = DEFAULT_SCALE) -> np.ndarray:
+    """区域图像 -> 灰度缩略图（int16，便于直接相减）"""
+    if image.ndim == 3:
+        image = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    height, width = image.shape[:2]
+    size = (max(1, width // scale), max(1, height // scale))
+    return cv2.resize(image, size, interpolation=cv2.INTER_AREA).astype(np.int16)
+
+
+class TileChangeDetector:
+    """按区域记住上次的识别结果，区域画面未变化时复用"""
+
+    def __init__(
+        self,
+        max_diff: int = DEFAULT_MAX_DIFF,
+        scale: int = DEFAULT_SCALE,
+        capacity: int = DEFAULT_CAPACITY,
+    ):
+        self.max_diff = max_diff
+        self.scale = scale
+        self.capacity = capacity
+        self._memo: "OrderedDict[Hashable, Tuple[np.ndarray, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def check(self, key: Hashable, image: np.ndarray) -> Tuple[Optional[Any], np.ndarray]:
+        """检查区域画面是否与上次识别时相同
+
+        Returns:
+            (上次的结果或 None, 本次缩略图)；缩略图传给 ``remember`` 避免重复计算
+        """
+        current = fingerprint(image, self.scale)
+        with self._lock:
+            entry = self._memo.get(key)
+            if entry is None:
+                return None, current
+            previous, result = entry
+            if previous.shape != current.shape:
+                return None, current
+            if int(np.abs(current - previous).max()) > self.max_diff:
+                return None, current
+            self._memo.move_to_end(key)
+            return result, current
+
+    def remember(self, key: Hashable, thumb: np.ndarray, result: Any) -> None:
+        with self._lock:
+            self._memo[key] = (thumb, result)
+            self._memo.move_to_end(key)
+            while len(self._memo) > self.capacity:
+                self._memo.popitem(last=False)
+
+    def forget(self, key: Hashable) -> None:
+        with self._lock:
+            self._memo.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memo.clear()
+
+
+__all__ = ["TileChangeDetector", "fingerprint"]